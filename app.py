@@ -5,8 +5,7 @@ Provides HTTP endpoints to trigger the multi-agent content system.
 import os
 import sys
 import json
-import re
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,9 +15,27 @@ load_dotenv()
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
 from adk.core import AgentContext
+from adk.history import PayloadStore, payload_dir
+from adk.checkpoint import get_checkpoint_store
+from adk.coalesce import JobCoalescer
+from adk.generation import parse_overrides
+from adk.routing import job_routes
+from adk.job_store import get_job_store
+from adk.job_outcome import record_success, record_failure
+from adk.metrics import REGISTRY, JOBS_IN_FLIGHT
+from adk.scheduler import FairScheduler, tenant_key
 from agents.manager_agent import ManagerAgent
+from adk.warmup import WARMUP_ON_START, start_background_warmup
+from tools.http_client import HttpClient
 
 app = Flask(__name__)
+coalescer = JobCoalescer()
+# Caps concurrent pipelines per API key / user and per WordPress site (SCHEDULER_* env vars)
+scheduler = FairScheduler(name="api")
+
+# Pre-build clients and connections off the request path; readiness does not wait for it
+if WARMUP_ON_START:
+    start_background_warmup()
 
 @app.route('/', methods=['GET'])
 def health_check():
@@ -33,6 +50,7 @@ def health_check():
 def run_agents():
     """
     Trigger the multi-agent content system.
+    When job_id is given, each stage is checkpointed so a failure can be resumed via /resume.
     
     Request body:
     {
@@ -41,26 +59,58 @@ def run_agents():
             "url": "...",
             "username": "...",
             "password": "..."
-        }
+        },
+        "user_id": "...",   (optional: fair-share tenant; defaults to the API key)
+        "priority": 0,      (optional: higher runs first among the tenant's queued jobs)
+        "generation": {     (optional: per-job generation settings by "*", agent name or call type)
+            "WriterAgent": {"max_output_tokens": 4096, "thinking": "low"}
+        },
+        "google_model_routes": "alt_text=gemini-2.5-flash-lite|$primary"
+                            (optional: model list per call type or agent name, see adk.routing)
     }
     """
+    # Get topic from request
+    data = request.get_json()
+    
+    if not data or 'topic' not in data:
+        return jsonify({
+            'error': 'Missing required field: topic',
+            'example': {'topic': 'Agentic AI'}
+        }), 400
+    
+    return _execute_workflow(data)
+
+@app.route('/resume', methods=['POST'])
+def resume_job():
+    """
+    Resume a failed job from its stage checkpoints.
+    Accepts the same body as /run, with job_id required and topic optional.
+    """
+    data = request.get_json()
+    
+    if not data or not data.get('job_id'):
+        return jsonify({'error': 'Missing required field: job_id'}), 400
+    
+    return _execute_workflow(data, resume=True)
+
+def _execute_workflow(data, resume=False):
+    """Run (or resume) the pipeline for a /run-style request body and record the outcome."""
     try:
-        # Get topic from request
-        data = request.get_json()
-        
-        if not data or 'topic' not in data:
-            return jsonify({
-                'error': 'Missing required field: topic',
-                'example': {'topic': 'Agentic AI'}
-            }), 400
-        
-        topic = data['topic']
+        topic = data.get('topic', '')
         wp_config = data.get('wp_config', {})
         db_url = data.get('db_url')
         job_id = data.get('job_id')
         google_api_key = data.get('google_api_key')
         google_model_name = data.get('google_model_name')
         google_fallback_models = data.get('google_fallback_models')
+        try:
+            generation_overrides = parse_overrides(data.get('generation'))
+            try:
+                priority = int(data.get('priority') or 0)
+            except (TypeError, ValueError):
+                raise ValueError(f"priority must be an integer, got {data.get('priority')!r}")
+        except ValueError as e:
+            return jsonify({'status': 'error', 'error': str(e), 'type': 'ValueError'}), 400
         
         # Override environment variables for the current request context
         if wp_config:
@@ -68,7 +118,7 @@ def run_agents():
             if wp_config.get('username'): os.environ['WP_USERNAME'] = wp_config['username']
             if wp_config.get('password'): os.environ['WP_APP_PASSWORD'] = wp_config['password']
         
-        print(f"Starting workflow with topic: '{topic}' [Job: {job_id}]")
+        print(f"{'Resuming' if resume else 'Starting'} workflow with topic: '{topic}' [Job: {job_id}]")
         
         # Create shared context
         context = AgentContext()
@@ -79,95 +129,64 @@ def run_agents():
         context.google_api_key = google_api_key or os.environ.get('GOOGLE_API_KEY')
         context.google_model_name = google_model_name or os.environ.get('GOOGLE_MODEL_NAME')
         context.google_fallback_models = google_fallback_models or os.environ.get('GOOGLE_FALLBACK_MODELS')
+        context.wp_config = wp_config or None
+        if generation_overrides:
+            context.generation_overrides = generation_overrides
+        # Malformed routes are rejected when saved; a run warns in its log and uses the defaults
+        context.google_model_routes = job_routes(data.get('google_model_routes'), context.log)
+        if job_id:
+            # The job database when there is one, so /resume can land on any instance
+            context.checkpoint_store = get_checkpoint_store(db_url=db_url)
         
-        # Initialize the Manager
-        manager = ManagerAgent(context)
+        def run_pipeline():
+            # Initialize the Manager and run the workflow
+            JOBS_IN_FLIGHT.inc()
+            try:
+                manager = ManagerAgent(context)
+                result = manager.resume(job_id) if resume else manager.run(topic)
+            finally:
+                JOBS_IN_FLIGHT.dec()
+            return result, context
+
+        # Duplicate submissions from the same tenant for the same site/topic attach to the running pipeline
+        site = (wp_config or {}).get('url') or os.environ.get('WP_URL', '')
+        tenant = tenant_key(data.get('user_id'), context.google_api_key)
+        key = ("resume", job_id) if resume else JobCoalescer.make_key(site, topic, tenant)
+
+        def scheduled_pipeline():
+            # Waits for a fair-share slot; attached duplicates never take one
+            return scheduler.run(run_pipeline, tenant=tenant, site=site, priority=priority)
         
-        # Run the workflow
         try:
-            result = manager.run(topic)
+            (result, run_context), coalesced = coalescer.run(key, scheduled_pipeline, job_id=job_id)
+            if coalesced and run_context is not context:
+                print(f"Attached job {job_id} to an in-flight or recent run for '{topic}'")
+                # The job keeps its own logs; status and URL come from the shared result
+                context.log(f"[System] Attached to an identical run (job {run_context.job_id or 'n/a'}); "
+                            f"its result is shared.")
+            topic = context.topic or run_context.topic or topic
             print(f"Workflow completed successfully")
 
             # Final DB update for completion
-            if db_url and job_id:
-                try:
-                    logs = "\n".join(context.history)
-                    combined_output = logs + "\n" + str(result)
-                    
-                    url_match = re.search(r"\[View Post\]\((https?://[^\s)]+)\)", combined_output)
-                    published_url = url_match.group(1) if url_match else None
-                    if not published_url:
-                        fallback_match = re.search(r"SUCCESS: Post published at\s*(https?://[^\s]+)", combined_output)
-                        if fallback_match: published_url = fallback_match.group(1)
-                    
-                    title_match = re.search(r"Final Title: (.*)", logs)
-                    published_title = title_match.group(1).strip() if title_match else None
-
-                    is_simulated = getattr(context, 'is_simulated', False)
-                    is_draft = "Saved as Draft" in str(result) or "retrying as draft" in combined_output
-                    
-                    if published_url:
-                        final_status = "DRAFT" if (is_simulated or is_draft) else "PUBLISHED"
-                        if is_simulated: logs += "\n[System] Post saved as DRAFT due to Simulated Mode."
-                        elif is_draft: logs += "\n[System] Post saved as DRAFT due to Publishing Fallback."
-                    else:
-                        final_status = "FAILED"
-                        logs += "\n[System] Publishing failed: " + ("Skipped due to simulation" if is_simulated else "No WordPress URL found.")
-
-                    if db_url.startswith("file:") or "sqlite" in db_url.lower():
-                        import sqlite3
-                        db_path = db_url.replace("file:", "")
-                        if "?" in db_path: db_path = db_path.split("?")[0]
-                        conn = sqlite3.connect(db_path)
-                        cur = conn.cursor()
-                        cur.execute('UPDATE "AgentJob" SET "status" = ?, "logs" = ?, "currentStep" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?', ("COMPLETED", logs, "Completed", job_id))
-                        cur.execute('SELECT "contentItemId" FROM "AgentJob" WHERE "id" = ?', (job_id,))
-                        cid = cur.fetchone()[0]
-                        cur.execute('UPDATE "ContentItem" SET "status" = ?, "publishedUrl" = ?, "title" = COALESCE(?, "title"), "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?', (final_status, published_url, published_title, cid))
-                    else:
-                        import psycopg2
-                        clean_url = db_url.split("?")[0] if "?" in db_url else db_url
-                        conn = psycopg2.connect(clean_url)
-                        cur = conn.cursor()
-                        cur.execute('UPDATE "AgentJob" SET "status" = %s, "logs" = %s, "currentStep" = %s, "updatedAt" = NOW() WHERE "id" = %s', ("COMPLETED", logs, "Completed", job_id))
-                        cur.execute('SELECT "contentItemId" FROM "AgentJob" WHERE "id" = %s', (job_id,))
-                        cid = cur.fetchone()[0]
-                        cur.execute('UPDATE "ContentItem" SET "status" = %s, "publishedUrl" = %s, "title" = COALESCE(%s, "title"), "updatedAt" = NOW() WHERE "id" = %s', (final_status, published_url, published_title, cid))
-
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                except Exception as final_db_err:
-                    print(f"[FINAL DB ERROR] {final_db_err}")
+            try:
+                record_success(db_url, job_id, context, result, source=run_context)
+            except Exception as final_db_err:
+                print(f"[FINAL DB ERROR] {final_db_err}")
 
             return jsonify({
                 'status': 'success',
                 'topic': topic,
                 'result': result,
-                'logs': context.history
+                'logs': context.history,
+                'logs_dropped': getattr(context.history, 'dropped', 0),
+                'coalesced': coalesced
             }), 200
         except Exception as e:
             # Update AgentJob with failure
-            if db_url and job_id:
-                try:
-                    logs = "\n".join(context.history) + f"\nERROR: {str(e)}"
-                    if db_url.startswith("file:") or "sqlite" in db_url.lower():
-                        import sqlite3
-                        db_path = db_url.replace("file:", "")
-                        if "?" in db_path: db_path = db_path.split("?")[0]
-                        conn = sqlite3.connect(db_path)
-                        cur = conn.cursor()
-                        cur.execute('UPDATE "AgentJob" SET "status" = ?, "logs" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?', ("FAILED", logs, job_id))
-                    else:
-                        import psycopg2
-                        clean_url = db_url.split("?")[0] if "?" in db_url else db_url
-                        conn = psycopg2.connect(clean_url)
-                        cur = conn.cursor()
-                        cur.execute('UPDATE "AgentJob" SET "status" = %s, "logs" = %s, "updatedAt" = NOW() WHERE "id" = %s', ("FAILED", logs, job_id))
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                except: pass
+            try:
+                record_failure(db_url, job_id, context, e)
+            except Exception as fail_db_err:
+                print(f"[FINAL DB ERROR] {fail_db_err}")
             raise e
         
     except Exception as e:
@@ -197,6 +216,52 @@ def test():
         }
     }), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of pipeline, LLM, HTTP and DB metrics"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs/<job_id>/logs', methods=['GET'])
+def job_logs(job_id):
+    """Incremental job logs: segments after the ?after=<seq> cursor (full text with ?full=true)"""
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        return jsonify({'error': 'DATABASE_URL is not configured'}), 503
+    store = get_job_store(db_url)
+    if request.args.get('full', '').lower() == 'true':
+        return jsonify({'job_id': job_id, 'logs': store.full_logs(job_id)}), 200
+    try:
+        after = max(0, int(request.args.get('after', 0)))
+        limit = min(1000, max(1, int(request.args.get('limit', 500))))
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+    segments = store.read_logs(job_id, after=after, limit=limit)
+    return jsonify({
+        'job_id': job_id,
+        'segments': [{'seq': seq, 'content': content} for seq, content in segments],
+        'cursor': segments[-1][0] if segments else after,
+        'finished': store.job_logs(job_id) is not None
+    }), 200
+
+@app.route('/jobs/<job_id>/payloads/<ref>', methods=['GET'])
+def job_payload(job_id, ref):
+    """Full text of a log payload referenced as payload:<ref> (this host; until the job ends unless LOG_PAYLOAD_DIR is set)"""
+    text = PayloadStore(payload_dir(job_id)).get(ref)
+    if text is None:
+        return jsonify({'error': 'Payload not found'}), 404
+    return Response(text, mimetype='text/plain'), 200
+
+@app.route('/warmup', methods=['GET', 'POST'])
+def warmup():
+    """Start warm-up if it has not run yet and report what was warmed and how long each step took"""
+    report = start_background_warmup().to_dict()
+    return jsonify(report), 200 if report['state'] == 'done' else 202
+
+@app.route('/stats/http', methods=['GET'])
+def http_stats():
+    """Per-host outbound HTTP counters (latency, bytes, errors)"""
+    return jsonify(HttpClient.export_stats()), 200
+
 if __name__ == '__main__':
     # For local testing
     port = int(os.environ.get('PORT', 8080))
@@ -0,0 +1,56 @@
+"""
+Offline publishing load test against the fake WordPress server in test/fake_wordpress.py.
+
+Usage:
+    python bench/publish_load.py --posts 40 --concurrency 8 --latency 0.2 --error-rate 0.05 --rate-limit 20
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+sys.path.append(os.path.join(ROOT, "test"))
+
+from fake_wordpress import FakeWordPressServer
+from tools.wordpress_tool import WordPressTool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publishing load test against a fake WordPress")
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with FakeWordPressServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             rate_limit=args.rate_limit, seed=args.seed) as wp:
+        auth = wp.auth()
+
+        def publish(i: int):
+            start = time.perf_counter()
+            result = WordPressTool.publish_post(f"Load test post {i}", "<p>Body</p>", auth, status="draft")
+            return time.perf_counter() - start, not str(result).startswith("FAILED")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            outcomes = list(pool.map(publish, range(args.posts)))
+        wall = time.perf_counter() - start
+
+        latencies = sorted(t for t, _ in outcomes)
+        succeeded = sum(1 for _, ok in outcomes if ok)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"\nPublished {succeeded}/{args.posts} posts in {wall:.2f}s ({args.posts / wall:.1f} posts/s)")
+        print(f"Latency p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+        print(f"Server status counts {wp.status_counts()}, peak concurrency {wp.peak_concurrency}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Research query building: local keyword extraction (the default) against the LLM round-trip.
+
+For each fixture trend list, builds the search query both ways and reports the latency of each,
+the word overlap between the two queries and, when GOOGLE_SEARCH_API_KEY / GOOGLE_SEARCH_CX are
+set, the overlap of the result links they return. The LLM side uses Gemini when GOOGLE_API_KEY is
+set and otherwise the offline fake backend (latency only; its queries are placeholders).
+
+Usage:
+    python bench/query_extraction.py
+    python bench/query_extraction.py --model gemini-2.5-flash-lite --fake-ttft 0.8
+"""
+import os
+import re
+import sys
+import time
+import timeit
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+
+from dotenv import load_dotenv
+from adk.aio import run_sync
+from adk.core import AgentContext
+from adk.llm_backends import FakeLLMBackend
+from agents.research_agent import ResearcherAgent
+from tools.search_tool import SearchTool
+from tools.keyword_tool import KeywordTool
+
+# (topic, TrendAgent-style output)
+FIXTURES = [
+    ("Edge AI", """1. **Edge AI inference on smartphones** - On-device LLMs are cutting cloud costs.
+2. **TinyML for IoT sensors** - Microcontrollers running neural networks.
+3. **Neuromorphic chips** - Intel Loihi 2 and energy-efficient edge inference.
+4. Federated learning for privacy-preserving edge AI"""),
+    ("Remote Work", """- Hybrid work policies and return-to-office mandates
+- Four-day work week pilots
+- Async collaboration tools replacing meetings
+- Employee monitoring software backlash"""),
+    ("Sustainable Fashion", """1. Circular fashion and garment resale platforms
+2. Textile recycling technology
+3. EU Digital Product Passport for apparel
+4. Fast fashion carbon emissions"""),
+    ("Electric Vehicles", """* Solid-state battery commercialization
+* Public fast charging network expansion
+* EV battery recycling and second-life storage
+* Used EV prices and depreciation"""),
+    ("Cybersecurity", """1. **AI-powered phishing attacks** - Deepfake voice scams targeting finance teams
+2. **Ransomware on healthcare** - Hospital downtime and recovery costs
+3. **Zero trust architecture adoption**
+4. Passkeys replacing passwords"""),
+]
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#'-]*")
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def result_links(query: str) -> set:
+    return {r["link"] for r in SearchTool.google_search(query) if r.get("link")}
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Local vs LLM research query building")
+    parser.add_argument("--model", default=None, help="Model for the LLM side (default: its query_extraction route)")
+    parser.add_argument("--fake-ttft", type=float, default=0.6, help="Fake backend time to first token without GOOGLE_API_KEY")
+    parser.add_argument("--fake-tps", type=float, default=80.0, help="Fake backend tokens per second")
+    args = parser.parse_args()
+
+    context = AgentContext()
+    if args.model:
+        context.google_model_routes = {"query_extraction": [args.model]}
+    if not os.environ.get("GOOGLE_API_KEY"):
+        context.llm_backend = FakeLLMBackend(ttft=args.fake_ttft, tokens_per_second=args.fake_tps,
+                                             responder=lambda model, prompt: "placeholder query")
+        print(f"GOOGLE_API_KEY not set: LLM side uses the fake backend (ttft {args.fake_ttft}s)")
+    search = bool(os.environ.get("GOOGLE_SEARCH_API_KEY") and os.environ.get("GOOGLE_SEARCH_CX"))
+
+    local_us, llm_s, word_overlap, link_overlap = [], [], [], []
+    print(f"\n{'topic':<20} {'local':>10} {'llm':>9} {'words':>6} {'links':>6}  queries")
+    for topic, trends in FIXTURES:
+        context.topic = topic
+        agent = ResearcherAgent(context)
+        timer = timeit.Timer(lambda: KeywordTool.build_search_query(topic, trends))
+        number, _ = timer.autorange()
+        local = min(timer.repeat(repeat=5, number=number)) / number
+        local_query = run_sync(agent.asearch_query(trends, mode="local"))
+
+        started = time.perf_counter()
+        llm_query = run_sync(agent.asearch_query(trends, mode="llm"))
+        llm = time.perf_counter() - started
+
+        words = jaccard(set(_WORD.findall(local_query.lower())), set(_WORD.findall(llm_query.lower())))
+        links = jaccard(result_links(local_query), result_links(llm_query)) if search else None
+        local_us.append(local * 1e6)
+        llm_s.append(llm)
+        word_overlap.append(words)
+        if links is not None:
+            link_overlap.append(links)
+        print(f"{topic:<20} {local * 1e6:>8.0f}us {llm:>8.2f}s {words:>6.2f} {'-' if links is None else f'{links:.2f}':>6}"
+              f"  local={local_query!r} llm={llm_query!r}")
+
+    print(f"\nLocal query: median {statistics.median(local_us):.0f} us per build")
+    print(f"LLM query:   median {statistics.median(llm_s):.2f} s per round-trip")
+    print(f"Query word overlap (Jaccard): mean {statistics.mean(word_overlap):.2f}")
+    if link_overlap:
+        print(f"Search result overlap (Jaccard of links): mean {statistics.mean(link_overlap):.2f}")
+    else:
+        print("Search result overlap: skipped (set GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_CX)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Component micro-benchmarks for CPU hot paths in the agent pipeline.
+
+Usage:
+    python bench/run_benchmarks.py                  # run and print results
+    python bench/run_benchmarks.py --save           # run and write the JSON baseline
+    python bench/run_benchmarks.py --compare        # run and flag regressions against the baseline
+    python bench/run_benchmarks.py --only clean_output,link_extraction
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import sqlite3
+import argparse
+import platform
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+
+DEFAULT_BASELINE = os.path.join(ROOT, "bench", "baselines", "components.json")
+
+
+# --- Fixtures ---
+
+def _paragraph(i: int) -> str:
+    return (f"Paragraph {i} discusses [source {i}](https://site{i % 37}.org/article/{i}) and the measurable "
+            f"impact of automation on content teams, with statistics from [report {i}](https://data{i % 11}.com/r/{i}). ")
+
+
+def make_article(words: int = 2500) -> str:
+    parts = ["# The Ultimate Guide to Edge AI\n"]
+    i = 0
+    while sum(len(p.split()) for p in parts) < words:
+        if i % 6 == 0:
+            parts.append(f"\n## Section {i // 6 + 1}\n")
+        parts.append(_paragraph(i) * 3 + "\n")
+        i += 1
+    return "\n".join(parts)
+
+
+ARTICLE = make_article()
+
+LLM_OUTPUT = "FINAL CONTENT:\n```markdown\n" + ARTICLE + "\n```\n"
+
+SEO_OUTPUT = f"""---SEO_DATA---
+Meta Title: Edge AI Guide
+Meta Description: Everything about edge AI deployment in 2026.
+Slug: edge-ai-guide
+OG Title: Edge AI Guide
+OG Description: Deploying AI at the edge.
+Canonical:
+Category: Technology
+Tags: Edge AI, IoT, Inference, Hardware
+JSON-LD: {{"@context": "https://schema.org", "@type": "Article"}}
+---ARTICLE---
+{ARTICLE}
+
+---VALIDATED_LINKS_FOR_REFERENCE_ONLY---
+EXTERNAL:
+- [source 1](https://site1.org/article/1)
+"""
+
+SOFT_404_CHUNKS = [
+    ("<html><head><title>Welcome</title></head><body>" + "<div class='nav'>menu item</div>" * 60)[:2048].encode(),
+    ("<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40)[:2048].encode(),
+    ("<footer>" + "links and copyright " * 100)[:2048].encode(),
+]
+
+
+# --- Benchmarks: each returns a zero-argument callable to time ---
+
+def bench_clean_output():
+    from adk.core import AgentContext
+    from adk.agents import LLMAgent
+    agent = LLMAgent("BenchAgent", AgentContext(), persona="bench")
+    return lambda: agent._clean_output(LLM_OUTPUT)
+
+
+def bench_marker_parsing():
+    from adk.artifacts import Article
+    return lambda: Article.from_seo_output(SEO_OUTPUT)
+
+
+def bench_link_extraction():
+    from adk.artifacts import extract_links
+    return lambda: extract_links(ARTICLE)
+
+
+def bench_markdown_to_html():
+    import markdown
+    return lambda: markdown.markdown(ARTICLE, extensions=['extra', 'nl2br'])
+
+
+def _db_log_update(history_lines: int):
+    def factory():
+        from adk.core import AgentContext, _update_db_logs
+        tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(tmp_dir, "bench.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE "AgentJob" ("id" TEXT PRIMARY KEY, "logs" TEXT, "currentStep" TEXT, "updatedAt" DATETIME)')
+        conn.execute('CREATE TABLE "AgentJobLog" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "jobId" TEXT NOT NULL, '
+                     '"seq" INTEGER NOT NULL, "content" TEXT NOT NULL, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, '
+                     'UNIQUE ("jobId", "seq"))')
+        conn.execute('INSERT INTO "AgentJob" ("id") VALUES (?)', ("bench-job",))
+        conn.commit()
+        conn.close()
+
+        context = AgentContext()
+        context.db_url = f"file:{db_path}"
+        context.job_id = "bench-job"
+        # A history of the given size that is already persisted; each call logs one more line, as LLMAgent does
+        context.history = [f"[WriterAgent] step {i}: " + ("x" * 200) for i in range(history_lines)]
+        _update_db_logs(context)
+
+        def run():
+            context.history.append("[SEOAgent] Validating external link: https://example.org/a")
+            _update_db_logs(context)
+        return run
+    return factory
+
+
+def bench_keyword_query():
+    from tools.keyword_tool import KeywordTool
+    trends = "\n".join(f"{i}. **Trend {i}: edge inference on device class {i % 4}** - cuts cloud costs for IoT fleets"
+                       for i in range(1, 8))
+    return lambda: KeywordTool.build_search_query("Edge AI", trends)
+
+
+def bench_soft_404_scan():
+    from tools.link_validator_tool import LinkValidatorTool
+    return lambda: LinkValidatorTool.looks_like_soft_404(SOFT_404_CHUNKS)
+
+
+BENCHMARKS = {
+    "clean_output": bench_clean_output,
+    "marker_parsing": bench_marker_parsing,
+    "link_extraction": bench_link_extraction,
+    "markdown_to_html": bench_markdown_to_html,
+    "db_log_update_100": _db_log_update(100),
+    "db_log_update_1000": _db_log_update(1000),
+    "db_log_update_5000": _db_log_update(5000),
+    "soft_404_scan": bench_soft_404_scan,
+    "keyword_query": bench_keyword_query,
+}
+
+
+def measure(fn, repeat: int = 7) -> dict:
+    """Auto-calibrate the loop count (~0.2s per sample), then report per-call timings over several repeats."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(names=None) -> dict:
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        try:
+            fn = factory()
+        except ImportError as e:
+            print(f"  {name:<20} SKIPPED ({e})")
+            continue
+        results[name] = measure(fn)
+        print(f"  {name:<20} min {results[name]['min_us']:>12.2f} us   median {results[name]['median_us']:>12.2f} us")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (name, baseline_us, current_us, ratio) for benchmarks slower than baseline by more than threshold."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = current["min_us"] / base["min_us"] if base["min_us"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + threshold else ("faster" if ratio < 1 - threshold else "ok")
+        print(f"  {name:<20} {base['min_us']:>12.2f} -> {current['min_us']:>12.2f} us  x{ratio:.2f}  {flag}")
+        if ratio > 1 + threshold:
+            regressions.append((name, base["min_us"], current["min_us"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Component micro-benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline and exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or None
+    print("Running component benchmarks...")
+    results = run_benchmarks(names)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save first.")
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparing against baseline from {baseline.get('created')}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cold-start benchmark: time from process spawn to the first 200 from the / health check.
+
+Usage:
+    python bench/startup.py                       # 5 runs, print timings and the slowest imports
+    python bench/startup.py --max-seconds 1.5     # exit 1 if the median exceeds the budget
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay off the startup path; they are imported on first use
+LAZY_MODULES = ("google.genai", "google.adk", "PIL", "psycopg2", "markdown")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(timeout: float = 30.0) -> float:
+    """Start app.py in a fresh interpreter and poll / until it answers 200."""
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port))
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "app.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"app.py exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No health response within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def startup_imports() -> list:
+    """Heavy modules loaded by `import app` (should be empty)."""
+    code = ("import sys; sys.path.insert(0, 'src'); import app; "
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    # Background warm-up imports these on purpose; check only what the request path pays for
+    env = dict(os.environ, WARMUP_ON_START="false")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    last = out.stdout.strip().splitlines()[-1] if out.stdout.strip() else ""
+    return [m for m in last.split(",") if m]
+
+
+def slowest_imports(limit: int = 10) -> list:
+    """(cumulative_us, module) for the slowest imports under `import app`, via -X importtime."""
+    env = dict(os.environ, WARMUP_ON_START="false")
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import sys; sys.path.insert(0, 'src'); import app"],
+                         cwd=ROOT, env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for app.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the median time to first response exceeds this")
+    args = parser.parse_args()
+
+    print("Slowest imports under `import app` (cumulative):")
+    for cumulative, name in slowest_imports():
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    timings = [time_to_first_response() for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"\nTime to first / response over {args.runs} runs: "
+          f"median {median * 1000:.0f} ms, min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms")
+
+    failed = False
+    eager = startup_imports()
+    if eager:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: median startup {median:.2f}s exceeds budget of {args.max_seconds:.2f}s")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("Startup OK.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,31 @@
-
+import os
+import sys
+import time
 import sqlite3
-import json
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from adk.job_store import get_job_store
+
+DEFAULT_DB = 'web/prisma/dev.db'
+
 
-def dump_recent_job():
-    conn = sqlite3.connect('web/prisma/dev.db')
+def dump_recent_job(db_path: str = DEFAULT_DB, follow: bool = False, interval: float = 1.0):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Get latest job
-    cursor.execute("SELECT id, status, logs, contentItemId FROM AgentJob ORDER BY createdAt DESC LIMIT 1")
+    cursor.execute("SELECT id, status, contentItemId FROM AgentJob ORDER BY createdAt DESC LIMIT 1")
     job = cursor.fetchone()
     
     if job:
         print(f"Job ID: {job[0]}")
         print(f"Status: {job[1]}")
-        print(f"Content ID: {job[3]}")
+        print(f"Content ID: {job[2]}")
         print("-" * 20)
         # Content item info
-        cursor.execute("SELECT title, topic FROM ContentItem WHERE id = ?", (job[3],))
+        cursor.execute("SELECT title, topic FROM ContentItem WHERE id = ?", (job[2],))
         item = cursor.fetchone()
         if item:
             print(f"Item Title: {item[0]}")
@@ -24,11 +33,27 @@ def dump_recent_job():
         
         print("-" * 20)
         print("LOGS:")
-        print(job[2][-10000:] if job[2] and len(job[2]) > 10000 else job[2])
+        store = get_job_store(f"file:{db_path}")
+        if not follow:
+            logs = store.full_logs(job[0])
+            print(logs[-10000:] if logs and len(logs) > 10000 else logs)
+        else:
+            # Tail the job: read only segments after the last one printed
+            seq = 0
+            while True:
+                for seq, content in store.read_logs(job[0], after=seq):
+                    print(content)
+                if store.job_logs(job[0]) is not None:
+                    break
+                time.sleep(interval)
     else:
         print("No jobs found.")
     
     conn.close()
 
 if __name__ == "__main__":
-    dump_recent_job()
+    parser = argparse.ArgumentParser(description="Print the logs of the most recent agent job")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database path")
+    parser.add_argument("--follow", action="store_true", help="Stream new log segments until the job finishes")
+    args = parser.parse_args()
+    dump_recent_job(args.db, follow=args.follow)
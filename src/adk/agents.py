@@ -1,86 +1,104 @@
+import re
 import abc
+import json
+import time
 import typing
-import os
+import asyncio
 from .core import BaseAgent, AgentContext
+from .metrics import STAGE_DURATION, LLM_DURATION, LLM_ROUTE_DURATION, LLM_FALLBACKS, SIMULATION_ENTRIES
+from .tracing import span
+from .checkpoint import JOB_INPUT_STAGE, encode_output, decode_output
+from .llm_backends import get_llm_backend
+from .history import preview
+from . import generation, routing
 
 class LLMAgent(BaseAgent):
-    """An agent that uses an LLM (simulated) to perform tasks."""
+    """An agent that uses an LLM (via a pluggable backend, simulated as a last resort) to perform tasks."""
+
+    # Generation settings (see adk.generation): agent-wide defaults, refined per call type;
+    # context.generation_overrides wins over both. Empty means provider defaults.
+    generation_config: typing.Dict[str, typing.Any] = {}
+    call_configs: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    # Call type used when arun is not given one
+    default_call = "generate"
     
     def __init__(self, name: str, context: AgentContext, persona: str, tools: typing.List[typing.Callable] = None):
         super().__init__(name, context)
         self.persona = persona
         self.tools = tools or []
 
-    def run(self, input_data: typing.Any) -> str:
-        self.log(f"Received input: {input_data}")
-        self.log(f"Thinking as {self.persona}...")
+    async def arun(self, input_data: typing.Any, call: str = None) -> str:
+        call = call or self.default_call
+        # Inputs and personas can be whole articles; log a preview and keep the full text once as a payload
+        self.log(f"Received input: {preview(self.context, input_data)}")
+        self.log(f"Thinking as {preview(self.context, self.persona)}")
         
-        # Real Gemini Integration
-        api_key = self.context.google_api_key
-        use_vertex = os.environ.get("USE_VERTEX_AI", "").lower() == "true"
-        project = os.environ.get("GCP_PROJECT_ID")
-        location = os.environ.get("GCP_LOCATION", "us-central1")
-
-        if not api_key and not use_vertex:
-            raise Exception("Missing Google API Key. Please set it in Settings.")
-
-        if api_key or use_vertex:
-            # Prepare model list: primary model first, then fallbacks
-            primary_model = getattr(self.context, 'google_model_name', None) or os.environ.get("GOOGLE_MODEL_NAME", "gemini-3-flash-preview")
-            fallback_str = getattr(self.context, 'google_fallback_models', None) or os.environ.get("GOOGLE_FALLBACK_MODELS", "")
-            # Support both comma and pipe delimiters to avoid CLI issues
-            fallback_models = [m.strip() for m in fallback_str.replace("|", ",").split(",") if m.strip()]
-            
-            models_to_try = [primary_model] + [m for m in fallback_models if m != primary_model]
-            
-            from google import genai
-            if use_vertex:
-                self.log(f"Using Vertex AI (Project: {project}, Location: {location})")
-                client = genai.Client(vertexai=True, project=project, location=location)
-            else:
-                client = genai.Client(api_key=api_key)
-
-            for model_name in models_to_try:
-                try:
-                    self.log(f"Attempting to use model: {model_name}")
-                    # Construct a prompt that includes the persona context
-                    prompt = f"""
-                    You are: {self.persona}
-                    
-                    TASK:
-                    Process the provided input and return ONLY the resulting content. 
-                    Focus on the substance and structure requested.
-                    
-                    CRITICAL INSTRUCTIONS:
-                    - Output ONLY the clean result.
-                    - Do NOT echo the input headers, labels, or instruction prefixes (e.g., "Synthesize...", "Search Findings:", "Topic:").
-                    - Do NOT include any introductory or concluding meta-commentary.
-                    - Do NOT wrap the result in markdown code blocks.
-                    
-                    INPUT: 
-                    {input_data}
-                    
-                    FINAL CONTENT:
-                    """
-                    
-                    response = client.models.generate_content(
-                        model=model_name,
-                        contents=prompt
-                    )
-                    output_text = response.text
+        # Gemini by default; context.llm_backend / LLM_BACKEND=fake swap in the offline fake
+        backend = get_llm_backend(self.context)
+        if getattr(backend, 'vertex', False):
+            self.log(f"Using Vertex AI (Project: {backend.project}, Location: {backend.location})")
+
+        # Models for this call type / agent, in order (see adk.routing)
+        route, models_to_try = routing.resolve(self.name, call, self.context)
+        self.log(f"Model route ({route}): {' -> '.join(models_to_try)}")
+        config = generation.resolve(self, call, self.context)
+        self.log(f"Generation settings ({call}): {generation.describe(config)}")
+        # Checked once, outside the model loop: a bad setting is the job's error, not a model failure
+        generation.validate(config)
+
+        route_started = time.perf_counter()
+        for model_name in models_to_try:
+            try:
+                self.log(f"Attempting to use model: {model_name}")
+                # Construct a prompt that includes the persona context
+                prompt = f"""
+                You are: {self.persona}
+                
+                TASK:
+                Process the provided input and return ONLY the resulting content. 
+                Focus on the substance and structure requested.
+                
+                CRITICAL INSTRUCTIONS:
+                - Output ONLY the clean result.
+                - Do NOT echo the input headers, labels, or instruction prefixes (e.g., "Synthesize...", "Search Findings:", "Topic:").
+                - Do NOT include any introductory or concluding meta-commentary.
+                - Do NOT wrap the result in markdown code blocks.
+                
+                INPUT: 
+                {input_data}
+                
+                FINAL CONTENT:
+                """
+                
+                started = time.perf_counter()
+                with span("llm.generate", agent=self.name, call=call, route=route, model=model_name, backend=backend.name,
+                          prompt_chars=len(prompt), max_output_tokens=config.get("max_output_tokens")) as llm_span:
+                    try:
+                        output_text = await backend.agenerate(model_name, prompt, config=config)
+                    except Exception:
+                        LLM_DURATION.observe(time.perf_counter() - started, agent=self.name, model=model_name, outcome="error")
+                        raise
+                    LLM_DURATION.observe(time.perf_counter() - started, agent=self.name, model=model_name, outcome="ok")
+                    llm_span.set(output_chars=len(output_text or ""))
+                LLM_ROUTE_DURATION.observe(time.perf_counter() - route_started, route=route, model=model_name, outcome="ok")
+                # Structured (JSON) output is returned as is; the cleanup would cut into its strings
+                if not config.get("response_schema"):
                     output_text = self._clean_output(output_text)
-                    self.log(f"Output ({model_name}): {output_text[:100]}...") # Log brief output
-                    return output_text
-                except Exception as e:
-                    self.log(f"Model {model_name} failed: {e}")
-                    continue # Try next model
+                self.log(f"Output ({model_name}): {output_text[:100]}...") # Log brief output
+                return output_text
+            except Exception as e:
+                self.log(f"Model {model_name} failed: {e}")
+                LLM_FALLBACKS.inc(agent=self.name, model=model_name)
+                continue # Try next model
 
-            self.log("All configured models failed. Falling back to simulation.")
+        LLM_ROUTE_DURATION.observe(time.perf_counter() - route_started, route=route, model="none", outcome="error")
+        self.log("All configured models failed. Falling back to simulation.")
 
         # Fallback to simulation
         self.context.is_simulated = True
+        SIMULATION_ENTRIES.inc(agent=self.name)
         response = self._simulate_llm_response(input_data)
-        self.log(f"Output: {response}")
+        self.log(f"Output: {preview(self.context, response)}")
         return response
 
     def _clean_output(self, text: str) -> str:
@@ -166,19 +184,19 @@ class LLMAgent(BaseAgent):
             article += f"### Impact and Future Outlook\n\n"
             article += f"The future of {topic} looks incredibly promising. With advancements in AI and machine learning, we can expect {topic} to become even more intuitive and powerful. Staying curious and adaptable will be your greatest asset as you navigate the future of this field."
             
-            return f"""---SEO_DATA---
-Meta Title: Master {topic} | Professional Guide 2026
-Meta Description: Learn everything about {topic} in our comprehensive, SEO-optimized article. Explore best practices, future trends, and implementation strategies.
-Slug: mastering-{topic.lower().replace(' ', '-')}
-OG Title: Mastering {topic}: The Future of Innovation
-OG Description: Your one-stop resource for insights into {topic}. Expert strategies and implementation guides for 2026.
-Canonical: 
-Category: Technology
-Tags: {topic}, AI, Automation, Strategy, 2026
-JSON-LD: {{}}
----ARTICLE---
-{article}
-"""
+            # Same shape as the SEO stage's structured output (adk.artifacts.SEO_SCHEMA)
+            return json.dumps({
+                "meta_title": f"Master {topic} | Guide 2026"[:60],
+                "meta_description": f"Learn everything about {topic}: best practices, future trends, and implementation strategies."[:160],
+                "slug": f"mastering-{re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-')}",
+                "og_title": f"Mastering {topic}: The Future of Innovation",
+                "og_description": f"Your one-stop resource for insights into {topic}. Expert strategies and implementation guides for 2026.",
+                "canonical": "",
+                "category": "Technology",
+                "tags": [topic, "AI", "Automation", "Strategy", "2026"],
+                "json_ld": json.dumps({"@context": "https://schema.org", "@type": "Article", "headline": f"Mastering {topic}"}),
+                "article": article,
+            })
         elif "media" in self.name.lower():
             return f"A vibrant conceptual illustration representing {topic} in a modern workspace."
         elif "publisher" in self.name.lower():
@@ -186,6 +204,18 @@ JSON-LD: {{}}
         
         return f"Finalized {input_data} as {self.name}."
 
+def _runs_natively_async(agent: BaseAgent) -> bool:
+    """
+    True when the agent's arun is defined at or below its run in the MRO. A subclass that only
+    overrides run (or an instance whose run is patched) keeps that behaviour and is run in a thread.
+    """
+    if "run" in vars(agent):
+        return False
+    mro = type(agent).__mro__
+    owner = lambda name: next(i for i, cls in enumerate(mro) if name in vars(cls))
+    return owner("arun") <= owner("run")
+
+
 class WorkflowAgent(BaseAgent):
     """An agent that coordinates other agents."""
     
@@ -194,18 +224,79 @@ class WorkflowAgent(BaseAgent):
         self.sub_agents = {agent.name: agent for agent in sub_agents}
         self.execution_order = [agent.name for agent in sub_agents] # Default sequential
 
-    def run(self, input_data: typing.Any) -> typing.Any:
+    async def arun(self, input_data: typing.Any) -> typing.Any:
+        job_id = getattr(self.context, 'job_id', None)
+        with span(f"workflow:{self.name}", trace_id=job_id, job_id=job_id, topic=str(input_data)[:100]):
+            return await self._arun_stages(input_data)
+
+    async def _checkpoint(self, operation: str, *args, default=None):
+        """Run a checkpoint store call off the loop; a store error is logged, never fails the job."""
+        store = self.context.checkpoint_store
+        try:
+            return await asyncio.to_thread(getattr(store, operation), *args)
+        except Exception as e:
+            self.log(f"Checkpoint {operation} failed ({e}); continuing without it.")
+            return default
+
+    async def _arun_stages(self, input_data: typing.Any) -> typing.Any:
         self.log(f"Starting professional content workflow with input: {input_data}")
         # Persist the initial topic in the context for sub-agents to use as a source of truth
         if hasattr(self.context, 'topic'):
             self.context.topic = str(input_data).strip()
+
+        # Stage checkpoints (per job id) let a failed run resume without repeating finished stages
+        store = getattr(self.context, 'checkpoint_store', None)
+        job_id = getattr(self.context, 'job_id', None)
+        completed = {}
+        if store and job_id:
+            completed = await self._checkpoint("load", job_id, default={})
+            stored_input = completed.get(JOB_INPUT_STAGE)
+            if stored_input and str(decode_output(stored_input["output"])).strip() != str(input_data).strip():
+                # A reused job id with a different input: the saved stages belong to another article
+                self.log(f"Discarding checkpoints of job {job_id}: they were saved for a different input.")
+                await self._checkpoint("clear", job_id)
+                completed = {}
+            if JOB_INPUT_STAGE not in completed:
+                await self._checkpoint("save", job_id, JOB_INPUT_STAGE, {"output": encode_output(input_data)})
             
         current_data = input_data
         
         for agent_name in self.execution_order:
             agent = self.sub_agents[agent_name]
-            self.log(f"Phase {self.execution_order.index(agent_name) + 1}: Delegating to {agent.name} ({agent.persona[:50]}...)")
-            current_data = agent.run(current_data)
+            phase = self.execution_order.index(agent_name) + 1
+            record = completed.get(agent_name)
+            if record:
+                self.log(f"Phase {phase}: Restored {agent.name} output from checkpoint.")
+                current_data = decode_output(record["output"])
+                if record.get("is_simulated"):
+                    self.context.is_simulated = True
+                continue
+
+            self.log(f"Phase {phase}: Delegating to {agent.name} ({agent.persona[:50]}...)")
+            with STAGE_DURATION.time(agent=agent.name), span(f"agent:{agent.name}", agent=agent.name, phase=phase):
+                if _runs_natively_async(agent):
+                    current_data = await agent.arun(current_data)
+                else:
+                    current_data = await asyncio.to_thread(agent.run, current_data)
+            if store and job_id:
+                await self._checkpoint("save", job_id, agent_name, {
+                    "output": encode_output(current_data),
+                    "is_simulated": getattr(self.context, 'is_simulated', False)
+                })
         
+        if store and job_id:
+            await self._checkpoint("clear", job_id)
         self.log("Workflow orchestration complete. Content finalized.")
         return current_data
+
+    def resume(self, job_id: str) -> typing.Any:
+        """Continue a failed job from the first stage without a checkpoint."""
+        store = getattr(self.context, 'checkpoint_store', None)
+        if not store:
+            raise Exception("Resume requires a checkpoint store on the context.")
+        record = store.load(job_id).get(JOB_INPUT_STAGE)
+        if not record:
+            raise Exception(f"No checkpoints found for job {job_id}.")
+        self.context.job_id = job_id
+        self.log(f"Resuming job {job_id} from checkpoints...")
+        return self.run(decode_output(record["output"]))
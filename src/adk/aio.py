@@ -0,0 +1,73 @@
+"""
+Shared event loop for the asyncio agent runtime.
+
+Agents, LLM backends and tools have coroutine variants (arun, agenerate, aget, ...). Blocking
+callers (Flask request threads, scheduler threads, scripts) reach them through run_sync, which runs
+the coroutine on one background loop, so every in-flight job shares a single event loop.
+"""
+import asyncio
+import typing
+import threading
+import contextvars
+import concurrent.futures
+
+_loop: typing.Optional[asyncio.AbstractEventLoop] = None
+_thread: typing.Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide runtime loop, started on first use in a daemon thread."""
+    global _loop, _thread
+    if _loop is not None:
+        return _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _serve():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=_serve, name="flowpress-aio", daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop = loop
+        return _loop
+
+
+def in_runtime_loop() -> bool:
+    return _thread is not None and threading.current_thread() is _thread
+
+
+def run_sync(coro: typing.Awaitable) -> typing.Any:
+    """
+    Run coro on the shared loop and block until it finishes. The caller's context variables
+    (e.g. the current trace span) carry over. Must not be called from inside the loop itself;
+    coroutines there should await the async variant instead.
+    """
+    if in_runtime_loop():
+        coro.close()
+        raise RuntimeError("run_sync() called from the runtime loop; await the coroutine instead")
+    loop = get_loop()
+    context = contextvars.copy_context()
+    result = concurrent.futures.Future()
+
+    def _start():
+        # The task copies the context current at creation (create_task(context=) needs 3.11)
+        task = context.run(loop.create_task, coro)
+
+        def _done(task: asyncio.Task):
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result())
+
+        task.add_done_callback(_done)
+
+    loop.call_soon_threadsafe(_start)
+    return result.result()
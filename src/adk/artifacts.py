@@ -0,0 +1,287 @@
+"""
+Typed artifacts passed between pipeline stages.
+Each stage parses LLM text once into one of these objects; downstream stages read
+fields instead of re-splitting marker-delimited strings or re-running link regexes.
+"""
+import re
+import json
+import base64
+import typing
+
+# Markdown links: [text](url)
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
+
+SEO_DATA_MARKER = "---SEO_DATA---"
+ARTICLE_MARKER_PATTERN = re.compile(r"---+\s*ARTICLE\s*---+", re.IGNORECASE)
+REFERENCE_LINKS_MARKER = "---VALIDATED_LINKS_FOR_REFERENCE_ONLY---"
+LINKS_SECTION_HEADER = "### AUTHORITATIVE EXTERNAL LINKS"
+
+Link = typing.Tuple[str, str]  # (anchor text, url)
+
+# Structured SEO stage output (JSON schema for the model's response_schema); json_ld is a JSON
+# object serialised as a string, since the schema cannot describe arbitrary nested JSON-LD
+SEO_SCHEMA = {
+    "title": "SEOOutput",
+    "type": "object",
+    "properties": {
+        "meta_title": {"type": "string", "description": "Under 60 characters"},
+        "meta_description": {"type": "string", "description": "150-160 characters"},
+        "slug": {"type": "string", "description": "Lowercase words joined by hyphens"},
+        "og_title": {"type": "string"},
+        "og_description": {"type": "string"},
+        "canonical": {"type": "string", "description": "Absolute URL or empty"},
+        "category": {"type": "string", "description": "One primary category name"},
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "3-5 specific tags"},
+        "json_ld": {"type": "string", "description": "JSON-LD object as a JSON string"},
+        "article": {"type": "string", "description": "The optimized article in Markdown, starting with a single # heading"},
+    },
+    "required": ["meta_title", "meta_description", "slug", "category", "tags", "article"],
+}
+META_TITLE_MAX = 60
+META_DESCRIPTION_MAX = 160
+SLUG_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+def extract_links(text: str) -> typing.List[Link]:
+    """Return unique markdown links in order of first appearance."""
+    seen = set()
+    links = []
+    for anchor, url in LINK_PATTERN.findall(text or ""):
+        if url in seen:
+            continue
+        seen.add(url)
+        links.append((anchor, url))
+    return links
+
+
+def strip_links(text: str, urls: typing.Collection[str]) -> str:
+    """Unlink every markdown link to one of urls, keeping whatever anchor text each occurrence has."""
+    if not urls:
+        return text
+    return LINK_PATTERN.sub(lambda m: m.group(1) if m.group(2) in urls else m.group(0), text)
+
+
+def format_links(links: typing.Iterable[Link]) -> str:
+    return "\n".join(f"- [{anchor}]({url})" for anchor, url in links)
+
+
+class ResearchBrief:
+    """ResearcherAgent output: the briefing text plus its validated source links."""
+    __slots__ = ("topic", "summary", "links")
+
+    def __init__(self, topic: str, summary: str, links: typing.List[Link] = None):
+        self.topic = topic
+        self.summary = summary
+        self.links = links or []
+
+    def render(self) -> str:
+        if not self.links:
+            return self.summary
+        return f"{self.summary}\n\n{LINKS_SECTION_HEADER}\n{format_links(self.links)}\n"
+
+    def __str__(self):
+        return self.render()
+
+    def to_dict(self) -> dict:
+        return {"topic": self.topic, "summary": self.summary, "links": [list(l) for l in self.links]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResearchBrief":
+        return cls(data.get("topic"), data.get("summary", ""), [tuple(l) for l in data.get("links", [])])
+
+
+class SEOMeta:
+    """Structured SEO metadata for a post."""
+    __slots__ = ("meta_title", "meta_description", "slug", "og_title", "og_description",
+                 "canonical", "categories", "tags", "json_ld")
+
+    # "Key: Value" labels used in the SEO text format
+    LABELS = {
+        "meta title": "meta_title",
+        "meta description": "meta_description",
+        "slug": "slug",
+        "og title": "og_title",
+        "og description": "og_description",
+        "canonical": "canonical",
+        "category": "categories",
+        "tags": "tags",
+        "json-ld": "json_ld",
+    }
+    LIST_FIELDS = ("categories", "tags")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            default = [] if name in self.LIST_FIELDS else None
+            setattr(self, name, fields.get(name, default))
+
+    @staticmethod
+    def _split_list(value: str) -> typing.List[str]:
+        return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+    @classmethod
+    def parse(cls, block: str) -> "SEOMeta":
+        """Parse the 'Key: Value' metadata block emitted by the SEO stage."""
+        fields = {}
+        for line in (block or "").split("\n"):
+            if ":" not in line:
+                continue
+            k, v = line.split(":", 1)
+            name = cls.LABELS.get(k.strip().lower())
+            if not name:
+                continue
+            v = v.strip()
+            fields[name] = cls._split_list(v) if name in cls.LIST_FIELDS else (v or None)
+        return cls(**fields)
+
+    @staticmethod
+    def validate(data: typing.Any) -> typing.Dict[str, str]:
+        """{field: problem} for a structured SEO response (see SEO_SCHEMA); empty when it is usable."""
+        if not isinstance(data, dict):
+            return {"response": "must be a JSON object"}
+        errors = {}
+        for name, spec in SEO_SCHEMA["properties"].items():
+            value = data.get(name)
+            if value is None or value == "" or value == []:
+                if name in SEO_SCHEMA["required"]:
+                    errors[name] = "is required"
+            elif spec["type"] == "string" and not isinstance(value, str):
+                errors[name] = "must be a string"
+            elif spec["type"] == "array" and not (isinstance(value, list) and all(isinstance(v, str) and v.strip() for v in value)):
+                errors[name] = "must be a list of non-empty strings"
+        if "meta_title" not in errors and len(data["meta_title"]) > META_TITLE_MAX:
+            errors["meta_title"] = f"is {len(data['meta_title'])} characters; the limit is {META_TITLE_MAX}"
+        if "meta_description" not in errors and len(data["meta_description"]) > META_DESCRIPTION_MAX:
+            errors["meta_description"] = f"is {len(data['meta_description'])} characters; the limit is {META_DESCRIPTION_MAX}"
+        if "slug" not in errors and not SLUG_PATTERN.match(data["slug"]):
+            errors["slug"] = "must be lowercase letters and digits joined by single hyphens"
+        if "canonical" not in errors and data.get("canonical") and not data["canonical"].startswith(("http://", "https://")):
+            errors["canonical"] = "must be an absolute http(s) URL or empty"
+        if "json_ld" not in errors and data.get("json_ld"):
+            try:
+                if not isinstance(json.loads(data["json_ld"]), dict):
+                    errors["json_ld"] = "must encode a JSON object"
+            except ValueError as e:
+                errors["json_ld"] = f"is not valid JSON ({e})"
+        return errors
+
+    @classmethod
+    def from_structured(cls, data: dict) -> "SEOMeta":
+        """SEOMeta from a validated structured SEO response."""
+        return cls(
+            meta_title=data.get("meta_title"),
+            meta_description=data.get("meta_description"),
+            slug=data.get("slug"),
+            og_title=data.get("og_title") or None,
+            og_description=data.get("og_description") or None,
+            canonical=data.get("canonical") or None,
+            categories=[data["category"].strip()] if data.get("category") else [],
+            tags=[tag.strip() for tag in data.get("tags") or []],
+            json_ld=data.get("json_ld") or None,
+        )
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SEOMeta":
+        return cls(**data)
+
+
+class MediaAsset:
+    """A featured image (in memory) plus its alt text."""
+    __slots__ = ("image", "alt_text")
+
+    def __init__(self, image: typing.Any = None, alt_text: str = None):
+        self.image = image
+        self.alt_text = alt_text
+
+    @property
+    def path(self) -> typing.Optional[str]:
+        return getattr(self.image, "path", None)
+
+    def to_dict(self) -> dict:
+        # The bytes stay in the image cache; a checkpoint only records where to find them
+        image = self.image
+        if image is not None and not isinstance(image, str):
+            image = {
+                "cache_key": getattr(image, "cache_key", None),
+                "mime_type": image.mime_type,
+                "filename": image.filename,
+                "path": image.path,
+            }
+        return {"image": image, "alt_text": self.alt_text}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaAsset":
+        image = data.get("image")
+        if isinstance(image, dict):
+            from tools.image_tool import GeneratedImage, ImageTool
+            if "data" in image:
+                # Checkpoints written before images were stored by cache key
+                image = GeneratedImage(base64.b64decode(image["data"]), image["mime_type"], image["filename"], image.get("path"))
+            else:
+                # Evicted from the cache: the article goes on without a featured image
+                image = ImageTool.reload(image.get("cache_key"), image["filename"], image.get("path"))
+        return cls(image, data.get("alt_text"))
+
+
+class Article:
+    """Article body with its links extracted once, plus optional SEO metadata and media."""
+    __slots__ = ("body", "links", "seo", "media", "reference_links")
+
+    def __init__(self, body: str, seo: SEOMeta = None, media: MediaAsset = None,
+                 reference_links: typing.Dict[str, typing.List[Link]] = None, links: typing.List[Link] = None):
+        self.body = body
+        self.links = extract_links(body) if links is None else links
+        self.seo = seo
+        self.media = media
+        self.reference_links = reference_links or {}
+
+    @classmethod
+    def from_seo_output(cls, text: str) -> "Article":
+        """
+        Parse the SEO text format (---SEO_DATA--- / ---ARTICLE--- / reference links) once.
+        Plain markdown without markers becomes an Article with no metadata.
+        """
+        content = text or ""
+        seo = None
+        if SEO_DATA_MARKER in content:
+            match = ARTICLE_MARKER_PATTERN.search(content)
+            if match:
+                meta_block = content[:match.start()]
+                content = content[match.end():]
+            else:
+                meta_block, content = content, ""
+            seo = SEOMeta.parse(meta_block.split(SEO_DATA_MARKER)[-1])
+
+        # Remove the reference links section (cleanup)
+        if REFERENCE_LINKS_MARKER in content:
+            content = content.split(REFERENCE_LINKS_MARKER)[0]
+        return cls(content.strip(), seo=seo)
+
+    @classmethod
+    def from_structured(cls, data: dict) -> "Article":
+        """Article from a validated structured SEO response (see SEO_SCHEMA)."""
+        return cls(data["article"].strip(), seo=SEOMeta.from_structured(data))
+
+    def __str__(self):
+        return self.body
+
+    def to_dict(self) -> dict:
+        return {
+            "body": self.body,
+            "links": [list(l) for l in self.links],
+            "seo": self.seo.to_dict() if self.seo else None,
+            "media": self.media.to_dict() if self.media else None,
+            "reference_links": {k: [list(l) for l in v] for k, v in self.reference_links.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Article":
+        return cls(
+            data.get("body", ""),
+            seo=SEOMeta.from_dict(data["seo"]) if data.get("seo") else None,
+            media=MediaAsset.from_dict(data["media"]) if data.get("media") else None,
+            reference_links={k: [tuple(l) for l in v] for k, v in (data.get("reference_links") or {}).items()},
+            links=[tuple(l) for l in data.get("links", [])],
+        )
@@ -0,0 +1,152 @@
+"""
+Per-job stage checkpoints so a failed pipeline can resume from the first unfinished stage.
+
+CHECKPOINT_STORE picks the store: "db" (the job database's StageCheckpoint table), "file:<dir>"
+or "sqlite:<path>". Unset, checkpoints go to the job database when one is configured, so /resume
+works on any instance (Cloud Run routes it to whichever instance is free, often a fresh container);
+otherwise to .checkpoints on local disk, which only a single long-lived instance can resume from.
+"""
+import os
+import json
+import contextlib
+import sqlite3
+import threading
+import typing
+
+from .artifacts import Article, ResearchBrief
+from .job_store import get_job_store
+
+# "db", "file:<dir>" or "sqlite:<path>"; unset: the job database if there is one, else file:.checkpoints
+CHECKPOINT_STORE = os.environ.get("CHECKPOINT_STORE", "")
+DEFAULT_FILE_STORE = "file:.checkpoints"
+
+# Reserved stage name holding the job's initial input
+JOB_INPUT_STAGE = "__input__"
+
+_ARTIFACT_TYPES = {"ResearchBrief": ResearchBrief, "Article": Article}
+
+
+def encode_output(value: typing.Any) -> dict:
+    """Turn a stage output (str or artifact) into a JSON-safe payload."""
+    type_name = type(value).__name__
+    if type_name in _ARTIFACT_TYPES:
+        return {"type": type_name, "data": value.to_dict()}
+    return {"type": "json", "data": value}
+
+
+def decode_output(payload: dict) -> typing.Any:
+    artifact_cls = _ARTIFACT_TYPES.get(payload.get("type"))
+    if artifact_cls:
+        return artifact_cls.from_dict(payload["data"])
+    return payload.get("data")
+
+
+class FileCheckpointStore:
+    """One JSON file per (job, stage) under base_dir/<job_id>/."""
+
+    def __init__(self, base_dir: str = ".checkpoints"):
+        self.base_dir = base_dir
+
+    def _job_dir(self, job_id: str) -> str:
+        safe_id = "".join(c for c in str(job_id) if c.isalnum() or c in ("-", "_"))
+        return os.path.join(self.base_dir, safe_id)
+
+    def save(self, job_id: str, stage: str, record: dict):
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        tmp_path = os.path.join(job_dir, f".{stage}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, os.path.join(job_dir, f"{stage}.json"))
+
+    def load(self, job_id: str) -> typing.Dict[str, dict]:
+        job_dir = self._job_dir(job_id)
+        records = {}
+        if not os.path.isdir(job_dir):
+            return records
+        for name in os.listdir(job_dir):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(job_dir, name), encoding="utf-8") as f:
+                records[name[:-len(".json")]] = json.load(f)
+        return records
+
+    def clear(self, job_id: str):
+        job_dir = self._job_dir(job_id)
+        if not os.path.isdir(job_dir):
+            return
+        for name in os.listdir(job_dir):
+            os.remove(os.path.join(job_dir, name))
+        os.rmdir(job_dir)
+
+
+class SQLiteCheckpointStore:
+    """Checkpoints in a single SQLite table keyed by (jobId, stage)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS "StageCheckpoint" ('
+                '"jobId" TEXT NOT NULL, "stage" TEXT NOT NULL, "payload" TEXT NOT NULL, '
+                '"createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY ("jobId", "stage"))'
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, job_id: str, stage: str, record: dict):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO "StageCheckpoint" ("jobId", "stage", "payload") VALUES (?, ?, ?)',
+                (job_id, stage, json.dumps(record))
+            )
+
+    def load(self, job_id: str) -> typing.Dict[str, dict]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute('SELECT "stage", "payload" FROM "StageCheckpoint" WHERE "jobId" = ?', (job_id,)).fetchall()
+        return {stage: json.loads(payload) for stage, payload in rows}
+
+    def clear(self, job_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM "StageCheckpoint" WHERE "jobId" = ?', (job_id,))
+
+
+class JobStoreCheckpointStore:
+    """Checkpoints in the job database (StageCheckpoint), shared by every instance using it."""
+
+    def __init__(self, db_url: str):
+        self.db_url = db_url
+
+    def save(self, job_id: str, stage: str, record: dict):
+        get_job_store(self.db_url).save_checkpoint(job_id, stage, json.dumps(record))
+
+    def load(self, job_id: str) -> typing.Dict[str, dict]:
+        return {stage: json.loads(payload) for stage, payload in get_job_store(self.db_url).load_checkpoints(job_id).items()}
+
+    def clear(self, job_id: str):
+        get_job_store(self.db_url).clear_checkpoints(job_id)
+
+
+def get_checkpoint_store(spec: str = None, db_url: str = None):
+    """
+    Build a checkpoint store from a 'db', 'file:<dir>' or 'sqlite:<path>' spec (default CHECKPOINT_STORE).
+    Without a spec, the job database (db_url, else DATABASE_URL) is used when there is one.
+    """
+    spec = spec or CHECKPOINT_STORE
+    db_url = db_url or os.environ.get("DATABASE_URL")
+    if spec == "db" or (not spec and db_url):
+        if not db_url:
+            raise ValueError("CHECKPOINT_STORE=db needs a job database (DATABASE_URL)")
+        return JobStoreCheckpointStore(db_url)
+    spec = spec or DEFAULT_FILE_STORE
+    if spec.startswith("sqlite:"):
+        return SQLiteCheckpointStore(spec[len("sqlite:"):])
+    return FileCheckpointStore(spec[len("file:"):] if spec.startswith("file:") else spec)
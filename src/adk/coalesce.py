@@ -0,0 +1,104 @@
+"""
+In-flight job registry: duplicate submissions attach to the running pipeline instead of starting another.
+"""
+import os
+import re
+import time
+import threading
+import typing
+
+from .metrics import CACHE_EVENTS
+
+COALESCE_RESULT_TTL = float(os.environ.get("COALESCE_RESULT_TTL", "120"))
+
+
+def normalize_topic(topic: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form of a topic."""
+    text = re.sub(r"[^\w\s]", " ", str(topic or "").lower())
+    return " ".join(text.split())
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error", "finished_at", "job_ids")
+
+    def __init__(self, job_id: str = None):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.job_ids = {job_id} if job_id else set()
+
+
+class JobCoalescer:
+    """
+    Runs at most one pipeline per (tenant, site, normalized topic) at a time.
+    A submission whose key or job id matches a running pipeline waits for that result;
+    successful results are kept for result_ttl seconds so quick retries return immediately.
+    """
+
+    def __init__(self, result_ttl: float = None):
+        self.result_ttl = COALESCE_RESULT_TTL if result_ttl is None else result_ttl
+        self._lock = threading.Lock()
+        self._by_key: typing.Dict[tuple, _InFlight] = {}
+        self._by_job: typing.Dict[str, tuple] = {}
+
+    @staticmethod
+    def make_key(site: str, topic: str, tenant: str = None) -> tuple:
+        # Only the same tenant's submissions share a run: a result carries its owner's logs and settings
+        return (tenant or "", (site or "").rstrip("/").lower(), normalize_topic(topic))
+
+    def _expire(self, now: float):
+        for key, entry in list(self._by_key.items()):
+            if entry.finished_at is not None and now - entry.finished_at > self.result_ttl:
+                del self._by_key[key]
+                for job_id in entry.job_ids:
+                    self._by_job.pop(job_id, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._by_key.values() if not entry.done.is_set())
+
+    def run(self, key: tuple, fn: typing.Callable[[], typing.Any], job_id: str = None) -> typing.Tuple[typing.Any, bool]:
+        """
+        Run fn for key unless an identical job is running or recently finished.
+        Returns (result, shared) where shared is True if the result came from another submission.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            existing_key = self._by_job.get(job_id) if job_id else None
+            entry = self._by_key.get(existing_key or key)
+            if entry is not None:
+                leader = False
+                if job_id:
+                    entry.job_ids.add(job_id)
+                    self._by_job[job_id] = existing_key or key
+            else:
+                leader = True
+                entry = _InFlight(job_id)
+                self._by_key[key] = entry
+                if job_id:
+                    self._by_job[job_id] = key
+
+        CACHE_EVENTS.inc(cache="job_coalesce", result="miss" if leader else "hit")
+        if not leader:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result, True
+
+        try:
+            entry.result = fn()
+        except Exception as e:
+            entry.error = e
+            # Failures are not cached: the next submission starts a fresh run
+            with self._lock:
+                if self._by_key.get(key) is entry:
+                    del self._by_key[key]
+                for jid in entry.job_ids:
+                    self._by_job.pop(jid, None)
+            raise
+        finally:
+            entry.finished_at = time.monotonic()
+            entry.done.set()
+        return entry.result, False
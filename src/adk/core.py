@@ -1,78 +1,156 @@
+import os
+import re
 import abc
+import time
 import typing
+import asyncio
+import threading
 from dataclasses import dataclass, field
+from .job_store import get_job_store
+from .history import BoundedHistory, payload_store_for
+from .aio import run_sync, in_runtime_loop
 
-# Try to import from the official google-adk
-try:
-    from google.adk import BaseAgent as OfficialBaseAgent
-    from google.adk import AgentContext as OfficialAgentContext
-    print("[ADK] Using official google-adk classes.")
-    
-    def _update_db_logs(context_obj):
-        """Helper to update database logs in real-time."""
-        if not (context_obj.db_url and context_obj.job_id):
+_STEP_PATTERN = re.compile(r"^\[([^\]]+)\]\s*(.*)$")
+
+
+def _current_step(history: typing.List[str]) -> typing.Optional[str]:
+    """Last "[Agent] message" line in the history, trimmed for the currentStep column."""
+    for entry in reversed(history):
+        for line in reversed(entry.strip().split("\n")):
+            match = _STEP_PATTERN.match(line.strip())
+            if match:
+                return f"{match.group(1)}: {match.group(2)}"[:100]
+    return None
+
+
+# Guards the per-context "flush scheduled" flag; held only to flip it, never across a write
+_flush_flag_lock = threading.Lock()
+
+
+def _mark_persisted(history, count: int):
+    if hasattr(history, 'persisted'):
+        history.persisted = count
+
+
+def _update_db_logs(context_obj):
+    """
+    Append log entries written since the last call as AgentJobLog segments. On the runtime loop
+    the write goes to a worker thread (one queued per job; it picks up every line logged before it
+    starts), so a slow database never stalls the other jobs on the loop.
+    """
+    history = context_obj.history
+    if not (context_obj.db_url and context_obj.job_id):
+        if hasattr(history, 'spill') and history.spill is None:
+            # No job store: lines the history trims go to the run's payload directory instead
+            history.spill = lambda lines: payload_store_for(context_obj).append_log(lines)
+        return
+    if getattr(history, 'spill', None) is not None:
+        history.spill = None
+    if in_runtime_loop():
+        with _flush_flag_lock:
+            if getattr(context_obj, 'log_flush_pending', False):
+                return
+            context_obj.log_flush_pending = True
+        asyncio.get_running_loop().run_in_executor(None, _flush_db_logs, context_obj)
+        return
+    _write_db_logs(context_obj)
+
+
+def _flush_db_logs(context_obj):
+    with _flush_flag_lock:
+        context_obj.log_flush_pending = False
+    _write_db_logs(context_obj)
+
+
+def _write_db_logs(context_obj):
+    with context_obj.log_lock:
+        history = context_obj.history
+        # The cursor counts lines of the full log; a BoundedHistory may have dropped the oldest ones
+        dropped = getattr(history, 'dropped', 0)
+        cursor = context_obj.log_cursor
+        if cursor > dropped + len(history):
+            # History was replaced; start over
+            cursor = 0
+        start = max(cursor - dropped, 0)
+        pending = history[start:]
+        if not pending:
             return
+        try:
+            store = get_job_store(context_obj.db_url)
+            current_step = _current_step(pending) or _current_step(history[:start])
+            if store.segments_available:
+                try:
+                    store.append_logs(context_obj.job_id, pending, current_step)
+                    context_obj.log_cursor = dropped + len(history)
+                    _mark_persisted(history, context_obj.log_cursor)
+                    return
+                except Exception as append_err:
+                    if not store.is_missing_segments_error(append_err):
+                        raise
+                    store.segments_available = False
+                    print("[DB LOG] AgentJobLog table not found (apply the Prisma migration); rewriting full logs instead.")
+            store.update_logs(context_obj.job_id, "\n".join(history), current_step)
+            context_obj.log_cursor = dropped + len(history)
+            _mark_persisted(history, context_obj.log_cursor)
+        except Exception as db_err:
+            print(f"[DB LOG ERROR] {db_err}")
 
+
+def job_log_text(context_obj) -> str:
+    """
+    The job's complete log: in-memory history, or the stored segments once older lines were dropped
+    (without a job store, the lines spilled to the payload directory plus the history).
+    """
+    history = context_obj.history
+    if context_obj.db_url and context_obj.job_id and not in_runtime_loop():
+        # Lines still queued for the background writer go in first
+        _write_db_logs(context_obj)
+    if getattr(history, 'dropped', 0) and context_obj.db_url and context_obj.job_id:
         try:
-            # Extract current step (last agent tag)
-            lines = "\n".join(context_obj.history).strip().split("\n")
-            current_step = None
-            import re
-            for i in range(len(lines)-1, -1, -1):
-                match = re.match(r"^\[([^\]]+)\]\s*(.*)$", lines[i].strip())
-                if match:
-                    current_step = f"{match.group(1)}: {match.group(2)}"[:100]
-                    break
-
-            if context_obj.db_url.startswith("file:") or "sqlite" in context_obj.db_url.lower():
-                import sqlite3
-                db_path = context_obj.db_url.replace("file:", "")
-                if "?" in db_path: db_path = db_path.split("?")[0]
-                conn = sqlite3.connect(db_path)
-                cur = conn.cursor()
-                cur.execute(
-                    'UPDATE "AgentJob" SET "logs" = ?, "currentStep" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?',
-                    ("\n".join(context_obj.history), current_step, context_obj.job_id)
-                )
-            else:
-                import psycopg2
-                from urllib.parse import urlparse, parse_qs, unquote
-                parsed = urlparse(context_obj.db_url)
-                params = parse_qs(parsed.query)
-                
-                # Robust parsing for Prisma-style URLs and Unix sockets
-                host = params.get('host', [None])[0] or parsed.hostname
-                
-                connect_params = {
-                    "dbname": parsed.path.lstrip('/'),
-                    "user": parsed.username,
-                    "password": unquote(parsed.password) if parsed.password else None,
-                    "host": host
-                }
-                connect_params = {k: v for k, v in connect_params.items() if v is not None}
-                
-                conn = psycopg2.connect(**connect_params)
-                cur = conn.cursor()
-                cur.execute(
-                    'UPDATE "AgentJob" SET "logs" = %s, "currentStep" = %s, "updatedAt" = NOW() WHERE "id" = %s',
-                    ("\n".join(context_obj.history), current_step, context_obj.job_id)
-                )
-            conn.commit()
-            cur.close()
-            conn.close()
+            store = get_job_store(context_obj.db_url)
+            if store.segments_available:
+                return store.full_logs(context_obj.job_id)
         except Exception as db_err:
             print(f"[DB LOG ERROR] {db_err}")
+    elif getattr(history, 'dropped', 0) and getattr(context_obj, 'payloads', None) is not None:
+        return "\n".join(context_obj.payloads.read_log() + list(history))
+    return "\n".join(history)
+
+
+def _require_run_or_arun(agent, base: type):
+    """run and arun are derived from each other, so an agent overriding neither would recurse forever."""
+    cls = type(agent)
+    if cls.run is base.run and cls.arun is base.arun:
+        raise TypeError(f"Can't instantiate {cls.__name__}: it must override run or arun")
 
+
+# Try to import from the official google-adk (opt-in: probing it costs cold-start time and it is not deployed)
+try:
+    if os.environ.get("USE_OFFICIAL_ADK", "").lower() != "true":
+        raise ImportError("google-adk disabled; set USE_OFFICIAL_ADK=true to use it")
+    from google.adk import BaseAgent as OfficialBaseAgent
+    from google.adk import AgentContext as OfficialAgentContext
+    print("[ADK] Using official google-adk classes.")
+    
     class AgentContext(OfficialAgentContext):
         """Adapter for AgentContext."""
         def __init__(self):
             # Custom initialization
-            self.history = []
+            self.history = BoundedHistory()
             self.topic = ""
             self.is_simulated = False
             self.google_api_key = None
             self.db_url = None
             self.job_id = None
+            self.checkpoint_store = None
+            self.llm_backend = None
+            self.log_cursor = 0
+            self.log_lock = threading.Lock()
+            self.log_flush_pending = False
+            self.payloads = None
+            self.wp_config = None
+            self.generation_overrides = None
+            self.google_model_routes = None
             super().__init__()
 
         def log(self, message: str):
@@ -86,82 +164,47 @@ try:
     class BaseAgent(OfficialBaseAgent):
         """Adapter for BaseAgent."""
         def __init__(self, name: str, context: AgentContext, config: typing.Dict[str, typing.Any] = None):
+            _require_run_or_arun(self, BaseAgent)
             super().__init__(name=name)
             self.context = context
             self.config = config or {}
 
+        def run(self, input_data: typing.Any) -> typing.Any:
+            return run_sync(self.arun(input_data))
+
+        async def arun(self, input_data: typing.Any) -> typing.Any:
+            return await asyncio.to_thread(self.run, input_data)
+
         def log(self, message: str):
             self.context.log(f"[{self.name}] {message}")
 
 except ImportError:
-    print("[ADK] Official google-adk not found or incompatible. Using local shim.")
+    if os.environ.get("USE_OFFICIAL_ADK", "").lower() == "true":
+        print("[ADK] Official google-adk not found or incompatible. Using local shim.")
     
-    def _update_db_logs(context_obj):
-        """Helper to update database logs in real-time."""
-        if not (context_obj.db_url and context_obj.job_id):
-            return
-
-        try:
-            # Extract current step (last agent tag)
-            lines = "\n".join(context_obj.history).strip().split("\n")
-            current_step = None
-            import re
-            for i in range(len(lines)-1, -1, -1):
-                match = re.match(r"^\[([^\]]+)\]\s*(.*)$", lines[i].strip())
-                if match:
-                    current_step = f"{match.group(1)}: {match.group(2)}"[:100]
-                    break
-
-            if context_obj.db_url.startswith("file:") or "sqlite" in context_obj.db_url.lower():
-                import sqlite3
-                db_path = context_obj.db_url.replace("file:", "")
-                if "?" in db_path: db_path = db_path.split("?")[0]
-                conn = sqlite3.connect(db_path)
-                cur = conn.cursor()
-                cur.execute(
-                    'UPDATE "AgentJob" SET "logs" = ?, "currentStep" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?',
-                    ("\n".join(context_obj.history), current_step, context_obj.job_id)
-                )
-            else:
-                import psycopg2
-                from urllib.parse import urlparse, parse_qs, unquote
-                parsed = urlparse(context_obj.db_url)
-                params = parse_qs(parsed.query)
-                
-                # Robust parsing for Prisma-style URLs and Unix sockets
-                host = params.get('host', [None])[0] or parsed.hostname
-                
-                connect_params = {
-                    "dbname": parsed.path.lstrip('/'),
-                    "user": parsed.username,
-                    "password": unquote(parsed.password) if parsed.password else None,
-                    "host": host
-                }
-                connect_params = {k: v for k, v in connect_params.items() if v is not None}
-                
-                conn = psycopg2.connect(**connect_params)
-                cur = conn.cursor()
-                cur.execute(
-                    'UPDATE "AgentJob" SET "logs" = %s, "currentStep" = %s, "updatedAt" = NOW() WHERE "id" = %s',
-                    ("\n".join(context_obj.history), current_step, context_obj.job_id)
-                )
-            conn.commit()
-            cur.close()
-            conn.close()
-        except Exception as db_err:
-            print(f"[DB LOG ERROR] {db_err}")
-
     # Fallback / Shim Implementation
     @dataclass
     class AgentContext:
         """Shared context for the agent system."""
         state: typing.Dict[str, typing.Any] = field(default_factory=dict)
-        history: typing.List[str] = field(default_factory=list)
+        history: typing.List[str] = field(default_factory=BoundedHistory)
         topic: str = ""
         is_simulated: bool = False
         db_url: str = None
         job_id: str = None
         google_api_key: str = None
+        checkpoint_store: typing.Any = None
+        llm_backend: typing.Any = None
+        log_cursor: int = 0
+        log_lock: typing.Any = field(default_factory=threading.Lock, repr=False, compare=False)
+        log_flush_pending: bool = field(default=False, repr=False, compare=False)
+        payloads: typing.Any = field(default=None, repr=False, compare=False)
+        # Per-job WordPress credentials {"url", "username", "password"}; WP_* env vars when unset
+        wp_config: typing.Dict[str, str] = None
+        # Per-job generation settings {"*" | agent name | call type: {...}} (see adk.generation)
+        generation_overrides: typing.Dict[str, typing.Dict[str, typing.Any]] = None
+        # Per-job model routes {call type | agent name | "*": [models]} (see adk.routing)
+        google_model_routes: typing.Dict[str, typing.List[str]] = None
 
         def log(self, message: str):
             self.history.append(message)
@@ -172,17 +215,24 @@ except ImportError:
             _update_db_logs(self)
 
     class BaseAgent(abc.ABC):
-        """Abstract base class for all agents."""
+        """
+        Base class for all agents. Subclasses implement arun (native asyncio) or run (blocking);
+        the other one is derived: run drives arun on the shared runtime loop, arun runs run in a thread.
+        """
         
         def __init__(self, name: str, context: AgentContext, config: typing.Dict[str, typing.Any] = None):
+            _require_run_or_arun(self, BaseAgent)
             self.name = name
             self.context = context
             self.config = config or {}
 
-        @abc.abstractmethod
         def run(self, input_data: typing.Any) -> typing.Any:
             """Execute the agent's logic."""
-            pass
+            return run_sync(self.arun(input_data))
+
+        async def arun(self, input_data: typing.Any) -> typing.Any:
+            """Execute the agent's logic without blocking the event loop."""
+            return await asyncio.to_thread(self.run, input_data)
 
         def log(self, message: str):
             """Log a message prefixed with the agent's name."""
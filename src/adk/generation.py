@@ -0,0 +1,147 @@
+"""
+Generation settings per LLM call: output-token cap, thinking effort, temperature, stop sequences
+and a JSON schema for structured output.
+
+Agents declare defaults (LLMAgent.generation_config, refined per call type in call_configs); a job
+can override them through context.generation_overrides, or LLM_GENERATION_OVERRIDES for the whole
+process, keyed by "*", agent name or call type, e.g.
+    {"*": {"temperature": 0.2}, "WriterAgent": {"max_output_tokens": 4096}, "alt_text": {"thinking": "low"}}
+A null value removes a default (e.g. {"max_output_tokens": null} lifts the cap).
+"""
+import os
+import json
+import typing
+import functools
+
+# max_output_tokens caps the answer; thinking is a level (minimal | low | medium | high) or a token budget;
+# response_schema (a JSON schema) asks for a JSON response of that shape
+GENERATION_KEYS = ("max_output_tokens", "thinking", "temperature", "stop_sequences", "response_schema")
+THINKING_LEVELS = {"minimal": 0, "low": 512, "medium": 2048, "high": 8192}
+# Smallest thinking budget the 2.5 Pro models accept (they cannot turn thinking off)
+_PRO_MIN_BUDGET = 128
+
+
+def _is_number(value: typing.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate(config: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Raise ValueError for unknown settings or values of the wrong type or range."""
+    unknown = set(config) - set(GENERATION_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown generation setting(s): {', '.join(sorted(unknown))}; expected {', '.join(GENERATION_KEYS)}")
+    max_tokens = config.get("max_output_tokens")
+    if max_tokens is not None and not (isinstance(max_tokens, int) and not isinstance(max_tokens, bool) and max_tokens > 0):
+        raise ValueError(f"max_output_tokens must be a positive integer, not {max_tokens!r}")
+    temperature = config.get("temperature")
+    if temperature is not None and not (_is_number(temperature) and 0 <= temperature <= 2):
+        raise ValueError(f"temperature must be a number from 0 to 2, not {temperature!r}")
+    stops = config.get("stop_sequences")
+    if stops is not None and not (isinstance(stops, (list, tuple)) and all(isinstance(stop, str) and stop for stop in stops)):
+        raise ValueError(f"stop_sequences must be a list of non-empty strings, not {stops!r}")
+    thinking = config.get("thinking")
+    if isinstance(thinking, bool) or (thinking is not None and not isinstance(thinking, int) and thinking not in THINKING_LEVELS):
+        raise ValueError(f"thinking must be a token budget or one of {', '.join(THINKING_LEVELS)}, not {thinking!r}")
+    if isinstance(thinking, int) and thinking < -1:
+        # -1 is Gemini 2.5's dynamic budget
+        raise ValueError(f"thinking budget must be -1 (dynamic) or at least 0, not {thinking}")
+    if config.get("response_schema") is not None and not isinstance(config["response_schema"], dict):
+        raise ValueError("response_schema must be a JSON schema object")
+    return config
+
+
+def parse_overrides(value: typing.Any) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """{scope: settings} from a dict or JSON string; raises ValueError on unknown settings."""
+    if not value:
+        return {}
+    overrides = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+        raise ValueError("Generation overrides must map '*', an agent name or a call type to a settings object")
+    for settings in overrides.values():
+        validate(settings)
+    return overrides
+
+
+@functools.lru_cache(maxsize=8)
+def _env_overrides(value: str) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    return parse_overrides(value)
+
+
+def job_overrides(context) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    overrides = getattr(context, 'generation_overrides', None)
+    if overrides is None:
+        overrides = _env_overrides(os.environ.get("LLM_GENERATION_OVERRIDES", ""))
+    return overrides
+
+
+def resolve(agent, call: str, context) -> typing.Dict[str, typing.Any]:
+    """Settings for one call: agent defaults, then its call type, then the job's "*", agent and call overrides."""
+    config = dict(getattr(agent, 'generation_config', None) or {})
+    layers = [(getattr(agent, 'call_configs', None) or {}).get(call)]
+    overrides = job_overrides(context)
+    layers += [overrides.get("*"), overrides.get(agent.name), overrides.get(call)]
+    for layer in layers:
+        for key, value in (layer or {}).items():
+            if value is None:
+                config.pop(key, None)
+            else:
+                config[key] = value
+    return config
+
+
+def _thinking_family(model: str) -> typing.Optional[str]:
+    name = model.rsplit("/", 1)[-1].lower()
+    if name.startswith("gemini-3"):
+        return "level"
+    if name.startswith("gemini-2.5"):
+        return "budget"
+    return None
+
+
+def to_genai_config(model: str, config: typing.Dict[str, typing.Any]):
+    """
+    google.genai GenerateContentConfig for model, or None when nothing is set. Gemini 3 takes a
+    thinking level and 2.5 a budget; models without thinking ignore it. Thinking tokens count
+    against the output limit, so the cap is raised by the thinking budget.
+    """
+    if not config:
+        return None
+    from google.genai import types
+    kwargs = {}
+    if config.get("temperature") is not None:
+        kwargs["temperature"] = config["temperature"]
+    if config.get("stop_sequences"):
+        kwargs["stop_sequences"] = list(config["stop_sequences"])
+    if config.get("response_schema"):
+        kwargs["response_mime_type"] = "application/json"
+        kwargs["response_json_schema"] = config["response_schema"]
+
+    thinking = config.get("thinking")
+    family = _thinking_family(model)
+    budget = 0
+    if thinking is not None and family:
+        budget = THINKING_LEVELS.get(thinking, thinking) if isinstance(thinking, str) else int(thinking)
+        if family == "level":
+            level = thinking if isinstance(thinking, str) else next(
+                (name for name, size in THINKING_LEVELS.items() if budget <= size), "high")
+            if "pro" in model.lower():
+                # Gemini 3 Pro only has low and high
+                level = "low" if level in ("minimal", "low") else "high"
+            kwargs["thinking_config"] = types.ThinkingConfig(thinking_level=level.upper())
+        else:
+            if "pro" in model.lower():
+                budget = max(budget, _PRO_MIN_BUDGET)
+            kwargs["thinking_config"] = types.ThinkingConfig(thinking_budget=budget)
+
+    if config.get("max_output_tokens"):
+        # A negative budget is 2.5's dynamic thinking; leave room for a large one
+        kwargs["max_output_tokens"] = int(config["max_output_tokens"]) + (budget if budget >= 0 else THINKING_LEVELS["high"])
+    return types.GenerateContentConfig(**kwargs) if kwargs else None
+
+
+def describe(config: typing.Dict[str, typing.Any]) -> str:
+    """Compact form for logs and span attributes; a schema is shown by its title."""
+    shown = {key: config[key] for key in GENERATION_KEYS if key in config}
+    if "response_schema" in shown:
+        shown["response_schema"] = shown["response_schema"].get("title", "json")
+    return ", ".join(f"{key}={value}" for key, value in shown.items()) or "provider defaults"
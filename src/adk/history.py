@@ -0,0 +1,346 @@
+"""
+Bounded job history. Large log payloads (inputs, personas, generated text) are stored once as
+content-addressed payload files and log lines carry a preview plus a reference; the in-memory history
+keeps only the newest HISTORY_MAX_BYTES of lines once the job store holds them (the complete log).
+Without a job store, trimmed lines are spilled to history.log in the run's payload directory.
+
+Payload directories are scratch space: all of them together are kept under LOG_PAYLOAD_MAX_MB and
+LOG_PAYLOAD_TTL_HOURS (least recently written first), and with the default location (the system
+temp dir, memory-backed on Cloud Run) a job's directory is deleted when the job finishes.
+"""
+import os
+import time
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import threading
+import typing
+from collections import OrderedDict
+
+from .aio import in_runtime_loop
+
+HISTORY_MAX_BYTES = int(os.environ.get("HISTORY_MAX_BYTES", str(256 * 1024)))
+# Values longer than this are offloaded; the log line keeps the first LOG_PREVIEW_CHARS characters
+LOG_PREVIEW_CHARS = int(os.environ.get("LOG_PREVIEW_CHARS", "160"))
+# Directory for payload files (<dir>/<job_id>/<ref>.txt); the system temp dir unless set
+LOG_PAYLOAD_DIR = os.environ.get("LOG_PAYLOAD_DIR", "") or os.path.join(tempfile.gettempdir(), "flowpress-payloads")
+# Payloads in a configured directory outlive their job (until the caps below); temp ones do not
+LOG_PAYLOAD_KEEP = bool(os.environ.get("LOG_PAYLOAD_DIR"))
+LOG_PAYLOAD_MAX_MB = float(os.environ.get("LOG_PAYLOAD_MAX_MB", "256"))
+LOG_PAYLOAD_TTL_HOURS = float(os.environ.get("LOG_PAYLOAD_TTL_HOURS", "24"))
+
+_REF_CHARS = 16
+
+
+def _safe_id(value: str) -> str:
+    return "".join(c for c in str(value) if c.isalnum() or c in ("-", "_"))
+
+
+class PayloadDirCap:
+    """
+    Size and age cap over the per-job directories under root, like ImageCache's LRU: a running
+    total plus an index ordered by last write (read from disk once), evicting whole directories.
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl_seconds: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total = 0
+        self._dirs: "OrderedDict[str, list]" = OrderedDict()
+        self._scanned = False
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        found = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for name in names:
+            size, last_write = 0, 0.0
+            try:
+                with os.scandir(os.path.join(self.root, name)) as entries:
+                    for entry in entries:
+                        st = entry.stat()
+                        size += st.st_size
+                        last_write = max(last_write, st.st_mtime)
+            except OSError:
+                continue
+            found.append((last_write, name, size))
+        for last_write, name, size in sorted(found):
+            self._dirs[name] = [size, last_write]
+            self.total += size
+        self._scanned = True
+
+    def record(self, directory: str, size: int):
+        """Count a file written under directory and evict what no longer fits."""
+        if os.path.dirname(os.path.abspath(directory)) != os.path.abspath(self.root):
+            return
+        name = os.path.basename(directory)
+        with self._lock:
+            if not self._scanned:
+                # The scan already sees the file just written
+                self._scan()
+            else:
+                entry = self._dirs.pop(name, [0, 0.0])
+                entry[0] += size
+                entry[1] = time.time()
+                self._dirs[name] = entry
+                self.total += size
+            self._evict(keep=name)
+
+    def _evict(self, keep: str):
+        now = time.time()
+        while self._dirs:
+            name, (size, last_write) = next(iter(self._dirs.items()))
+            if name == keep or (self.total <= self.max_bytes and now - last_write <= self.ttl_seconds):
+                break
+            self._remove(name)
+
+    def _remove(self, name: str):
+        size, _ = self._dirs.pop(name, [0, 0.0])
+        self.total -= size
+        shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def discard(self, directory: str):
+        """Delete a directory now (its job finished)."""
+        with self._lock:
+            if os.path.dirname(os.path.abspath(directory)) == os.path.abspath(self.root):
+                self._remove(os.path.basename(directory))
+            else:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+_payload_cap = PayloadDirCap(LOG_PAYLOAD_DIR, int(LOG_PAYLOAD_MAX_MB * 1024 * 1024), LOG_PAYLOAD_TTL_HOURS * 3600)
+
+
+class PayloadStore:
+    """
+    Content-addressed payloads referenced from log lines; each distinct payload is kept once.
+    With a directory, payloads are files and nothing is held in memory once written (a put on the
+    runtime loop writes from a worker thread and serves the text from memory until then); without
+    one, the oldest payloads are evicted once max_bytes is exceeded.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        self.directory = directory
+        self.max_bytes = HISTORY_MAX_BYTES if max_bytes is None else max_bytes
+        self.sizes: typing.Dict[str, int] = {}
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._unwritten: typing.Dict[str, str] = {}
+        self._log_pending: typing.List[str] = []
+        self._log_flush_pending = False
+        self._log_write_lock = threading.Lock()
+        self.discarded = False
+        self._lock = threading.Lock()
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.directory, f"{_safe_id(ref)}.txt")
+
+    def put(self, text: str) -> str:
+        data = text.encode("utf-8", errors="replace")
+        ref = hashlib.sha256(data).hexdigest()[:_REF_CHARS]
+        with self._lock:
+            if ref in self.sizes:
+                return ref
+            self.sizes[ref] = len(data)
+            if self.directory:
+                self._unwritten[ref] = text
+            else:
+                self._memory[ref] = text
+                self._memory_bytes += len(data)
+                while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+                    _, evicted = self._memory.popitem(last=False)
+                    self._memory_bytes -= len(evicted.encode("utf-8", errors="replace"))
+        if self.directory:
+            if in_runtime_loop():
+                asyncio.get_running_loop().run_in_executor(None, self._write, ref, data)
+            else:
+                self._write(ref, data)
+        return ref
+
+    def _write(self, ref: str, data: bytes):
+        if self.discarded:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(ref) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(ref))
+        except OSError as e:
+            # The text stays in memory, so the payload is still served by this process
+            print(f"[Payloads] Could not write {ref}: {e}")
+            return
+        with self._lock:
+            self._unwritten.pop(ref, None)
+        _payload_cap.record(self.directory, len(data))
+
+    def _log_path(self) -> str:
+        return os.path.join(self.directory, "history.log")
+
+    def append_log(self, lines: typing.List[str]):
+        """Spill log lines to history.log (from a worker thread on the runtime loop, in order)."""
+        with self._lock:
+            self._log_pending.extend(str(line) for line in lines)
+            if in_runtime_loop():
+                if self._log_flush_pending:
+                    return
+                self._log_flush_pending = True
+                asyncio.get_running_loop().run_in_executor(None, self._write_log)
+                return
+        self._write_log()
+
+    def _write_log(self):
+        with self._log_write_lock:
+            with self._lock:
+                self._log_flush_pending = False
+                lines, self._log_pending = self._log_pending, []
+            if not lines or self.discarded:
+                return
+            data = ("\n".join(lines) + "\n").encode("utf-8", errors="replace")
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._log_path(), "ab") as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"[Payloads] Could not spill {len(lines)} log line(s): {e}")
+                return
+            _payload_cap.record(self.directory, len(data))
+
+    def read_log(self) -> typing.List[str]:
+        """Lines spilled so far (pending ones are written first); [] once the directory was evicted."""
+        self._write_log()
+        try:
+            with open(self._log_path(), encoding="utf-8") as f:
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+    def discard(self):
+        """Delete the payload files; later writes are dropped."""
+        self.discarded = True
+        with self._lock:
+            self._unwritten.clear()
+            self._log_pending = []
+        _payload_cap.discard(self.directory)
+
+    def get(self, ref: str) -> typing.Optional[str]:
+        with self._lock:
+            if ref in self._unwritten:
+                return self._unwritten[ref]
+        if self.directory:
+            try:
+                with open(self._path(ref), encoding="utf-8") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+        with self._lock:
+            return self._memory.get(ref)
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self.sizes
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+
+def payload_dir(job_id: str) -> typing.Optional[str]:
+    if not job_id:
+        return None
+    return os.path.join(LOG_PAYLOAD_DIR, _safe_id(job_id))
+
+
+def payload_store_for(context) -> PayloadStore:
+    """The context's payload store, created on first use (the job id is known by then)."""
+    store = getattr(context, 'payloads', None)
+    if store is None:
+        directory = payload_dir(getattr(context, 'job_id', None))
+        if directory is None:
+            # A run without a job (CLI, scripts) still keeps its payloads on disk, under the same caps
+            os.makedirs(LOG_PAYLOAD_DIR, exist_ok=True)
+            directory = tempfile.mkdtemp(prefix="run-", dir=LOG_PAYLOAD_DIR)
+            print(f"[Payloads] Full log payloads are in {directory}")
+        store = PayloadStore(directory)
+        context.payloads = store
+    return store
+
+
+def release_payloads(context):
+    """A job finished: delete its payload directory, unless LOG_PAYLOAD_DIR asks to keep them."""
+    store = getattr(context, 'payloads', None)
+    if store is None or not store.directory or LOG_PAYLOAD_KEEP:
+        return
+    store.discard()
+
+
+def preview(context, value: typing.Any, limit: int = None) -> str:
+    """Short values unchanged; long ones offloaded once and rendered as 'preview... [N bytes, payload:<ref>]'."""
+    text = str(value)
+    limit = LOG_PREVIEW_CHARS if limit is None else limit
+    if len(text) <= limit:
+        return text
+    ref = payload_store_for(context).put(text)
+    size = len(text.encode("utf-8", errors="replace"))
+    head = " ".join(text[:limit].split())
+    return f"{head}... [{size} bytes, payload:{ref}]"
+
+
+class BoundedHistory(list):
+    """
+    Log lines with a size cap. Once the lines exceed max_bytes, the oldest are dropped
+    (down to 3/4 of the cap, so trimming is amortized); `dropped` counts them so cursors
+    into the full log stay absolute. Only lines the job store holds are dropped: `persisted`
+    counts them like a cursor (None drops freely), so a write still in flight loses nothing.
+    With `spill` set (a history with no job store), dropped lines are handed to it first.
+    """
+
+    def __init__(self, iterable: typing.Iterable[str] = (), max_bytes: int = None):
+        super().__init__()
+        self.max_bytes = HISTORY_MAX_BYTES if max_bytes is None else max_bytes
+        self.bytes = 0
+        self.dropped = 0
+        self.dropped_bytes = 0
+        self.persisted: typing.Optional[int] = 0
+        self.spill: typing.Optional[typing.Callable[[typing.List[str]], None]] = None
+        for line in iterable:
+            self.append(line)
+
+    @staticmethod
+    def _size(line) -> int:
+        return len(str(line).encode("utf-8", errors="replace"))
+
+    def append(self, line):
+        super().append(line)
+        self.bytes += self._size(line)
+        if self.bytes > self.max_bytes:
+            self._trim()
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def _trim(self):
+        target = self.max_bytes * 3 // 4
+        count = 0
+        freed = 0
+        # Always keep the newest line, even if it alone is over the cap
+        limit = len(self) - 1
+        if self.persisted is not None and self.spill is None:
+            limit = min(limit, self.persisted - self.dropped)
+        while count < limit and self.bytes - freed > target:
+            freed += self._size(self[count])
+            count += 1
+        if count and self.spill is not None and self.persisted is not None:
+            unsaved = max(self.persisted - self.dropped, 0)
+            if count > unsaved:
+                self.spill(self[unsaved:count])
+                self.persisted = self.dropped + count
+        if count:
+            del self[:count]
+            self.bytes -= freed
+            self.dropped += count
+            self.dropped_bytes += freed
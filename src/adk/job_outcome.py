@@ -0,0 +1,60 @@
+"""
+Final AgentJob / ContentItem state for a finished pipeline run, shared by app.py and worker.py.
+"""
+import re
+import typing
+
+from .core import job_log_text
+from .history import release_payloads
+from .job_store import get_job_store
+
+_VIEW_POST_PATTERN = re.compile(r"\[View Post\]\((https?://[^\s)]+)\)")
+_PUBLISHED_AT_PATTERN = re.compile(r"SUCCESS: Post published at\s*(https?://[^\s]+)")
+_FINAL_TITLE_PATTERN = re.compile(r"Final Title: (.*)")
+
+
+def record_success(db_url: str, job_id: str, context, result: typing.Any, source=None) -> typing.Optional[str]:
+    """
+    Complete the job and set its ContentItem to PUBLISHED / DRAFT / FAILED; returns that status.
+    context is the job's own run; source is the run that produced result when the job attached
+    to another one (coalesced): status, URL and title come from source, the logs from context.
+    """
+    if not (db_url and job_id):
+        release_payloads(context)
+        return None
+    source = source or context
+    source_logs = job_log_text(source)
+    logs = source_logs if source is context else job_log_text(context)
+    # The full text is read; the job's payload files are no longer needed
+    release_payloads(context)
+    combined_output = source_logs + "\n" + str(result)
+
+    url_match = _VIEW_POST_PATTERN.search(combined_output) or _PUBLISHED_AT_PATTERN.search(combined_output)
+    published_url = url_match.group(1) if url_match else None
+    title_match = _FINAL_TITLE_PATTERN.search(source_logs)
+    published_title = title_match.group(1).strip() if title_match else None
+
+    is_simulated = getattr(source, 'is_simulated', False)
+    is_draft = "Saved as Draft" in str(result) or "retrying as draft" in combined_output
+
+    if published_url:
+        final_status = "DRAFT" if (is_simulated or is_draft) else "PUBLISHED"
+        if is_simulated: logs += "\n[System] Post saved as DRAFT due to Simulated Mode."
+        elif is_draft: logs += "\n[System] Post saved as DRAFT due to Publishing Fallback."
+    else:
+        final_status = "FAILED"
+        logs += "\n[System] Publishing failed: " + ("Skipped due to simulation" if is_simulated else "No WordPress URL found.")
+
+    # AgentJob and ContentItem are updated in one transaction
+    get_job_store(db_url).finalize(job_id, logs, final_status, published_url, published_title)
+    return final_status
+
+
+def record_failure(db_url: str, job_id: str, context, error: Exception, content_status: str = None):
+    """Mark the job FAILED (and its ContentItem, when content_status is given) with the logs so far."""
+    if not (db_url and job_id):
+        release_payloads(context)
+        return
+    logs = job_log_text(context) + f"\nERROR: {str(error)}"
+    release_payloads(context)
+    get_job_store(db_url).fail_job(job_id, logs, content_status)
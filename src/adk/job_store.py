@@ -0,0 +1,564 @@
+"""
+Job persistence for AgentJob / ContentItem rows, shared by agents (live logs) and app.py (final status).
+One store per database URL: a pool of psycopg2 connections for Postgres, a single WAL-mode
+connection for SQLite. Statements are prepared once per connection.
+
+Live logs are appended as AgentJobLog segments (one row per log entry, numbered per job);
+AgentJob.logs is written once, when the job completes or fails.
+
+claim_due() hands due SCHEDULED content to worker.py: FOR UPDATE SKIP LOCKED on Postgres, a
+WorkerClaim lock table (written under BEGIN IMMEDIATE) on SQLite. Claims take users in turn.
+A claim is a lease: its AgentJob.heartbeatAt is refreshed by the worker while the item runs or waits
+in its queue. If the worker dies, the heartbeat stops, and once it is older than the lease
+(WORKER_LEASE_SECONDS) the next claim_due() by any worker marks that job FAILED, puts the item back
+to SCHEDULED (dropping its SQLite WorkerClaim row) and claims it again with a new job.
+
+Stage checkpoints (adk.checkpoint) live in the StageCheckpoint table, so /resume works from any
+instance that shares the database.
+"""
+import os
+import abc
+import uuid
+import typing
+import sqlite3
+import threading
+import functools
+import contextlib
+from urllib.parse import urlparse, parse_qs, unquote
+
+from .metrics import DB_WRITE_DURATION
+
+# JOB_DB_POOL_MIN connections are opened up front; returned connections stay open, up to JOB_DB_POOL_MAX
+JOB_DB_POOL_MIN = int(os.environ.get("JOB_DB_POOL_MIN", "2"))
+JOB_DB_POOL_MAX = int(os.environ.get("JOB_DB_POOL_MAX", "8"))
+# A claimed job whose heartbeat is older than this is presumed abandoned and reclaimed
+WORKER_LEASE_SECONDS = float(os.environ.get("WORKER_LEASE_SECONDS", "300"))
+
+
+def is_sqlite_url(db_url: str) -> bool:
+    return db_url.startswith("file:") or "sqlite" in db_url.lower()
+
+
+def sqlite_path(db_url: str) -> str:
+    path = db_url.replace("file:", "", 1)
+    if path.startswith("sqlite://"):
+        path = path[len("sqlite://"):]
+    return path.split("?")[0]
+
+
+def postgres_params(db_url: str) -> typing.Dict[str, str]:
+    """psycopg2.connect kwargs from a Prisma-style URL (supports ?host=/cloudsql/... Unix sockets)."""
+    parsed = urlparse(db_url)
+    params = parse_qs(parsed.query)
+    connect_params = {
+        "dbname": parsed.path.lstrip('/'),
+        "user": unquote(parsed.username) if parsed.username else None,
+        "password": unquote(parsed.password) if parsed.password else None,
+        "host": params.get('host', [None])[0] or parsed.hostname,
+        "port": parsed.port,
+        "sslmode": params.get('sslmode', [None])[0],
+    }
+    return {k: v for k, v in connect_params.items() if v is not None}
+
+
+class JobStore(abc.ABC):
+    """Reads and writes for one job database."""
+
+    # Cleared the first time an append fails because the AgentJobLog migration has not been applied
+    segments_available = True
+
+    @abc.abstractmethod
+    def append_logs(self, job_id: str, entries: typing.Sequence[str], current_step: typing.Optional[str]):
+        """Append log entries as new segments and update the job's current step."""
+
+    @abc.abstractmethod
+    def read_logs(self, job_id: str, after: int = 0, limit: int = None) -> typing.List[typing.Tuple[int, str]]:
+        """(seq, content) segments with seq > after, oldest first."""
+
+    @abc.abstractmethod
+    def job_logs(self, job_id: str) -> typing.Optional[str]:
+        """The final AgentJob.logs text, or None while the job is running."""
+
+    @abc.abstractmethod
+    def update_logs(self, job_id: str, logs: str, current_step: typing.Optional[str]):
+        """Replace the full log text and current step (legacy path without segments)."""
+
+    @abc.abstractmethod
+    def fail_job(self, job_id: str, logs: str, content_status: str = None):
+        """Mark the job FAILED with its final logs (and its ContentItem, when content_status is given)."""
+
+    @abc.abstractmethod
+    def finalize(self, job_id: str, logs: str, content_status: str,
+                 published_url: typing.Optional[str], title: typing.Optional[str]):
+        """Complete the job and update its ContentItem in one transaction."""
+
+    @abc.abstractmethod
+    def claim_due(self, worker_id: str, limit: int, lease_seconds: float = None) -> typing.List[typing.Dict[str, typing.Any]]:
+        """
+        Claim up to limit due SCHEDULED ContentItems that have no active job, one per user per round
+        (each user's by priority, then scheduledFor):
+        mark them PROCESSING and create a RUNNING AgentJob for each, in one transaction.
+        Claims whose heartbeat is older than lease_seconds (default WORKER_LEASE_SECONDS) are expired
+        first, so their items are claimed again.
+        Returns one dict per claim with the job id, content fields, site credentials and model settings.
+        """
+
+    @abc.abstractmethod
+    def heartbeat(self, job_ids: typing.Sequence[str]):
+        """Extend the lease of running claimed jobs."""
+
+    def release_claim(self, content_id: str):
+        """Drop a finished claim (only the SQLite lock table needs this)."""
+
+    @abc.abstractmethod
+    def save_checkpoint(self, job_id: str, stage: str, payload: str):
+        """Insert or replace one stage's checkpoint (JSON text)."""
+
+    @abc.abstractmethod
+    def load_checkpoints(self, job_id: str) -> typing.Dict[str, str]:
+        """{stage: JSON text} for the job."""
+
+    @abc.abstractmethod
+    def clear_checkpoints(self, job_id: str):
+        """Delete the job's checkpoints."""
+
+    @abc.abstractmethod
+    def ping(self):
+        """Open (or check) a connection; used by warm-up."""
+
+    def close(self):
+        pass
+
+    def full_logs(self, job_id: str) -> str:
+        """Final logs if the job has finished, otherwise the segments assembled so far."""
+        logs = self.job_logs(job_id)
+        if logs is not None:
+            return logs
+        return "\n".join(content for _, content in self.read_logs(job_id))
+
+    @staticmethod
+    def new_job_id() -> str:
+        # Prisma generates cuid()s client-side; any unique string is a valid id
+        return "c" + uuid.uuid4().hex[:24]
+
+    @staticmethod
+    def _claim_rows(rows, job_ids: typing.Dict[str, str]) -> typing.List[typing.Dict[str, typing.Any]]:
+        order = {content_id: i for i, content_id in enumerate(job_ids)}
+        claims = [dict(zip(_CLAIM_FIELDS, row), job_id=job_ids[row[0]]) for row in rows]
+        return sorted(claims, key=lambda claim: order[claim["content_id"]])
+
+    @staticmethod
+    def _lease_note(lease_seconds: float) -> str:
+        return f"[Worker] Claim expired: no heartbeat for {lease_seconds:.0f}s (worker stopped?); the item was rescheduled."
+
+    @staticmethod
+    def is_missing_segments_error(error: Exception) -> bool:
+        message = str(error)
+        return "AgentJobLog" in message or "job_log_append" in message
+
+
+_CLAIM_FIELDS = ("content_id", "topic", "title", "priority", "scheduled_for", "user_id", "wp_url", "wp_username",
+                 "wp_password", "google_api_key", "google_model_name", "google_fallback_models",
+                 "google_model_routes")
+_CLAIM_DETAILS = ('SELECT c."id", c."topic", c."title", c."priority", c."scheduledFor", w."userId", w."url", w."username", '
+                  'w."appPassword", u."googleApiKey", u."googleModelName", u."googleFallbackModels", u."googleModelRoutes" '
+                  'FROM "ContentItem" c '
+                  'LEFT JOIN "Website" w ON w."id" = c."websiteId" LEFT JOIN "User" u ON u."id" = w."userId" '
+                  'WHERE c."id" IN ({})')
+# A job created outside the worker (e.g. the web "run now" route) also blocks a claim
+_NO_ACTIVE_JOB = ('NOT EXISTS (SELECT 1 FROM "AgentJob" j WHERE j."contentItemId" = c."id" '
+                  'AND j."status" IN (\'PENDING\', \'RUNNING\'))')
+# Round-robin across users: everyone's first due item (by priority, then scheduledFor) before anyone's second
+_CLAIM_TURN = ('ROW_NUMBER() OVER (PARTITION BY w."userId" ORDER BY c."priority" DESC, c."scheduledFor")')
+
+# SQLite caches compiled statements per connection keyed by SQL text, so these are prepared once
+_SQLITE_UPDATE_LOGS = 'UPDATE "AgentJob" SET "logs" = ?, "currentStep" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?'
+_SQLITE_FAIL_JOB = 'UPDATE "AgentJob" SET "status" = \'FAILED\', "logs" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?'
+_SQLITE_COMPLETE_JOB = 'UPDATE "AgentJob" SET "status" = \'COMPLETED\', "logs" = ?, "currentStep" = \'Completed\', "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?'
+_SQLITE_APPEND_LOG = ('INSERT INTO "AgentJobLog" ("jobId", "seq", "content") '
+                      'SELECT ?, COALESCE(MAX("seq"), 0) + 1, ? FROM "AgentJobLog" WHERE "jobId" = ?')
+_SQLITE_SET_STEP = 'UPDATE "AgentJob" SET "currentStep" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?'
+_SQLITE_READ_LOGS = 'SELECT "seq", "content" FROM "AgentJobLog" WHERE "jobId" = ? AND "seq" > ? ORDER BY "seq" LIMIT ?'
+_SQLITE_JOB_LOGS = 'SELECT "logs", "status" FROM "AgentJob" WHERE "id" = ?'
+_SQLITE_SET_CONTENT_STATUS = 'UPDATE "ContentItem" SET "status" = ?, "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = (SELECT "contentItemId" FROM "AgentJob" WHERE "id" = ?)'
+_SQLITE_CLAIM_TABLE = ('CREATE TABLE IF NOT EXISTS "WorkerClaim" ("contentItemId" TEXT PRIMARY KEY, "jobId" TEXT NOT NULL, '
+                       '"workerId" TEXT NOT NULL, "claimedAt" DATETIME DEFAULT CURRENT_TIMESTAMP)')
+# Prisma stores SQLite DateTimes as epoch milliseconds; rows written by hand may hold ISO text
+_SQLITE_DUE = (f'SELECT c."id", {_CLAIM_TURN} AS turn, c."priority", c."scheduledFor" FROM "ContentItem" c '
+               'LEFT JOIN "Website" w ON w."id" = c."websiteId" '
+               'WHERE c."status" = \'SCHEDULED\' AND c."scheduledFor" IS NOT NULL '
+               'AND (CASE WHEN typeof(c."scheduledFor") IN (\'integer\', \'real\') '
+               'THEN c."scheduledFor" <= CAST(strftime(\'%s\', \'now\') AS INTEGER) * 1000 '
+               'ELSE datetime(c."scheduledFor") <= datetime(\'now\') END) '
+               'AND NOT EXISTS (SELECT 1 FROM "WorkerClaim" k WHERE k."contentItemId" = c."id") '
+               f'AND {_NO_ACTIVE_JOB} ORDER BY turn, c."priority" DESC, c."scheduledFor" LIMIT ?')
+_SQLITE_INSERT_CLAIM = 'INSERT OR IGNORE INTO "WorkerClaim" ("contentItemId", "jobId", "workerId") VALUES (?, ?, ?)'
+_SQLITE_MARK_PROCESSING = 'UPDATE "ContentItem" SET "status" = \'PROCESSING\', "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ?'
+_SQLITE_CREATE_JOB = ('INSERT INTO "AgentJob" ("id", "status", "currentStep", "contentItemId", "heartbeatAt", "updatedAt") '
+                      'VALUES (?, \'RUNNING\', ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)')
+_SQLITE_RELEASE_CLAIM = 'DELETE FROM "WorkerClaim" WHERE "contentItemId" = ?'
+_SQLITE_HEARTBEAT = 'UPDATE "AgentJob" SET "heartbeatAt" = CURRENT_TIMESTAMP WHERE "id" = ? AND "status" = \'RUNNING\''
+# Only worker claims carry a heartbeat; jobs started elsewhere (heartbeatAt NULL) are never expired here
+_SQLITE_EXPIRED = ('SELECT "id", "contentItemId" FROM "AgentJob" WHERE "status" = \'RUNNING\' '
+                   'AND "heartbeatAt" IS NOT NULL AND datetime("heartbeatAt") < datetime(\'now\', ?)')
+_SQLITE_EXPIRE_JOB = ('UPDATE "AgentJob" SET "status" = \'FAILED\', "currentStep" = \'Claim expired\', "updatedAt" = CURRENT_TIMESTAMP, '
+                      '"logs" = COALESCE((SELECT group_concat("content", char(10)) FROM (SELECT "content" FROM "AgentJobLog" '
+                      'WHERE "jobId" = ? ORDER BY "seq")) || char(10), \'\') || ? WHERE "id" = ? AND "status" = \'RUNNING\'')
+_SQLITE_RESCHEDULE = 'UPDATE "ContentItem" SET "status" = \'SCHEDULED\', "updatedAt" = CURRENT_TIMESTAMP WHERE "id" = ? AND "status" = \'PROCESSING\''
+_SQLITE_CHECKPOINT_TABLE = ('CREATE TABLE IF NOT EXISTS "StageCheckpoint" ("jobId" TEXT NOT NULL, "stage" TEXT NOT NULL, '
+                            '"payload" TEXT NOT NULL, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY ("jobId", "stage"))')
+_SQLITE_SAVE_CHECKPOINT = 'INSERT OR REPLACE INTO "StageCheckpoint" ("jobId", "stage", "payload") VALUES (?, ?, ?)'
+_SQLITE_LOAD_CHECKPOINTS = 'SELECT "stage", "payload" FROM "StageCheckpoint" WHERE "jobId" = ?'
+_SQLITE_CLEAR_CHECKPOINTS = 'DELETE FROM "StageCheckpoint" WHERE "jobId" = ?'
+_SQLITE_UPDATE_CONTENT = ('UPDATE "ContentItem" SET "status" = ?, "publishedUrl" = ?, "title" = COALESCE(?, "title"), '
+                          '"updatedAt" = CURRENT_TIMESTAMP WHERE "id" = (SELECT "contentItemId" FROM "AgentJob" WHERE "id" = ?)')
+
+
+class SQLiteJobStore(JobStore):
+    """One shared connection in WAL mode; writes are serialized by a lock (SQLite has a single writer anyway)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+    def append_logs(self, job_id, entries, current_step):
+        with DB_WRITE_DURATION.time(operation="log_append"), self._transaction() as conn:
+            conn.executemany(_SQLITE_APPEND_LOG, [(job_id, entry, job_id) for entry in entries])
+            conn.execute(_SQLITE_SET_STEP, (current_step, job_id))
+
+    def read_logs(self, job_id, after=0, limit=None):
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(_SQLITE_READ_LOGS, (job_id, after, -1 if limit is None else limit))]
+
+    def job_logs(self, job_id):
+        with self._lock:
+            row = self._conn.execute(_SQLITE_JOB_LOGS, (job_id,)).fetchone()
+        return row[0] if row and row[1] in ("COMPLETED", "FAILED") else None
+
+    def update_logs(self, job_id, logs, current_step):
+        with DB_WRITE_DURATION.time(operation="log_update"), self._transaction() as conn:
+            conn.execute(_SQLITE_UPDATE_LOGS, (logs, current_step, job_id))
+
+    def fail_job(self, job_id, logs, content_status=None):
+        with DB_WRITE_DURATION.time(operation="fail"), self._transaction() as conn:
+            conn.execute(_SQLITE_FAIL_JOB, (logs, job_id))
+            if content_status:
+                conn.execute(_SQLITE_SET_CONTENT_STATUS, (content_status, job_id))
+
+    def finalize(self, job_id, logs, content_status, published_url, title):
+        with DB_WRITE_DURATION.time(operation="finalize"), self._transaction() as conn:
+            conn.execute(_SQLITE_COMPLETE_JOB, (logs, job_id))
+            conn.execute(_SQLITE_UPDATE_CONTENT, (content_status, published_url, title, job_id))
+
+    def claim_due(self, worker_id, limit, lease_seconds=None):
+        lease_seconds = WORKER_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        with DB_WRITE_DURATION.time(operation="claim"), self._lock:
+            conn = self._conn
+            conn.execute(_SQLITE_CLAIM_TABLE)
+            # IMMEDIATE takes the write lock up front, so two workers cannot both read the same due rows
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                note = self._lease_note(lease_seconds)
+                for job_id, content_id in conn.execute(_SQLITE_EXPIRED, (f"-{lease_seconds} seconds",)).fetchall():
+                    conn.execute(_SQLITE_EXPIRE_JOB, (job_id, note, job_id))
+                    conn.execute(_SQLITE_RESCHEDULE, (content_id,))
+                    conn.execute(_SQLITE_RELEASE_CLAIM, (content_id,))
+                job_ids = {}
+                for content_id, _, _, _ in conn.execute(_SQLITE_DUE, (limit,)).fetchall():
+                    job_id = self.new_job_id()
+                    if conn.execute(_SQLITE_INSERT_CLAIM, (content_id, job_id, worker_id)).rowcount:
+                        job_ids[content_id] = job_id
+                for content_id, job_id in job_ids.items():
+                    conn.execute(_SQLITE_MARK_PROCESSING, (content_id,))
+                    conn.execute(_SQLITE_CREATE_JOB, (job_id, f"Claimed by {worker_id}"[:100], content_id))
+                rows = conn.execute(_CLAIM_DETAILS.format(", ".join("?" * len(job_ids))), list(job_ids)).fetchall() if job_ids else []
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return self._claim_rows(rows, job_ids)
+
+    def heartbeat(self, job_ids):
+        with DB_WRITE_DURATION.time(operation="heartbeat"), self._transaction() as conn:
+            conn.executemany(_SQLITE_HEARTBEAT, [(job_id,) for job_id in job_ids])
+
+    def release_claim(self, content_id):
+        with self._transaction() as conn:
+            conn.execute(_SQLITE_CLAIM_TABLE)
+            conn.execute(_SQLITE_RELEASE_CLAIM, (content_id,))
+
+    def save_checkpoint(self, job_id, stage, payload):
+        with DB_WRITE_DURATION.time(operation="checkpoint"), self._transaction() as conn:
+            conn.execute(_SQLITE_CHECKPOINT_TABLE)
+            conn.execute(_SQLITE_SAVE_CHECKPOINT, (job_id, stage, payload))
+
+    def load_checkpoints(self, job_id):
+        with self._transaction() as conn:
+            conn.execute(_SQLITE_CHECKPOINT_TABLE)
+            return dict(conn.execute(_SQLITE_LOAD_CHECKPOINTS, (job_id,)).fetchall())
+
+    def clear_checkpoints(self, job_id):
+        with self._transaction() as conn:
+            conn.execute(_SQLITE_CHECKPOINT_TABLE)
+            conn.execute(_SQLITE_CLEAR_CHECKPOINTS, (job_id,))
+
+    def ping(self):
+        with self._lock:
+            self._conn.execute("SELECT 1")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Server-side prepared statements, created once per pooled connection
+_PG_STATEMENTS = {
+    "job_update_logs": ('PREPARE job_update_logs (text, text, text) AS '
+                        'UPDATE "AgentJob" SET "logs" = $1, "currentStep" = $2, "updatedAt" = NOW() WHERE "id" = $3'),
+    "job_log_append": ('PREPARE job_log_append (text, text) AS '
+                       'INSERT INTO "AgentJobLog" ("jobId", "seq", "content") '
+                       'SELECT $1, COALESCE(MAX("seq"), 0) + 1, $2 FROM "AgentJobLog" WHERE "jobId" = $1'),
+    "job_set_step": ('PREPARE job_set_step (text, text) AS '
+                     'UPDATE "AgentJob" SET "currentStep" = $1, "updatedAt" = NOW() WHERE "id" = $2'),
+    "job_fail": ('PREPARE job_fail (text, text) AS '
+                 'UPDATE "AgentJob" SET "status" = \'FAILED\', "logs" = $1, "updatedAt" = NOW() WHERE "id" = $2'),
+    "job_complete": ('PREPARE job_complete (text, text) AS '
+                     'UPDATE "AgentJob" SET "status" = \'COMPLETED\', "logs" = $1, "currentStep" = \'Completed\', '
+                     '"updatedAt" = NOW() WHERE "id" = $2'),
+    "content_set_status": ('PREPARE content_set_status (text, text) AS '
+                           'UPDATE "ContentItem" SET "status" = $1, "updatedAt" = NOW() '
+                           'WHERE "id" = (SELECT "contentItemId" FROM "AgentJob" WHERE "id" = $2)'),
+    "checkpoint_save": ('PREPARE checkpoint_save (text, text, text) AS '
+                        'INSERT INTO "StageCheckpoint" ("jobId", "stage", "payload") VALUES ($1, $2, $3) '
+                        'ON CONFLICT ("jobId", "stage") DO UPDATE SET "payload" = EXCLUDED."payload", "createdAt" = NOW()'),
+    "content_finalize": ('PREPARE content_finalize (text, text, text, text) AS '
+                         'UPDATE "ContentItem" SET "status" = $1, "publishedUrl" = $2, "title" = COALESCE($3, "title"), '
+                         '"updatedAt" = NOW() WHERE "id" = (SELECT "contentItemId" FROM "AgentJob" WHERE "id" = $4)'),
+}
+
+
+# Rows locked by another worker's open claim are skipped rather than waited on. `ranked` reads the
+# statement's snapshot; after taking the lock, READ COMMITTED re-evaluates only the `due` and UPDATE
+# conditions against the row's latest version. They repeat the status check, so a row another worker
+# claimed and committed after this statement started is dropped instead of claimed twice.
+_PG_CLAIM = ('WITH ranked AS (SELECT c."id", ' + _CLAIM_TURN + ' AS turn FROM "ContentItem" c '
+             'LEFT JOIN "Website" w ON w."id" = c."websiteId" '
+             'WHERE c."status" = \'SCHEDULED\' AND c."scheduledFor" <= NOW() AND ' + _NO_ACTIVE_JOB + '), '
+             'due AS (SELECT c."id", r.turn FROM "ContentItem" c JOIN ranked r ON r."id" = c."id" '
+             'WHERE c."status" = \'SCHEDULED\' AND c."scheduledFor" <= NOW() '
+             'ORDER BY r.turn, c."priority" DESC, c."scheduledFor" LIMIT %s FOR UPDATE OF c SKIP LOCKED) '
+             'UPDATE "ContentItem" c SET "status" = \'PROCESSING\', "updatedAt" = NOW() '
+             'FROM due WHERE c."id" = due."id" AND c."status" = \'SCHEDULED\' '
+             'RETURNING c."id", due.turn, c."priority", c."scheduledFor"')
+_PG_CREATE_JOB = ('INSERT INTO "AgentJob" ("id", "status", "currentStep", "contentItemId", "heartbeatAt", "updatedAt") '
+                  'VALUES (%s, \'RUNNING\', %s, %s, NOW(), NOW())')
+# Expire abandoned claims (see the module docstring): the job keeps its segments as its final logs
+_PG_EXPIRE_CLAIMS = ('WITH expired AS (UPDATE "AgentJob" j SET "status" = \'FAILED\', "currentStep" = \'Claim expired\', '
+                     '"updatedAt" = NOW(), "logs" = COALESCE((SELECT string_agg(l."content", E\'\\n\' ORDER BY l."seq") '
+                     'FROM "AgentJobLog" l WHERE l."jobId" = j."id") || E\'\\n\', \'\') || %s '
+                     'WHERE j."status" = \'RUNNING\' AND j."heartbeatAt" < NOW() - make_interval(secs => %s) '
+                     'RETURNING j."contentItemId") '
+                     'UPDATE "ContentItem" c SET "status" = \'SCHEDULED\', "updatedAt" = NOW() FROM expired e '
+                     'WHERE c."id" = e."contentItemId" AND c."status" = \'PROCESSING\'')
+_PG_HEARTBEAT = 'UPDATE "AgentJob" SET "heartbeatAt" = NOW() WHERE "id" = ANY(%s) AND "status" = \'RUNNING\''
+
+
+@functools.lru_cache(maxsize=None)
+def _pooled_connection_class():
+    from psycopg2.extensions import connection
+
+    class PooledConnection(connection):
+        """A psycopg2 connection that remembers whether the store's statements are prepared on it."""
+        statements_prepared = False
+
+    return PooledConnection
+
+
+class PostgresJobStore(JobStore):
+    """
+    A pool of up to maxconn psycopg2 connections; callers block while all are in use. Returned
+    connections stay open (psycopg2's pools close idle ones beyond minconn, which would throw away
+    their prepared statements), and only broken ones are dropped.
+    """
+
+    def __init__(self, db_url: str, minconn: int = None, maxconn: int = None, connect: typing.Callable = None):
+        self.maxconn = maxconn or JOB_DB_POOL_MAX
+        params = postgres_params(db_url)
+        if connect is None:
+            import psycopg2
+
+            def connect():
+                return psycopg2.connect(connection_factory=_pooled_connection_class(), **params)
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        for _ in range(min(JOB_DB_POOL_MIN if minconn is None else minconn, self.maxconn)):
+            self._idle.append(self._connect())
+
+    def _checkout(self):
+        with self._idle_lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if not conn.closed:
+                    return conn
+        return self._connect()
+
+    def _checkin(self, conn, broken: bool):
+        if broken or conn.closed:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        with self._idle_lock:
+            self._idle.append(conn)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._slots.acquire()
+        conn = None
+        broken = False
+        try:
+            conn = self._checkout()
+            self._prepare(conn)
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            if conn is not None:
+                broken = bool(conn.closed)
+                if not broken:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        broken = True
+            raise
+        finally:
+            if conn is not None:
+                self._checkin(conn, broken)
+            self._slots.release()
+
+    def _prepare(self, conn):
+        if getattr(conn, "statements_prepared", False):
+            return
+        with conn.cursor() as cur:
+            for statement in _PG_STATEMENTS.values():
+                # A missing table (e.g. migration not yet applied) must not block the other statements
+                cur.execute("SAVEPOINT prepare_statement")
+                try:
+                    cur.execute(statement)
+                    cur.execute("RELEASE SAVEPOINT prepare_statement")
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+        conn.commit()
+        # Prepared statements live as long as the connection; the flag goes with it
+        conn.statements_prepared = True
+
+    def append_logs(self, job_id, entries, current_step):
+        with DB_WRITE_DURATION.time(operation="log_append"), self._transaction() as cur:
+            cur.executemany("EXECUTE job_log_append (%s, %s)", [(job_id, entry) for entry in entries])
+            cur.execute("EXECUTE job_set_step (%s, %s)", (current_step, job_id))
+
+    def read_logs(self, job_id, after=0, limit=None):
+        with self._transaction() as cur:
+            cur.execute('SELECT "seq", "content" FROM "AgentJobLog" WHERE "jobId" = %s AND "seq" > %s ORDER BY "seq" LIMIT %s',
+                        (job_id, after, limit))
+            return [tuple(row) for row in cur.fetchall()]
+
+    def job_logs(self, job_id):
+        with self._transaction() as cur:
+            cur.execute('SELECT "logs", "status" FROM "AgentJob" WHERE "id" = %s', (job_id,))
+            row = cur.fetchone()
+        return row[0] if row and row[1] in ("COMPLETED", "FAILED") else None
+
+    def update_logs(self, job_id, logs, current_step):
+        with DB_WRITE_DURATION.time(operation="log_update"), self._transaction() as cur:
+            cur.execute("EXECUTE job_update_logs (%s, %s, %s)", (logs, current_step, job_id))
+
+    def fail_job(self, job_id, logs, content_status=None):
+        with DB_WRITE_DURATION.time(operation="fail"), self._transaction() as cur:
+            cur.execute("EXECUTE job_fail (%s, %s)", (logs, job_id))
+            if content_status:
+                cur.execute("EXECUTE content_set_status (%s, %s)", (content_status, job_id))
+
+    def finalize(self, job_id, logs, content_status, published_url, title):
+        with DB_WRITE_DURATION.time(operation="finalize"), self._transaction() as cur:
+            cur.execute("EXECUTE job_complete (%s, %s)", (logs, job_id))
+            cur.execute("EXECUTE content_finalize (%s, %s, %s, %s)", (content_status, published_url, title, job_id))
+
+    def claim_due(self, worker_id, limit, lease_seconds=None):
+        lease_seconds = WORKER_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        with DB_WRITE_DURATION.time(operation="claim"), self._transaction() as cur:
+            cur.execute(_PG_EXPIRE_CLAIMS, (self._lease_note(lease_seconds), lease_seconds))
+            cur.execute(_PG_CLAIM, (limit,))
+            # RETURNING order is unspecified; restore the claim order
+            claimed = sorted(cur.fetchall(), key=lambda row: (row[1], -row[2], row[3]))
+            job_ids = {row[0]: self.new_job_id() for row in claimed}
+            if not job_ids:
+                return []
+            cur.executemany(_PG_CREATE_JOB, [(job_id, f"Claimed by {worker_id}"[:100], content_id)
+                                             for content_id, job_id in job_ids.items()])
+            cur.execute(_CLAIM_DETAILS.format(", ".join(["%s"] * len(job_ids))), list(job_ids))
+            rows = cur.fetchall()
+        return self._claim_rows(rows, job_ids)
+
+    def heartbeat(self, job_ids):
+        with DB_WRITE_DURATION.time(operation="heartbeat"), self._transaction() as cur:
+            cur.execute(_PG_HEARTBEAT, (list(job_ids),))
+
+    def save_checkpoint(self, job_id, stage, payload):
+        with DB_WRITE_DURATION.time(operation="checkpoint"), self._transaction() as cur:
+            cur.execute("EXECUTE checkpoint_save (%s, %s, %s)", (job_id, stage, payload))
+
+    def load_checkpoints(self, job_id):
+        with self._transaction() as cur:
+            cur.execute('SELECT "stage", "payload" FROM "StageCheckpoint" WHERE "jobId" = %s', (job_id,))
+            return dict(cur.fetchall())
+
+    def clear_checkpoints(self, job_id):
+        with self._transaction() as cur:
+            cur.execute('DELETE FROM "StageCheckpoint" WHERE "jobId" = %s', (job_id,))
+
+    def ping(self):
+        with self._transaction() as cur:
+            cur.execute("SELECT 1")
+
+    def close(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_stores: typing.Dict[str, JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store(db_url: str) -> JobStore:
+    """Shared store for a database URL, created on first use."""
+    store = _stores.get(db_url)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(db_url)
+        if store is None:
+            store = SQLiteJobStore(sqlite_path(db_url)) if is_sqlite_url(db_url) else PostgresJobStore(db_url)
+            _stores[db_url] = store
+        return store
+
+
+def close_job_stores():
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
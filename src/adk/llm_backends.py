@@ -0,0 +1,318 @@
+"""
+LLM backends behind LLMAgent: the real Gemini client and a deterministic fake for offline load tests.
+LLMAgent uses context.llm_backend when set, otherwise LLM_BACKEND (gemini | fake).
+"""
+import os
+import abc
+import json
+import time
+import asyncio
+import random
+import typing
+import hashlib
+import threading
+
+import httpx
+
+from .generation import to_genai_config
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "gemini")
+
+
+class LLMError(Exception):
+    """A generate call failed in a way that should move on to the next model."""
+
+
+class RateLimitError(LLMError):
+    """429 / RESOURCE_EXHAUSTED from the model provider."""
+
+
+class LLMTimeoutError(LLMError):
+    """The call did not finish within its deadline."""
+
+
+class LLMBackend(abc.ABC):
+    name = ""
+
+    @abc.abstractmethod
+    def generate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        """
+        Return the model's text for prompt; raise on failure so the caller can fall back.
+        config holds generation settings (see adk.generation); None means provider defaults.
+        """
+
+    async def agenerate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        """Async generate; backends without a native async client run generate in a thread."""
+        return await asyncio.to_thread(self.generate, model, prompt, timeout, config)
+
+
+class GeminiBackend(LLMBackend):
+    """google.genai client; one client per credential set is shared across agents and jobs."""
+    name = "gemini"
+    _clients: typing.Dict[tuple, typing.Any] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, api_key: str = None, vertex: bool = False, project: str = None, location: str = "us-central1"):
+        self.api_key = api_key
+        self.vertex = vertex
+        self.project = project
+        self.location = location
+
+    @classmethod
+    def from_context(cls, context) -> "GeminiBackend":
+        api_key = getattr(context, 'google_api_key', None)
+        use_vertex = os.environ.get("USE_VERTEX_AI", "").lower() == "true"
+        if not api_key and not use_vertex:
+            raise Exception("Missing Google API Key. Please set it in Settings.")
+        return cls(
+            api_key=api_key,
+            vertex=use_vertex,
+            project=os.environ.get("GCP_PROJECT_ID"),
+            location=os.environ.get("GCP_LOCATION", "us-central1"),
+        )
+
+    @property
+    def client(self):
+        key = ("vertex", self.project, self.location) if self.vertex else ("api_key", self.api_key)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                from google import genai
+                if self.vertex:
+                    client = genai.Client(vertexai=True, project=self.project, location=self.location)
+                else:
+                    client = genai.Client(api_key=self.api_key)
+                self._clients[key] = client
+            return client
+
+    @staticmethod
+    def _raise_mapped(error: Exception):
+        message = str(error)
+        if "429" in message or "RESOURCE_EXHAUSTED" in message:
+            raise RateLimitError(message) from error
+        if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+            raise LLMTimeoutError(message or type(error).__name__) from error
+        raise error
+
+    @staticmethod
+    def _request_config(model: str, config: dict, timeout: float):
+        """GenerateContentConfig for the call, with timeout (seconds) as the request's HTTP timeout."""
+        genai_config = to_genai_config(model, config)
+        if timeout is None:
+            return genai_config
+        from google.genai import types
+        http_options = types.HttpOptions(timeout=max(int(timeout * 1000), 1))
+        if genai_config is None:
+            return types.GenerateContentConfig(http_options=http_options)
+        return genai_config.model_copy(update={"http_options": http_options})
+
+    @staticmethod
+    def _text(response, model: str) -> str:
+        text = response.text
+        if text is None:
+            # e.g. the output cap was spent on thinking; let the caller move on to the next model
+            candidates = getattr(response, "candidates", None) or []
+            reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+            raise LLMError(f"{model} returned no text (finish reason: {reason})")
+        return text
+
+    def generate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        try:
+            response = self.client.models.generate_content(model=model, contents=prompt, config=self._request_config(model, config, timeout))
+        except Exception as e:
+            self._raise_mapped(e)
+        return self._text(response, model)
+
+    async def agenerate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        # client.aio shares the client's credentials and runs on the caller's event loop
+        try:
+            response = await self.client.aio.models.generate_content(model=model, contents=prompt, config=self._request_config(model, config, timeout))
+        except Exception as e:
+            self._raise_mapped(e)
+        return self._text(response, model)
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic stand-in that models latency and failures without calling a provider.
+
+    Each call takes ttft + output_tokens / tokens_per_second seconds (plus up to `jitter` extra);
+    a max_output_tokens setting caps output_tokens, like a real model stopping at its limit.
+    rate_limit_rate / timeout_rate inject 429s and timeouts; max_concurrent answers 429 once that
+    many calls are in flight; failing_models always raise. A response_schema setting gets JSON of
+    that shape. Outcomes depend only on
+    (seed, model, prompt, nth call with that model and prompt), so runs repeat exactly.
+    """
+    name = "fake"
+
+    def __init__(self, ttft: float = 0.5, tokens_per_second: float = 80.0, output_tokens: int = 400,
+                 jitter: float = 0.0, rate_limit_rate: float = 0.0, timeout_rate: float = 0.0,
+                 timeout: float = 60.0, max_concurrent: int = None, failing_models: typing.Iterable[str] = (),
+                 seed: int = 0, responder: typing.Callable[[str, str], str] = None,
+                 sleep: typing.Callable[[float], None] = time.sleep,
+                 asleep: typing.Callable[[float], typing.Awaitable] = asyncio.sleep):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.max_concurrent = max_concurrent
+        self.failing_models = set(failing_models)
+        self.seed = seed
+        self.responder = responder
+        self.sleep = sleep
+        # agenerate awaits asleep, unless a custom (e.g. no-op) sleep was injected
+        self.asleep = asleep
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._seen: typing.Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMBackend":
+        return cls(
+            ttft=float(os.environ.get("FAKE_LLM_TTFT", "0.5")),
+            tokens_per_second=float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "80")),
+            output_tokens=int(os.environ.get("FAKE_LLM_OUTPUT_TOKENS", "400")),
+            jitter=float(os.environ.get("FAKE_LLM_JITTER", "0")),
+            rate_limit_rate=float(os.environ.get("FAKE_LLM_429_RATE", "0")),
+            timeout_rate=float(os.environ.get("FAKE_LLM_TIMEOUT_RATE", "0")),
+            timeout=float(os.environ.get("FAKE_LLM_TIMEOUT", "60")),
+            max_concurrent=int(os.environ["FAKE_LLM_MAX_CONCURRENT"]) if os.environ.get("FAKE_LLM_MAX_CONCURRENT") else None,
+            failing_models=[m.strip() for m in os.environ.get("FAKE_LLM_FAILING_MODELS", "").split(",") if m.strip()],
+            seed=int(os.environ.get("FAKE_LLM_SEED", "0")),
+        )
+
+    def _rng(self, model: str, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{model}\x00{prompt}".encode()).hexdigest()[:16]
+        with self._lock:
+            nth = self._seen.get((model, digest), 0)
+            self._seen[(model, digest)] = nth + 1
+        return random.Random(f"{self.seed}:{digest}:{nth}")
+
+    def _output_tokens(self, config: dict = None) -> int:
+        cap = (config or {}).get("max_output_tokens")
+        return min(self.output_tokens, cap) if cap else self.output_tokens
+
+    _WORDS = ["content", "pipeline", "latency", "model", "article", "research", "trend", "insight", "draft", "publish"]
+
+    def _structured(self, schema: dict, rng: random.Random, tokens: int, required: bool = True) -> typing.Any:
+        """A value of the schema's shape: required strings get hyphenated words, optional ones stay empty."""
+        kind = schema.get("type")
+        if kind == "object":
+            wanted = set(schema.get("required", ()))
+            return {name: self._structured(spec, rng, tokens, name in wanted)
+                    for name, spec in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self._structured(schema.get("items", {}), rng, tokens)] if required else []
+        if kind in ("integer", "number"):
+            return 0
+        if kind == "boolean":
+            return False
+        return "-".join(rng.choice(self._WORDS) for _ in range(min(tokens, 3))) if required else ""
+
+    def _text(self, model: str, prompt: str, rng: random.Random, tokens: int, config: dict = None) -> str:
+        if self.responder:
+            return self.responder(model, prompt)
+        schema = (config or {}).get("response_schema")
+        if schema:
+            return json.dumps(self._structured(schema, rng, tokens))
+        body = " ".join(rng.choice(self._WORDS) for _ in range(tokens))
+        return f"Fake response from {model}.\n\n{body}"
+
+    def _record(self, model: str, prompt: str, outcome: str, latency: float):
+        with self._lock:
+            self.calls.append({"model": model, "prompt_chars": len(prompt), "outcome": outcome, "latency": latency})
+
+    def _plan(self, model: str, prompt: str, rng: random.Random, deadline: float, over_capacity: bool, tokens: int) -> tuple:
+        """(outcome, seconds to wait) for one call."""
+        roll = rng.random()
+        if model in self.failing_models:
+            return "error", self.ttft * 0.1
+        if over_capacity or roll < self.rate_limit_rate:
+            # Quota errors come back quickly, before any tokens are produced
+            return "rate_limited", self.ttft * 0.1
+        latency = self.ttft + tokens / self.tokens_per_second + rng.uniform(0, self.jitter)
+        if roll < self.rate_limit_rate + self.timeout_rate or latency > deadline:
+            return "timeout", deadline
+        return "ok", latency
+
+    def _enter(self) -> bool:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self.max_concurrent is not None and self.in_flight > self.max_concurrent
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _finish(self, model: str, prompt: str, rng: random.Random, outcome: str, seconds: float, tokens: int,
+                config: dict = None) -> str:
+        self._record(model, prompt, outcome, seconds)
+        if outcome == "error":
+            raise LLMError(f"404 NOT_FOUND: model {model} is not available")
+        if outcome == "rate_limited":
+            raise RateLimitError(f"429 RESOURCE_EXHAUSTED: quota exceeded for {model}")
+        if outcome == "timeout":
+            raise LLMTimeoutError(f"Deadline of {seconds:.1f}s exceeded for {model}")
+        return self._text(model, prompt, rng, tokens, config)
+
+    def generate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        rng = self._rng(model, prompt)
+        tokens = self._output_tokens(config)
+        over_capacity = self._enter()
+        try:
+            outcome, seconds = self._plan(model, prompt, rng, timeout or self.timeout, over_capacity, tokens)
+            self.sleep(seconds)
+            return self._finish(model, prompt, rng, outcome, seconds, tokens, config)
+        finally:
+            self._exit()
+
+    async def agenerate(self, model: str, prompt: str, timeout: float = None, config: dict = None) -> str:
+        rng = self._rng(model, prompt)
+        tokens = self._output_tokens(config)
+        over_capacity = self._enter()
+        try:
+            outcome, seconds = self._plan(model, prompt, rng, timeout or self.timeout, over_capacity, tokens)
+            if self.sleep is time.sleep:
+                await self.asleep(seconds)
+            else:
+                self.sleep(seconds)
+            return self._finish(model, prompt, rng, outcome, seconds, tokens, config)
+        finally:
+            self._exit()
+
+    def outcome_counts(self) -> typing.Dict[str, int]:
+        counts = {}
+        with self._lock:
+            for call in self.calls:
+                counts[call["outcome"]] = counts.get(call["outcome"], 0) + 1
+        return counts
+
+
+_shared_fake: typing.Optional[FakeLLMBackend] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_backend(context) -> LLMBackend:
+    """Backend for a job: context.llm_backend, else LLM_BACKEND (one shared fake per process)."""
+    global _shared_fake
+    backend = getattr(context, 'llm_backend', None)
+    if backend is not None:
+        return backend
+    kind = os.environ.get("LLM_BACKEND", LLM_BACKEND).lower()
+    if kind == "fake":
+        with _shared_lock:
+            if _shared_fake is None:
+                _shared_fake = FakeLLMBackend.from_env()
+            return _shared_fake
+    if kind != "gemini":
+        raise ValueError(f"Unknown LLM_BACKEND: {kind}")
+    return GeminiBackend.from_context(context)
@@ -0,0 +1,189 @@
+"""
+Minimal Prometheus-style metrics (counters, gauges, histograms) with text exposition.
+Recording is a dict lookup plus an add under a per-metric lock, so it is cheap on the hot path.
+"""
+import bisect
+import threading
+import time
+import typing
+import contextlib
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: typing.Sequence[str], values: typing.Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: typing.Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: typing.Dict[tuple, typing.Any] = {}
+
+    def _key(self, labels: typing.Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> typing.List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> typing.List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: typing.Sequence[str] = (), buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_value(self, key, value) -> typing.List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_number(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: typing.Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.reset()
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labelnames: typing.Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name: str, help_text: str, labelnames: typing.Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labelnames))
+
+
+def histogram(name: str, help_text: str, labelnames: typing.Sequence[str] = (), buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+# Pipeline metrics shared across modules
+STAGE_DURATION = histogram("flowpress_stage_duration_seconds", "Duration of each agent stage in the workflow.", ("agent",))
+LLM_DURATION = histogram("flowpress_llm_request_duration_seconds", "Latency of LLM generate calls per agent and model.", ("agent", "model", "outcome"))
+HTTP_DURATION = histogram("flowpress_http_request_duration_seconds", "Latency of outbound HTTP requests per tool (per-host detail: /stats/http).", ("tool", "outcome"))
+DB_WRITE_DURATION = histogram("flowpress_db_write_duration_seconds", "Latency of job database writes.", ("operation",))
+LLM_ROUTE_DURATION = histogram("flowpress_llm_route_duration_seconds", "Latency of a routed LLM call including fallbacks, by route and answering model.", ("route", "model", "outcome"))
+LLM_FALLBACKS = counter("flowpress_llm_fallbacks_total", "Model failures that moved on to the next configured model.", ("agent", "model"))
+SIMULATION_ENTRIES = counter("flowpress_simulation_entries_total", "Times an agent fell back to simulated output.", ("agent",))
+CACHE_EVENTS = counter("flowpress_cache_events_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+JOBS_IN_FLIGHT = gauge("flowpress_jobs_in_flight", "Pipelines currently executing.")
+SCHEDULER_QUEUE_WAIT = histogram("flowpress_scheduler_queue_wait_seconds", "Time a job waited in the fair-share scheduler before it started.", ("queue",))
+SCHEDULER_QUEUED = gauge("flowpress_scheduler_queued_jobs", "Jobs waiting in the fair-share scheduler.", ("queue",))
@@ -0,0 +1,115 @@
+"""
+Model routing: which models each LLM call tries, in order.
+
+A route maps a call type (e.g. "query_extraction", "writing") or an agent name to an ordered model
+list; the first model that answers wins and the rest are fallbacks. Entries may name models or use
+    $primary    the user's model (googleModelName / GOOGLE_MODEL_NAME)
+    $fallbacks  the user's fallback list (googleFallbackModels / GOOGLE_FALLBACK_MODELS)
+    $fast       the small model for short utility calls (GOOGLE_FAST_MODEL)
+Routes come from the job (context.google_model_routes, the user's googleModelRoutes), then
+GOOGLE_MODEL_ROUTES, then DEFAULT_ROUTES; within each, the call type beats the agent name, and "*"
+is the last resort. Both a JSON object and the compact form are accepted:
+    query_extraction=gemini-2.5-flash-lite|$primary; WriterAgent=gemini-3-pro-preview|$fallbacks
+"""
+import os
+import json
+import typing
+import functools
+
+DEFAULT_PRIMARY = "gemini-3-flash-preview"
+DEFAULT_FAST = "gemini-2.5-flash-lite"
+TOKENS = ("$primary", "$fallbacks", "$fast")
+
+# Short, mechanical calls go to the fast model first; reasoning and long-form work stays on the user's model
+DEFAULT_ROUTES: typing.Dict[str, typing.List[str]] = {
+    "query_extraction": ["$fast", "$primary", "$fallbacks"],
+    "alt_text": ["$fast", "$primary", "$fallbacks"],
+    "outline": ["$fast", "$primary", "$fallbacks"],
+    "synthesis": ["$primary", "$fallbacks"],
+    "writing": ["$primary", "$fallbacks"],
+    "seo_rewrite": ["$primary", "$fallbacks"],
+    "*": ["$primary", "$fallbacks"],
+}
+
+
+def _split_models(value: str) -> typing.List[str]:
+    # Comma and pipe both separate models, as in GOOGLE_FALLBACK_MODELS
+    return [m.strip() for m in value.replace("|", ",").split(",") if m.strip()]
+
+
+def parse_routes(value: typing.Any) -> typing.Dict[str, typing.List[str]]:
+    """{route: [model or $token, ...]} from a dict, JSON or the compact form; raises ValueError if malformed."""
+    if not value:
+        return {}
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("{"):
+            value = json.loads(text)
+        else:
+            value = {}
+            for entry in filter(None, (part.strip() for part in text.replace("\n", ";").split(";"))):
+                key, sep, models = entry.partition("=")
+                if not sep or not key.strip():
+                    raise ValueError(f"Model route {entry!r} must look like 'call_or_agent=model|model'")
+                value[key.strip()] = models
+    if not isinstance(value, dict):
+        raise ValueError("Model routes must map a call type, an agent name or '*' to a model list")
+    routes = {}
+    for key, models in value.items():
+        models = _split_models(models) if isinstance(models, str) else list(models or [])
+        if not models or not all(isinstance(m, str) and m for m in models):
+            raise ValueError(f"Model route {key!r} needs at least one model name")
+        unknown = [m for m in models if m.startswith("$") and m not in TOKENS]
+        if unknown:
+            raise ValueError(f"Unknown model token(s) in route {key!r}: {', '.join(unknown)}; expected {', '.join(TOKENS)}")
+        routes[key] = models
+    return routes
+
+
+def job_routes(value: typing.Any, log: typing.Callable[[str], None] = print) -> typing.Optional[typing.Dict[str, typing.List[str]]]:
+    """
+    A job's saved routes, or None when there are none or they are malformed. Malformed routes are
+    rejected when saved; at run time they are logged and ignored so GOOGLE_MODEL_ROUTES and the
+    defaults still apply rather than failing the run.
+    """
+    try:
+        return parse_routes(value) or None
+    except (ValueError, TypeError) as e:
+        log(f"[System] Ignoring model routes: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _env_routes(value: str) -> typing.Dict[str, typing.List[str]]:
+    return parse_routes(value)
+
+
+def select(agent_name: str, call: str, context) -> typing.Tuple[str, typing.List[str]]:
+    """(route key, unexpanded model list) for one call."""
+    layers = [getattr(context, 'google_model_routes', None) or {},
+              _env_routes(os.environ.get("GOOGLE_MODEL_ROUTES", "")), DEFAULT_ROUTES]
+    for key in (call, agent_name, "*"):
+        for routes in layers:
+            if key in routes:
+                return key, routes[key]
+    return "*", DEFAULT_ROUTES["*"]
+
+
+def expand(models: typing.Sequence[str], context) -> typing.List[str]:
+    """Substitute the $tokens and drop repeats, keeping the first position of each model."""
+    primary = getattr(context, 'google_model_name', None) or os.environ.get("GOOGLE_MODEL_NAME") or DEFAULT_PRIMARY
+    fallbacks = getattr(context, 'google_fallback_models', None) or os.environ.get("GOOGLE_FALLBACK_MODELS", "")
+    fast = os.environ.get("GOOGLE_FAST_MODEL", DEFAULT_FAST)
+    values = {"$primary": [primary], "$fallbacks": _split_models(fallbacks), "$fast": _split_models(fast)}
+    resolved = []
+    for model in models:
+        for name in values.get(model, [model]):
+            if name not in resolved:
+                resolved.append(name)
+    return resolved
+
+
+def resolve(agent_name: str, call: str, context) -> typing.Tuple[str, typing.List[str]]:
+    """(route key, models to try in order) for a call by agent_name."""
+    route, models = select(agent_name, call, context)
+    return route, expand(models, context)
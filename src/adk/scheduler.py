@@ -0,0 +1,213 @@
+"""
+Fair-share scheduler in front of pipeline execution.
+
+Jobs are queued per tenant (a user, or an API key when there is no user) and started only while
+the tenant, its WordPress site and the scheduler as a whole are under their concurrency caps.
+Across tenants, weighted fair queuing picks the tenant with the smallest virtual finish time, so a
+tenant with 50 queued posts gets its share and no more; within a tenant, higher priority runs
+first, then the earliest deadline (scheduledFor).
+"""
+import os
+import time
+import bisect
+import hashlib
+import itertools
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .metrics import SCHEDULER_QUEUE_WAIT, SCHEDULER_QUEUED
+
+SCHEDULER_MAX_CONCURRENT = int(os.environ.get("SCHEDULER_MAX_CONCURRENT", "4"))
+SCHEDULER_PER_TENANT = int(os.environ.get("SCHEDULER_PER_TENANT", "2"))
+SCHEDULER_PER_SITE = int(os.environ.get("SCHEDULER_PER_SITE", "2"))
+# "tenant=weight,..." e.g. "user_abc=2,user_xyz=0.5"; unlisted tenants weigh 1
+SCHEDULER_TENANT_WEIGHTS = os.environ.get("SCHEDULER_TENANT_WEIGHTS", "")
+
+
+def parse_weights(spec: str) -> typing.Dict[str, float]:
+    weights = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            tenant, weight = item.rsplit("=", 1)
+            weights[tenant.strip()] = float(weight)
+    return weights
+
+
+def tenant_key(user_id: str = None, api_key: str = None) -> str:
+    """The user id, else a hash of the API key (keys never end up in metrics or logs), else 'default'."""
+    if user_id:
+        return f"user:{user_id}"
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+    return "default"
+
+
+class _Job:
+    __slots__ = ("fn", "tenant", "site", "priority", "deadline", "seq", "future", "queued_at")
+
+    def __init__(self, fn, tenant, site, priority, deadline, seq):
+        self.fn = fn
+        self.tenant = tenant
+        self.site = site or ""
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+    def sort_key(self) -> tuple:
+        return (-self.priority, self.deadline if self.deadline is not None else float("inf"), self.seq)
+
+    def __lt__(self, other: "_Job") -> bool:
+        return self.sort_key() < other.sort_key()
+
+
+class _Tenant:
+    __slots__ = ("jobs", "running", "finish")
+
+    def __init__(self):
+        self.jobs: typing.List[_Job] = []  # sorted by priority, deadline, arrival
+        self.running = 0
+        self.finish = 0.0  # virtual finish time of the tenant's last dispatched job
+
+
+class FairScheduler:
+    """
+    Runs submitted callables on up to max_concurrent threads, admitting a job only while its tenant
+    is under per_tenant and its site under per_site (jobs without a site have no site cap). Tenants
+    are served in weighted fair order.
+    """
+
+    def __init__(self, max_concurrent: int = None, per_tenant: int = None, per_site: int = None,
+                 weights: typing.Dict[str, float] = None, name: str = "default"):
+        self.max_concurrent = SCHEDULER_MAX_CONCURRENT if max_concurrent is None else max_concurrent
+        self.per_tenant = SCHEDULER_PER_TENANT if per_tenant is None else per_tenant
+        self.per_site = SCHEDULER_PER_SITE if per_site is None else per_site
+        for cap in ("max_concurrent", "per_tenant", "per_site"):
+            if getattr(self, cap) < 1:
+                raise ValueError(f"FairScheduler {cap} must be at least 1, not {getattr(self, cap)}")
+        self.weights = parse_weights(SCHEDULER_TENANT_WEIGHTS) if weights is None else dict(weights)
+        self.name = name
+        self.running = 0
+        self.virtual_time = 0.0
+        self._tenants: typing.Dict[str, _Tenant] = {}
+        self._sites: typing.Dict[str, int] = {}
+        self._queued = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix=f"sched-{name}")
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def weight(self, tenant: str) -> float:
+        return max(self.weights.get(tenant, 1.0), 1e-6)
+
+    def submit(self, fn: typing.Callable[[], typing.Any], tenant: str = "default", site: str = None,
+               priority: int = 0, deadline: float = None) -> Future:
+        """Queue fn; the returned future resolves with its result once it has been admitted and run."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("FairScheduler is shut down")
+            job = _Job(fn, tenant, site, priority, deadline, next(self._seq))
+            state = self._tenants.get(tenant)
+            if state is None:
+                state = self._tenants[tenant] = _Tenant()
+            if not state.jobs and not state.running:
+                # A tenant returning from idle starts at the current virtual time instead of cashing in saved credit
+                state.finish = max(state.finish, self.virtual_time)
+            bisect.insort(state.jobs, job)
+            self._queued += 1
+            SCHEDULER_QUEUED.inc(queue=self.name)
+            self._dispatch()
+        return job.future
+
+    def run(self, fn: typing.Callable[[], typing.Any], **kwargs) -> typing.Any:
+        """Submit and wait for the result (for request threads)."""
+        return self.submit(fn, **kwargs).result()
+
+    def _eligible_job(self, state: _Tenant) -> typing.Optional[int]:
+        if state.running >= self.per_tenant:
+            return None
+        for index, job in enumerate(state.jobs):
+            if not job.site or self._sites.get(job.site, 0) < self.per_site:
+                return index
+        return None
+
+    def _dispatch(self):
+        # Caller holds the lock
+        while self.running < self.max_concurrent and not self._closed:
+            best = None
+            for tenant, state in self._tenants.items():
+                if not state.jobs:
+                    continue
+                index = self._eligible_job(state)
+                if index is None:
+                    continue
+                job = state.jobs[index]
+                key = (state.finish + 1.0 / self.weight(tenant),) + job.sort_key()
+                if best is None or key < best[0]:
+                    best = (key, tenant, state, index)
+            if best is None:
+                return
+            key, tenant, state, index = best
+            job = state.jobs.pop(index)
+            state.finish = key[0]
+            self.virtual_time = max(self.virtual_time, key[0] - 1.0 / self.weight(tenant))
+            state.running += 1
+            if job.site:
+                self._sites[job.site] = self._sites.get(job.site, 0) + 1
+            self.running += 1
+            self._queued -= 1
+            SCHEDULER_QUEUED.dec(queue=self.name)
+            SCHEDULER_QUEUE_WAIT.observe(time.perf_counter() - job.queued_at, queue=self.name)
+            self._executor.submit(self._execute, job)
+
+    def _execute(self, job: _Job):
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn())
+                except BaseException as e:
+                    job.future.set_exception(e)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self._tenants[job.tenant].running -= 1
+                if job.site:
+                    self._sites[job.site] -= 1
+                    if not self._sites[job.site]:
+                        del self._sites[job.site]
+                state = self._tenants[job.tenant]
+                if not state.jobs and not state.running:
+                    # An idle tenant would restart at the current virtual time anyway
+                    del self._tenants[job.tenant]
+                self._dispatch()
+                self._idle.notify_all()
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queued": self._queued,
+                "tenants": {t: {"queued": len(s.jobs), "running": s.running} for t, s in self._tenants.items()},
+                "sites": dict(self._sites),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """With wait, run everything already queued first; otherwise cancel queued jobs."""
+        with self._lock:
+            if wait:
+                self._idle.wait_for(lambda: not self._queued and not self.running)
+            self._closed = True
+            for state in self._tenants.values():
+                for job in state.jobs:
+                    job.future.cancel()
+                    SCHEDULER_QUEUED.dec(queue=self.name)
+                self._queued -= len(state.jobs)
+                state.jobs.clear()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,172 @@
+"""
+Lightweight span tracing: WorkflowAgent -> agent -> LLM/tool call, exported as JSON lines.
+Export is off by default (Cloud Run disks are memory-backed); set TRACE_FILE=traces.jsonl to enable it.
+"""
+import os
+import json
+import time
+import uuid
+import typing
+import threading
+import contextlib
+import contextvars
+
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("flowpress_current_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attributes: dict = None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def _export(record: dict):
+    path = os.environ.get("TRACE_FILE", TRACE_FILE)
+    if not path:
+        return
+    line = json.dumps(record, default=str)
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def current_span() -> typing.Optional[Span]:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(name: str, trace_id: str = None, **attributes):
+    """
+    Open a child of the current span (or a new root, using trace_id if given).
+    Exceptions mark the span as failed and propagate.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id = parent.trace_id
+    s = Span(name, trace_id or uuid.uuid4().hex, parent.span_id if parent else None, attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes.setdefault("error", str(e)[:200])
+        raise
+    finally:
+        s.end = time.time()
+        _current_span.reset(token)
+        try:
+            _export(s.to_dict())
+        except Exception as export_err:
+            print(f"[TRACE ERROR] {export_err}")
+
+
+# --- Analysis helpers used by trace_waterfall.py ---
+
+def load_spans(path: str, trace_id: str = None) -> typing.List[dict]:
+    """Read spans from a JSONL file; defaults to the most recently started trace."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    if not spans:
+        return []
+    if trace_id is None:
+        roots = [s for s in spans if not s.get("parent_id")]
+        trace_id = max(roots or spans, key=lambda s: s["start"])["trace_id"]
+    return [s for s in spans if s["trace_id"] == trace_id]
+
+
+def _children(spans: typing.List[dict]) -> typing.Dict[str, typing.List[dict]]:
+    children: typing.Dict[str, typing.List[dict]] = {}
+    for s in spans:
+        children.setdefault(s.get("parent_id"), []).append(s)
+    for items in children.values():
+        items.sort(key=lambda s: s["start"])
+    return children
+
+
+def critical_path(spans: typing.List[dict]) -> typing.List[dict]:
+    """
+    Walk from the root, stepping into the child that finishes last at each level.
+    For sequential stages this is the slowest chain of calls that bounds wall time.
+    """
+    children = _children(spans)
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if not s.get("parent_id") or s["parent_id"] not in ids]
+    if not roots:
+        return []
+    node = max(roots, key=lambda s: s["duration_ms"])
+    path = [node]
+    while children.get(node["span_id"]):
+        node = max(children[node["span_id"]], key=lambda s: s["end"] or 0)
+        path.append(node)
+    return path
+
+
+def format_waterfall(spans: typing.List[dict], width: int = 50) -> str:
+    """Render spans as an indented waterfall with offset, duration and a timing bar."""
+    if not spans:
+        return "No spans found."
+    children = _children(spans)
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if not s.get("parent_id") or s["parent_id"] not in ids]
+    t0 = min(s["start"] for s in spans)
+    total = max((s["end"] or s["start"]) for s in spans) - t0 or 1e-9
+    on_path = {s["span_id"] for s in critical_path(spans)}
+
+    lines = [f"Trace {spans[0]['trace_id']}  total {total * 1000:.0f} ms  (* = critical path)"]
+
+    def walk(s: dict, depth: int):
+        offset = s["start"] - t0
+        bar_start = int(offset / total * width)
+        bar_len = max(1, int((s["duration_ms"] / 1000) / total * width))
+        bar = " " * bar_start + "#" * bar_len
+        mark = "*" if s["span_id"] in on_path else " "
+        attrs = s.get("attributes", {})
+        detail = attrs.get("model") or attrs.get("url") or ""
+        status = "" if s.get("status") == "ok" else f" [{s.get('status')}]"
+        label = f"{'  ' * depth}{s['name']}"
+        lines.append(f"{mark} {label:<40} {offset * 1000:>9.0f} ms {s['duration_ms']:>9.0f} ms |{bar:<{width}}| {detail}{status}")
+        for child in children.get(s["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start"]):
+        walk(root, 0)
+
+    path = critical_path(spans)
+    lines.append("")
+    lines.append("Critical path: " + " -> ".join(f"{s['name']} ({s['duration_ms']:.0f} ms)" for s in path))
+    return "\n".join(lines)
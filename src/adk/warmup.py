@@ -0,0 +1,136 @@
+"""
+Instance warm-up: build the clients and connections the first job would otherwise pay for.
+Runs in a background thread at startup when WARMUP_ON_START=true, or on the first GET/POST /warmup,
+and never blocks readiness. It is off by default: on a cold start it competes with the first request
+for CPU and makes an API call, so a deployment opts in (e.g. with min-instances or a startup probe).
+"""
+import os
+import time
+import typing
+import threading
+
+WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "false").lower() == "true"
+# A models.get call opens the genai client's TLS connection; it is a metadata lookup, not a generation
+WARMUP_GENAI_PING = os.environ.get("WARMUP_GENAI_PING", "true").lower() == "true"
+GOOGLE_SEARCH_HOST = "https://www.googleapis.com"
+
+
+class WarmupReport:
+    """What was warmed, whether it worked and how long each step took."""
+
+    def __init__(self):
+        self.state = "pending"
+        self.started_at = None
+        self.finished_at = None
+        self.steps: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, status: str, seconds: float, detail: str = ""):
+        with self._lock:
+            self.steps[name] = {"status": status, "seconds": round(seconds, 4), "detail": detail}
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            total = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+            return {"state": self.state, "total_seconds": round(total, 4), "steps": dict(self.steps)}
+
+
+class _Skip(Exception):
+    """Raised by a step that has nothing to warm with the current configuration."""
+
+
+def _step(report: WarmupReport, name: str, fn: typing.Callable[[], str]):
+    started = time.perf_counter()
+    try:
+        detail = fn() or ""
+        report.record(name, "ok", time.perf_counter() - started, detail)
+    except _Skip as e:
+        report.record(name, "skipped", time.perf_counter() - started, str(e))
+    except Exception as e:
+        report.record(name, "error", time.perf_counter() - started, str(e)[:200])
+
+
+def _warm_imports() -> str:
+    import httpx  # noqa: F401
+    import markdown  # noqa: F401
+    from google import genai  # noqa: F401
+    return "google.genai, httpx, markdown"
+
+
+def _warm_genai() -> str:
+    from .core import AgentContext
+    from .llm_backends import GeminiBackend
+    context = AgentContext()
+    context.google_api_key = os.environ.get("GOOGLE_API_KEY")
+    try:
+        backend = GeminiBackend.from_context(context)
+    except Exception:
+        raise _Skip("no GOOGLE_API_KEY or USE_VERTEX_AI")
+    client = backend.client
+    # Without an API key (Vertex credentials) the ping would spend project quota; build the client only
+    if not (WARMUP_GENAI_PING and context.google_api_key):
+        return "client built"
+    model = os.environ.get("GOOGLE_MODEL_NAME", "gemini-3-flash-preview")
+    client.models.get(model=model)
+    return f"client built, connected ({model})"
+
+
+def _warm_host(url: str, tool: str) -> str:
+    from tools.http_client import HttpClient
+    from .aio import run_sync
+    # Pipelines run on the shared runtime loop, so warm that loop's async client for the host
+    response = run_sync(HttpClient.ahead(url, tool=tool, verify=False, allow_redirects=False))
+    return f"{url} -> {response.status_code}"
+
+
+def _wordpress_urls() -> typing.List[str]:
+    urls = os.environ.get("WP_URLS", os.environ.get("WP_URL", ""))
+    return [u.strip().rstrip("/") for u in urls.split(",") if u.strip()]
+
+
+def _warm_database() -> str:
+    from .job_store import get_job_store, is_sqlite_url
+    db_url = os.environ.get("DATABASE_URL")
+    if not db_url:
+        raise _Skip("no DATABASE_URL")
+    # Opens the shared SQLite connection or fills the Postgres pool used by the first job
+    get_job_store(db_url).ping()
+    return "sqlite" if is_sqlite_url(db_url) else "postgres pool"
+
+
+def warm_up(report: WarmupReport = None) -> WarmupReport:
+    """Run every warm-up step in order; failures are recorded, never raised."""
+    report = report or WarmupReport()
+    report.state = "running"
+    report.started_at = time.time()
+    _step(report, "imports", _warm_imports)
+    _step(report, "genai_client", _warm_genai)
+    if os.environ.get("GOOGLE_SEARCH_API_KEY"):
+        _step(report, "tls:google_search", lambda: _warm_host(GOOGLE_SEARCH_HOST, "search"))
+    for url in _wordpress_urls():
+        _step(report, f"tls:{url}", lambda url=url: _warm_host(f"{url}/wp-json/", "wordpress"))
+    _step(report, "database", _warm_database)
+    report.finished_at = time.time()
+    report.state = "done"
+    print(f"[Warmup] Done in {report.finished_at - report.started_at:.2f}s: "
+          + ", ".join(f"{name}={step['status']}" for name, step in report.steps.items()))
+    return report
+
+
+_report = WarmupReport()
+_thread: typing.Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+
+
+def start_background_warmup() -> WarmupReport:
+    """Start warm-up once per process on a daemon thread and return its (live) report."""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, args=(_report,), name="warmup", daemon=True)
+            _thread.start()
+    return _report
+
+
+def get_warmup_report() -> WarmupReport:
+    return _report
@@ -1,8 +1,15 @@
+import asyncio
 from adk.agents import LLMAgent
 from adk.core import AgentContext
+from adk.artifacts import Article, MediaAsset
+from adk.history import preview
 from tools.image_tool import ImageTool
 
 class MediaAgent(LLMAgent):
+    # Alt text is one sentence
+    default_call = "alt_text"
+    generation_config = {"max_output_tokens": 80, "thinking": "minimal", "temperature": 0.4}
+
     def __init__(self, context: AgentContext):
         super().__init__(
             name="MediaAgent", 
@@ -11,27 +18,25 @@ class MediaAgent(LLMAgent):
             tools=[ImageTool.generate_image]
         )
 
-    def run(self, input_data: str) -> dict:
+    async def arun(self, input_data) -> Article:
         self.log(f"Generating media for content...")
         
-        # Parse content if SEO markers are present
-        clean_content = input_data
-        if "---ARTICLE---" in input_data:
-            clean_content = input_data.split("---ARTICLE---")[-1].strip()
+        article = input_data if isinstance(input_data, Article) else Article.from_seo_output(str(input_data))
+        clean_content = article.body
         
         # Simple prompt derivation: just ask for a relevant image
         prompt = f"Professional digital art for an article about: {clean_content[:150]}..."
-        image_path = ImageTool.generate_image(prompt, api_key=self.context.google_api_key)
         
-        # Generate Alt Text using LLM (delegated to super().run or handled here)
+        # Generate Alt Text using LLM (delegated to super().arun); it only needs the article,
+        # so it runs while the image is being generated
         alt_prompt = f"Generate a descriptive, SEO-friendly alt text for an image about: {clean_content[:200]}"
-        alt_text = super().run(alt_prompt)
+        image, alt_text = await asyncio.gather(
+            ImageTool.agenerate_image(prompt, api_key=self.context.google_api_key),
+            super().arun(alt_prompt),
+        )
         
-        self.log(f"Image generated at: {image_path}")
-        self.log(f"Alt text generated: {alt_text}")
+        self.log(f"Image generated: {preview(self.context, image)}")
+        self.log(f"Alt text generated: {preview(self.context, alt_text)}")
         
-        return {
-            "content": input_data,
-            "image_path": image_path,
-            "alt_text": alt_text
-        }
+        article.media = MediaAsset(image, alt_text)
+        return article
@@ -1,8 +1,9 @@
 import os
-import re
 import typing
+import asyncio
 from adk.agents import LLMAgent
 from adk.core import AgentContext
+from adk.artifacts import Article, SEOMeta, MediaAsset
 from tools.wordpress_tool import WordPressTool
 
 class PublisherAgent(LLMAgent):
@@ -14,47 +15,37 @@ class PublisherAgent(LLMAgent):
             tools=[WordPressTool.publish_post]
         )
 
-    def run(self, input_data: typing.Union[str, dict]) -> str:
+    async def arun(self, input_data: typing.Union[Article, str, dict]) -> str:
         self.log("Formatting and publishing content to WordPress...")
         
         # Check for simulation safeguard
         is_simulated = getattr(self.context, 'is_simulated', False)
         
-        content = ""
-        image_path = None
-        
-        if isinstance(input_data, dict):
-            content = input_data.get("content", "")
-            image_path = input_data.get("image_path")
+        if isinstance(input_data, Article):
+            article = input_data
+        elif isinstance(input_data, dict):
+            # Legacy dict handoff: {"content", "image", "image_path", "alt_text"}
+            article = Article.from_seo_output(input_data.get("content", ""))
+            article.media = MediaAsset(input_data.get("image"), input_data.get("alt_text"))
+            if article.media.image is None and input_data.get("image_path"):
+                article.media.image = input_data.get("image_path")
         else:
-            content = input_data
+            article = Article.from_seo_output(str(input_data))
 
-        # Parse SEO Meta Data if present
-        seo_meta = {}
-        
-        if "---SEO_DATA---" in content:
-            parts = content.split("---ARTICLE---")
-            
-            # Parse the metadata section
-            seo_part = parts[0].replace("---SEO_DATA---", "").strip()
-            for line in seo_part.split("\n"):
-                if ":" in line:
-                    k, v = line.split(":", 1)
-                    seo_meta[k.strip().lower()] = v.strip()
-            
-            # Update content to be just the article part
-            if len(parts) > 1:
-                content = parts[1].strip()
-
-        # Remove the reference links section (cleanup)
-        if "---VALIDATED_LINKS_FOR_REFERENCE_ONLY---" in content:
-            content = content.split("---VALIDATED_LINKS_FOR_REFERENCE_ONLY---")[0].strip()
+        content = article.body
+        seo = article.seo or SEOMeta()
+        image = article.media.image if article.media else None
 
         # Retrieve credentials
         wp_sites = []
-        wp_urls = os.environ.get("WP_URLS", os.environ.get("WP_URL", ""))
-        wp_users = os.environ.get("WP_USERNAMES", os.environ.get("WP_USERNAME", ""))
-        wp_passes = os.environ.get("WP_APP_PASSWORDS", os.environ.get("WP_APP_PASSWORD", ""))
+        wp_config = getattr(self.context, 'wp_config', None) or {}
+        if wp_config.get("url") and wp_config.get("username") and wp_config.get("password"):
+            # Credentials passed with the job (a worker runs several sites at once, so env vars cannot be shared)
+            wp_urls, wp_users, wp_passes = wp_config["url"], wp_config["username"], wp_config["password"]
+        else:
+            wp_urls = os.environ.get("WP_URLS", os.environ.get("WP_URL", ""))
+            wp_users = os.environ.get("WP_USERNAMES", os.environ.get("WP_USERNAME", ""))
+            wp_passes = os.environ.get("WP_APP_PASSWORDS", os.environ.get("WP_APP_PASSWORD", ""))
         
         if wp_urls and wp_users and wp_passes:
             urls = [u.strip() for u in wp_urls.split(",")]
@@ -87,43 +78,39 @@ class PublisherAgent(LLMAgent):
             
             # Upload image if provided
             featured_media_id = None
-            if image_path:
-                media_result = WordPressTool.upload_media(image_path, auth_data)
-                if media_result: featured_media_id = media_result.get("id")
+            if isinstance(image, str):
+                upload = WordPressTool.aupload_media(image, auth_data)
+            elif image is not None:
+                # Upload straight from memory; no disk round-trip
+                upload = WordPressTool.aupload_media_bytes(image.data, image.filename, image.mime_type, auth_data)
+            else:
+                upload = asyncio.sleep(0)  # No image; resolves to None
 
             # Extract title
-            title = seo_meta.get("meta title") or (f"Mastering {self.context.topic}" if hasattr(self.context, 'topic') else "Agentic AI Report")
+            title = seo.meta_title or (f"Mastering {self.context.topic}" if hasattr(self.context, 'topic') else "Agentic AI Report")
             
-            # Resolve Categories
-            cat_ids = []
-            cat_names = seo_meta.get("category", "").split(",")
-            for cat in cat_names:
-                cat = cat.strip()
-                if cat:
-                    cat_id = WordPressTool.get_or_create_term(cat, "categories", auth_data)
-                    if cat_id:
-                        cat_ids.append(cat_id)
-
-            # Resolve Tags
-            tag_ids = []
-            tag_names = seo_meta.get("tags", "").split(",")
-            for tag in tag_names:
-                tag = tag.strip()
-                if tag:
-                    tag_id = WordPressTool.get_or_create_term(tag, "tags", auth_data)
-                    if tag_id:
-                        tag_ids.append(tag_id)
+            # Upload the image and resolve categories and tags at the same time (duplicates resolve once)
+            categories = list(dict.fromkeys(cat for cat in seo.categories if cat))
+            tags = list(dict.fromkeys(tag for tag in seo.tags if tag))
+            media_result, *term_ids = await asyncio.gather(
+                upload,
+                *(WordPressTool.aget_or_create_term(cat, "categories", auth_data) for cat in categories),
+                *(WordPressTool.aget_or_create_term(tag, "tags", auth_data) for tag in tags),
+            )
+            if media_result: featured_media_id = media_result.get("id")
+            cat_ids = [term_id for term_id in term_ids[:len(categories)] if term_id]
+            tag_ids = [term_id for term_id in term_ids[len(categories):] if term_id]
 
             # Publish to WordPress
             try:
-                result_url = WordPressTool.publish_post(
+                result_url = await WordPressTool.apublish_post(
                     title, 
                     html_content, 
                     auth=auth_data, 
                     featured_media_id=featured_media_id,
                     status=publish_status, # Use dynamic status
-                    slug=seo_meta.get("slug"),
-                    excerpt=seo_meta.get("meta description"),
+                    slug=seo.slug,
+                    excerpt=seo.meta_description,
                     categories=cat_ids,
                     tags=tag_ids
                 )
@@ -142,14 +129,14 @@ class PublisherAgent(LLMAgent):
                 if publish_status == "publish":
                     try:
                         print(f"  -> Publishing failed ({e}), retrying as draft...")
-                        result_url = WordPressTool.publish_post(
+                        result_url = await WordPressTool.apublish_post(
                             title, 
                             html_content, 
                             auth=auth_data, 
                             featured_media_id=featured_media_id,
                             status="draft", 
-                            slug=seo_meta.get("slug"),
-                            excerpt=seo_meta.get("meta description"),
+                            slug=seo.slug,
+                            excerpt=seo.meta_description,
                             categories=cat_ids,
                             tags=tag_ids
                         )
@@ -1,9 +1,20 @@
+import os
+import asyncio
 from adk.agents import LLMAgent
 from adk.core import AgentContext
+from adk.artifacts import ResearchBrief, extract_links, strip_links, LINKS_SECTION_HEADER
 from tools.mock_tools import MockTools
 from tools.search_tool import SearchTool
+from tools.keyword_tool import KeywordTool
 
 class ResearcherAgent(LLMAgent):
+    default_call = "synthesis"
+    generation_config = {"max_output_tokens": 2048, "thinking": "medium", "temperature": 0.3}
+    call_configs = {
+        # One line of search terms: no thinking, deterministic, stop at the end of the line
+        "query_extraction": {"max_output_tokens": 32, "thinking": "minimal", "temperature": 0.0, "stop_sequences": ["\n"]},
+    }
+
     def __init__(self, context: AgentContext):
         super().__init__(
             name="ResearcherAgent", 
@@ -21,14 +32,24 @@ class ResearcherAgent(LLMAgent):
             tools=[SearchTool.google_search]
         )
         
-    def run(self, input_data: str) -> str:
-        # Step 1: Extract a clean search query using the LLM
-        query_extraction_prompt = f"Extract a concise Google search query to find facts/stats about: '{input_data}'. Return ONLY the query."
-        search_query = super().run(query_extraction_prompt).strip().strip('"')
+    async def asearch_query(self, input_data: str, mode: str = None) -> str:
+        """
+        Search query for the trend list: built locally from its key phrases (no model round-trip),
+        or by the LLM when mode / RESEARCH_QUERY_MODE is "llm".
+        """
+        mode = (mode or os.environ.get("RESEARCH_QUERY_MODE", "local")).lower()
+        if mode == "llm":
+            query_extraction_prompt = f"Extract a concise Google search query to find facts/stats about: '{input_data}'. Return ONLY the query."
+            return (await super().arun(query_extraction_prompt, call="query_extraction")).strip().strip('"')
+        return KeywordTool.build_search_query(self.context.topic, str(input_data))
+
+    async def arun(self, input_data: str) -> ResearchBrief:
+        # Step 1: Turn the trend list into a search query
+        search_query = await self.asearch_query(input_data)
         self.log(f"Generated Search Query: {search_query}")
         
         # Step 2: Search
-        search_results = SearchTool.google_search(search_query)
+        search_results = await SearchTool.agoogle_search(search_query)
         
         # Step 3: Synthesis
         prompt = f"""Synthesize a research briefing for: {input_data}
@@ -41,41 +62,27 @@ class ResearcherAgent(LLMAgent):
         2. Identify the top 3-5 most authoritative external sources from the findings.
         3. At the end of your report, create a section "### AUTHORITATIVE EXTERNAL LINKS" and list them as [Title](URL).
         """
-        raw_briefing = super().run(prompt)
+        raw_briefing = await super().arun(prompt)
         
         self.log("Validating links in research briefing...")
-        import re
         from tools.link_validator_tool import LinkValidatorTool
         
-        # Regex to find markdown links: [text](url)
-        found_links = re.findall(r'\[([^\]]+)\]\((https?://[^\)]+)\)', raw_briefing)
-        
-        valid_links_section = "\n### AUTHORITATIVE EXTERNAL LINKS\n"
-        has_valid_links = False
-        
-        # Verify each link found in the briefing
-        unique_urls = set()
-        for text, url in found_links:
-            if url in unique_urls:
-                continue
-            
+        # Extract markdown links once; downstream stages reuse brief.links
+        links = extract_links(raw_briefing)
+        for text, url in links:
             self.log(f"Researcher validation: {url}")
-            if LinkValidatorTool.is_link_valid(url):
-                valid_links_section += f"- [{text}]({url})\n"
-                has_valid_links = True
-                unique_urls.add(url)
+        # All links are checked at once; each check waits on its own host
+        checks = await asyncio.gather(*(LinkValidatorTool.ais_link_valid(url) for _, url in links))
+        valid_links, dead_urls = [], set()
+        for (text, url), is_valid in zip(links, checks):
+            if is_valid:
+                valid_links.append((text, url))
             else:
                 self.log(f"Researcher filtering dead link: {url}")
-                # Remove the dead link from the main text if it appears as a markdown link
-                raw_briefing = raw_briefing.replace(f"[{text}]({url})", text)
+                dead_urls.add(url)
+        # Links are unique by URL, so a dead URL cited again under another anchor is matched by URL
+        raw_briefing = strip_links(raw_briefing, dead_urls)
         
-        # Split the briefing at the links section and rebuild it with only valid links
-        if "### AUTHORITATIVE EXTERNAL LINKS" in raw_briefing:
-            main_content = raw_briefing.split("### AUTHORITATIVE EXTERNAL LINKS")[0].strip()
-        else:
-            main_content = raw_briefing.strip()
-            
-        if has_valid_links:
-            return f"{main_content}\n{valid_links_section}"
-        else:
-            return main_content
+        # Split the briefing at the links section; the validated links travel as structured data
+        main_content = raw_briefing.split(LINKS_SECTION_HEADER)[0].strip()
+        return ResearchBrief(self.context.topic or str(input_data), main_content, valid_links)
@@ -1,35 +1,46 @@
+import re
+import json
+import asyncio
 from adk.agents import LLMAgent
 from adk.core import AgentContext
+from adk.artifacts import Article, SEOMeta, SEO_SCHEMA
+
+# The repair call may return any subset of the fields, only the ones it was asked to fix
+SEO_REPAIR_SCHEMA = {key: value for key, value in SEO_SCHEMA.items() if key != "required"}
+SEO_REPAIR_SCHEMA["title"] = "SEORepair"
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
 
 class SEOAgent(LLMAgent):
+    # Rewrites the whole article, so the cap matches the writer's; the edits themselves are mechanical
+    default_call = "seo_rewrite"
+    generation_config = {"max_output_tokens": 8192, "thinking": "low", "temperature": 0.4}
+    call_configs = {
+        "seo_rewrite": {"response_schema": SEO_SCHEMA},
+        # Fixes the fields that failed validation; deterministic and without thinking
+        "seo_repair": {"thinking": "minimal", "temperature": 0.0, "response_schema": SEO_REPAIR_SCHEMA},
+    }
+
     def __init__(self, context: AgentContext):
         super().__init__(
             name="SEOAgent", 
             context=context, 
-            persona="""You are a Professional SEO Specialist. Your task is to optimize the article while maintaining a strict output format.
+            persona="""You are a Professional SEO Specialist. Your task is to optimize the article and return it with its SEO metadata as one JSON object.
             
             OUTPUT RULES:
-            - Return ONLY the optimized data using the separators below.
+            - Return ONLY the JSON object described below.
             - Do NOT include any introductory or concluding meta-commentary.
             - Ensure all internal/external links are NATURALLY EMBEDDED within the article text using Markdown anchor text (e.g., [descriptive text](URL)).
             - DO NOT append a list of links at the end of the article text.
             - The article must read like a cohesive piece with links integrated into the narrative.
             - Ensure all internal/external links are accurately placed with descriptive anchor text.
             
-            FORMAT REQUIRED:
-            ---SEO_DATA---
-            Meta Title: [Title]
-            Meta Description: [Description]
-            Slug: [Slug]
-            OG Title: [Title]
-            OG Description: [Description]
-            Canonical: [URL or empty]
-            Category: [Primary Category Name]
-            Tags: [Comma, Separated, Tags]
-            JSON-LD: [Valid JSON-LD object]
-            ---ARTICLE---
-            # [Main Heading]
-            [Optimized Article Content]
+            FIELDS REQUIRED:
+            - meta_title, meta_description, slug (lowercase-with-hyphens)
+            - og_title, og_description, canonical (URL or empty)
+            - category (one primary category name), tags (list of 3-5 tags)
+            - json_ld (a valid JSON-LD object, serialized as a string)
+            - article (the optimized article in Markdown: "# [Main Heading]" followed by the content)
 
             ### OPTIMIZATION RULES:
             1. Metadata: Title (<60 chars), Description (150-160 chars).
@@ -42,15 +53,14 @@ class SEOAgent(LLMAgent):
             tools=[]
         )
 
-    def run(self, input_data: str) -> str:
+    async def arun(self, input_data) -> Article:
         self.log("Starting link optimization and verification...")
         
         import os
-        import re
         from tools.wordpress_tool import WordPressTool
         from tools.link_validator_tool import LinkValidatorTool
         
-        wp_auth = {
+        wp_auth = getattr(self.context, 'wp_config', None) or {
             "url": os.environ.get("WP_URL"),
             "username": os.environ.get("WP_USERNAME"),
             "password": os.environ.get("WP_APP_PASSWORD")
@@ -60,27 +70,31 @@ class SEOAgent(LLMAgent):
         recent_posts = []
         try:
             self.log("Fetching recent posts for internal linking...")
-            raw_posts = WordPressTool.get_recent_posts(wp_auth, count=5)
-            for p in raw_posts:
-                if LinkValidatorTool.is_link_valid(p['link']):
+            raw_posts = await WordPressTool.aget_recent_posts(wp_auth, count=5)
+            checks = await asyncio.gather(*(LinkValidatorTool.ais_link_valid(p['link']) for p in raw_posts))
+            for p, is_valid in zip(raw_posts, checks):
+                if is_valid:
                     recent_posts.append(p)
                 else:
                     self.log(f"LinkValidator: Filtering dead internal link: {p['link']}")
         except Exception as e:
             self.log(f"Warning: Could not fetch recent posts: {e}")
 
-        # 2. Extract and validate external links from the draft
-        # Regex to find markdown links: [text](url)
-        found_links = re.findall(r'\[([^\]]+)\]\((https?://[^\)]+)\)', input_data)
-        external_links = []
-        for text, url in found_links:
+        # 2. Validate external links from the draft (already extracted by the Writer stage)
+        draft = input_data if isinstance(input_data, Article) else Article(str(input_data))
+        candidates = []
+        for text, url in draft.links:
             # Check if it's external (not the WP site)
-            wp_site_url = os.environ.get("WP_URL", "")
+            wp_site_url = wp_auth.get("url") or ""
             if wp_site_url and wp_site_url in url:
                 continue
             
             self.log(f"Validating external link: {url}")
-            if LinkValidatorTool.is_link_valid(url):
+            candidates.append((text, url))
+        checks = await asyncio.gather(*(LinkValidatorTool.ais_link_valid(url) for _, url in candidates))
+        external_links = []
+        for (text, url), is_valid in zip(candidates, checks):
+            if is_valid:
                 external_links.append({"text": text, "url": url})
             else:
                 self.log(f"LinkValidator: Filtering dead external link: {url}")
@@ -110,17 +124,65 @@ class SEOAgent(LLMAgent):
         
         original_persona = self.persona
         self.persona = enhanced_persona
-        result = super().run(input_data)
+        result = await super().arun(draft)
         self.persona = original_persona
         
-        # 5. Append validated links section for PublisherAgent (this will be stripped before publishing)
-        if recent_posts or external_links:
-            result += "\n\n---VALIDATED_LINKS_FOR_REFERENCE_ONLY---\n"
-            if recent_posts:
-                result += "INTERNAL:\n"
-                result += "\n".join([f"- [{p['title']}]({p['link']})" for p in recent_posts]) + "\n"
-            if external_links:
-                result += "EXTERNAL:\n"
-                result += "\n".join([f"- [{l['text']}]({l['url']})" for l in external_links]) + "\n"
-        
-        return result
+        # 5. Validate the structured output; one targeted repair call fixes the failing fields
+        data = self._parse(result)
+        errors = SEOMeta.validate(data)
+        if errors:
+            self.log(f"SEO output failed validation: {self._describe(errors)}")
+            data = await self._arepair(data, errors, result, draft)
+            errors = SEOMeta.validate(data)
+        if errors:
+            # Still invalid after the repair: publish what is valid rather than re-running the stage
+            self.log(f"SEO output still invalid after repair, dropping: {self._describe(errors)}")
+            data = {key: value for key, value in data.items() if key not in errors} if isinstance(data, dict) else {}
+            data.setdefault("article", draft.body)
+
+        # Validated links travel alongside for reference only
+        article = Article.from_structured(data)
+        article.reference_links = {
+            "internal": [(p['title'], p['link']) for p in recent_posts],
+            "external": [(l['text'], l['url']) for l in external_links],
+        }
+        return article
+
+    @staticmethod
+    def _parse(text: str):
+        """The JSON object in a structured response, or None when it is not JSON."""
+        text = (text or "").strip()
+        match = _JSON_FENCE.match(text)
+        try:
+            return json.loads(match.group(1) if match else text)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _describe(errors: dict) -> str:
+        return "; ".join(f"{field} {problem}" for field, problem in errors.items())
+
+    async def _arepair(self, data, errors: dict, raw: str, draft: Article) -> dict:
+        """
+        One repair call for the failing metadata fields, or for the whole object when the response
+        was not JSON. A missing article is not regenerated; the draft stands in for it.
+        """
+        if not isinstance(data, dict):
+            prompt = (f"This response should have been a JSON object with the fields {', '.join(SEO_SCHEMA['properties'])}. "
+                      f"Return it as that JSON object, keeping the article text as written.\n\nRESPONSE:\n{raw}")
+            repaired = self._parse(await super().arun(prompt, call="seo_repair"))
+            return repaired if isinstance(repaired, dict) else data
+
+        current = {field: data.get(field) for field in errors if field != "article"}
+        if not current:
+            return data
+        prompt = (f"Fix these fields of the SEO metadata for the article titled {data.get('meta_title') or self.context.topic!r}. "
+                  f"Return a JSON object with ONLY the corrected fields.\n\nPROBLEMS:\n{self._describe({f: errors[f] for f in current})}\n\n"
+                  f"CURRENT VALUES:\n{json.dumps(current, indent=2)}")
+        if "meta_description" in current:
+            # A description needs the content itself; the other fields are fixable from the metadata alone
+            prompt += f"\n\nARTICLE:\n{data.get('article') or draft.body}"
+        repaired = self._parse(await super().arun(prompt, call="seo_repair"))
+        if not isinstance(repaired, dict):
+            return data
+        return dict(data, **{field: value for field, value in repaired.items() if field in SEO_SCHEMA["properties"]})
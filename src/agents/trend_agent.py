@@ -1,9 +1,24 @@
+import datetime
 from adk.agents import LLMAgent
 from adk.core import AgentContext
 from tools.mock_tools import MockTools
 from tools.search_tool import SearchTool
 
+# Searched at the same time for broader coverage: trends, news, how-to, statistics and this year's take
+QUERY_VARIANTS = (
+    "trending topics and keywords for {topic}",
+    "{topic} latest news",
+    "how to {topic}",
+    "{topic} statistics",
+    "{topic} trends {year}",
+)
+
+
 class TrendAgent(LLMAgent):
+    # A short list of trends; little reasoning needed
+    default_call = "trends"
+    generation_config = {"max_output_tokens": 512, "thinking": "low", "temperature": 0.7}
+
     def __init__(self, context: AgentContext):
         super().__init__(
             name="TrendAgent", 
@@ -18,7 +33,7 @@ class TrendAgent(LLMAgent):
             tools=[SearchTool.google_search]
         )
 
-    def run(self, input_data: str) -> str:
+    async def arun(self, input_data: str) -> str:
         # Final safeguard: ensure input_data is a clean string, not a JSON fragment
         if isinstance(input_data, str) and input_data.startswith('{') and '"topic"' in input_data:
             try:
@@ -30,9 +45,12 @@ class TrendAgent(LLMAgent):
                 
         # Override to add specific logic or pre/post processing if needed
         self.log(f"Scanning for trends related to: {input_data}")
-        # Try real search first
-        search_results = SearchTool.google_search(f"trending topics and keywords for {input_data}")
+        # Try real search first: every query variant at once, merged and ranked into one result list
+        year = datetime.date.today().year
+        queries = [variant.format(topic=input_data, year=year) for variant in QUERY_VARIANTS]
+        search_results = await SearchTool.amulti_search(queries)
+        self.log(f"Searched {len(queries)} query variants: {len(search_results)} unique results")
         
         # Pass search results context to the LLM
         prompt = f"Identify the top 3-5 trending topics or keywords for: {input_data}\n\nSearch Context:\n{search_results}"
-        return super().run(prompt)
+        return await super().arun(prompt)
@@ -1,21 +1,85 @@
+import os
+import json
+import asyncio
 from adk.agents import LLMAgent
 from adk.core import AgentContext
+from adk.artifacts import Article, LINK_PATTERN
+
+# Plan for the sectioned mode: the title, what the introduction covers and one entry per H2 section
+OUTLINE_SCHEMA = {
+    "title": "ArticleOutline",
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "The article's H1 title"},
+        "intro_points": {"type": "array", "items": {"type": "string"}},
+        "sections": {
+            "type": "array",
+            "description": "4-6 H2 sections in reading order; the last one concludes the article",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string"},
+                    "points": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["heading", "points"],
+            },
+        },
+    },
+    "required": ["title", "intro_points", "sections"],
+}
+# Small edits from the consistency pass, applied where `find` occurs exactly once
+EDITS_SCHEMA = {
+    "title": "ConsistencyEdits",
+    "type": "object",
+    "properties": {
+        "edits": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"find": {"type": "string"}, "replace": {"type": "string"}},
+                "required": ["find", "replace"],
+            },
+        },
+    },
+    "required": ["edits"],
+}
+DEFAULT_SECTION_CONCURRENCY = 4
+
+
+def section_concurrency() -> int:
+    """WRITER_SECTION_CONCURRENCY as a call limit; 0 or less still lets one call run."""
+    value = os.environ.get("WRITER_SECTION_CONCURRENCY", str(DEFAULT_SECTION_CONCURRENCY))
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise ValueError(f"WRITER_SECTION_CONCURRENCY must be an integer, got {value!r}") from None
+
 
 class WriterAgent(LLMAgent):
+    # Long-form article: room for the full draft and more reasoning
+    default_call = "writing"
+    generation_config = {"max_output_tokens": 8192, "thinking": "medium", "temperature": 0.8}
+    call_configs = {
+        # Sectioned mode: a short structured plan, then one bounded call per section
+        "outline": {"max_output_tokens": 1024, "thinking": "low", "temperature": 0.4, "response_schema": OUTLINE_SCHEMA},
+        "section": {"max_output_tokens": 2048, "thinking": "low"},
+        "consistency": {"max_output_tokens": 1024, "thinking": "low", "temperature": 0.0, "response_schema": EDITS_SCHEMA},
+    }
+
     def __init__(self, context: AgentContext):
         super().__init__(
-            name="WriterAgent", 
-            context=context, 
+            name="WriterAgent",
+            context=context,
             persona="""You are a Professional Content Writer. Your task is to draft a high-quality, engaging article based on research.
-            
+
             OUTPUT RULES:
             - Return ONLY the final article.
             - Do NOT include any introductory or concluding meta-commentary (e.g., "Certainly!", "Here is...").
             - Do NOT include headers like "Synthesize a research briefing", "Search Findings", or "Topic:".
             - Start directly with the article content.
-            
+
             CRITICAL LINKING RULES:
-            1. Use the provided URLs for citations. 
+            1. Use the provided URLs for citations.
             2. YOU MUST INCLUDE AT LEAST 2 EXTERNAL LINKS from the "AUTHORITATIVE EXTERNAL LINKS" section provided in the research.
             3. Always use descriptive anchor text (e.g., [the latest productivity statistics](URL)) instead of raw URLs or "click here".
             4. Ensure links flow naturally within the text.
@@ -24,3 +88,114 @@ class WriterAgent(LLMAgent):
             """,
             tools=[]
         )
+
+    async def arun(self, input_data) -> Article:
+        # WRITER_MODE=single writes the whole article in one call; sections (the default) plans it first
+        if os.environ.get("WRITER_MODE", "sections").lower() == "single":
+            # The research brief renders its validated links section for the prompt
+            return Article(await super().arun(input_data))
+
+        research = str(input_data)
+        topic = self.context.topic or research[:100]
+        outline = self._parse_outline(await super().arun(
+            f"Plan an article about {topic!r} from the research below. Return the H1 title, the points the "
+            f"introduction should make, and 4-6 H2 sections (heading plus 2-4 key points each, the last one "
+            f"concluding the article).\n\nRESEARCH:\n{research}", call="outline"))
+        if outline is None:
+            self.log("Outline unusable; writing the article in one call.")
+            return Article(await super().arun(input_data))
+        self.log(f"Outline: {outline['title']} ({len(outline['sections'])} sections)")
+
+        # Sections (and the introduction) are written at the same time, a few calls at a time
+        limit = asyncio.Semaphore(section_concurrency())
+
+        async def write(prompt: str) -> str:
+            async with limit:
+                return await super(WriterAgent, self).arun(prompt, call="section")
+
+        plan = self._outline_text(outline)
+        intro, *sections = await asyncio.gather(
+            write(f"Write the introduction (1-2 short paragraphs, no heading) of the article {outline['title']!r}. "
+                  f"Cover: {'; '.join(outline['intro_points']) or topic}.\n\nOUTLINE:\n{plan}\n\nRESEARCH:\n{research}"),
+            *(write(f"Write ONLY the section \"## {section['heading']}\" of the article {outline['title']!r} "
+                    f"(250-400 words; ### subheadings are fine). Cover: {'; '.join(section['points'])}. "
+                    f"Cite research links inline where they fit. Do not introduce or conclude the whole article "
+                    f"unless this is the last section.\n\nOUTLINE:\n{plan}\n\nRESEARCH:\n{research}")
+              for section in outline["sections"]),
+        )
+        body = self._assemble(outline, intro, sections)
+        return Article(await self._consistency_pass(body))
+
+    @staticmethod
+    def _parse_outline(text: str):
+        """The outline as a dict with a title and at least one headed section, or None."""
+        try:
+            outline = json.loads((text or "").strip())
+        except ValueError:
+            return None
+        if not isinstance(outline, dict) or not str(outline.get("title") or "").strip():
+            return None
+        sections = [{"heading": str(s["heading"]).strip().lstrip("#").strip(), "points": [str(p) for p in s.get("points") or []]}
+                    for s in outline.get("sections") or [] if isinstance(s, dict) and str(s.get("heading") or "").strip()]
+        if not sections:
+            return None
+        points = [str(p) for p in outline.get("intro_points") or []]
+        return {"title": str(outline["title"]).strip().lstrip("#").strip(), "intro_points": points, "sections": sections}
+
+    @staticmethod
+    def _outline_text(outline: dict) -> str:
+        lines = [f"# {outline['title']}"]
+        for section in outline["sections"]:
+            lines.append(f"## {section['heading']}")
+            lines.extend(f"- {point}" for point in section["points"])
+        return "\n".join(lines)
+
+    @staticmethod
+    def _assemble(outline: dict, intro: str, sections: list) -> str:
+        """
+        Join the pieces under one H1: each section starts with its H2 and keeps no H1 of its own,
+        the introduction has no headings, and a source linked in an earlier section is not linked again.
+        """
+        def without_h1(text: str) -> list:
+            return [line for line in text.strip().splitlines() if not line.startswith("# ")]
+
+        parts = [f"# {outline['title']}", "\n".join(l for l in without_h1(intro) if not l.startswith("#")).strip()]
+        for section, text in zip(outline["sections"], sections):
+            lines = without_h1(text)
+            while lines and not lines[0].strip():
+                lines.pop(0)
+            if not (lines and lines[0].startswith("## ")):
+                lines.insert(0, f"## {section['heading']}\n")
+            parts.append("\n".join(lines).strip())
+
+        seen = set()
+
+        def link_once(match):
+            if match.group(2) in seen:
+                return match.group(1)
+            seen.add(match.group(2))
+            return match.group(0)
+        return LINK_PATTERN.sub(link_once, "\n\n".join(p for p in parts if p))
+
+    async def _consistency_pass(self, body: str) -> str:
+        """One small call listing edits for repetition, contradictions and inconsistent terms across sections."""
+        response = await super().arun(
+            "The article below was written section by section. List only small edits that fix repeated "
+            "sentences, contradicting facts or figures, inconsistent terminology and abrupt transitions between "
+            "sections. Each edit replaces an exact passage (`find`, copied verbatim) with its fix (`replace`). "
+            f"Return no edits if none are needed.\n\nARTICLE:\n{body}", call="consistency")
+        try:
+            edits = json.loads((response or "").strip()).get("edits") or []
+        except (ValueError, AttributeError):
+            self.log("Consistency pass returned no usable edits.")
+            return body
+        applied = 0
+        for edit in edits:
+            find = edit.get("find") if isinstance(edit, dict) else None
+            replace = edit.get("replace") if isinstance(edit, dict) else None
+            # Only unambiguous edits; headings stay as the outline set them
+            if find and isinstance(replace, str) and body.count(find) == 1 and not find.lstrip().startswith("#"):
+                body = body.replace(find, replace)
+                applied += 1
+        self.log(f"Consistency pass: applied {applied} of {len(edits)} edit(s).")
+        return body
@@ -0,0 +1,372 @@
+import os
+import time
+import asyncio
+import threading
+import typing
+import weakref
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+
+from adk.metrics import HTTP_DURATION
+from adk.tracing import span
+
+# Disable SSL verification warnings once for the whole process (user sites often have cert issues)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "8"))
+# Seconds to wait for a free connection once a host's pool is exhausted
+HTTP_POOL_TIMEOUT = float(os.environ.get("HTTP_POOL_TIMEOUT", str(DEFAULT_READ_TIMEOUT)))
+# The link validator reaches arbitrary hosts: pools and stats are kept for this many, least recently used go first
+HTTP_MAX_POOLED_HOSTS = int(os.environ.get("HTTP_MAX_POOLED_HOSTS", "64"))
+HTTP_MAX_STATS_HOSTS = int(os.environ.get("HTTP_MAX_STATS_HOSTS", "512"))
+# Stats of evicted hosts are folded into this entry
+OTHER_HOSTS = "other"
+
+
+class _PoolTimeout:
+    """Connection pool whose blocking wait for a free connection gives up after HTTP_POOL_TIMEOUT."""
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(HTTP_POOL_TIMEOUT if timeout is None else timeout)
+
+
+class _HTTPPool(_PoolTimeout, urllib3.HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_PoolTimeout, urllib3.HTTPSConnectionPool):
+    pass
+
+
+class _BoundedAdapter(HTTPAdapter):
+    """pool_block=True adapter (a hard per-host connection limit) whose wait for a connection times out."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def send(self, request, *args, **kwargs):
+        try:
+            return super().send(request, *args, **kwargs)
+        except urllib3.exceptions.EmptyPoolError as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+
+
+class _HostPools:
+    """
+    Per-host pools in LRU order. Beyond max_hosts, the least recently used pools that no request
+    is using are closed; callers hold HttpClient._lock.
+    """
+
+    def __init__(self, max_hosts: int, close: typing.Callable):
+        self.max_hosts = max_hosts
+        self.close = close
+        self.pools: "OrderedDict[typing.Any, typing.Any]" = OrderedDict()
+        self.in_use: typing.Dict[typing.Any, int] = {}
+
+    def acquire(self, key, create: typing.Callable):
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = create()
+        self.pools.move_to_end(key)
+        self.in_use[key] = self.in_use.get(key, 0) + 1
+        self._evict()
+        return pool
+
+    def release(self, key):
+        count = self.in_use.get(key, 0) - 1
+        if count > 0:
+            self.in_use[key] = count
+        else:
+            self.in_use.pop(key, None)
+            self._evict()
+
+    def _evict(self):
+        for key in list(self.pools):
+            if len(self.pools) <= self.max_hosts:
+                break
+            if not self.in_use.get(key):
+                self.close(self.pools.pop(key))
+
+    def clear(self, close: bool = True):
+        if close:
+            for pool in self.pools.values():
+                self.close(pool)
+        self.pools.clear()
+        self.in_use.clear()
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+
+class HostStats:
+    """Per-host counters for outbound traffic."""
+    __slots__ = ("requests", "errors", "latency_total", "latency_max", "bytes_sent", "bytes_received", "status_counts")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status_counts = {}
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_total_s": round(self.latency_total, 6),
+            "latency_avg_s": round(self.latency_total / self.requests, 6) if self.requests else 0.0,
+            "latency_max_s": round(self.latency_max, 6),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "status_counts": dict(self.status_counts),
+        }
+
+    def merge(self, other: "HostStats"):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latency_total += other.latency_total
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        for status_class, count in other.status_counts.items():
+            self.status_counts[status_class] = self.status_counts.get(status_class, 0) + count
+
+
+def _close_async_client(client):
+    # Evictions happen on the client's own loop; keep the task referenced until it finishes
+    task = asyncio.get_running_loop().create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+_closing = set()
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP transport used by every tool.
+    Keeps one pooled session per host (for the HTTP_MAX_POOLED_HOSTS most recently used hosts),
+    caps concurrent connections per host, applies default connect/read/pool timeouts and records
+    per-host metrics (HTTP_MAX_STATS_HOSTS hosts, the rest under "other").
+    The a* variants do the same over httpx.AsyncClient (one per event loop and host).
+    """
+    _lock = threading.Lock()
+    _sessions = _HostPools(HTTP_MAX_POOLED_HOSTS, lambda session: session.close())
+    _stats: "OrderedDict[str, HostStats]" = OrderedDict()
+    _async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _HostPools]" = weakref.WeakKeyDictionary()
+    _ssl_context = None
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    @staticmethod
+    def _new_session() -> requests.Session:
+        session = requests.Session()
+        # pool_block=True turns the pool size into a hard per-host connection limit
+        adapter = _BoundedAdapter(pool_connections=1, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def _acquire_session(cls, host: str) -> requests.Session:
+        """The host's session, marked in use until _release_session (so it is not closed mid-request)."""
+        with cls._lock:
+            return cls._sessions.acquire(host, cls._new_session)
+
+    @classmethod
+    def _release_session(cls, host: str):
+        with cls._lock:
+            cls._sessions.release(host)
+
+    @classmethod
+    def _new_async_client(cls, verify: bool):
+        # Imported on first use: only the asyncio runtime needs httpx
+        import httpx
+        if verify and cls._ssl_context is None:
+            # Loading the CA bundle is slow; build it once and share it across hosts
+            import ssl
+            import certifi
+            cls._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        # Waiting for a free connection (pool timeout) makes the limit a hard per-host cap
+        limits = httpx.Limits(max_connections=MAX_CONNECTIONS_PER_HOST, max_keepalive_connections=MAX_CONNECTIONS_PER_HOST)
+        return httpx.AsyncClient(limits=limits, verify=cls._ssl_context if verify else False)
+
+    @classmethod
+    def _async_clients_here(cls) -> _HostPools:
+        loop = asyncio.get_running_loop()
+        clients = cls._async_clients.get(loop)
+        if clients is None:
+            clients = cls._async_clients[loop] = _HostPools(HTTP_MAX_POOLED_HOSTS, _close_async_client)
+        return clients
+
+    @staticmethod
+    def _async_timeout(timeout: typing.Any):
+        import httpx
+        if timeout is None:
+            timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    @classmethod
+    def _stats_for(cls, host: str) -> HostStats:
+        """The host's counters (caller holds _lock); the least recently used host is folded into "other"."""
+        stats = cls._stats.get(host)
+        if stats is None:
+            stats = cls._stats[host] = HostStats()
+            if len(cls._stats) > HTTP_MAX_STATS_HOSTS:
+                evicted = next(key for key in cls._stats if key != OTHER_HOSTS)
+                cls._stats.setdefault(OTHER_HOSTS, HostStats()).merge(cls._stats.pop(evicted))
+        cls._stats.move_to_end(host)
+        return stats
+
+    @classmethod
+    def _record(cls, host: str, elapsed: float, sent: int, received: int, status: int = None, error: bool = False):
+        with cls._lock:
+            stats = cls._stats_for(host)
+            stats.requests += 1
+            stats.latency_total += elapsed
+            if elapsed > stats.latency_max:
+                stats.latency_max = elapsed
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+            if error:
+                stats.errors += 1
+            if status is not None:
+                status_class = f"{status // 100}xx"
+                stats.status_counts[status_class] = stats.status_counts.get(status_class, 0) + 1
+
+    @classmethod
+    def request(cls, method: str, url: str, timeout: typing.Any = None, tool: str = "other", **kwargs) -> requests.Response:
+        """
+        Perform an HTTP request through the pooled per-host session.
+        timeout defaults to (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT); a single number applies to both.
+        tool labels the caller in the latency histogram (hosts are only in export_stats: the link validator
+        reaches arbitrary sites, and a label per host would grow without bound).
+        """
+        host = cls._host_key(url)
+        session = cls._acquire_session(host)
+        if timeout is None:
+            timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+        start = time.perf_counter()
+        try:
+            with span(f"http {method}", url=url.split("?")[0], host=host, tool=tool) as http_span:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+                http_span.set(status=response.status_code)
+        except Exception:
+            elapsed = time.perf_counter() - start
+            cls._record(host, elapsed, 0, 0, error=True)
+            HTTP_DURATION.observe(elapsed, tool=tool, outcome="error")
+            raise
+        finally:
+            cls._release_session(host)
+
+        elapsed = time.perf_counter() - start
+        HTTP_DURATION.observe(elapsed, tool=tool, outcome=str(response.status_code))
+        body = response.request.body if response.request is not None else None
+        sent = len(body) if isinstance(body, (bytes, str)) else 0
+        if kwargs.get("stream"):
+            # Body is not read yet; rely on the declared length
+            received = int(response.headers.get("Content-Length", 0) or 0)
+        else:
+            received = len(response.content or b"")
+        cls._record(host, elapsed, sent, received, status=response.status_code, error=response.status_code >= 500)
+        return response
+
+    @classmethod
+    async def arequest(cls, method: str, url: str, timeout: typing.Any = None, tool: str = "other", **kwargs):
+        """
+        Async request, returning an httpx.Response. Takes the same arguments as request():
+        verify, stream, allow_redirects and a raw data body are mapped to their httpx equivalents.
+        With stream=True the body is not read; iterate aiter_bytes() and aclose() the response.
+        """
+        host = cls._host_key(url)
+        verify = kwargs.pop("verify", True)
+        client_key = (host, verify)
+        with cls._lock:
+            clients = cls._async_clients_here()
+            client = clients.acquire(client_key, lambda: cls._new_async_client(verify))
+        stream = kwargs.pop("stream", False)
+        # requests follows redirects for everything but HEAD; httpx follows none by default
+        follow_redirects = kwargs.pop("allow_redirects", method.upper() != "HEAD")
+        if isinstance(kwargs.get("data"), (bytes, str)):
+            kwargs["content"] = kwargs.pop("data")
+
+        start = time.perf_counter()
+        try:
+            with span(f"http {method}", url=url.split("?")[0], host=host, tool=tool) as http_span:
+                request = client.build_request(method, url, timeout=cls._async_timeout(timeout), **kwargs)
+                response = await client.send(request, stream=stream, follow_redirects=follow_redirects)
+                http_span.set(status=response.status_code)
+        except Exception:
+            elapsed = time.perf_counter() - start
+            cls._record(host, elapsed, 0, 0, error=True)
+            HTTP_DURATION.observe(elapsed, tool=tool, outcome="error")
+            raise
+        finally:
+            with cls._lock:
+                clients.release(client_key)
+
+        elapsed = time.perf_counter() - start
+        HTTP_DURATION.observe(elapsed, tool=tool, outcome=str(response.status_code))
+        sent = int(request.headers.get("Content-Length", 0) or 0)
+        if stream:
+            received = int(response.headers.get("Content-Length", 0) or 0)
+        else:
+            received = len(response.content or b"")
+        cls._record(host, elapsed, sent, received, status=response.status_code, error=response.status_code >= 500)
+        return response
+
+    @classmethod
+    async def aget(cls, url: str, **kwargs):
+        return await cls.arequest("GET", url, **kwargs)
+
+    @classmethod
+    async def apost(cls, url: str, **kwargs):
+        return await cls.arequest("POST", url, **kwargs)
+
+    @classmethod
+    async def ahead(cls, url: str, **kwargs):
+        return await cls.arequest("HEAD", url, **kwargs)
+
+    @classmethod
+    def get(cls, url: str, **kwargs) -> requests.Response:
+        return cls.request("GET", url, **kwargs)
+
+    @classmethod
+    def post(cls, url: str, **kwargs) -> requests.Response:
+        return cls.request("POST", url, **kwargs)
+
+    @classmethod
+    def head(cls, url: str, **kwargs) -> requests.Response:
+        return cls.request("HEAD", url, **kwargs)
+
+    @classmethod
+    def export_stats(cls) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Snapshot of per-host counters, keyed by scheme://host."""
+        with cls._lock:
+            return {host: stats.to_dict() for host, stats in cls._stats.items()}
+
+    @classmethod
+    def reset(cls):
+        """Close all pooled sessions and clear counters (async clients are dropped with their connections)."""
+        with cls._lock:
+            cls._sessions.clear()
+            for clients in cls._async_clients.values():
+                clients.clear(close=False)
+            cls._async_clients.clear()
+            cls._stats.clear()
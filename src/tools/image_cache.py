@@ -0,0 +1,159 @@
+import os
+import hashlib
+import tempfile
+import threading
+import typing
+from collections import OrderedDict
+
+try:
+    import fcntl  # POSIX only; used to coordinate eviction across worker processes
+except ImportError:
+    fcntl = None
+
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join("generated_assets", "cache"))
+IMAGE_CACHE_MAX_MB = float(os.environ.get("IMAGE_CACHE_MAX_MB", "256"))
+# Eviction frees down to this share of the cap, so a full cache is rescanned only every few puts
+_LOW_WATER = 0.9
+
+
+class _CacheIndex:
+    """Running total and LRU order of one cache directory, shared by every ImageCache on it."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, int]" = OrderedDict()  # path -> size, least recently used first
+        self.total = 0
+        self.scanned = False
+
+    def scan(self, directory: str):
+        """Rebuild from disk; mtime is last use, so this also sees other processes' writes and hits."""
+        found = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(".png"):
+                continue
+            full = os.path.join(directory, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            found.append((st.st_mtime, full, st.st_size))
+        found.sort()
+        self.entries = OrderedDict((full, size) for _, full, size in found)
+        self.total = sum(self.entries.values())
+        self.scanned = True
+
+    def touch(self, path: str, size: int):
+        self.total += size - self.entries.pop(path, 0)
+        self.entries[path] = size
+
+    def forget(self, path: str):
+        self.total -= self.entries.pop(path, 0)
+
+
+
+class ImageCache:
+    """
+    Content-addressed on-disk image cache.
+    Entries are named by sha256(model, prompt, aspect ratio), written atomically,
+    and the directory is kept under max_bytes by evicting least recently used files.
+    Sizes and use order are tracked in memory; the directory is only listed on first use
+    and when the cap is exceeded.
+    """
+    _lock = threading.Lock()
+    _indexes: typing.Dict[str, _CacheIndex] = {}
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        self.directory = directory or IMAGE_CACHE_DIR
+        self.max_bytes = int(IMAGE_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(model: str, prompt: str, aspect_ratio: str) -> str:
+        raw = "\x00".join([model or "", prompt or "", aspect_ratio or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _index(self) -> _CacheIndex:
+        # Caller holds _lock
+        directory = os.path.abspath(self.directory)
+        index = self._indexes.get(directory)
+        if index is None:
+            index = self._indexes[directory] = _CacheIndex()
+        if not index.scanned:
+            index.scan(self.directory)
+        return index
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        """Return cached bytes and mark the entry as recently used, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, None)  # LRU: mtime tracks last use (for other processes and rescans)
+        except OSError:
+            # Missing, or evicted by another job between open and utime
+            return None
+        with self._lock:
+            self._index().touch(path, len(data))
+        return data
+
+    def put(self, key: str, data: bytes) -> typing.Optional[str]:
+        """Store bytes under key and enforce the size cap. Returns the entry path."""
+        if not self.enabled or not data:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Atomic rename: concurrent readers see either the old entry or the complete new one
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            index = self._index()
+            index.touch(path, len(data))
+            over = index.total > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def evict(self):
+        """Delete least recently used entries until the directory fits in max_bytes (with some headroom)."""
+        with self._lock:
+            lock_file = None
+            try:
+                if fcntl is not None:
+                    lock_file = open(os.path.join(self.directory, ".lock"), "w")
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+                # Other processes share the directory: resync before deciding what to delete
+                index = self._index()
+                index.scan(self.directory)
+                if index.total <= self.max_bytes:
+                    return
+                target = int(self.max_bytes * _LOW_WATER)
+                while index.entries and index.total > target:
+                    full = next(iter(index.entries))
+                    try:
+                        os.remove(full)
+                    except OSError:
+                        pass
+                    index.forget(full)
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
@@ -1,64 +1,206 @@
 import os
-from google import genai
-from google.genai import types
-from PIL import Image
 import io
+import asyncio
+from tools.image_cache import ImageCache
+from adk.metrics import CACHE_EVENTS
+from adk.tracing import span
+
+# Optional transcode before upload: "png" (keep original), "webp" or "jpeg"
+IMAGE_UPLOAD_FORMAT = os.environ.get("IMAGE_UPLOAD_FORMAT", "png").lower()
+IMAGE_UPLOAD_QUALITY = int(os.environ.get("IMAGE_UPLOAD_QUALITY", "85"))
+IMAGE_ASPECT_RATIO = "16:9"
+
+_FORMATS = {
+    "png": ("PNG", "image/png", "png"),
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "jpg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+
+def _debug_assets_enabled() -> bool:
+    return os.environ.get("DEBUG_GENERATED_ASSETS", "").lower() == "true"
+
+
+class GeneratedImage:
+    """Image bytes held in memory, ready to be uploaded without touching disk."""
+    __slots__ = ("data", "mime_type", "filename", "path", "cache_key")
+
+    def __init__(self, data: bytes, mime_type: str, filename: str, path: str = None, cache_key: str = None):
+        self.data = data
+        self.mime_type = mime_type
+        self.filename = filename
+        self.path = path
+        # ImageCache entry holding the original bytes; checkpoints store this instead of the image
+        self.cache_key = cache_key
+
+    def __repr__(self):
+        return f"GeneratedImage({self.filename}, {self.mime_type}, {len(self.data)} bytes)"
+
 
 class ImageTool:
     @staticmethod
-    def generate_image(prompt: str, output_dir: str = "generated_assets", api_key: str = None) -> str:
+    def transcode(data: bytes, fmt: str = None, quality: int = None) -> tuple:
         """
-        Generate an image using Imagen 4 via Google GenAI SDK.
-        Returns the local file path of the saved image.
+        Re-encode image bytes to the configured upload format.
+        Returns (bytes, mime_type, extension). Falls back to the original PNG on error.
         """
-        use_vertex_for_images = os.environ.get("USE_VERTEX_FOR_IMAGES", "").lower() == "true"
-        project = os.environ.get("GCP_PROJECT_ID")
-        location = os.environ.get("GCP_LOCATION", "us-central1")
+        fmt = (fmt or IMAGE_UPLOAD_FORMAT).lower()
+        quality = quality or IMAGE_UPLOAD_QUALITY
+        pil_format, mime_type, ext = _FORMATS.get(fmt, _FORMATS["png"])
+        if pil_format == "PNG":
+            return data, mime_type, ext
+
+        try:
+            from PIL import Image
+            img = Image.open(io.BytesIO(data))
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            out = io.BytesIO()
+            img.save(out, format=pil_format, quality=quality)
+            return out.getvalue(), mime_type, ext
+        except Exception as e:
+            print(f"  -> WARNING: Transcode to {fmt} failed ({e}), keeping PNG.")
+            return data, "image/png", "png"
+
+    @staticmethod
+    def _build_result(raw: bytes, prompt: str, key: str, output_dir: str) -> GeneratedImage:
+        """Transcode raw PNG bytes and wrap them, persisting a copy only in debug mode."""
+        data, mime_type, ext = ImageTool.transcode(raw)
+
+        # Readable prefix plus the content hash, so jobs never overwrite each other's files
+        safe_prompt = "".join([c for c in prompt if c.isalnum() or c in (' ', '-', '_')]).strip()[:30]
+        filename = f"{safe_prompt.replace(' ', '_')}-{key[:12]}.{ext}"
+        result = GeneratedImage(data, mime_type, filename, cache_key=key)
+
+        if _debug_assets_enabled():
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            result.path = os.path.join(output_dir, filename)
+            with open(result.path, "wb") as f:
+                f.write(data)
+            print(f"  -> DEBUG: Image saved to {result.path}")
+        return result
 
+    @staticmethod
+    def reload(cache_key: str, filename: str, path: str = None, cache: ImageCache = None) -> GeneratedImage:
+        """Rebuild a checkpointed image from the cache (or its debug copy); None once it is gone."""
+        raw = (cache or ImageCache()).get(cache_key) if cache_key else None
+        if raw:
+            data, mime_type, _ = ImageTool.transcode(raw)
+            return GeneratedImage(data, mime_type, filename, path, cache_key)
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            return GeneratedImage(data, _FORMATS.get(os.path.splitext(path)[1][1:].lower(), _FORMATS["png"])[1], filename, path, cache_key)
+        return None
+
+    @staticmethod
+    def _image_request(prompt: str, api_key: str = None) -> dict:
+        """Model and client settings for an Imagen call (Vertex AI when USE_VERTEX_FOR_IMAGES=true)."""
+        use_vertex_for_images = os.environ.get("USE_VERTEX_FOR_IMAGES", "").lower() == "true"
         if not api_key and not use_vertex_for_images:
             raise Exception("Missing Google API Key for image generation. Please set it in Settings.")
+        return {
+            "vertex": use_vertex_for_images,
+            "project": os.environ.get("GCP_PROJECT_ID"),
+            "location": os.environ.get("GCP_LOCATION", "us-central1"),
+            "api_key": api_key,
+            "model_id": 'publishers/google/models/imagen-4.0-generate-001' if use_vertex_for_images else 'imagen-4.0-generate-001',
+        }
+
+    @staticmethod
+    def _client(request: dict):
+        # Imported on first use: google.genai adds ~0.4s to cold start
+        from google import genai
+        if request["vertex"]:
+            print(f"  -> Using Vertex AI (Project: {request['project']})")
+            return genai.Client(vertexai=True, project=request["project"], location=request["location"])
+        return genai.Client(api_key=request["api_key"])
+
+    @staticmethod
+    def _config():
+        from google.genai import types
+        return types.GenerateImagesConfig(
+            aspect_ratio=IMAGE_ASPECT_RATIO,
+            number_of_images=1
+        )
+
+    @staticmethod
+    def _cached(cache: ImageCache, key: str, prompt: str):
+        cached = cache.get(key)
+        CACHE_EVENTS.inc(cache="image", result="hit" if cached else "miss")
+        if cached:
+            print(f"  -> Cache hit for image '{prompt[:50]}...' ({key[:12]})")
+        return cached
+
+    @staticmethod
+    def _from_response(response, cache: ImageCache, key: str, prompt: str, output_dir: str) -> GeneratedImage:
+        if response.generated_images:
+            raw = response.generated_images[0].image.image_bytes
+            try:
+                cache.put(key, raw)
+            except Exception as cache_err:
+                print(f"  -> WARNING: Could not cache image: {cache_err}")
+
+            result = ImageTool._build_result(raw, prompt, key, output_dir)
+            print(f"  -> SUCCESS: Image generated ({len(result.data)} bytes, {result.mime_type})")
+            return result
+        else:
+            print("  -> ERROR: No image generated.")
+            return None
+
+    @staticmethod
+    def generate_image(prompt: str, output_dir: str = "generated_assets", api_key: str = None, cache: ImageCache = None) -> GeneratedImage:
+        """
+        Generate an image using Imagen 4 via Google GenAI SDK.
+        Returns a GeneratedImage kept in memory, or None on failure.
+        Results are cached by (model, prompt, aspect ratio); a cache hit skips the Imagen call.
+        The file is only written to output_dir when DEBUG_GENERATED_ASSETS=true.
+        """
+        request = ImageTool._image_request(prompt, api_key)
+        model_id = request["model_id"]
+        cache = cache or ImageCache()
+        key = ImageCache.key(model_id, prompt, IMAGE_ASPECT_RATIO)
+
+        cached = ImageTool._cached(cache, key, prompt)
+        if cached:
+            return ImageTool._build_result(cached, prompt, key, output_dir)
 
         try:
             print(f"  -> Tool Call: Generating image for '{prompt}'...")
-            if use_vertex_for_images:
-                print(f"  -> Using Vertex AI (Project: {project})")
-                client = genai.Client(vertexai=True, project=project, location=location)
-                model_id = 'publishers/google/models/imagen-4.0-generate-001'
-            else:
-                client = genai.Client(api_key=api_key)
-                model_id = 'imagen-4.0-generate-001'
-            
+            client = ImageTool._client(request)
+
             # Using Imagen 4 model
-            response = client.models.generate_images(
-                model=model_id, 
-                prompt=prompt,
-                config=types.GenerateImagesConfig(
-                    aspect_ratio="16:9",
-                    number_of_images=1
-                )
-            )
-
-            if response.generated_images:
-                image = response.generated_images[0]
-                
-                # Ensure output directory exists
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                # Create a filename based on prompt or timestamp
-                # Simple sanitization
-                safe_prompt = "".join([c for c in prompt if c.isalnum() or c in (' ', '-', '_')]).strip()[:30]
-                filename = f"{safe_prompt.replace(' ', '_')}.png"
-                file_path = os.path.join(output_dir, filename)
-                
-                image.image.save(file_path)
-                print(f"  -> SUCCESS: Image saved to {file_path}")
-                return file_path
-            else:
-                print("  -> ERROR: No image generated.")
-                return "error_no_image.png"
+            with span("tool.generate_image", model=model_id, prompt_chars=len(prompt)):
+                response = client.models.generate_images(model=model_id, prompt=prompt, config=ImageTool._config())
+            return ImageTool._from_response(response, cache, key, prompt, output_dir)
+
+        except Exception as e:
+            print(f"  -> ERROR: Image generation failed: {e}")
+            # Continue without a featured image for demo continuity
+            return None
+
+    @staticmethod
+    async def agenerate_image(prompt: str, output_dir: str = "generated_assets", api_key: str = None, cache: ImageCache = None) -> GeneratedImage:
+        """Async generate_image: Imagen via client.aio; cache I/O and transcoding run in a thread."""
+        request = ImageTool._image_request(prompt, api_key)
+        model_id = request["model_id"]
+        cache = cache or ImageCache()
+        key = ImageCache.key(model_id, prompt, IMAGE_ASPECT_RATIO)
+
+        cached = await asyncio.to_thread(ImageTool._cached, cache, key, prompt)
+        if cached:
+            return await asyncio.to_thread(ImageTool._build_result, cached, prompt, key, output_dir)
+
+        try:
+            print(f"  -> Tool Call: Generating image for '{prompt}'...")
+            client = ImageTool._client(request)
+
+            with span("tool.generate_image", model=model_id, prompt_chars=len(prompt)):
+                response = await client.aio.models.generate_images(model=model_id, prompt=prompt, config=ImageTool._config())
+            return await asyncio.to_thread(ImageTool._from_response, response, cache, key, prompt, output_dir)
 
         except Exception as e:
             print(f"  -> ERROR: Image generation failed: {e}")
-            # Fallback for demo continuity
-            return "error_generating_image.png"
+            return None
@@ -0,0 +1,90 @@
+import re
+from collections import Counter
+from typing import List, Tuple
+
+# Common English function words plus the filler trend lists are written in; RAKE splits phrases at these
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc even ever every few for from
+further had has have having he her here hers him his how however i if in into is it its itself just let
+like may me might more most much must my near new no nor not now of off on once only or other our ours
+out over own per same she should so some such than that the their theirs them then there these they
+this those through to too under until up upon us use used using very via was we were what when where
+which while who whom why will with within without would yet you your yours
+top key trend trends trending topic topics keyword keywords high potential emerging growing rise rising
+including include includes focus focused increasing increased latest current currently today year years
+""".split())
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s*")
+_URL = re.compile(r"https?://\S+")
+_PHRASE_BREAK = re.compile(r"[.,;:!?()\[\]{}\"“”‘’|/\\]|\s[-–—]\s|[–—]")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#'&-]*")
+
+
+class KeywordTool:
+    @staticmethod
+    def _candidates(text: str, max_words: int) -> List[Tuple[str, ...]]:
+        """Runs of content words between stopwords and punctuation, one list item / heading at a time."""
+        phrases = []
+        for line in text.splitlines():
+            line = _URL.sub(" ", _LIST_MARKER.sub("", line)).replace("*", " ").replace("#", " ").replace("_", " ")
+            for fragment in _PHRASE_BREAK.split(line.lower()):
+                phrase = []
+                for word in _WORD.findall(fragment):
+                    word = word.strip("'-&")
+                    if not word or word in STOPWORDS or word.isdigit():
+                        if phrase:
+                            phrases.append(tuple(phrase))
+                        phrase = []
+                    else:
+                        phrase.append(word)
+                if phrase:
+                    phrases.append(tuple(phrase))
+        # Very long runs are sentences rather than key phrases
+        return [p for p in phrases if len(p) <= max_words]
+
+    @staticmethod
+    def extract_keywords(text: str, max_phrases: int = 5, max_words: int = 4) -> List[str]:
+        """
+        Rank key phrases in text with RAKE: candidates are split at stopwords and punctuation, a
+        word scores its degree (the summed length of the candidates it appears in) and a phrase
+        the sum of its words. Degree rather than degree / frequency favours words that recur
+        across trend lines over one long description.
+        """
+        phrases = KeywordTool._candidates(text, max_words)
+        degree = Counter()
+        for phrase in phrases:
+            for word in phrase:
+                degree[word] += len(phrase)
+        scores = {}
+        for phrase in phrases:
+            if phrase not in scores:
+                scores[phrase] = sum(degree[w] for w in phrase)
+        # Ties keep first-seen order, so the earliest (usually highest-ranked) trend wins
+        ranked = sorted(scores, key=lambda p: -scores[p])
+        return [" ".join(p) for p in ranked[:max_phrases]]
+
+    @staticmethod
+    def build_search_query(topic: str, text: str, max_phrases: int = 2, max_words: int = 10) -> str:
+        """
+        A facts/statistics search query from the topic plus the top key phrases of text (e.g. the
+        TrendAgent's list); only the words a phrase adds to the query are appended.
+        """
+        topic = " ".join(topic.split()) if topic else ""
+        seen = set(_WORD.findall(topic.lower()))
+        terms = [topic] if topic else []
+        # The topic may already ask for numbers; otherwise "statistics" takes the last word
+        suffix = [] if seen & {"statistics", "stats", "data"} else ["statistics"]
+        words = len(seen) + len(suffix)
+        added = 0
+        for phrase in KeywordTool.extract_keywords(text, max_phrases=max_phrases + 5):
+            new_words = [w for w in phrase.split() if w not in seen]
+            if not new_words or words + len(new_words) > max_words:
+                continue
+            terms.extend(new_words)
+            seen.update(new_words)
+            words += len(new_words)
+            added += 1
+            if added == max_phrases:
+                break
+        return " ".join(terms + suffix)
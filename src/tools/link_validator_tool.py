@@ -1,36 +1,54 @@
-import requests
 import typing
+from tools.http_client import HttpClient
+
+SOFT_404_KEYWORDS = [
+    "404 not found", "page not found", "doesn't exist", "can't be found", 
+    "404 - ", "error 404", "sorry, the page you requested", "404: page not found"
+]
+
+# Blacklist common example/mock domains
+MOCK_DOMAINS = ["example.com", "example.org", "example.net", "mock.com", "test.com", "yourdomain.com"]
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Soft-404 scan reads at most SOFT_404_CHUNKS chunks of SOFT_404_CHUNK_SIZE bytes (~6KB)
+SOFT_404_CHUNK_SIZE = 2048
+SOFT_404_CHUNKS = 3
 
 class LinkValidatorTool:
+    @staticmethod
+    def looks_like_soft_404(chunks: typing.Iterable[bytes]) -> bool:
+        """Scan the first HTML chunks of a 200 response for 'page not found' wording."""
+        full_text = "".join(chunk.decode('utf-8', errors='ignore') for chunk in chunks).lower()
+        return any(kw in full_text for kw in SOFT_404_KEYWORDS)
+
+    @staticmethod
+    def _checkable(url: str) -> bool:
+        if not url or not url.startswith("http"):
+            return False
+        return not any(domain in url.lower() for domain in MOCK_DOMAINS)
+
     @staticmethod
     def is_link_valid(url: str, timeout: int = 5) -> bool:
         """
         Check if a URL is valid (returns 200 OK).
         Uses a HEAD request first for efficiency, falls back to GET if HEAD is not allowed.
         """
-        if not url or not url.startswith("http"):
-            return False
-            
-        # Blacklist common example/mock domains
-        mock_domains = ["example.com", "example.org", "example.net", "mock.com", "test.com", "yourdomain.com"]
-        if any(domain in url.lower() for domain in mock_domains):
+        if not LinkValidatorTool._checkable(url):
             return False
             
+        response = None
         try:
-            # Disable SSL verification warnings for user's site issues
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
+            headers = BROWSER_HEADERS
             
             # Skip HEAD if we want to be thorough about soft 404s, 
             # but for performance we can keep it and just be aware of the limitation.
             # However, "pages not found" is the priority.
             
             # Use GET with stream=True to avoid downloading large files, but allowing content check
-            response = requests.get(url, timeout=timeout, allow_redirects=True, stream=True, verify=False, headers=headers)
+            response = HttpClient.get(url, timeout=timeout, allow_redirects=True, stream=True, verify=False, headers=headers, tool="link_validator")
             
             # Accept 200 (OK) and 403 (Forbidden - likely anti-bot, but link exists)
             # We strictly reject 404 (Not Found) and 5xx (Server Errors)
@@ -45,22 +63,54 @@ class LinkValidatorTool:
                 # Some sites have the error message further down
                 content_chunks = []
                 try:
-                    for i, chunk in enumerate(response.iter_content(chunk_size=2048)):
-                        content_chunks.append(chunk.decode('utf-8', errors='ignore').lower())
-                        if i >= 2: # Check up to ~6KB of content
+                    for i, chunk in enumerate(response.iter_content(chunk_size=SOFT_404_CHUNK_SIZE)):
+                        content_chunks.append(chunk)
+                        if i >= SOFT_404_CHUNKS - 1: # Check up to ~6KB of content
                             break
                 except:
                     pass
                 
-                full_text = "".join(content_chunks)
-                
-                error_keywords = [
-                    "404 not found", "page not found", "doesn't exist", "can't be found", 
-                    "404 - ", "error 404", "sorry, the page you requested", "404: page not found"
-                ]
-                if any(kw in full_text for kw in error_keywords):
+                if LinkValidatorTool.looks_like_soft_404(content_chunks):
                     return False
             
             return True
         except Exception as e:
             return False
+        finally:
+            # Release the pooled connection; the body is only partially read
+            if response is not None:
+                response.close()
+
+    @staticmethod
+    async def ais_link_valid(url: str, timeout: int = 5) -> bool:
+        """Async is_link_valid: same checks over the shared async client, so many links can be checked at once."""
+        if not LinkValidatorTool._checkable(url):
+            return False
+
+        response = None
+        try:
+            response = await HttpClient.aget(url, timeout=timeout, allow_redirects=True, stream=True, verify=False, headers=BROWSER_HEADERS, tool="link_validator")
+            if response.status_code not in [200, 403]:
+                return False
+
+            content_type = response.headers.get('Content-Type', '').lower()
+            if 'text/html' in content_type:
+                content_chunks = []
+                try:
+                    async for chunk in response.aiter_bytes(SOFT_404_CHUNK_SIZE):
+                        content_chunks.append(chunk)
+                        if len(content_chunks) >= SOFT_404_CHUNKS:
+                            break
+                except Exception:
+                    pass
+
+                if LinkValidatorTool.looks_like_soft_404(content_chunks):
+                    return False
+
+            return True
+        except Exception:
+            return False
+        finally:
+            # Release the pooled connection; the body is only partially read
+            if response is not None:
+                await response.aclose()
@@ -1,50 +1,154 @@
 import os
-import requests
-from typing import List, Dict
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from tools.http_client import HttpClient
+from typing import List, Dict, Optional
+
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+# Query parameters that only track the visit; dropped when comparing result URLs.
+# Names match exactly, except the utm_ family, which is matched by prefix.
+TRACKING_PARAM_PREFIX = "utm_"
+TRACKING_PARAMS = frozenset({"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"})
+# Reciprocal rank fusion constant: damps the weight of the very top positions across result lists
+RRF_K = 60
+
 
 class SearchTool:
     @staticmethod
-    def google_search(query: str, num_results: int = 10) -> List[Dict[str, str]]:
-        """
-        Perform a Google Custom Search.
-        Requires GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_CX in env.
-        """
+    def _params(query: str, num_results: int) -> Optional[Dict]:
+        """Custom Search query parameters, or None when GOOGLE_SEARCH_API_KEY / GOOGLE_SEARCH_CX are missing."""
         api_key = os.environ.get("GOOGLE_SEARCH_API_KEY")
         cx = os.environ.get("GOOGLE_SEARCH_CX")
-
         if not api_key or not cx:
-            print("[SearchTool] Missing API Key or CX, falling back to mock.")
-            return [{"title": f"Mock Result for {query}", "snippet": f"This is a simulated result for the query: '{query}'. It provides relevant background information and simulated facts to allow the content workflow to proceed without an active Google Search configuration."}]
-
-        url = "https://www.googleapis.com/customsearch/v1"
-        params = {
+            return None
+        return {
             "key": api_key,
             "cx": cx,
             "q": query,
             "num": num_results
         }
 
+    @staticmethod
+    def _mock_results(query: str) -> List[Dict[str, str]]:
+        print("[SearchTool] Missing API Key or CX, falling back to mock.")
+        return [{"title": f"Mock Result for {query}", "snippet": f"This is a simulated result for the query: '{query}'. It provides relevant background information and simulated facts to allow the content workflow to proceed without an active Google Search configuration."}]
+
+    @staticmethod
+    def _results(items: List[Dict], valid: List[bool]) -> List[Dict[str, str]]:
+        results = []
+        for item, ok in zip(items, valid):
+            link = item.get("link")
+            if ok:
+                results.append({
+                    "title": item.get("title"),
+                    "link": link,
+                    "snippet": item.get("snippet")
+                })
+            else:
+                print(f"  -> LinkValidator: Filtering dead link: {link}")
+        return results
+
+    @staticmethod
+    def _is_tracking_param(name: str) -> bool:
+        name = name.lower()
+        return name.startswith(TRACKING_PARAM_PREFIX) or name in TRACKING_PARAMS
+
+    @staticmethod
+    def canonical_url(url: str) -> str:
+        """
+        Comparable form of a result URL: lowercase host without "www.", no fragment, tracking
+        parameters or trailing slash, remaining parameters sorted; http and https are the same page.
+        """
+        parts = urlsplit((url or "").strip())
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not SearchTool._is_tracking_param(k))
+        return urlunsplit(("https", host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+    @staticmethod
+    def merge_results(result_lists: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """
+        Merge several searches' results: one entry per canonical URL (mock results, which have no
+        link, per title), ranked by reciprocal rank fusion so pages found by several queries, or
+        near the top of one, come first.
+        """
+        scores, merged = {}, {}
+        for results in result_lists:
+            for rank, result in enumerate(results):
+                if result.get("title") == "Error":
+                    continue
+                key = SearchTool.canonical_url(result["link"]) if result.get("link") else result.get("title")
+                scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+                merged.setdefault(key, result)
+        # Ties keep first-seen order
+        return [merged[key] for key in sorted(merged, key=lambda key: -scores[key])]
+
+    @staticmethod
+    def google_search(query: str, num_results: int = 10) -> List[Dict[str, str]]:
+        """
+        Perform a Google Custom Search.
+        Requires GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_CX in env.
+        """
+        params = SearchTool._params(query, num_results)
+        if params is None:
+            return SearchTool._mock_results(query)
+
+        try:
+            print(f"  -> Tool Call: google_search('{query}')")
+            response = HttpClient.get(SEARCH_URL, params=params, tool="search")
+            response.raise_for_status()
+            data = response.json()
+
+            from tools.link_validator_tool import LinkValidatorTool
+
+            items = [item for item in data.get("items", []) if item.get("link")]
+            return SearchTool._results(items, [LinkValidatorTool.is_link_valid(item["link"]) for item in items])
+        except Exception as e:
+            print(f"[SearchTool] Error: {e}")
+            return [{"title": "Error", "snippet": str(e)}]
+
+    @staticmethod
+    async def agoogle_search(query: str, num_results: int = 10, validate: bool = True) -> List[Dict[str, str]]:
+        """Async google_search; the result links are validated concurrently (unless validate is False)."""
+        params = SearchTool._params(query, num_results)
+        if params is None:
+            return SearchTool._mock_results(query)
+
         try:
             print(f"  -> Tool Call: google_search('{query}')")
-            response = requests.get(url, params=params)
+            response = await HttpClient.aget(SEARCH_URL, params=params, tool="search")
             response.raise_for_status()
             data = response.json()
-            
+
             from tools.link_validator_tool import LinkValidatorTool
-            
-            results = []
-            if "items" in data:
-                for item in data["items"]:
-                    link = item.get("link")
-                    if link and LinkValidatorTool.is_link_valid(link):
-                        results.append({
-                            "title": item.get("title"),
-                            "link": link,
-                            "snippet": item.get("snippet")
-                        })
-                    elif link:
-                        print(f"  -> LinkValidator: Filtering dead link: {link}")
-            return results
+
+            items = [item for item in data.get("items", []) if item.get("link")]
+            if not validate:
+                return SearchTool._results(items, [True] * len(items))
+            valid = await asyncio.gather(*(LinkValidatorTool.ais_link_valid(item["link"]) for item in items))
+            return SearchTool._results(items, valid)
         except Exception as e:
             print(f"[SearchTool] Error: {e}")
             return [{"title": "Error", "snippet": str(e)}]
+
+    @staticmethod
+    async def amulti_search(queries: List[str], num_results: int = 10, limit: int = 15) -> List[Dict[str, str]]:
+        """
+        Run several queries at once and return their merged results (see merge_results), at most
+        limit of them. Links are validated once, after deduplication, and only for the kept results.
+        """
+        if SearchTool._params(queries[0], num_results) is None:
+            return SearchTool._mock_results(queries[0])
+
+        result_lists = await asyncio.gather(*(SearchTool.agoogle_search(q, num_results, validate=False) for q in queries))
+        merged = SearchTool.merge_results(result_lists)
+
+        from tools.link_validator_tool import LinkValidatorTool
+
+        if not merged:
+            # Every search failed or came back empty; pass an error entry through as a single search would
+            return [r for results in result_lists for r in results][:1]
+        top = merged[:limit]
+        return SearchTool._results(top, await asyncio.gather(*(LinkValidatorTool.ais_link_valid(r["link"]) for r in top)))
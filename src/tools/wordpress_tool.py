@@ -1,237 +1,325 @@
-import requests
 from typing import Dict
+import asyncio
 import base64
+from tools.http_client import HttpClient
 
 class WordPressTool:
+    """
+    WordPress REST calls. Each call has a blocking form and an async a* form; both share
+    the request building and response handling below and differ only in the transport.
+    """
+
+    @staticmethod
+    def _auth_headers(auth: Dict, **extra) -> Dict:
+        credentials = f"{auth.get('username')}:{auth.get('password')}"
+        token = base64.b64encode(credentials.encode()).decode('utf-8')
+        return {"Authorization": f"Basic {token}", **extra}
+
+    @staticmethod
+    def _has_credentials(auth: Dict) -> bool:
+        return bool(auth.get("url") and auth.get("username") and auth.get("password"))
+
+    @staticmethod
+    def _read_file(file_path: str):
+        """(bytes, filename, mime type) of an image on disk, or None if it does not exist."""
+        import os
+        if not os.path.exists(file_path):
+            print(f"[WordPressTool] File not found: {file_path}")
+            return None
+
+        # Determine mime type
+        import mimetypes
+        mime_type, _ = mimetypes.guess_type(file_path)
+        if not mime_type:
+            mime_type = "image/png" # Default
+
+        with open(file_path, "rb") as f:
+            image_data = f.read()
+        return image_data, os.path.basename(file_path), mime_type
+
     @staticmethod
     def upload_media(file_path: str, auth: Dict) -> Dict:
         """
-        Upload an image to WordPress Media Library.
+        Upload an image file from disk to WordPress Media Library.
         Returns a dict with 'id' (int) and 'link' (str) or None if failed.
         """
-        wp_url = auth.get("url")
-        username = auth.get("username")
-        password = auth.get("password")
+        image = WordPressTool._read_file(file_path)
+        if image is None:
+            return None
+        return WordPressTool.upload_media_bytes(*image, auth)
 
-        if not wp_url or not username or not password:
+    @staticmethod
+    async def aupload_media(file_path: str, auth: Dict) -> Dict:
+        image = await asyncio.to_thread(WordPressTool._read_file, file_path)
+        if image is None:
+            return None
+        return await WordPressTool.aupload_media_bytes(*image, auth)
+
+    @staticmethod
+    def _media_request(image_data: bytes, filename: str, mime_type: str, auth: Dict):
+        """(endpoint, headers) for a media upload, or None if it cannot be attempted."""
+        if not WordPressTool._has_credentials(auth):
             print("[WordPressTool] Missing URL or credentials for upload.")
             return None
 
-        import os
-        if not os.path.exists(file_path):
-            print(f"[WordPressTool] File not found: {file_path}")
+        if not image_data:
+            print("[WordPressTool] No image data to upload.")
             return None
 
         # Endpoint
-        base_url = wp_url.rstrip("/")
+        base_url = auth.get("url").rstrip("/")
         api_endpoint = f"{base_url}/wp-json/wp/v2/media"
 
-        # Auth
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode()).decode('utf-8')
-        
         # Headers - Content-Disposition is critical
-        filename = os.path.basename(file_path)
-        headers = {
-            "Authorization": f"Basic {token}",
-            "Content-Disposition": f'attachment; filename="{filename}"',
-        }
-        
-        # Determine mime type
-        import mimetypes
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if not mime_type:
-            mime_type = "image/png" # Default
-            
-        headers["Content-Type"] = mime_type
+        headers = WordPressTool._auth_headers(
+            auth,
+            **{"Content-Disposition": f'attachment; filename="{filename}"', "Content-Type": mime_type or "image/png"}
+        )
+        print(f"  -> Tool Call: Uploading media {filename} ({len(image_data)} bytes)...")
+        return api_endpoint, headers
+
+    @staticmethod
+    def _media_result(response) -> Dict:
+        if response.status_code == 201:
+            media_data = response.json()
+            media_id = media_data.get("id")
+            media_link = media_data.get("source_url")
+            print(f"  -> SUCCESS: Media uploaded. ID: {media_id}, Link: {media_link}")
+            return {"id": media_id, "link": media_link}
+        else:
+            print(f"  -> ERROR: Failed to upload media. Status: {response.status_code}")
+            print(f"  -> Response: {response.text[:200]}...")
+            return None
 
+    @staticmethod
+    def upload_media_bytes(image_data: bytes, filename: str, mime_type: str, auth: Dict) -> Dict:
+        """
+        Upload in-memory image bytes to WordPress Media Library.
+        Returns a dict with 'id' (int) and 'link' (str) or None if failed.
+        """
+        request = WordPressTool._media_request(image_data, filename, mime_type, auth)
+        if request is None:
+            return None
+        api_endpoint, headers = request
         try:
-            print(f"  -> Tool Call: Uploading media {filename}...")
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            with open(file_path, "rb") as f:
-                image_data = f.read()
-                
-            response = requests.post(api_endpoint, data=image_data, headers=headers, verify=False)
-            
-            if response.status_code == 201:
-                media_data = response.json()
-                media_id = media_data.get("id")
-                media_link = media_data.get("source_url")
-                print(f"  -> SUCCESS: Media uploaded. ID: {media_id}, Link: {media_link}")
-                return {"id": media_id, "link": media_link}
-            else:
-                print(f"  -> ERROR: Failed to upload media. Status: {response.status_code}")
-                print(f"  -> Response: {response.text[:200]}...")
-                return None
-                
+            response = HttpClient.post(api_endpoint, data=image_data, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._media_result(response)
+        except Exception as e:
+            print(f"  -> ERROR: Exception during media upload: {e}")
+            return None
+
+    @staticmethod
+    async def aupload_media_bytes(image_data: bytes, filename: str, mime_type: str, auth: Dict) -> Dict:
+        request = WordPressTool._media_request(image_data, filename, mime_type, auth)
+        if request is None:
+            return None
+        api_endpoint, headers = request
+        try:
+            response = await HttpClient.apost(api_endpoint, data=image_data, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._media_result(response)
         except Exception as e:
             print(f"  -> ERROR: Exception during media upload: {e}")
             return None
 
+    @staticmethod
+    def _term_request(taxonomy: str, auth: Dict):
+        base_url = auth.get("url").rstrip("/")
+        api_endpoint = f"{base_url}/wp-json/wp/v2/{taxonomy}"
+        return api_endpoint, WordPressTool._auth_headers(auth, **{"Content-Type": "application/json"})
+
+    @staticmethod
+    def _matching_term(response, name: str) -> int:
+        # Also verify exact match because search is fuzzy
+        if response.status_code == 200:
+            name_clean = name.strip().lower()
+            for term in response.json():
+                if term["name"].strip().lower() == name_clean:
+                    return term["id"]
+        return None
+
+    @staticmethod
+    def _created_term(response, taxonomy: str) -> int:
+        if response.status_code == 201:
+            return response.json().get("id")
+        print(f"  -> ERROR: Failed to create {taxonomy}. Status: {response.status_code}")
+        return None
+
     @staticmethod
     def get_or_create_term(name: str, taxonomy: str, auth: Dict) -> int:
         """
         Get term ID by name or create it if missing.
         Taxonomy can be 'categories' or 'tags'.
         """
-        wp_url = auth.get("url")
-        username = auth.get("username")
-        password = auth.get("password")
-        
-        base_url = wp_url.rstrip("/")
-        api_endpoint = f"{base_url}/wp-json/wp/v2/{taxonomy}"
-        
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode()).decode('utf-8')
-        headers = {
-            "Authorization": f"Basic {token}",
-            "Content-Type": "application/json"
-        }
-        
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        
+        api_endpoint, headers = WordPressTool._term_request(taxonomy, auth)
+
         # 1. Search for existing term
         try:
-            search_params = {"search": name}
-            # Also verify exact match because search is fuzzy
-            response = requests.get(api_endpoint, params=search_params, headers=headers, verify=False)
-            if response.status_code == 200:
-                terms = response.json()
-                name_clean = name.strip().lower()
-                for term in terms:
-                    if term["name"].strip().lower() == name_clean:
-                        return term["id"]
+            response = HttpClient.get(api_endpoint, params={"search": name}, headers=headers, verify=False, tool="wordpress")
+            term_id = WordPressTool._matching_term(response, name)
+            if term_id:
+                return term_id
         except Exception as e:
             print(f"  -> ERROR: Failed to search {taxonomy}: {e}")
 
         # 2. Create if not found
         try:
             print(f"  -> Creating new {taxonomy}: {name}")
-            data = {"name": name}
-            response = requests.post(api_endpoint, json=data, headers=headers, verify=False)
-            if response.status_code == 201:
-                return response.json().get("id")
-            else:
-                print(f"  -> ERROR: Failed to create {taxonomy}. Status: {response.status_code}")
-                return None
+            response = HttpClient.post(api_endpoint, json={"name": name}, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._created_term(response, taxonomy)
         except Exception as e:
             print(f"  -> ERROR: Failed to create {taxonomy}: {e}")
             return None
 
     @staticmethod
-    def publish_post(title: str, content: str, auth: Dict, featured_media_id: int = None, slug: str = None, excerpt: str = None, categories: list = None, tags: list = None, status: str = "publish") -> str:
-        """
-        Publish a post to WordPress using Basic Auth.
-        auth dict must contain: 'url', 'username', 'password'
-        status can be 'publish', 'draft', 'private', etc.
-        """
-        wp_url = auth.get("url")
-        username = auth.get("username")
-        password = auth.get("password")
+    async def aget_or_create_term(name: str, taxonomy: str, auth: Dict) -> int:
+        api_endpoint, headers = WordPressTool._term_request(taxonomy, auth)
+
+        try:
+            response = await HttpClient.aget(api_endpoint, params={"search": name}, headers=headers, verify=False, tool="wordpress")
+            term_id = WordPressTool._matching_term(response, name)
+            if term_id:
+                return term_id
+        except Exception as e:
+            print(f"  -> ERROR: Failed to search {taxonomy}: {e}")
 
-        if not wp_url or not username or not password:
+        try:
+            print(f"  -> Creating new {taxonomy}: {name}")
+            response = await HttpClient.apost(api_endpoint, json={"name": name}, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._created_term(response, taxonomy)
+        except Exception as e:
+            print(f"  -> ERROR: Failed to create {taxonomy}: {e}")
+            return None
+
+    @staticmethod
+    def _post_request(title: str, content: str, auth: Dict, featured_media_id: int = None, slug: str = None, excerpt: str = None, categories: list = None, tags: list = None, status: str = "publish"):
+        """(endpoint, headers, body) for a new post, or None without credentials."""
+        if not WordPressTool._has_credentials(auth):
             print("[WordPressTool] Missing URL or credentials.")
-            return "FAILED: Missing Credentials"
+            return None
 
         # Construct API Endpoint
-        base_url = wp_url.rstrip("/")
+        base_url = auth.get("url").rstrip("/")
         api_endpoint = f"{base_url}/wp-json/wp/v2/posts"
-
-        # Create Basic Auth Header
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode()).decode('utf-8')
-        headers = {
-            "Authorization": f"Basic {token}",
-            "Content-Type": "application/json"
-        }
+        headers = WordPressTool._auth_headers(auth, **{"Content-Type": "application/json"})
 
         data = {
             "title": title,
             "content": content,
-            "status": status 
+            "status": status
         }
-        
+
         if slug:
             data["slug"] = slug
         if excerpt:
             data["excerpt"] = excerpt
-        
+
         if featured_media_id:
             data["featured_media"] = featured_media_id
         if categories:
             data["categories"] = categories
         if tags:
             data["tags"] = tags
+        print(f"  -> Tool Call: Publishing to {api_endpoint}...")
+        return api_endpoint, headers, data
 
-        try:
-            print(f"  -> Tool Call: Publishing to {api_endpoint}...")
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            response = requests.post(api_endpoint, json=data, headers=headers, verify=False)
-            
-            if response.status_code == 201:
-                post_data = response.json()
-                link = post_data.get("link")
-                post_slug = post_data.get("slug")
-                
-                # WordPress sometimes returns ?p=ID format instead of pretty permalink
-                # Construct the pretty URL from the slug if available
-                if link and "?p=" in link and post_slug:
-                    # Build pretty permalink from base URL and slug
-                    from datetime import datetime
-                    now = datetime.now()
-                    pretty_link = f"{base_url}/{now.year}/{now.month:02d}/{now.day:02d}/{post_slug}/"
-                    print(f"  -> SUCCESS: Post published at {pretty_link} (converted from {link})")
-                    return pretty_link
-                else:
-                    print(f"  -> SUCCESS: Post published at {link}")
-                    return link
+    @staticmethod
+    def _published_link(response, auth: Dict) -> str:
+        if response.status_code == 201:
+            post_data = response.json()
+            link = post_data.get("link")
+            post_slug = post_data.get("slug")
+
+            # WordPress sometimes returns ?p=ID format instead of pretty permalink
+            # Construct the pretty URL from the slug if available
+            if link and "?p=" in link and post_slug:
+                # Build pretty permalink from base URL and slug
+                from datetime import datetime
+                now = datetime.now()
+                base_url = auth.get("url").rstrip("/")
+                pretty_link = f"{base_url}/{now.year}/{now.month:02d}/{now.day:02d}/{post_slug}/"
+                print(f"  -> SUCCESS: Post published at {pretty_link} (converted from {link})")
+                return pretty_link
             else:
-                print(f"  -> ERROR: Failed to publish. Status: {response.status_code}")
-                return f"FAILED: API Error {response.status_code}"
+                print(f"  -> SUCCESS: Post published at {link}")
+                return link
+        else:
+            print(f"  -> ERROR: Failed to publish. Status: {response.status_code}")
+            return f"FAILED: API Error {response.status_code}"
+
+    @staticmethod
+    def publish_post(title: str, content: str, auth: Dict, featured_media_id: int = None, slug: str = None, excerpt: str = None, categories: list = None, tags: list = None, status: str = "publish") -> str:
+        """
+        Publish a post to WordPress using Basic Auth.
+        auth dict must contain: 'url', 'username', 'password'
+        status can be 'publish', 'draft', 'private', etc.
+        """
+        request = WordPressTool._post_request(title, content, auth, featured_media_id, slug, excerpt, categories, tags, status)
+        if request is None:
+            return "FAILED: Missing Credentials"
+        api_endpoint, headers, data = request
+        try:
+            response = HttpClient.post(api_endpoint, json=data, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._published_link(response, auth)
+        except Exception as e:
+            print(f"  -> ERROR: Exception during publish: {e}")
+            return f"FAILED: {str(e)}"
 
+    @staticmethod
+    async def apublish_post(title: str, content: str, auth: Dict, featured_media_id: int = None, slug: str = None, excerpt: str = None, categories: list = None, tags: list = None, status: str = "publish") -> str:
+        request = WordPressTool._post_request(title, content, auth, featured_media_id, slug, excerpt, categories, tags, status)
+        if request is None:
+            return "FAILED: Missing Credentials"
+        api_endpoint, headers, data = request
+        try:
+            response = await HttpClient.apost(api_endpoint, json=data, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._published_link(response, auth)
         except Exception as e:
             print(f"  -> ERROR: Exception during publish: {e}")
             return f"FAILED: {str(e)}"
 
+    @staticmethod
+    def _recent_posts_request(auth: Dict, count: int):
+        if not WordPressTool._has_credentials(auth):
+            print("[WordPressTool] Missing URL or credentials for fetching.")
+            return None
+
+        base_url = auth.get("url").rstrip("/")
+        api_endpoint = f"{base_url}/wp-json/wp/v2/posts?per_page={count}&_fields=title,link"
+        print(f"  -> Tool Call: Fetching recent posts from {api_endpoint}...")
+        return api_endpoint, WordPressTool._auth_headers(auth)
+
+    @staticmethod
+    def _recent_posts(response) -> list:
+        if response.status_code == 200:
+            return [{"title": p["title"]["rendered"], "link": p["link"]} for p in response.json()]
+        return []
+
     @staticmethod
     def get_recent_posts(auth: Dict, count: int = 10) -> list:
         """
         Fetch recent posts from WordPress.
         Returns a list of dictionaries with 'title' and 'link'.
         """
-        wp_url = auth.get("url")
-        username = auth.get("username")
-        password = auth.get("password")
-
-        if not wp_url or not username or not password:
-            print("[WordPressTool] Missing URL or credentials for fetching.")
+        request = WordPressTool._recent_posts_request(auth, count)
+        if request is None:
             return []
-
-        base_url = wp_url.rstrip("/")
-        api_endpoint = f"{base_url}/wp-json/wp/v2/posts?per_page={count}&_fields=title,link"
-
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode()).decode('utf-8')
-        headers = {
-            "Authorization": f"Basic {token}",
-        }
-
+        api_endpoint, headers = request
         try:
-            print(f"  -> Tool Call: Fetching recent posts from {api_endpoint}...")
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            response = requests.get(api_endpoint, headers=headers, verify=False)
-            if response.status_code == 200:
-                posts = response.json()
-                return [{"title": p["title"]["rendered"], "link": p["link"]} for p in posts]
-            return []
+            response = HttpClient.get(api_endpoint, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._recent_posts(response)
         except Exception as e:
             print(f"  -> ERROR: Exception during fetching posts: {e}")
             return []
 
+    @staticmethod
+    async def aget_recent_posts(auth: Dict, count: int = 10) -> list:
+        request = WordPressTool._recent_posts_request(auth, count)
+        if request is None:
+            return []
+        api_endpoint, headers = request
+        try:
+            response = await HttpClient.aget(api_endpoint, headers=headers, verify=False, tool="wordpress")
+            return WordPressTool._recent_posts(response)
+        except Exception as e:
+            print(f"  -> ERROR: Exception during fetching posts: {e}")
+            return []
@@ -0,0 +1,405 @@
+"""
+In-process stand-in for the WordPress REST API (posts, media, categories, tags, batch).
+
+Used to exercise WordPressTool / PublisherAgent offline and to benchmark publishing
+concurrency and retry behaviour. Latency, error rate and rate limiting are configurable,
+and every request is recorded.
+
+Usage in tests:
+    with FakeWordPressServer(latency=0.05, error_rate=0.1) as wp:
+        auth = wp.auth()
+        WordPressTool.publish_post("Title", "<p>Body</p>", auth)
+        print(wp.requests, wp.peak_concurrency)
+
+Standalone:
+    python test/fake_wordpress.py --port 8089 --latency 0.2 --rate-limit 5
+"""
+import re
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+API_PREFIX = "/wp-json/wp/v2"
+BATCH_PATH = "/wp-json/batch/v1"
+BATCH_MAX_REQUESTS = 25  # Same limit as WordPress core
+
+
+def _slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "untitled"
+
+
+class RecordedRequest:
+    __slots__ = ("method", "path", "query", "headers", "body_bytes", "status", "started", "duration")
+
+    def __init__(self, method, path, query, headers, body_bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body_bytes = body_bytes
+        self.status = None
+        self.started = time.time()
+        self.duration = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"<{self.method} {self.path} -> {self.status}>"
+
+
+class _TokenBucket:
+    """Requests-per-second limiter; rate None disables it."""
+
+    def __init__(self, rate: float = None, burst: int = None):
+        self.rate = rate
+        self.capacity = float(burst or (rate or 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Consume a token; returns 0 if allowed, else seconds until one is available."""
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class FakeWordPressState:
+    """In-memory posts, media and terms with WordPress-shaped JSON responses."""
+
+    def __init__(self, base_url: str = ""):
+        self.base_url = base_url
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.posts = {}
+        self.media = {}
+        self.terms = {"categories": {}, "tags": {}}
+
+    def _new_id(self) -> int:
+        new_id = self.next_id
+        self.next_id += 1
+        return new_id
+
+    def create_post(self, body: dict) -> dict:
+        with self.lock:
+            post_id = self._new_id()
+            slug = body.get("slug") or _slugify(body.get("title", ""))
+            post = {
+                "id": post_id,
+                "slug": slug,
+                "status": body.get("status", "draft"),
+                "link": f"{self.base_url}/{slug}/",
+                "title": {"raw": body.get("title", ""), "rendered": body.get("title", "")},
+                "content": {"raw": body.get("content", ""), "rendered": body.get("content", "")},
+                "excerpt": {"raw": body.get("excerpt", ""), "rendered": body.get("excerpt", "")},
+                "featured_media": body.get("featured_media", 0),
+                "categories": list(body.get("categories") or []),
+                "tags": list(body.get("tags") or []),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self.posts[post_id] = post
+            return post
+
+    def update_post(self, post_id: int, body: dict) -> dict:
+        with self.lock:
+            post = self.posts.get(post_id)
+            if post is None:
+                return None
+            for key in ("title", "content", "excerpt"):
+                if key in body:
+                    post[key] = {"raw": body[key], "rendered": body[key]}
+            for key in ("status", "slug", "featured_media", "categories", "tags"):
+                if key in body:
+                    post[key] = body[key]
+            return post
+
+    def create_media(self, data: bytes, filename: str, mime_type: str) -> dict:
+        with self.lock:
+            media_id = self._new_id()
+            item = {
+                "id": media_id,
+                "source_url": f"{self.base_url}/wp-content/uploads/{filename}",
+                "mime_type": mime_type,
+                "media_details": {"filesize": len(data)},
+            }
+            self.media[media_id] = item
+            return item
+
+    def search_terms(self, taxonomy: str, search: str = "") -> list:
+        with self.lock:
+            terms = list(self.terms[taxonomy].values())
+        if search:
+            terms = [t for t in terms if search.lower() in t["name"].lower()]
+        return terms
+
+    def create_term(self, taxonomy: str, name: str) -> tuple:
+        """Returns (status, body); duplicate names get WordPress's term_exists error."""
+        with self.lock:
+            for term in self.terms[taxonomy].values():
+                if term["name"].strip().lower() == name.strip().lower():
+                    return 400, {"code": "term_exists", "message": "A term with the name provided already exists.",
+                                 "data": {"status": 400, "term_id": term["id"]}}
+            term = {"id": self._new_id(), "name": name, "slug": _slugify(name), "taxonomy": taxonomy}
+            self.terms[taxonomy][term["id"]] = term
+            return 201, term
+
+
+class FakeWordPressServer:
+    """
+    Threaded HTTP server speaking a subset of the WordPress REST API.
+
+    latency / jitter: seconds added to every response (uniform jitter on top).
+    error_rate: probability of answering 500 instead of handling the request.
+    rate_limit / burst: requests per second before answering 429 with Retry-After.
+    username / password: when set, Basic auth is enforced (401 otherwise).
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = None, burst: int = None, username: str = "admin",
+                 password: str = "secret", seed: int = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.username = username
+        self.password = password
+        self.bucket = _TokenBucket(rate_limit, burst)
+        self.random = random.Random(seed)
+        self.requests = []
+        self.concurrency = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_port}"
+        self.state = FakeWordPressState(self.url)
+        self._thread = None
+
+    # --- Lifecycle ---
+
+    def start(self) -> "FakeWordPressServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def auth(self) -> dict:
+        """Credentials dict in the shape WordPressTool expects."""
+        return {"url": self.url, "username": self.username or "user", "password": self.password or "pass"}
+
+    # --- Introspection ---
+
+    def requests_for(self, method: str = None, path: str = None) -> list:
+        with self._lock:
+            recorded = list(self.requests)
+        return [r for r in recorded
+                if (method is None or r.method == method) and (path is None or r.path.startswith(path))]
+
+    def status_counts(self) -> dict:
+        counts = {}
+        for r in self.requests_for():
+            counts[r.status] = counts.get(r.status, 0) + 1
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.peak_concurrency = self.concurrency
+
+    # --- Request handling ---
+
+    def _check_auth(self, header: str) -> bool:
+        if not self.username:
+            return True
+        expected = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
+        return header == f"Basic {expected}"
+
+    def _route(self, method: str, path: str, query: dict, headers: dict, body: bytes) -> tuple:
+        """Dispatch one REST call; returns (status, json_body, extra_headers). Also used for batch sub-requests."""
+        if path.startswith(API_PREFIX):
+            resource = path[len(API_PREFIX):].strip("/").split("/")
+        else:
+            return 404, {"code": "rest_no_route", "message": "No route was found matching the URL and request method."}, {}
+        kind = resource[0]
+        item_id = int(resource[1]) if len(resource) > 1 and resource[1].isdigit() else None
+
+        if kind == "posts":
+            if method == "GET" and item_id is None:
+                posts = sorted(self.state.posts.values(), key=lambda p: p["id"], reverse=True)
+                statuses = (query.get("status") or "publish").split(",")
+                posts = [p for p in posts if p["status"] in statuses]
+                posts = posts[:int(query.get("per_page") or 10)]
+                fields = [f for f in (query.get("_fields") or "").split(",") if f]
+                if fields:
+                    posts = [{k: p[k] for k in fields if k in p} for p in posts]
+                return 200, posts, {"X-WP-Total": str(len(posts))}
+            if method == "GET":
+                post = self.state.posts.get(item_id)
+                return (200, post, {}) if post else (404, {"code": "rest_post_invalid_id"}, {})
+            if method == "POST":
+                payload = json.loads(body or b"{}")
+                if item_id is None:
+                    return 201, self.state.create_post(payload), {}
+                post = self.state.update_post(item_id, payload)
+                return (200, post, {}) if post else (404, {"code": "rest_post_invalid_id"}, {})
+            if method == "DELETE" and item_id is not None:
+                post = self.state.posts.pop(item_id, None)
+                return (200, {"deleted": True, "previous": post}, {}) if post else (404, {"code": "rest_post_invalid_id"}, {})
+
+        if kind == "media" and method == "POST":
+            match = re.search(r'filename="?([^";]+)"?', headers.get("Content-Disposition", ""))
+            if not match or not body:
+                return 400, {"code": "rest_upload_no_data", "message": "No data supplied."}, {}
+            mime_type = headers.get("Content-Type", "application/octet-stream")
+            return 201, self.state.create_media(body, match.group(1), mime_type), {}
+
+        if kind in ("categories", "tags"):
+            if method == "GET":
+                return 200, self.state.search_terms(kind, query.get("search", "")), {}
+            if method == "POST":
+                payload = json.loads(body or b"{}")
+                status, term = self.state.create_term(kind, payload.get("name", ""))
+                return status, term, {}
+
+        return 404, {"code": "rest_no_route", "message": "No route was found matching the URL and request method."}, {}
+
+    def _batch(self, body: bytes) -> tuple:
+        payload = json.loads(body or b"{}")
+        calls = payload.get("requests", [])
+        if len(calls) > BATCH_MAX_REQUESTS:
+            return 400, {"code": "rest_batch_max_requests_exceeded",
+                         "message": f"Maximum {BATCH_MAX_REQUESTS} requests per batch."}, {}
+        responses = []
+        for call in calls:
+            parsed = urlparse(call.get("path", ""))
+            path = parsed.path
+            if path.startswith("/wp/v2"):
+                path = "/wp-json" + path
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            sub_body = json.dumps(call.get("body") or {}).encode()
+            status, data, extra = self._route(call.get("method", "POST").upper(), path, query, {}, sub_body)
+            responses.append({"body": data, "status": status, "headers": extra})
+        return 207, {"responses": responses}, {}
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str):
+        parsed = urlparse(handler.path)
+        length = int(handler.headers.get("Content-Length", 0) or 0)
+        body = handler.rfile.read(length) if length else b""
+        record = RecordedRequest(method, parsed.path, parsed.query,
+                                 {k: v for k, v in handler.headers.items() if k.lower() != "authorization"},
+                                 len(body))
+        with self._lock:
+            self.requests.append(record)
+            self.concurrency += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.concurrency)
+
+        extra_headers = {}
+        try:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            retry_after = self.bucket.take()
+            if retry_after:
+                status = 429
+                data = {"code": "rest_too_many_requests", "message": "Too many requests."}
+                extra_headers = {"Retry-After": str(max(1, int(retry_after + 0.999)))}
+            elif self.error_rate and self.random.random() < self.error_rate:
+                status, data = 500, {"code": "internal_server_error", "message": "Injected failure."}
+            elif not self._check_auth(handler.headers.get("Authorization", "")):
+                status, data = 401, {"code": "rest_not_logged_in", "message": "You are not currently logged in."}
+            elif parsed.path.rstrip("/") == BATCH_PATH and method == "POST":
+                status, data, extra_headers = self._batch(body)
+            else:
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                try:
+                    status, data, extra_headers = self._route(method, parsed.path, query, handler.headers, body)
+                except (ValueError, KeyError) as e:
+                    status, data = 400, {"code": "rest_invalid_param", "message": str(e)}
+        finally:
+            with self._lock:
+                self.concurrency -= 1
+
+        record.status = status
+        record.duration = time.time() - record.started
+        payload = json.dumps(data).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=UTF-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        for key, value in extra_headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+            def do_PUT(self):
+                server._handle(self, "POST")
+
+            def do_DELETE(self):
+                server._handle(self, "DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake WordPress REST server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before 429s")
+    parser.add_argument("--burst", type=int, default=None)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="secret")
+    args = parser.parse_args()
+
+    server = FakeWordPressServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                 rate_limit=args.rate_limit, burst=args.burst,
+                                 username=args.username, password=args.password, port=args.port)
+    print(f"Fake WordPress listening on {server.url} (user {args.username!r}, password {args.password!r})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Handled {len(server.requests)} requests, status counts {server.status_counts()}, "
+              f"peak concurrency {server.peak_concurrency}")
+
+
+if __name__ == "__main__":
+    main()
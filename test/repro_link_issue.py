@@ -1,7 +1,6 @@
 import os
 import sys
 import re
-import requests
 from unittest.mock import MagicMock, patch
 
 # Ensure src is in python path
@@ -47,7 +46,7 @@ Here are some facts about the Dead Link.
         mock_valid.side_effect = side_effect
         
         # Process the briefing through the agent's logic
-        final_briefing = agent.run("some topic")
+        final_briefing = str(agent.run("some topic"))
         
         print(f"Final Briefing:\n{final_briefing}")
         
@@ -59,7 +58,7 @@ Here are some facts about the Dead Link.
 def test_search_tool_filtering():
     print("\nTesting SearchTool filtering...")
     from tools.search_tool import SearchTool
-    with patch('requests.get') as mock_get, \
+    with patch('tools.http_client.HttpClient.get') as mock_get, \
          patch('tools.link_validator_tool.LinkValidatorTool.is_link_valid') as mock_valid, \
          patch.dict('os.environ', {'GOOGLE_SEARCH_API_KEY': 'fake', 'GOOGLE_SEARCH_CX': 'fake'}):
         
@@ -87,7 +86,7 @@ def test_search_tool_filtering():
 def test_soft_404_detection():
     print("\nTesting soft 404 detection...")
     # This is harder to test without a real server, but we can mock the response
-    with patch('requests.head') as mock_head, patch('requests.get') as mock_get:
+    with patch('tools.http_client.HttpClient.head') as mock_head, patch('tools.http_client.HttpClient.get') as mock_get:
         # Mock HEAD to return 200
         mock_head.return_value.status_code = 200
         
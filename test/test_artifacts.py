@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+from unittest.mock import AsyncMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.llm_backends import FakeLLMBackend
+from adk.artifacts import Article, ResearchBrief, SEOMeta, MediaAsset, extract_links
+from agents.research_agent import ResearcherAgent
+from agents.seo_agent import SEOAgent
+from agents.publisher_agent import PublisherAgent
+
+SEO_OUTPUT = """---SEO_DATA---
+Meta Title: Test Post
+Meta Description: A test post.
+Slug: test-post
+Category: Artificial Intelligence
+Tags: AI, Agentic, Testing
+JSON-LD: {"@type": "Article"}
+---ARTICLE---
+# Test Post
+This is a post with an [embedded link](https://google.com).
+"""
+
+SEO_JSON = {
+    "meta_title": "Test Post",
+    "meta_description": "A test post.",
+    "slug": "test-post",
+    "category": "Artificial Intelligence",
+    "tags": ["AI", "Agentic", "Testing"],
+    "json_ld": '{"@type": "Article"}',
+    "article": "# Test Post\nThis is a post with an [embedded link](https://google.com).",
+}
+
+
+def test_extract_links_dedupes():
+    text = "[a](https://a.com) and [again](https://a.com) then [b](http://b.org/x)"
+    assert extract_links(text) == [("a", "https://a.com"), ("b", "http://b.org/x")]
+
+
+def test_researcher_unlinks_dead_urls_under_every_anchor():
+    briefing = ("Per [the report](https://dead.org/r), and again [in this study](https://dead.org/r), "
+                "see [live](https://live.org).\n\n### AUTHORITATIVE EXTERNAL LINKS\n- [Report](https://dead.org/r)")
+    context = AgentContext()
+    context.llm_backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=lambda model, prompt: briefing)
+    with patch.dict("os.environ", {"GOOGLE_SEARCH_API_KEY": ""}), \
+         patch("tools.link_validator_tool.LinkValidatorTool.ais_link_valid",
+               AsyncMock(side_effect=lambda url: "dead.org" not in url)):
+        brief = ResearcherAgent(context).run("Edge AI")
+    assert "dead.org" not in brief.summary
+    assert brief.summary.startswith("Per the report, and again in this study, see [live](https://live.org).")
+    assert brief.links == [("live", "https://live.org")]
+
+
+def test_article_parses_seo_output_once():
+    article = Article.from_seo_output(SEO_OUTPUT + "\n---VALIDATED_LINKS_FOR_REFERENCE_ONLY---\nEXTERNAL:\n- [G](https://g.com)\n")
+    assert article.seo.meta_title == "Test Post"
+    assert article.seo.categories == ["Artificial Intelligence"]
+    assert article.seo.tags == ["AI", "Agentic", "Testing"]
+    assert article.seo.json_ld == '{"@type": "Article"}'
+    assert article.body.startswith("# Test Post")
+    assert "VALIDATED_LINKS" not in article.body
+    assert article.links == [("embedded link", "https://google.com")]
+    assert not hasattr(article, "__dict__")
+
+
+def test_research_brief_renders_links():
+    brief = ResearchBrief("topic", "Facts.", [("Wiki", "https://www.wikipedia.org")])
+    assert "### AUTHORITATIVE EXTERNAL LINKS\n- [Wiki](https://www.wikipedia.org)" in str(brief)
+
+
+def test_seo_agent_uses_extracted_links():
+    context = AgentContext()
+    agent = SEOAgent(context)
+    draft = Article("# Draft\nSee [source](https://source.org/a).")
+    with patch("tools.wordpress_tool.WordPressTool.aget_recent_posts", new_callable=AsyncMock, return_value=[]), \
+         patch("tools.link_validator_tool.LinkValidatorTool.ais_link_valid", new_callable=AsyncMock, return_value=True), \
+         patch("adk.agents.LLMAgent.arun", new_callable=AsyncMock, return_value=json.dumps(SEO_JSON)) as mock_run, \
+         patch("adk.artifacts.extract_links", wraps=extract_links) as spy:
+        article = agent.run(draft)
+        # Only the new SEO body is scanned; the draft's links were reused
+        assert spy.call_count == 1
+        assert mock_run.call_args.args[0] is draft
+    assert article.seo.slug == "test-post"
+    assert article.seo.categories == ["Artificial Intelligence"]
+    assert article.reference_links["external"] == [("source", "https://source.org/a")]
+
+
+def test_structured_seo_output_is_validated():
+    assert SEOMeta.validate(SEO_JSON) == {}
+    errors = SEOMeta.validate(dict(SEO_JSON, slug="Test Post!", meta_title="x" * 61, tags="AI", json_ld="{broken", article=""))
+    assert set(errors) == {"slug", "meta_title", "tags", "json_ld", "article"}
+    assert SEOMeta.validate("not json") == {"response": "must be a JSON object"}
+
+
+def _run_seo(responses):
+    context = AgentContext()
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=lambda model, prompt: responses.pop(0))
+    with patch("tools.wordpress_tool.WordPressTool.aget_recent_posts", new_callable=AsyncMock, return_value=[]), \
+         patch("tools.link_validator_tool.LinkValidatorTool.ais_link_valid", new_callable=AsyncMock, return_value=True):
+        article = SEOAgent(context).run(Article("# Draft\nBody."))
+    return article, backend, context
+
+
+def test_seo_agent_repairs_only_the_failing_fields():
+    article, backend, context = _run_seo([json.dumps(dict(SEO_JSON, slug="Test Post!")), '{"slug": "test-post"}'])
+    assert len(backend.calls) == 2
+    assert article.seo.slug == "test-post" and article.seo.tags == ["AI", "Agentic", "Testing"]
+    assert article.body.startswith("# Test Post")
+    assert any("SEO output failed validation: slug must be" in line for line in context.history)
+
+    # A second failure does not trigger another call; the valid fields are kept and the rest dropped
+    article, backend, _ = _run_seo([json.dumps(dict(SEO_JSON, slug="Bad Slug", json_ld="{")), '{"slug": "Still Bad"}'])
+    assert len(backend.calls) == 2
+    assert article.seo.slug is None and article.seo.json_ld is None and article.seo.meta_title == "Test Post"
+
+    # Output that is not JSON at all is reformatted by the repair call
+    article, backend, _ = _run_seo(["Meta Title: Test Post", json.dumps(SEO_JSON)])
+    assert article.seo.meta_title == "Test Post" and len(backend.calls) == 2
+
+
+def test_publisher_reads_structured_fields():
+    context = AgentContext()
+    context.topic = "Testing"
+    publisher = PublisherAgent(context)
+    article = Article.from_seo_output(SEO_OUTPUT)
+    article.media = MediaAsset(None, "alt")
+    env = {"WP_URL": "https://wp.local", "WP_USERNAME": "u", "WP_APP_PASSWORD": "p"}
+    with patch.dict("os.environ", env), \
+         patch("tools.wordpress_tool.WordPressTool.aget_or_create_term", new_callable=AsyncMock, side_effect=[1, 2, 3, 4]), \
+         patch("tools.wordpress_tool.WordPressTool.apublish_post", new_callable=AsyncMock, return_value="https://wp.local/test-post/") as mock_publish:
+        result = publisher.run(article)
+    assert "[View Post](https://wp.local/test-post/)" in result
+    kwargs = mock_publish.call_args.kwargs
+    assert mock_publish.call_args.args[0] == "Test Post"
+    assert kwargs["slug"] == "test-post"
+    assert kwargs["categories"] == [1]
+    assert kwargs["tags"] == [2, 3, 4]
+
+
+if __name__ == "__main__":
+    test_extract_links_dedupes()
+    test_researcher_unlinks_dead_urls_under_every_anchor()
+    test_article_parses_seo_output_once()
+    test_research_brief_renders_links()
+    test_seo_agent_uses_extracted_links()
+    test_structured_seo_output_is_validated()
+    test_seo_agent_repairs_only_the_failing_fields()
+    test_publisher_reads_structured_fields()
+    print("Artifact tests passed!")
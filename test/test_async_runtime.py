@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import AsyncMock, patch
+
+# Ensure src and test helpers are in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+sys.path.append(os.path.join(os.getcwd(), "test"))
+
+from fake_wordpress import FakeWordPressServer
+from adk.aio import run_sync, in_runtime_loop
+from adk.core import AgentContext, BaseAgent
+from adk.agents import LLMAgent, WorkflowAgent
+from adk.llm_backends import FakeLLMBackend
+from agents.manager_agent import ManagerAgent
+from tools.http_client import HttpClient
+from tools.link_validator_tool import LinkValidatorTool
+from tools.wordpress_tool import WordPressTool
+
+
+def test_async_http_client_pools_per_host_and_records_stats():
+    HttpClient.reset()
+    with FakeWordPressServer(latency=0.05) as wp:
+        async def fetch_all():
+            headers = WordPressTool._auth_headers(wp.auth())
+            # The first request builds the host's client (TLS context); time only the pooled ones
+            await HttpClient.aget(f"{wp.url}/wp-json/wp/v2/posts", headers=headers, tool="wordpress")
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(HttpClient.aget(f"{wp.url}/wp-json/wp/v2/posts", headers=headers, tool="wordpress")
+                                               for _ in range(16)))
+            return responses, time.perf_counter() - started
+
+        responses, elapsed = asyncio.run(fetch_all())
+        assert all(r.status_code == 200 for r in responses)
+        # 16 requests at 50ms each over at most 8 connections
+        assert elapsed < 16 * 0.05
+        assert wp.peak_concurrency <= 8
+        stats = HttpClient.export_stats()[wp.url]
+        assert stats["requests"] == 17 and stats["status_counts"] == {"2xx": 17}
+
+
+def test_async_tools_match_sync_results():
+    HttpClient.reset()
+    with FakeWordPressServer() as wp:
+        auth = wp.auth()
+
+        async def publish():
+            media = await WordPressTool.aupload_media_bytes(b"\x89PNG fake", "hero.png", "image/png", auth)
+            cat_id = await WordPressTool.aget_or_create_term("Technology", "categories", auth)
+            same_id = await WordPressTool.aget_or_create_term("technology", "categories", auth)
+            link = await WordPressTool.apublish_post("Edge AI Guide", "<p>Body</p>", auth, featured_media_id=media["id"],
+                                                     slug="edge-ai-guide", categories=[cat_id])
+            recent = await WordPressTool.aget_recent_posts(auth)
+            bad = await WordPressTool.apublish_post("T", "C", dict(auth, password="wrong"))
+            return media, cat_id, same_id, link, recent, bad
+
+        media, cat_id, same_id, link, recent, bad = asyncio.run(publish())
+        assert media["link"].endswith("/hero.png")
+        assert cat_id == same_id
+        assert link == f"{wp.url}/edge-ai-guide/"
+        assert recent == [{"title": "Edge AI Guide", "link": link}]
+        assert bad == "FAILED: API Error 401"
+        assert list(wp.state.posts.values())[0]["featured_media"] == media["id"]
+
+
+class _PagesHandler(BaseHTTPRequestHandler):
+    PAGES = {"/ok": (200, "<h1>Welcome</h1>"), "/soft": (200, "<h1>Page not found</h1>"), "/moved": (301, "")}
+
+    def do_GET(self):
+        status, body = self.PAGES.get(self.path, (404, "missing"))
+        self.send_response(status)
+        if status == 301:
+            self.send_header("Location", "/ok")
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def test_async_link_validation_detects_dead_and_soft_404_links():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PagesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        urls = [f"{base}/ok", f"{base}/moved", f"{base}/soft", f"{base}/gone", "https://example.com/report"]
+
+        async def check_links():
+            return await asyncio.gather(*(LinkValidatorTool.ais_link_valid(url) for url in urls))
+        assert asyncio.run(check_links()) == [True, True, False, False, False]
+        assert [LinkValidatorTool.is_link_valid(url) for url in urls] == [True, True, False, False, False]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_concurrent_pipelines_share_one_loop():
+    HttpClient.reset()
+    backend = FakeLLMBackend(ttft=0.2, output_tokens=10, tokens_per_second=1000)
+    topics = [f"Topic {i}" for i in range(8)]
+    with FakeWordPressServer() as wp, \
+         patch.dict("os.environ", {"GOOGLE_SEARCH_API_KEY": "", "GOOGLE_MODEL_NAME": "gemini-test"}), \
+         patch("tools.image_tool.ImageTool.agenerate_image", new_callable=AsyncMock, return_value=None):
+        def pipeline(topic):
+            context = AgentContext()
+            context.llm_backend = backend
+            context.wp_config = wp.auth()
+            return ManagerAgent(context).arun(topic)
+
+        async def run_all():
+            return await asyncio.gather(*(pipeline(topic) for topic in topics))
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+
+    # Eight LLM calls per job, four of them the writer's outline, intro, one section and consistency
+    # pass (1.0s each job when run alone); all jobs wait on the model together
+    assert len(backend.calls) == 8 * len(topics)
+    assert backend.peak_in_flight >= len(topics)
+    assert elapsed < 1.0 * len(topics) / 2
+    assert all("[View Post]" in result for result in results)
+    assert len(wp.state.posts) == len(topics)
+
+
+class LegacyAgent(LLMAgent):
+    """Overrides only the blocking run, like agents written before arun existed."""
+
+    def run(self, input_data):
+        assert not in_runtime_loop()
+        return "legacy: " + super().run(input_data)
+
+
+def test_sync_run_is_a_thin_wrapper_over_the_shared_loop():
+    context = AgentContext()
+    context.llm_backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=lambda model, prompt: "done")
+    workflow = WorkflowAgent("ManagerAgent", context, [
+        LLMAgent("TrendAgent", context, persona="trends"),
+        LegacyAgent("WriterAgent", context, persona="writer"),
+    ])
+    assert workflow.run("Edge AI") == "legacy: done"
+
+    async def nested():
+        return workflow.run("Edge AI")
+    # Blocking run inside the runtime loop would deadlock it; the coroutine must be awaited instead
+    try:
+        run_sync(nested())
+        assert False, "Expected run_sync to refuse running inside the runtime loop"
+    except RuntimeError as e:
+        assert "await" in str(e)
+
+
+def test_agent_must_override_run_or_arun():
+    class Empty(BaseAgent):
+        pass
+
+    # Neither overridden: run and arun would call each other forever, so it fails up front
+    try:
+        Empty("Empty", AgentContext())
+        assert False, "Expected an agent without run or arun to be rejected"
+    except TypeError as e:
+        assert "run or arun" in str(e)
+
+    class Blocking(BaseAgent):
+        def run(self, input_data):
+            return f"ran {input_data}"
+
+    assert asyncio.run(Blocking("Blocking", AgentContext()).arun("x")) == "ran x"
+
+
+if __name__ == "__main__":
+    test_async_http_client_pools_per_host_and_records_stats()
+    test_async_tools_match_sync_results()
+    test_async_link_validation_detects_dead_and_soft_404_links()
+    test_concurrent_pipelines_share_one_loop()
+    test_sync_run_is_a_thin_wrapper_over_the_shared_loop()
+    test_agent_must_override_run_or_arun()
+    print("Async runtime tests passed.")
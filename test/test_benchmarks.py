@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Ensure src and bench are in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+sys.path.append(os.path.join(os.getcwd(), "bench"))
+
+from run_benchmarks import BENCHMARKS, compare, measure
+from tools.link_validator_tool import LinkValidatorTool
+
+
+def test_compare_flags_regressions_only():
+    baseline = {"results": {"fast": {"min_us": 100.0}, "slow": {"min_us": 100.0}}}
+    results = {"fast": {"min_us": 110.0}, "slow": {"min_us": 200.0}, "new": {"min_us": 5.0}}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert [r[0] for r in regressions] == ["slow"]
+
+
+def test_benchmarks_are_runnable():
+    for name in ("marker_parsing", "link_extraction", "soft_404_scan", "keyword_query"):
+        fn = BENCHMARKS[name]()
+        fn()
+    result = measure(BENCHMARKS["soft_404_scan"](), repeat=1)
+    assert result["min_us"] > 0 and result["loops"] >= 1
+
+
+def test_soft_404_scan():
+    assert LinkValidatorTool.looks_like_soft_404([b"<h1>Page Not Found</h1>"])
+    assert not LinkValidatorTool.looks_like_soft_404([b"<h1>Welcome</h1>", b"content"])
+
+
+if __name__ == "__main__":
+    test_compare_flags_regressions_only()
+    test_benchmarks_are_runnable()
+    test_soft_404_scan()
+    print("Benchmark tests passed.")
@@ -0,0 +1,187 @@
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.agents import LLMAgent, WorkflowAgent
+from adk.artifacts import Article, MediaAsset
+from adk.checkpoint import FileCheckpointStore, JobStoreCheckpointStore, SQLiteCheckpointStore, get_checkpoint_store
+from adk.job_store import close_job_stores
+from adk.llm_backends import FakeLLMBackend
+from tools.image_cache import ImageCache
+from tools.image_tool import ImageTool
+
+
+class ArticleAgent(LLMAgent):
+    def run(self, input_data):
+        return Article(super().run(input_data))
+
+
+class FlakyPublisher(LLMAgent):
+    """Fails on its first run, like a WordPress outage after the expensive stages."""
+    fail = True
+
+    def run(self, input_data):
+        if FlakyPublisher.fail:
+            raise Exception("WordPress unavailable")
+        return f"Published: {input_data.body[:20]}"
+
+
+def _build(context):
+    agents = [
+        LLMAgent("TrendAgent", context, persona="trends"),
+        ArticleAgent("WriterAgent", context, persona="writer"),
+        FlakyPublisher("PublisherAgent", context, persona="publisher"),
+    ]
+    return WorkflowAgent("ManagerAgent", context, agents)
+
+
+def _fake_backend():
+    backend = FakeLLMBackend(ttft=0, sleep=lambda s: None)
+    backend.responder = lambda model, prompt: f"output {len(backend.calls)}"
+    return backend
+
+
+def _check_resume_skips_llm(store):
+    context = AgentContext()
+    context.job_id = "job-123"
+    context.checkpoint_store = store
+    context.llm_backend = backend = _fake_backend()
+
+    FlakyPublisher.fail = True
+    try:
+        _build(context).run("Edge AI")
+        assert False, "Expected the publisher stage to fail"
+    except Exception as e:
+        assert "WordPress unavailable" in str(e)
+    assert len(backend.calls) == 2
+    saved = store.load("job-123")
+    assert set(saved) == {"__input__", "TrendAgent", "WriterAgent"}
+
+    # Resume on a fresh context: finished stages are restored, no LLM calls are made
+    FlakyPublisher.fail = False
+    resumed_context = AgentContext()
+    resumed_context.checkpoint_store = store
+    resumed_context.llm_backend = backend
+    result = _build(resumed_context).resume("job-123")
+
+    assert len(backend.calls) == 2
+    assert result.startswith("Published: output 2")
+    assert resumed_context.topic == "Edge AI"
+    assert any("Restored WriterAgent output from checkpoint" in line for line in resumed_context.history)
+    # Checkpoints are cleared once the job completes
+    assert store.load("job-123") == {}
+
+
+def test_resume_with_file_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        _check_resume_skips_llm(FileCheckpointStore(tmp))
+
+
+def test_resume_with_sqlite_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        _check_resume_skips_llm(SQLiteCheckpointStore(os.path.join(tmp, "checkpoints.db")))
+
+
+def test_resume_with_job_database_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"file:{os.path.join(tmp, 'dev.db')}"
+        try:
+            store = get_checkpoint_store(db_url=db_url)
+            assert isinstance(store, JobStoreCheckpointStore)
+            _check_resume_skips_llm(store)
+        finally:
+            close_job_stores()
+
+
+def test_store_defaults_to_the_job_database_when_configured():
+    with patch.dict("os.environ", {"DATABASE_URL": ""}):
+        assert isinstance(get_checkpoint_store(), FileCheckpointStore)
+    with patch.dict("os.environ", {"DATABASE_URL": "postgresql://u@db/jobs"}):
+        assert get_checkpoint_store().db_url == "postgresql://u@db/jobs"
+        assert isinstance(get_checkpoint_store("file:/tmp/checkpoints"), FileCheckpointStore)
+
+
+def test_reused_job_id_with_another_input_starts_over():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FileCheckpointStore(tmp)
+        context = AgentContext()
+        context.job_id = "job-9"
+        context.checkpoint_store = store
+        context.llm_backend = backend = _fake_backend()
+        FlakyPublisher.fail = True
+        try:
+            _build(context).run("Edge AI")
+        except Exception:
+            pass
+
+        FlakyPublisher.fail = False
+        retry = AgentContext()
+        retry.job_id = "job-9"
+        retry.checkpoint_store = store
+        retry.llm_backend = backend
+        result = _build(retry).run("Quantum computing")
+
+        # Both LLM stages ran again for the new topic instead of restoring Edge AI's outputs
+        assert len(backend.calls) == 4
+        assert retry.topic == "Quantum computing"
+        assert result.startswith("Published: output 4")
+        assert any("saved for a different input" in line for line in retry.history)
+        assert not any("Restored" in line for line in retry.history)
+
+
+class BrokenStore(FileCheckpointStore):
+    """Loads fine but every write fails, like a database outage mid-job."""
+
+    def save(self, job_id, stage, payload):
+        raise Exception("database is locked")
+
+    def clear(self, job_id):
+        raise Exception("database is locked")
+
+
+def test_checkpoint_errors_never_fail_a_finished_stage():
+    with tempfile.TemporaryDirectory() as tmp:
+        context = AgentContext()
+        context.job_id = "job-5"
+        context.checkpoint_store = BrokenStore(tmp)
+        context.llm_backend = _fake_backend()
+        FlakyPublisher.fail = False
+        result = _build(context).run("Edge AI")
+        assert result.startswith("Published: output 2")
+        assert any("Checkpoint save failed (database is locked)" in line for line in context.history)
+        assert any("Checkpoint clear failed" in line for line in context.history)
+
+
+def test_image_checkpoints_hold_a_cache_key_not_the_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ImageCache(os.path.join(tmp, "cache"))
+        key = ImageCache.key("imagen", "edge ai", "16:9")
+        raw = b"\x89PNG fake image bytes" * 1000
+        cache.put(key, raw)
+        media = MediaAsset(ImageTool._build_result(raw, "edge ai", key, tmp), "alt")
+        payload = media.to_dict()
+        assert payload["image"]["cache_key"] == key
+        assert "data" not in payload["image"]
+
+        with patch("tools.image_tool.ImageCache", lambda: cache):
+            restored = MediaAsset.from_dict(payload)
+        assert restored.image.data == raw and restored.image.filename == media.image.filename
+        # Evicted meanwhile: the article keeps its alt text and goes on without the image
+        with patch("tools.image_tool.ImageCache", lambda: ImageCache(os.path.join(tmp, "empty"))):
+            assert MediaAsset.from_dict(payload).image is None
+
+
+if __name__ == "__main__":
+    test_resume_with_file_store()
+    test_resume_with_sqlite_store()
+    test_resume_with_job_database_store()
+    test_store_defaults_to_the_job_database_when_configured()
+    test_reused_job_id_with_another_input_starts_over()
+    test_checkpoint_errors_never_fail_a_finished_stage()
+    test_image_checkpoints_hold_a_cache_key_not_the_bytes()
+    print("Checkpoint tests passed!")
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import threading
+from unittest.mock import MagicMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.coalesce import JobCoalescer, normalize_topic
+from adk.job_outcome import record_success
+
+
+def test_normalize_topic():
+    assert normalize_topic("  Agentic AI!! ") == normalize_topic("agentic   ai")
+    assert JobCoalescer.make_key("https://Site.com/", "Edge AI") == JobCoalescer.make_key("https://site.com", "edge ai")
+    # Another user's submission never shares a run
+    assert JobCoalescer.make_key("https://site.com", "Edge AI", "user:a") != JobCoalescer.make_key("https://site.com", "Edge AI", "user:b")
+
+
+def test_concurrent_duplicates_share_one_run():
+    coalescer = JobCoalescer(result_ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def pipeline():
+        calls.append(1)
+        release.wait(2)
+        return "published"
+
+    key = JobCoalescer.make_key("https://site.com", "Edge AI")
+    results = []
+
+    def submit(job_id):
+        results.append(coalescer.run(key, pipeline, job_id=job_id))
+
+    threads = [threading.Thread(target=submit, args=(f"job-{i}",)) for i in range(3)]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    assert coalescer.in_flight() == 1
+    release.set()
+    for t in threads: t.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert all(result == "published" for result, _ in results)
+
+    # Quick retry within the TTL returns the finished result immediately
+    result, shared = coalescer.run(key, pipeline)
+    assert (result, shared) == ("published", True)
+    assert len(calls) == 1
+
+    # Other sites are independent
+    coalescer.run(JobCoalescer.make_key("https://other.com", "Edge AI"), pipeline)
+    assert len(calls) == 2
+
+
+def test_job_id_attaches_and_failures_are_not_cached():
+    coalescer = JobCoalescer(result_ttl=0)
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise Exception("quota")
+
+    key = JobCoalescer.make_key("https://site.com", "topic")
+    for _ in range(2):
+        try:
+            coalescer.run(key, failing, job_id="job-1")
+            assert False, "Expected failure"
+        except Exception as e:
+            assert str(e) == "quota"
+    assert len(attempts) == 2
+
+    # Expired results are dropped: the next submission runs again
+    coalescer.run(key, lambda: "ok")
+    time.sleep(0.01)
+    result, shared = coalescer.run(key, lambda: "fresh")
+    assert (result, shared) == ("fresh", False)
+
+
+def test_attached_job_keeps_its_own_logs():
+    leader, attached = AgentContext(), AgentContext()
+    leader.history.extend(["[PublisherAgent] Final Title: Edge AI", "[PublisherAgent] working"])
+    leader.is_simulated = True
+    attached.history.append("[System] Attached to an identical run")
+    store = MagicMock()
+    with patch("adk.job_outcome.get_job_store", return_value=store):
+        status = record_success("sqlite:x", "job-2", attached, "[View Post](https://site.com/p/1)", source=leader)
+
+    # Status, URL and title come from the shared run; the logs are the attached job's own
+    assert status == "DRAFT"
+    job_id, logs, final_status, url, title = store.finalize.call_args.args
+    assert (job_id, final_status, url, title) == ("job-2", "DRAFT", "https://site.com/p/1", "Edge AI")
+    assert logs.startswith("[System] Attached") and "working" not in logs
+
+
+if __name__ == "__main__":
+    test_normalize_topic()
+    test_concurrent_duplicates_share_one_run()
+    test_job_id_attaches_and_failures_are_not_cached()
+    test_attached_job_keeps_its_own_logs()
+    print("Coalescer tests passed!")
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import threading
+
+# Ensure src and test helpers are in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+sys.path.append(os.path.join(os.getcwd(), "test"))
+
+from fake_wordpress import FakeWordPressServer
+from tools.http_client import HttpClient
+from tools.wordpress_tool import WordPressTool
+
+
+def test_publish_flow_against_fake():
+    with FakeWordPressServer() as wp:
+        auth = wp.auth()
+        media = WordPressTool.upload_media_bytes(b"\x89PNG fake", "hero.png", "image/png", auth)
+        assert media["id"] and media["link"].endswith("/hero.png")
+
+        cat_id = WordPressTool.get_or_create_term("Technology", "categories", auth)
+        assert WordPressTool.get_or_create_term("technology", "categories", auth) == cat_id
+        tag_id = WordPressTool.get_or_create_term("Edge AI", "tags", auth)
+
+        link = WordPressTool.publish_post("Edge AI Guide", "<p>Body</p>", auth, featured_media_id=media["id"],
+                                          slug="edge-ai-guide", categories=[cat_id], tags=[tag_id])
+        assert link == f"{wp.url}/edge-ai-guide/"
+
+        post = list(wp.state.posts.values())[0]
+        assert post["status"] == "publish" and post["featured_media"] == media["id"]
+        assert post["categories"] == [cat_id] and post["tags"] == [tag_id]
+
+        recent = WordPressTool.get_recent_posts(auth)
+        assert recent == [{"title": "Edge AI Guide", "link": link}]
+
+        # Requests are recorded (one media upload, two term searches + creates, ...)
+        assert len(wp.requests_for("POST", "/wp-json/wp/v2/media")) == 1
+        assert wp.status_counts().get(201) == 4
+
+
+def test_auth_errors_and_rate_limits():
+    with FakeWordPressServer(rate_limit=1, burst=2) as wp:
+        bad_auth = dict(wp.auth(), password="wrong")
+        assert WordPressTool.publish_post("T", "C", bad_auth) == "FAILED: API Error 401"
+
+        # Burst of 2 is used up by the 401 above and this call; the next one is throttled
+        WordPressTool.publish_post("T", "C", wp.auth())
+        response = HttpClient.get(f"{wp.url}/wp-json/wp/v2/posts")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_error_rate_and_latency_are_deterministic():
+    with FakeWordPressServer(error_rate=0.5, latency=0.01, seed=7) as wp:
+        results = [WordPressTool.publish_post(f"Post {i}", "C", wp.auth()) for i in range(20)]
+        failures = sum(1 for r in results if r.startswith("FAILED"))
+        assert 0 < failures < 20
+        assert wp.status_counts()[500] == failures
+        assert all(r.duration >= 0.01 for r in wp.requests)
+
+
+def test_concurrency_is_recorded():
+    with FakeWordPressServer(latency=0.1) as wp:
+        threads = [threading.Thread(target=WordPressTool.publish_post, args=(f"Post {i}", "C", wp.auth())) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(wp.state.posts) == 4
+        assert wp.peak_concurrency >= 2
+
+
+def test_batch_endpoint():
+    with FakeWordPressServer(username=None) as wp:
+        payload = {"requests": [
+            {"method": "POST", "path": "/wp/v2/posts", "body": {"title": "A", "status": "draft"}},
+            {"method": "POST", "path": "/wp/v2/tags", "body": {"name": "AI"}},
+            {"method": "GET", "path": "/wp/v2/nothing"},
+        ]}
+        response = HttpClient.post(f"{wp.url}/wp-json/batch/v1", json=payload)
+        assert response.status_code == 207
+        statuses = [r["status"] for r in response.json()["responses"]]
+        assert statuses == [201, 201, 404]
+
+        too_many = {"requests": [{"method": "POST", "path": "/wp/v2/posts", "body": {}}] * 26}
+        assert HttpClient.post(f"{wp.url}/wp-json/batch/v1", data=json.dumps(too_many)).status_code == 400
+
+
+if __name__ == "__main__":
+    test_publish_flow_against_fake()
+    test_auth_errors_and_rate_limits()
+    test_error_rate_and_latency_are_deterministic()
+    test_concurrency_is_recorded()
+    test_batch_endpoint()
+    print("Fake WordPress tests passed.")
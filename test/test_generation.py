@@ -0,0 +1,134 @@
+import os
+import sys
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.generation import resolve, parse_overrides, to_genai_config
+from adk.llm_backends import FakeLLMBackend, GeminiBackend, LLMError, LLMTimeoutError
+from agents.research_agent import ResearcherAgent
+from agents.writer_agent import WriterAgent
+from agents.media_agent import MediaAgent
+
+
+def test_settings_layer_agent_call_and_job_overrides():
+    context = AgentContext()
+    researcher = ResearcherAgent(context)
+    assert resolve(researcher, "synthesis", context)["max_output_tokens"] == 2048
+    extraction = resolve(researcher, "query_extraction", context)
+    assert extraction["max_output_tokens"] == 32 and extraction["thinking"] == "minimal"
+
+    context.generation_overrides = parse_overrides(
+        '{"*": {"temperature": 0.1}, "ResearcherAgent": {"thinking": "high"}, "query_extraction": {"max_output_tokens": null}}')
+    extraction = resolve(researcher, "query_extraction", context)
+    assert extraction == {"thinking": "high", "temperature": 0.1, "stop_sequences": ["\n"]}
+    assert resolve(WriterAgent(context), "writing", context)["temperature"] == 0.1
+
+    # Without per-job settings the process-wide ones apply
+    with patch.dict("os.environ", {"LLM_GENERATION_OVERRIDES": '{"alt_text": {"max_output_tokens": 40}}'}):
+        assert resolve(MediaAgent(AgentContext()), "alt_text", AgentContext())["max_output_tokens"] == 40
+
+
+def test_overrides_are_validated():
+    for bad in ('{"WriterAgent": {"max_tokens": 10}}', '{"*": {"thinking": "extreme"}}', '{"*": 5}',
+                '{"WriterAgent": {"max_output_tokens": "lots"}}', '{"*": {"max_output_tokens": 0}}',
+                '{"*": {"temperature": "warm"}}', '{"*": {"temperature": 3}}', '{"*": {"stop_sequences": "\\n"}}',
+                '{"*": {"thinking": -5}}', '{"*": {"thinking": true}}'):
+        try:
+            parse_overrides(bad)
+            assert False, f"Expected {bad} to be rejected"
+        except ValueError:
+            pass
+    assert parse_overrides('{"*": {"thinking": -1, "temperature": 1, "stop_sequences": ["END"]}}')
+
+
+def test_bad_settings_fail_the_call_instead_of_falling_back_to_simulation():
+    context = AgentContext()
+    context.llm_backend = backend = FakeLLMBackend(ttft=0, sleep=lambda s: None)
+    # Set directly, as a caller that skipped parse_overrides would
+    context.generation_overrides = {"WriterAgent": {"max_output_tokens": "lots"}}
+    try:
+        WriterAgent(context).run("Edge AI")
+        assert False, "Expected the bad setting to raise"
+    except ValueError as e:
+        assert "max_output_tokens" in str(e)
+    assert backend.calls == [] and not context.is_simulated
+
+
+def test_genai_config_follows_the_model_family():
+    config = {"max_output_tokens": 32, "thinking": "minimal", "temperature": 0.0, "stop_sequences": ["\n"]}
+    flash3 = to_genai_config("gemini-3-flash-preview", config)
+    assert flash3.thinking_config.thinking_level.value == "MINIMAL"
+    assert flash3.max_output_tokens == 32 and flash3.temperature == 0.0 and flash3.stop_sequences == ["\n"]
+
+    assert to_genai_config("gemini-3-pro-preview", config).thinking_config.thinking_level.value == "LOW"
+    flash25 = to_genai_config("gemini-2.5-flash", {"max_output_tokens": 100, "thinking": "low"})
+    assert flash25.thinking_config.thinking_budget == 512
+    # Thinking counts against the output limit, so the cap leaves room for it
+    assert flash25.max_output_tokens == 612
+    assert to_genai_config("gemini-2.5-pro", {"thinking": "minimal"}).thinking_config.thinking_budget == 128
+    assert to_genai_config("gemini-2.0-flash", {"max_output_tokens": 64, "thinking": "high"}).thinking_config is None
+    assert to_genai_config("gemini-3-flash-preview", {}) is None
+    structured = to_genai_config("gemini-3-flash-preview", {"response_schema": {"title": "Out", "type": "object"}})
+    assert structured.response_mime_type == "application/json" and structured.response_json_schema == {"title": "Out", "type": "object"}
+
+
+def test_gemini_backend_sends_config_and_rejects_empty_output():
+    client = MagicMock()
+    client.models.generate_content.return_value.text = "edge ai statistics"
+    client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=None, candidates=[MagicMock(finish_reason="MAX_TOKENS")]))
+    with patch.dict(GeminiBackend._clients, {("api_key", "k"): client}):
+        backend = GeminiBackend(api_key="k")
+        assert backend.generate("gemini-3-flash-preview", "q", config={"max_output_tokens": 32}) == "edge ai statistics"
+        assert client.models.generate_content.call_args.kwargs["config"].max_output_tokens == 32
+        try:
+            asyncio.run(backend.agenerate("gemini-3-flash-preview", "q", config={"max_output_tokens": 32}))
+            assert False, "Expected an empty response to fail over"
+        except LLMError as e:
+            assert "MAX_TOKENS" in str(e)
+
+
+def test_gemini_backend_applies_the_call_timeout():
+    client = MagicMock()
+    client.models.generate_content.return_value.text = "ok"
+    client.aio.models.generate_content = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+    with patch.dict(GeminiBackend._clients, {("api_key", "k"): client}):
+        backend = GeminiBackend(api_key="k")
+        backend.generate("gemini-3-flash-preview", "q", timeout=2.5)
+        assert client.models.generate_content.call_args.kwargs["config"].http_options.timeout == 2500
+        backend.generate("gemini-3-flash-preview", "q", timeout=1, config={"max_output_tokens": 32})
+        sent = client.models.generate_content.call_args.kwargs["config"]
+        assert sent.http_options.timeout == 1000 and sent.max_output_tokens == 32
+        backend.generate("gemini-3-flash-preview", "q")
+        assert client.models.generate_content.call_args.kwargs["config"] is None
+        try:
+            asyncio.run(backend.agenerate("gemini-3-flash-preview", "q", timeout=1))
+            assert False, "Expected the timeout to surface as an LLMTimeoutError"
+        except LLMTimeoutError:
+            pass
+
+
+def test_short_calls_finish_faster():
+    context = AgentContext()
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.1, output_tokens=400, tokens_per_second=80, sleep=lambda s: None)
+    with patch.dict("os.environ", {"GOOGLE_SEARCH_API_KEY": "", "RESEARCH_QUERY_MODE": "llm"}):
+        ResearcherAgent(context).run("Edge AI")
+    extraction, synthesis = backend.calls
+    assert extraction["latency"] == 0.1 + 32 / 80
+    assert synthesis["latency"] == 0.1 + 400 / 80
+    assert any("Generation settings (query_extraction): max_output_tokens=32, thinking=minimal" in line for line in context.history)
+
+
+if __name__ == "__main__":
+    test_settings_layer_agent_call_and_job_overrides()
+    test_overrides_are_validated()
+    test_bad_settings_fail_the_call_instead_of_falling_back_to_simulation()
+    test_genai_config_follows_the_model_family()
+    test_gemini_backend_sends_config_and_rejects_empty_output()
+    test_gemini_backend_applies_the_call_timeout()
+    test_short_calls_finish_faster()
+    print("Generation config tests passed.")
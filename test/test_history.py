@@ -0,0 +1,186 @@
+import os
+import sys
+import time
+import asyncio
+import sqlite3
+import tempfile
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.aio import get_loop
+from adk.core import AgentContext, job_log_text
+from adk.agents import LLMAgent
+from adk.history import BoundedHistory, PayloadDirCap, PayloadStore, preview, release_payloads
+from adk.job_store import close_job_stores
+from adk.llm_backends import FakeLLMBackend
+
+
+def test_history_is_capped_and_counts_dropped_lines():
+    history = BoundedHistory(max_bytes=1000)
+    # As if every line were already in the job store
+    history.persisted = None
+    for i in range(200):
+        history.append(f"[WriterAgent] line {i:03d} " + "x" * 30)
+    assert history.bytes <= 1000
+    assert history.bytes == sum(len(line) for line in history)
+    assert history.dropped + len(history) == 200
+    assert history[-1].startswith("[WriterAgent] line 199")
+    # A single oversized line is kept rather than leaving the history empty
+    history.append("y" * 5000)
+    assert list(history) == ["y" * 5000]
+
+
+def test_history_without_a_store_spills_trimmed_lines():
+    context = AgentContext()
+    context.history = BoundedHistory(max_bytes=500)
+    lines = [f"[SEOAgent] Validating external link: https://example.org/{i}" for i in range(50)]
+    for line in lines:
+        context.log(line)
+    # The cap holds without a database; trimmed lines went to the run's payload directory
+    assert context.history.dropped > 0 and context.history.bytes <= 500
+    assert job_log_text(context) == "\n".join(lines)
+    release_payloads(context)
+    assert not os.path.exists(context.payloads.directory)
+
+
+def test_large_values_become_payload_references():
+    context = AgentContext()
+    article = "# Guide\n\n" + "Edge inference keeps latency low. " * 500
+    line = preview(context, article)
+    assert len(line) < 250
+    assert line.startswith("# Guide Edge inference")
+    ref = line.rsplit("payload:", 1)[1].rstrip("]")
+    assert f"[{len(article.encode())} bytes, payload:{ref}]" in line
+    assert context.payloads.get(ref) == article
+    # Without a job, payloads still go to disk rather than an evicting memory store
+    assert PayloadStore(context.payloads.directory).get(ref) == article
+    # The same payload is stored once, short values pass through untouched
+    assert preview(context, article) == line
+    assert len(context.payloads) == 1
+    assert preview(context, "short topic") == "short topic"
+
+
+def test_payload_store_on_disk_and_memory_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PayloadStore(os.path.join(tmp, "job-1"))
+        ref = store.put("persisted payload")
+        assert os.listdir(os.path.join(tmp, "job-1")) == [f"{ref}.txt"]
+        assert PayloadStore(os.path.join(tmp, "job-1")).get(ref) == "persisted payload"
+
+    store = PayloadStore(max_bytes=100)
+    first = store.put("a" * 60)
+    second = store.put("b" * 60)
+    assert store.get(first) is None
+    assert store.get(second) == "b" * 60
+
+
+def test_payload_directories_are_capped_by_size_and_age():
+    with tempfile.TemporaryDirectory() as tmp:
+        def write(job, size, age=0):
+            os.makedirs(os.path.join(tmp, job), exist_ok=True)
+            path = os.path.join(tmp, job, "ref.txt")
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+            t = time.time() - age
+            os.utime(path, (t, t))
+
+        # Left by an earlier process: read once, on first use
+        write("stale", 10, age=7200)
+        write("old", 400, age=60)
+        cap = PayloadDirCap(tmp, max_bytes=1000, ttl_seconds=3600)
+        write("job-1", 500)
+        cap.record(os.path.join(tmp, "job-1"), 500)
+        assert sorted(os.listdir(tmp)) == ["job-1", "old"]
+        write("job-2", 300)
+        cap.record(os.path.join(tmp, "job-2"), 300)
+        # Over 1000 bytes: the least recently written directory goes first
+        assert sorted(os.listdir(tmp)) == ["job-1", "job-2"] and cap.total == 800
+        cap.discard(os.path.join(tmp, "job-1"))
+        assert os.listdir(tmp) == ["job-2"] and cap.total == 300
+
+
+def test_agent_logs_stay_small_for_long_articles():
+    context = AgentContext()
+    context.history = BoundedHistory(max_bytes=4096)
+    context.llm_backend = FakeLLMBackend(ttft=0, output_tokens=50, sleep=lambda s: None)
+    agent = LLMAgent("WriterAgent", context, persona="You are a writer. " * 40)
+    article = "Paragraph about edge AI. " * 4000
+    for _ in range(5):
+        agent.run(article)
+    assert all(len(line) < 400 for line in context.history)
+    assert any("Received input: Paragraph about edge AI." in line and "payload:" in line for line in context.history)
+    # The article and the persona are each stored once
+    assert len(context.payloads) == 2
+
+
+def _make_job_db(tmp):
+    path = os.path.join(tmp, "dev.db")
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE "AgentJob" ("id" TEXT PRIMARY KEY, "status" TEXT, "logs" TEXT, "currentStep" TEXT, "updatedAt" DATETIME)')
+    conn.execute('CREATE TABLE "AgentJobLog" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "jobId" TEXT NOT NULL, "seq" INTEGER NOT NULL, '
+                 '"content" TEXT NOT NULL, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, UNIQUE ("jobId", "seq"))')
+    conn.execute('INSERT INTO "AgentJob" ("id", "status") VALUES (\'j1\', \'RUNNING\')')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_trimmed_history_keeps_persisting_and_full_text_comes_from_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_job_db(tmp)
+        context = AgentContext()
+        context.history = BoundedHistory(max_bytes=500)
+        context.db_url = f"file:{path}"
+        context.job_id = "j1"
+        lines = [f"[SEOAgent] Validating external link: https://example.org/{i}" for i in range(50)]
+        for line in lines:
+            context.log(line)
+        assert context.history.dropped > 0
+        assert context.log_cursor == 50
+        assert job_log_text(context) == "\n".join(lines)
+        close_job_stores()
+
+
+def test_logging_on_the_runtime_loop_does_not_wait_for_the_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_job_db(tmp)
+        context = AgentContext()
+        context.history = BoundedHistory(max_bytes=500)
+        context.db_url = f"file:{path}"
+        context.job_id = "j1"
+        payloads = PayloadStore(os.path.join(tmp, "payloads"))
+        lines = [f"[SEOAgent] Validating external link: https://example.org/{i}" for i in range(50)]
+
+        async def job():
+            for line in lines:
+                context.log(line)
+            return payloads.put("generated article " * 100)
+
+        # Hold the writer's lock, as a slow database would: the job still finishes
+        with context.log_lock:
+            ref = asyncio.run_coroutine_threadsafe(job(), get_loop()).result(timeout=5)
+            # Nothing reached the store yet, so nothing was trimmed from memory
+            assert context.history.dropped == 0 and len(context.history) == 50
+            assert payloads.get(ref) == "generated article " * 100
+        assert job_log_text(context) == "\n".join(lines)
+        conn = sqlite3.connect(path)
+        assert conn.execute('SELECT COUNT(*) FROM "AgentJobLog"').fetchone() == (50,)
+        conn.close()
+        deadline = time.time() + 5
+        while not os.path.exists(os.path.join(tmp, "payloads", f"{ref}.txt")) and time.time() < deadline:
+            time.sleep(0.01)
+        assert PayloadStore(os.path.join(tmp, "payloads")).get(ref) == "generated article " * 100
+        close_job_stores()
+
+
+if __name__ == "__main__":
+    test_history_is_capped_and_counts_dropped_lines()
+    test_history_without_a_store_spills_trimmed_lines()
+    test_large_values_become_payload_references()
+    test_payload_store_on_disk_and_memory_eviction()
+    test_payload_directories_are_capped_by_size_and_age()
+    test_agent_logs_stay_small_for_long_articles()
+    test_trimmed_history_keeps_persisting_and_full_text_comes_from_store()
+    test_logging_on_the_runtime_loop_does_not_wait_for_the_store()
+    print("History tests passed.")
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import threading
+from unittest.mock import patch
+import pytest
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools import http_client
+from tools.http_client import HttpClient, _HostPools
+from adk.metrics import HTTP_DURATION
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(1)
+        status = 500 if self.path.startswith("/error") else 200
+        body = b"hello world"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(201)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_session_reuse_and_stats():
+    HttpClient.reset()
+    server = _start_server()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        assert HttpClient.get(f"{base}/a").status_code == 200
+        assert HttpClient.get(f"{base}/b").status_code == 200
+        assert HttpClient.post(f"{base}/c", data=b"12345").status_code == 201
+        assert HttpClient.get(f"{base}/error").status_code == 500
+
+        # One pooled session per host
+        assert len(HttpClient._sessions) == 1
+
+        stats = HttpClient.export_stats()[base]
+        print(f"Stats: {stats}")
+        assert stats["requests"] == 4
+        assert stats["errors"] == 1
+        assert stats["bytes_sent"] == 5
+        assert stats["bytes_received"] == 11 * 3 + 2
+        assert stats["status_counts"] == {"2xx": 3, "5xx": 1}
+
+        # The histogram is labelled by tool only, so arbitrary cited hosts add no series
+        assert HTTP_DURATION.labelnames == ("tool", "outcome")
+        assert HTTP_DURATION.count(tool="other", outcome="200") >= 2
+    finally:
+        server.shutdown()
+        HttpClient.reset()
+
+
+def test_connection_errors_are_counted():
+    HttpClient.reset()
+    url = "http://127.0.0.1:1/unreachable"
+    with pytest.raises(requests.exceptions.ConnectionError):
+        HttpClient.get(url, timeout=0.5)
+    stats = HttpClient.export_stats()["http://127.0.0.1:1"]
+    assert stats["requests"] == 1
+    assert stats["errors"] == 1
+    HttpClient.reset()
+
+
+def test_least_recently_used_idle_pools_are_closed():
+    closed = []
+    pools = _HostPools(2, closed.append)
+    pools.acquire("a", lambda: "pool-a")
+    pools.acquire("b", lambda: "pool-b")
+    pools.release("b")
+    pools.acquire("c", lambda: "pool-c")
+    # "a" is older but still in use, so the idle "b" goes
+    assert closed == ["pool-b"] and len(pools) == 2
+    pools.release("a")
+    pools.release("c")
+    pools.acquire("d", lambda: "pool-d")
+    assert closed == ["pool-b", "pool-a"]
+    assert list(pools.pools) == ["c", "d"]
+
+
+def test_stats_of_evicted_hosts_fold_into_other():
+    HttpClient.reset()
+    with patch.object(http_client, "HTTP_MAX_STATS_HOSTS", 2):
+        for n, host in enumerate(["http://a", "http://b", "http://c"]):
+            HttpClient._record(host, 0.1 * (n + 1), 1, 10, status=200)
+        stats = HttpClient.export_stats()
+    assert sorted(stats) == ["http://b", "http://c", "other"]
+    assert stats["other"]["requests"] == 1 and stats["other"]["bytes_received"] == 10
+    HttpClient.reset()
+
+
+def test_exhausted_pool_times_out_instead_of_hanging():
+    HttpClient.reset()
+    server = _start_server()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with patch.object(http_client, "MAX_CONNECTIONS_PER_HOST", 1), patch.object(http_client, "HTTP_POOL_TIMEOUT", 0.1):
+            busy = threading.Thread(target=HttpClient.get, args=(f"{base}/slow",))
+            busy.start()
+            time.sleep(0.2)
+            started = time.perf_counter()
+            with pytest.raises(requests.exceptions.ConnectTimeout):
+                HttpClient.get(f"{base}/a")
+            assert time.perf_counter() - started < 0.8
+            busy.join()
+    finally:
+        server.shutdown()
+        HttpClient.reset()
+
+
+if __name__ == "__main__":
+    test_session_reuse_and_stats()
+    test_connection_errors_are_counted()
+    test_least_recently_used_idle_pools_are_closed()
+    test_stats_of_evicted_hosts_fold_into_other()
+    test_exhausted_pool_times_out_instead_of_hanging()
+    print("HttpClient tests passed!")
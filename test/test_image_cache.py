@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from tools.image_cache import ImageCache
+from tools.image_tool import ImageTool
+
+
+def test_key_is_content_addressed():
+    a = ImageCache.key("imagen-4", "a prompt", "16:9")
+    assert a == ImageCache.key("imagen-4", "a prompt", "16:9")
+    assert a != ImageCache.key("imagen-4", "a prompt", "1:1")
+    assert a != ImageCache.key("imagen-3", "a prompt", "16:9")
+
+
+def _age(path, seconds_ago):
+    t = time.time() - seconds_ago
+    os.utime(path, (t, t))
+
+
+def test_lru_eviction_respects_cap():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ImageCache(tmp, max_bytes=250)
+        _age(cache.put("a", b"x" * 100), 30)
+        _age(cache.put("b", b"x" * 100), 20)
+        assert cache.get("a")  # touch "a" so "b" becomes least recently used
+        cache.put("c", b"x" * 100)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        total = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.endswith(".png"))
+        assert total <= 250
+
+
+def test_puts_under_the_cap_do_not_list_the_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ImageCache(tmp, max_bytes=1000)
+        cache.put("first", b"x" * 100)
+        with patch("tools.image_cache.os.listdir", side_effect=AssertionError("directory listed")):
+            for i in range(5):
+                cache.put(f"more-{i}", b"x" * 100)
+                assert cache.get(f"more-{i}")
+        # Going over the cap rescans once and frees below it
+        for i in range(5):
+            cache.put(f"over-{i}", b"x" * 100)
+        total = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.endswith(".png"))
+        assert total <= 1000
+        assert ImageCache(tmp, max_bytes=1000)._index().total == total
+
+
+def test_concurrent_puts_stay_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ImageCache(tmp, max_bytes=1000)
+
+        def worker(n):
+            for i in range(20):
+                cache.put(f"{n}-{i}", b"y" * 100)
+                cache.get(f"{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        names = os.listdir(tmp)
+        assert not [n for n in names if n.endswith(".tmp")]
+        assert len([n for n in names if n.endswith(".png")]) <= 10
+
+
+def test_cache_hit_skips_imagen_call():
+    generated = MagicMock()
+    generated.image.image_bytes = b"\x89PNG fake"
+    client = MagicMock()
+    client.models.generate_images.return_value.generated_images = [generated]
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("google.genai.Client", return_value=client), \
+         patch("tools.image_tool.IMAGE_UPLOAD_FORMAT", "png"):
+        cache = ImageCache(tmp, max_bytes=10_000)
+        first = ImageTool.generate_image("Same prompt", api_key="fake", cache=cache)
+        second = ImageTool.generate_image("Same prompt", api_key="fake", cache=cache)
+        assert client.models.generate_images.call_count == 1
+        assert first.data == second.data
+        assert first.filename == second.filename
+
+
+if __name__ == "__main__":
+    test_key_is_content_addressed()
+    test_lru_eviction_respects_cap()
+    test_puts_under_the_cap_do_not_list_the_directory()
+    test_concurrent_puts_stay_bounded()
+    test_cache_hit_skips_imagen_call()
+    print("ImageCache tests passed!")
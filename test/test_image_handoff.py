@@ -0,0 +1,83 @@
+import io
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from PIL import Image
+from tools.image_tool import ImageTool, GeneratedImage
+from tools.image_cache import ImageCache
+from tools.wordpress_tool import WordPressTool
+
+
+def _png_bytes() -> bytes:
+    # Photo-like noise so lossy formats have something to win on
+    img = Image.effect_noise((320, 180), 60).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _mock_client(data: bytes):
+    generated = MagicMock()
+    generated.image.image_bytes = data
+    client = MagicMock()
+    client.models.generate_images.return_value.generated_images = [generated]
+    return client
+
+
+def test_transcode_formats():
+    png = _png_bytes()
+    data, mime, ext = ImageTool.transcode(png, "png")
+    assert data is png and mime == "image/png" and ext == "png"
+
+    data, mime, ext = ImageTool.transcode(png, "jpeg", 70)
+    assert mime == "image/jpeg" and ext == "jpg"
+    assert len(data) < len(png)
+
+    data, mime, ext = ImageTool.transcode(png, "webp", 70)
+    assert mime == "image/webp" and ext == "webp"
+    assert len(data) < len(png)
+
+
+def test_generate_image_stays_in_memory():
+    png = _png_bytes()
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("google.genai.Client", return_value=_mock_client(png)), \
+         patch.dict("os.environ", {"DEBUG_GENERATED_ASSETS": ""}):
+        result = ImageTool.generate_image("A test prompt", output_dir=tmp, api_key="fake", cache=ImageCache(max_bytes=0))
+        assert isinstance(result, GeneratedImage)
+        assert result.data and result.path is None
+        assert os.listdir(tmp) == []
+
+
+def test_generate_image_persists_in_debug():
+    png = _png_bytes()
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("google.genai.Client", return_value=_mock_client(png)), \
+         patch.dict("os.environ", {"DEBUG_GENERATED_ASSETS": "true"}):
+        result = ImageTool.generate_image("A test prompt", output_dir=tmp, api_key="fake", cache=ImageCache(max_bytes=0))
+        assert result.path and os.path.exists(result.path)
+
+
+def test_upload_media_bytes_posts_payload():
+    auth = {"url": "https://wp.local", "username": "u", "password": "p"}
+    with patch("tools.http_client.HttpClient.post") as mock_post:
+        mock_post.return_value.status_code = 201
+        mock_post.return_value.json.return_value = {"id": 7, "source_url": "https://wp.local/a.webp"}
+        result = WordPressTool.upload_media_bytes(b"abc", "a.webp", "image/webp", auth)
+        assert result == {"id": 7, "link": "https://wp.local/a.webp"}
+        kwargs = mock_post.call_args.kwargs
+        assert kwargs["data"] == b"abc"
+        assert kwargs["headers"]["Content-Type"] == "image/webp"
+
+
+if __name__ == "__main__":
+    test_transcode_formats()
+    test_generate_image_stays_in_memory()
+    test_generate_image_persists_in_debug()
+    test_upload_media_bytes_posts_payload()
+    print("Image handoff tests passed!")
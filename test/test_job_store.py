@@ -0,0 +1,216 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import contextlib
+from unittest.mock import MagicMock
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext, _current_step
+from adk.job_store import _PG_STATEMENTS, PostgresJobStore, SQLiteJobStore, close_job_stores, get_job_store, postgres_params, sqlite_path
+
+SCHEMA = [
+    'CREATE TABLE "ContentItem" ("id" TEXT PRIMARY KEY, "title" TEXT, "status" TEXT, "publishedUrl" TEXT, "updatedAt" DATETIME)',
+    'CREATE TABLE "AgentJob" ("id" TEXT PRIMARY KEY, "status" TEXT, "logs" TEXT, "currentStep" TEXT, "contentItemId" TEXT, "updatedAt" DATETIME)',
+    'CREATE TABLE "AgentJobLog" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "jobId" TEXT NOT NULL, "seq" INTEGER NOT NULL, '
+    '"content" TEXT NOT NULL, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, UNIQUE ("jobId", "seq"))',
+    'INSERT INTO "ContentItem" ("id", "title", "status") VALUES (\'c1\', \'Draft title\', \'PROCESSING\')',
+    'INSERT INTO "AgentJob" ("id", "status", "contentItemId") VALUES (\'j1\', \'RUNNING\', \'c1\')',
+]
+
+
+def _make_db(tmp, schema=SCHEMA):
+    path = os.path.join(tmp, "dev.db")
+    conn = sqlite3.connect(path)
+    for statement in schema:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _row(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchone()
+    finally:
+        conn.close()
+
+
+def test_url_parsing():
+    assert sqlite_path("file:./dev.db?connection_limit=1") == "./dev.db"
+    params = postgres_params("postgresql://app:p%40ss@/flowpress?host=/cloudsql/proj:region:db&schema=public")
+    assert params == {"dbname": "flowpress", "user": "app", "password": "p@ss", "host": "/cloudsql/proj:region:db"}
+    params = postgres_params("postgres://u:pw@db.internal:6543/jobs?sslmode=require")
+    assert params["host"] == "db.internal" and params["port"] == 6543 and params["sslmode"] == "require"
+
+
+def test_live_logs_share_one_connection():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp)
+        url = f"file:{path}"
+        contexts = []
+        for _ in range(4):
+            context = AgentContext()
+            context.db_url = url
+            context.job_id = "j1"
+            contexts.append(context)
+
+        threads = [threading.Thread(target=lambda c=c, i=i: [c.log(f"[WriterAgent] step {i}.{n}") for n in range(10)])
+                   for i, c in enumerate(contexts)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert get_job_store(url) is get_job_store(url)
+        assert _row(path, "PRAGMA journal_mode")[0] == "wal"
+        current = _row(path, 'SELECT "currentStep" FROM "AgentJob" WHERE "id" = \'j1\'')[0]
+        assert current.startswith("WriterAgent: step")
+        # Every line is stored exactly once, with gap-free sequence numbers
+        assert _row(path, 'SELECT COUNT(*), MIN("seq"), MAX("seq"), COUNT(DISTINCT "content") FROM "AgentJobLog"') == (40, 1, 40, 40)
+        close_job_stores()
+
+
+def test_segments_are_appended_and_read_incrementally():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp)
+        context = AgentContext()
+        context.db_url = f"file:{path}"
+        context.job_id = "j1"
+        context.log("[TrendAgent] Searching")
+        context.log("[WriterAgent] Drafting\nsecond line")
+        store = get_job_store(context.db_url)
+
+        # Logs column stays untouched while running; only deltas are written
+        assert _row(path, 'SELECT "logs" FROM "AgentJob"') == (None,)
+        assert store.read_logs("j1") == [(1, "[TrendAgent] Searching"), (2, "[WriterAgent] Drafting\nsecond line")]
+        context.log("[SEOAgent] Optimizing")
+        assert store.read_logs("j1", after=2) == [(3, "[SEOAgent] Optimizing")]
+        assert store.read_logs("j1", after=1, limit=1) == [(2, "[WriterAgent] Drafting\nsecond line")]
+        assert store.job_logs("j1") is None
+        assert store.full_logs("j1") == "\n".join(context.history)
+
+        # A resumed job (fresh context, same id) continues the sequence
+        resumed = AgentContext()
+        resumed.db_url = context.db_url
+        resumed.job_id = "j1"
+        resumed.log("[ManagerAgent] Resuming")
+        assert store.read_logs("j1", after=3) == [(4, "[ManagerAgent] Resuming")]
+
+        store.finalize("j1", "final text", "PUBLISHED", None, None)
+        assert store.full_logs("j1") == "final text"
+        close_job_stores()
+
+
+def test_falls_back_to_full_rewrites_without_segment_table():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [stmt for stmt in SCHEMA if "AgentJobLog" not in stmt])
+        context = AgentContext()
+        context.db_url = f"file:{path}"
+        context.job_id = "j1"
+        context.log("[TrendAgent] Searching")
+        context.log("[WriterAgent] Drafting")
+        assert get_job_store(context.db_url).segments_available is False
+        assert _row(path, 'SELECT "logs", "currentStep" FROM "AgentJob"') == ("[TrendAgent] Searching\n[WriterAgent] Drafting", "WriterAgent: Drafting")
+        close_job_stores()
+
+
+def test_finalize_is_one_transaction():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp)
+        store = SQLiteJobStore(path)
+        store.finalize("j1", "all logs", "PUBLISHED", "https://site/p/", "Final title")
+        assert _row(path, 'SELECT "status", "logs", "currentStep" FROM "AgentJob"') == ("COMPLETED", "all logs", "Completed")
+        assert _row(path, 'SELECT "status", "publishedUrl", "title" FROM "ContentItem"') == ("PUBLISHED", "https://site/p/", "Final title")
+
+        store.fail_job("j1", "boom")
+        assert _row(path, 'SELECT "status", "logs" FROM "AgentJob"') == ("FAILED", "boom")
+        store.close()
+
+    # If the ContentItem update fails, the AgentJob update is rolled back too
+    with tempfile.TemporaryDirectory() as tmp:
+        broken = [SCHEMA[0].replace(', "publishedUrl" TEXT', "")] + SCHEMA[1:]
+        path = _make_db(tmp, broken)
+        store = SQLiteJobStore(path)
+        try:
+            store.finalize("j1", "all logs", "PUBLISHED", "https://site/p/", None)
+            assert False, "expected the ContentItem update to fail"
+        except sqlite3.OperationalError:
+            pass
+        assert _row(path, 'SELECT "status" FROM "AgentJob"') == ("RUNNING",)
+        store.close()
+
+
+class _FakePgConnection:
+    """Enough of a psycopg2 connection to count connects and PREPAREs."""
+
+    def __init__(self, log):
+        self.log = log
+        self.closed = 0
+        log["connects"] += 1
+
+    def execute(self, sql, *args):
+        if sql.startswith("PREPARE"):
+            self.log["prepares"] += 1
+
+    @contextlib.contextmanager
+    def cursor(self):
+        yield MagicMock(execute=self.execute)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def test_postgres_pool_keeps_idle_connections_and_their_prepared_statements():
+    log = {"connects": 0, "prepares": 0}
+    store = PostgresJobStore("postgresql://u@db/jobs", minconn=0, maxconn=4, connect=lambda: _FakePgConnection(log))
+    barrier = threading.Barrier(4)
+
+    def burst():
+        barrier.wait()
+        for _ in range(25):
+            store.append_logs("j1", ["line"], "step")
+
+    threads = [threading.Thread(target=burst) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    # At most maxconn connections were ever opened, all kept idle, each prepared exactly once
+    assert log["connects"] <= 4 and len(store._idle) == log["connects"]
+    assert log["prepares"] == log["connects"] * len(_PG_STATEMENTS)
+    # Closed connections are dropped; the replacement prepares its own statements
+    opened = log["connects"]
+    for conn in store._idle:
+        conn.closed = 2
+    store.ping()
+    assert log["connects"] == opened + 1 and len(store._idle) == 1
+    assert log["prepares"] == log["connects"] * len(_PG_STATEMENTS)
+    store.close()
+    assert store._idle == []
+
+
+def test_current_step_uses_last_tagged_line():
+    history = ["[TrendAgent] Searching", "[WriterAgent] Drafting\nplain continuation", "untagged"]
+    assert _current_step(history) == "WriterAgent: Drafting"
+    assert _current_step(["nothing tagged"]) is None
+
+
+if __name__ == "__main__":
+    test_url_parsing()
+    test_live_logs_share_one_connection()
+    test_segments_are_appended_and_read_incrementally()
+    test_falls_back_to_full_rewrites_without_segment_table()
+    test_finalize_is_one_transaction()
+    test_postgres_pool_keeps_idle_connections_and_their_prepared_statements()
+    test_current_step_uses_last_tagged_line()
+    print("Job store tests passed.")
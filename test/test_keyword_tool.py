@@ -0,0 +1,52 @@
+import os
+import sys
+from unittest.mock import patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.llm_backends import FakeLLMBackend
+from agents.research_agent import ResearcherAgent
+from tools.keyword_tool import KeywordTool
+
+TRENDS = """1. **Edge AI inference on smartphones** - On-device LLMs are cutting cloud costs.
+2. **TinyML for IoT sensors** - Microcontrollers running neural networks.
+3. **Neuromorphic chips** - Intel Loihi 2 and energy-efficient edge inference.
+4. Federated learning for privacy-preserving edge AI
+Source: https://example.com/edge-ai-report"""
+
+
+def test_rake_ranks_phrases_that_recur_across_trends():
+    keywords = KeywordTool.extract_keywords(TRENDS)
+    assert keywords[0] == "edge ai inference"
+    assert all("https" not in k and "**" not in k for k in keywords)
+    # Stopwords and list markers never start a phrase
+    assert not any(k.split()[0] in ("on", "for", "and", "1") for k in KeywordTool.extract_keywords(TRENDS, max_phrases=20))
+
+
+def test_query_adds_new_terms_to_the_topic():
+    assert KeywordTool.build_search_query("Edge AI", TRENDS) == "Edge AI inference energy-efficient statistics"
+    assert KeywordTool.build_search_query("", "Edge AI") == "edge ai statistics"
+    assert KeywordTool.build_search_query("Remote Work", "Hybrid work policies\nFour-day work week", max_words=6) == \
+        "Remote Work hybrid policies statistics"
+    assert KeywordTool.build_search_query("Remote work data", "Hybrid work policies").endswith("hybrid policies")
+
+
+def test_researcher_skips_the_llm_round_trip_by_default():
+    for mode, calls in (("", 1), ("llm", 2)):
+        context = AgentContext()
+        context.topic = "Edge AI"
+        context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1)
+        with patch.dict("os.environ", {"GOOGLE_SEARCH_API_KEY": "", "RESEARCH_QUERY_MODE": mode}):
+            ResearcherAgent(context).run(TRENDS)
+        assert len(backend.calls) == calls
+        if not mode:
+            assert "Generated Search Query: Edge AI inference energy-efficient statistics" in "\n".join(context.history)
+
+
+if __name__ == "__main__":
+    test_rake_ranks_phrases_that_recur_across_trends()
+    test_query_adds_new_terms_to_the_topic()
+    test_researcher_skips_the_llm_round_trip_by_default()
+    print("Keyword tool tests passed.")
@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.agents import LLMAgent
+from adk.llm_backends import FakeLLMBackend, RateLimitError, LLMTimeoutError, get_llm_backend
+
+
+class _Clock:
+    """Records requested sleeps instead of sleeping."""
+    def __init__(self):
+        self.slept = []
+
+    def __call__(self, seconds):
+        self.slept.append(seconds)
+
+
+def _agent(backend, primary="model-a", fallbacks="model-b"):
+    context = AgentContext()
+    context.llm_backend = backend
+    context.google_model_name = primary
+    context.google_fallback_models = fallbacks
+    return LLMAgent("ResearcherAgent", context, persona="researcher"), context
+
+
+def test_latency_model_and_determinism():
+    clock = _Clock()
+    backend = FakeLLMBackend(ttft=0.4, tokens_per_second=100, output_tokens=200, sleep=clock)
+    first = backend.generate("model-a", "hello")
+    assert clock.slept == [0.4 + 2.0]
+    assert first.startswith("Fake response from model-a")
+
+    # Same seed, same sequence of calls -> same outputs and outcomes
+    other = FakeLLMBackend(ttft=0.4, tokens_per_second=100, output_tokens=200, sleep=_Clock())
+    assert other.generate("model-a", "hello") == first
+
+
+def test_rate_limits_and_timeouts():
+    backend = FakeLLMBackend(rate_limit_rate=0.3, timeout_rate=0.2, seed=3, sleep=_Clock())
+    outcomes = []
+    for i in range(50):
+        try:
+            backend.generate("model-a", f"prompt {i}")
+            outcomes.append("ok")
+        except RateLimitError:
+            outcomes.append("rate_limited")
+        except LLMTimeoutError:
+            outcomes.append("timeout")
+    assert {"ok", "rate_limited", "timeout"} == set(outcomes)
+    assert backend.outcome_counts()["rate_limited"] == outcomes.count("rate_limited")
+
+    slow = FakeLLMBackend(ttft=5, sleep=_Clock())
+    try:
+        slow.generate("model-a", "x", timeout=2)
+        assert False, "expected timeout"
+    except LLMTimeoutError:
+        pass
+
+
+def test_agent_falls_back_without_simulation():
+    backend = FakeLLMBackend(failing_models=["model-a"], ttft=0, output_tokens=5, sleep=_Clock())
+    agent, context = _agent(backend)
+    output = agent.run("topic")
+    assert output.startswith("Fake response from model-b")
+    assert not context.is_simulated
+    assert [c["outcome"] for c in backend.calls] == ["error", "ok"]
+
+
+def test_agent_simulates_when_every_model_fails():
+    backend = FakeLLMBackend(rate_limit_rate=1.0, sleep=_Clock())
+    agent, context = _agent(backend)
+    agent.run("topic")
+    assert context.is_simulated
+    assert backend.outcome_counts() == {"rate_limited": 2}
+
+
+def test_max_concurrent_returns_429():
+    release = threading.Event()
+    backend = FakeLLMBackend(max_concurrent=1, ttft=0, output_tokens=1, sleep=lambda s: release.wait(1))
+    results = []
+
+    def call():
+        try:
+            backend.generate("model-a", "p")
+            results.append("ok")
+        except RateLimitError:
+            results.append("429")
+
+    first = threading.Thread(target=call)
+    first.start()
+    while backend.in_flight == 0:
+        pass
+    call()
+    release.set()
+    first.join()
+    assert sorted(results) == ["429", "ok"]
+
+
+def test_env_selects_shared_fake():
+    os.environ["LLM_BACKEND"] = "fake"
+    try:
+        context = AgentContext()
+        assert isinstance(get_llm_backend(context), FakeLLMBackend)
+        assert get_llm_backend(context) is get_llm_backend(AgentContext())
+    finally:
+        del os.environ["LLM_BACKEND"]
+
+
+if __name__ == "__main__":
+    test_latency_model_and_determinism()
+    test_rate_limits_and_timeouts()
+    test_agent_falls_back_without_simulation()
+    test_agent_simulates_when_every_model_fails()
+    test_max_concurrent_returns_429()
+    test_env_selects_shared_fake()
+    print("LLM backend tests passed.")
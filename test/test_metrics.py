@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.metrics import Registry, Counter, Gauge, Histogram, LLM_DURATION, LLM_FALLBACKS, SIMULATION_ENTRIES
+from adk.core import AgentContext
+from adk.agents import LLMAgent
+from adk.llm_backends import FakeLLMBackend
+
+
+def test_exposition_format():
+    registry = Registry()
+    hits = registry.register(Counter("demo_hits_total", "Hits.", ("cache",)))
+    inflight = registry.register(Gauge("demo_in_flight", "In flight."))
+    latency = registry.register(Histogram("demo_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0)))
+
+    hits.inc(cache="image")
+    hits.inc(2, cache="image")
+    inflight.inc()
+    latency.observe(0.05, stage="seo")
+    latency.observe(0.5, stage="seo")
+    latency.observe(5, stage="seo")
+
+    text = registry.render()
+    print(text)
+    assert "# TYPE demo_hits_total counter" in text
+    assert 'demo_hits_total{cache="image"} 3' in text
+    assert "demo_in_flight 1" in text
+    assert 'demo_seconds_bucket{stage="seo",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="seo",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="seo",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="seo"} 3' in text
+
+
+def test_llm_agent_records_fallbacks_and_simulation():
+    context = AgentContext()
+    context.google_model_name = "model-a"
+    context.google_fallback_models = "model-b"
+    context.llm_backend = FakeLLMBackend(rate_limit_rate=1.0, sleep=lambda s: None)
+    agent = LLMAgent("MetricsAgent", context, persona="tester")
+    agent.run("hello")
+
+    assert LLM_FALLBACKS.value(agent="MetricsAgent", model="model-a") == 1
+    assert LLM_FALLBACKS.value(agent="MetricsAgent", model="model-b") == 1
+    assert SIMULATION_ENTRIES.value(agent="MetricsAgent") == 1
+    assert LLM_DURATION.count(agent="MetricsAgent", model="model-a", outcome="error") == 1
+
+
+def test_recording_overhead_is_small():
+    latency = Histogram("overhead_seconds", "Overhead.", ("agent",))
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        latency.observe(0.2, agent="SEOAgent")
+    per_call = (time.perf_counter() - start) / n
+    print(f"observe() cost: {per_call * 1e6:.2f} us")
+    assert per_call < 50e-6
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_llm_agent_records_fallbacks_and_simulation()
+    test_recording_overhead_is_small()
+    print("Metrics tests passed!")
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+from unittest.mock import AsyncMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.routing import job_routes, parse_routes, resolve
+from adk.metrics import LLM_ROUTE_DURATION
+from adk.llm_backends import FakeLLMBackend
+from agents.research_agent import ResearcherAgent
+from agents.media_agent import MediaAgent
+
+
+def _context(**routes):
+    context = AgentContext()
+    context.google_model_name = "gemini-3-pro-preview"
+    context.google_fallback_models = "gemini-2.5-pro, gemini-3-pro-preview"
+    context.google_model_routes = routes or None
+    return context
+
+
+def test_default_routes_send_short_calls_to_the_fast_model():
+    with patch.dict("os.environ", {"GOOGLE_FAST_MODEL": "gemini-2.5-flash-lite", "GOOGLE_MODEL_ROUTES": ""}):
+        context = _context()
+        assert resolve("ResearcherAgent", "query_extraction", context) == (
+            "query_extraction", ["gemini-2.5-flash-lite", "gemini-3-pro-preview", "gemini-2.5-pro"])
+        assert resolve("WriterAgent", "writing", context) == ("writing", ["gemini-3-pro-preview", "gemini-2.5-pro"])
+        assert resolve("TrendAgent", "trends", context) == ("*", ["gemini-3-pro-preview", "gemini-2.5-pro"])
+        # Without a fast model the short calls start on the user's model
+        with patch.dict("os.environ", {"GOOGLE_FAST_MODEL": ""}):
+            assert resolve("MediaAgent", "alt_text", context)[1] == ["gemini-3-pro-preview", "gemini-2.5-pro"]
+
+
+def test_user_routes_win_over_env_and_defaults():
+    env = {"GOOGLE_MODEL_ROUTES": "WriterAgent=gemini-2.5-flash; *=gemini-2.0-flash|$primary"}
+    with patch.dict("os.environ", env):
+        context = _context(**parse_routes("writing=gemini-3-pro-preview|$fallbacks\nTrendAgent=$fast"))
+        assert resolve("WriterAgent", "writing", context) == ("writing", ["gemini-3-pro-preview", "gemini-2.5-pro"])
+        # The env's agent route beats the default for its call type, the default beats the env's "*"
+        assert resolve("WriterAgent", "section", _context()) == ("WriterAgent", ["gemini-2.5-flash"])
+        assert resolve("SEOAgent", "seo_rewrite", _context())[0] == "seo_rewrite"
+        assert resolve("SEOAgent", "keywords", _context())[1] == ["gemini-2.0-flash", "gemini-3-pro-preview"]
+        assert resolve("TrendAgent", "trends", context)[0] == "TrendAgent"
+
+    assert parse_routes(json.dumps({"alt_text": ["gemini-2.5-flash-lite", "$primary"]})) == {
+        "alt_text": ["gemini-2.5-flash-lite", "$primary"]}
+    for bad in ("writing", "writing=", "writing=$cheap", '{"writing": 5}'):
+        try:
+            parse_routes(bad)
+            assert False, f"Expected {bad!r} to be rejected"
+        except (ValueError, TypeError):
+            pass
+
+
+def test_saved_routes_that_do_not_parse_are_ignored_with_a_warning():
+    context = AgentContext()
+    assert job_routes("alt_text=$fast", context.log) == {"alt_text": ["$fast"]}
+    assert job_routes("", context.log) is None
+    for bad in ("writing=$cheap", '{"writing": 5}', "{not json"):
+        assert job_routes(bad, context.log) is None
+    assert sum("Ignoring model routes" in line for line in context.history) == 3
+
+
+def test_agents_follow_their_route_and_record_route_latency():
+    context = _context(query_extraction=["fast-model", "$primary"], alt_text=["broken-model", "$primary"])
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1, failing_models=["broken-model"])
+    with patch.dict("os.environ", {"GOOGLE_SEARCH_API_KEY": "", "RESEARCH_QUERY_MODE": "llm"}):
+        ResearcherAgent(context).run("Edge AI")
+    ok_before = LLM_ROUTE_DURATION.count(route="alt_text", model="gemini-3-pro-preview", outcome="ok")
+    with patch("tools.image_tool.ImageTool.agenerate_image", new_callable=AsyncMock, return_value=None):
+        MediaAgent(context).run("# Edge AI\n\nBody")
+
+    models = [call["model"] for call in backend.calls]
+    assert models[:2] == ["fast-model", "gemini-3-pro-preview"]
+    # The alt text fell back past the broken model, and the route's time includes the failed attempt
+    assert models[-2:] == ["broken-model", "gemini-3-pro-preview"]
+    assert LLM_ROUTE_DURATION.count(route="query_extraction", model="fast-model", outcome="ok") >= 1
+    assert LLM_ROUTE_DURATION.count(route="alt_text", model="gemini-3-pro-preview", outcome="ok") == ok_before + 1
+    assert any("Model route (query_extraction): fast-model -> gemini-3-pro-preview" in line
+               for line in context.history)
+
+
+if __name__ == "__main__":
+    test_default_routes_send_short_calls_to_the_fast_model()
+    test_user_routes_win_over_env_and_defaults()
+    test_saved_routes_that_do_not_parse_are_ignored_with_a_warning()
+    test_agents_follow_their_route_and_record_route_latency()
+    print("Model routing tests passed.")
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.scheduler import FairScheduler, parse_weights, tenant_key
+from adk.metrics import SCHEDULER_QUEUE_WAIT, SCHEDULER_QUEUED
+
+
+def _order_of(scheduler, submissions):
+    """Hold the only slot while everything is queued, then release and return the run order."""
+    gate = threading.Event()
+    order = []
+    scheduler.submit(gate.wait, tenant="gate")
+    futures = [scheduler.submit(lambda name=name: order.append(name), **kwargs) for name, kwargs in submissions]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.shutdown()
+    return order
+
+
+def test_tenants_share_fairly():
+    submissions = [(f"a{i}", {"tenant": "A"}) for i in range(6)] + [(f"b{i}", {"tenant": "B"}) for i in range(2)]
+    order = _order_of(FairScheduler(max_concurrent=1, name="test"), submissions)
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3", "a4", "a5"]
+
+
+def test_weights_scale_the_share():
+    submissions = [(f"a{i}", {"tenant": "A"}) for i in range(6)] + [(f"b{i}", {"tenant": "B"}) for i in range(2)]
+    order = _order_of(FairScheduler(max_concurrent=1, weights={"A": 2}, name="test"), submissions)
+    assert order == ["a0", "a1", "b0", "a2", "a3", "b1", "a4", "a5"]
+    assert parse_weights("user:1=2, key:abc=0.5") == {"user:1": 2.0, "key:abc": 0.5}
+
+
+def test_priority_then_deadline_within_a_tenant():
+    submissions = [
+        ("late", {"tenant": "A", "deadline": 300}),
+        ("early", {"tenant": "A", "deadline": 100}),
+        ("urgent", {"tenant": "A", "priority": 5, "deadline": 900}),
+        ("undated", {"tenant": "A"}),
+    ]
+    order = _order_of(FairScheduler(max_concurrent=1, name="test"), submissions)
+    assert order == ["urgent", "early", "late", "undated"]
+
+
+def test_per_tenant_and_per_site_caps():
+    scheduler = FairScheduler(max_concurrent=4, per_tenant=1, per_site=2, name="test")
+    running = {}
+    peaks = {}
+    lock = threading.Lock()
+
+    def job(key):
+        with lock:
+            running[key] = running.get(key, 0) + 1
+            peaks[key] = max(peaks.get(key, 0), running[key])
+        time.sleep(0.02)
+        with lock:
+            running[key] -= 1
+
+    futures = []
+    for tenant, site in [("A", "s1"), ("A", "s1"), ("A", "s2"), ("B", "s1"), ("C", "s1"), ("D", "s2")]:
+        futures.append(scheduler.submit(lambda tenant=tenant, site=site: (job(tenant), job(site)), tenant=tenant, site=site))
+        futures.append(scheduler.submit(lambda tenant=tenant, site=site: job(f"{tenant}+{site}"), tenant=tenant, site=site))
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.shutdown()
+    assert peaks["A"] == 1
+    assert all(peaks.get(f"{t}+{s}", 0) <= 1 for t in "ABCD" for s in ("s1", "s2"))
+    assert peaks["s1"] <= 2
+
+
+def test_queue_wait_is_recorded_and_errors_propagate():
+    before = SCHEDULER_QUEUE_WAIT.count(queue="wait-test")
+    scheduler = FairScheduler(max_concurrent=1, name="wait-test")
+
+    def boom():
+        raise ValueError("pipeline failed")
+
+    ok = scheduler.submit(lambda: "done", tenant="A")
+    failed = scheduler.submit(boom, tenant="A")
+    assert ok.result(timeout=5) == "done"
+    try:
+        failed.result(timeout=5)
+        assert False, "expected the job's exception"
+    except ValueError:
+        pass
+    scheduler.shutdown()
+    assert SCHEDULER_QUEUE_WAIT.count(queue="wait-test") == before + 2
+    assert SCHEDULER_QUEUED.value(queue="wait-test") == 0
+    assert scheduler.snapshot() == {"running": 0, "queued": 0, "tenants": {}, "sites": {}}
+
+
+def test_explicit_caps_are_kept_and_siteless_jobs_are_not_site_capped():
+    for cap in ("max_concurrent", "per_tenant", "per_site"):
+        try:
+            FairScheduler(name="test", **{cap: 0})
+            assert False, f"expected {cap}=0 to be rejected"
+        except ValueError as e:
+            assert cap in str(e)
+
+    scheduler = FairScheduler(max_concurrent=4, per_tenant=4, per_site=1, name="test")
+    started = threading.Barrier(4, timeout=5)
+    # Four jobs without a site, from the same tenant, run at once despite per_site=1
+    futures = [scheduler.submit(started.wait, tenant="A", site=site) for site in (None, "", None, "")]
+    for future in futures:
+        future.result(timeout=5)
+    assert scheduler.snapshot()["sites"] == {}
+    scheduler.shutdown()
+
+
+def test_tenant_key_never_exposes_api_keys():
+    assert tenant_key("u1", "secret-key") == "user:u1"
+    key = tenant_key(None, "secret-key")
+    assert key.startswith("key:") and "secret" not in key
+    assert tenant_key() == "default"
+
+
+if __name__ == "__main__":
+    test_tenants_share_fairly()
+    test_weights_scale_the_share()
+    test_priority_then_deadline_within_a_tenant()
+    test_per_tenant_and_per_site_caps()
+    test_queue_wait_is_recorded_and_errors_propagate()
+    test_explicit_caps_are_kept_and_siteless_jobs_are_not_site_capped()
+    test_tenant_key_never_exposes_api_keys()
+    print("Scheduler tests passed.")
@@ -0,0 +1,87 @@
+import os
+import sys
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.llm_backends import FakeLLMBackend
+from agents.trend_agent import TrendAgent
+from tools.search_tool import SearchTool
+
+SEARCH_ENV = {"GOOGLE_SEARCH_API_KEY": "key", "GOOGLE_SEARCH_CX": "cx"}
+
+# Per query: result links in rank order
+PAGES = {
+    "news": ["https://www.site.com/a/?utm_source=x", "https://news.org/b#top"],
+    "statistics": ["http://site.com/a", "https://data.org/c", "https://dead.org/d"],
+    "how to": ["https://guide.org/e", "https://news.org/b"],
+}
+
+
+def _fake_search(calls, in_flight=None):
+    in_flight = in_flight if in_flight is not None else {"now": 0, "peak": 0}
+
+    async def aget(url, params=None, tool=None):
+        calls.append(params["q"])
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        response = MagicMock()
+        key = next((k for k in PAGES if k in params["q"]), None)
+        response.json.return_value = {"items": [{"title": link, "link": link, "snippet": "s"} for link in PAGES.get(key, [])]}
+        return response
+    return aget
+
+
+def test_canonical_url():
+    assert SearchTool.canonical_url("https://www.Site.com/a/?utm_source=x&b=2&a=1#frag") == "https://site.com/a?a=1&b=2"
+    assert SearchTool.canonical_url("http://site.com/a") == SearchTool.canonical_url("https://site.com/a/")
+    assert SearchTool.canonical_url("https://site.com") == "https://site.com/"
+    # Only utm_ is a prefix; other tracking names match exactly, so real parameters survive
+    assert SearchTool.canonical_url("https://site.com/p?ref=hn&UTM_Medium=x&gclid=1") == "https://site.com/p"
+    assert SearchTool.canonical_url("https://site.com/p?reference=3&refid=7&refresh=1&ref=x") == "https://site.com/p?reference=3&refid=7&refresh=1"
+
+
+def test_multi_search_runs_queries_at_once_and_merges_by_canonical_url():
+    calls, in_flight = [], {"now": 0, "peak": 0}
+    validate = AsyncMock(side_effect=lambda url: "dead.org" not in url)
+    with patch.dict("os.environ", SEARCH_ENV), \
+         patch("tools.http_client.HttpClient.aget", side_effect=_fake_search(calls, in_flight)), \
+         patch("tools.link_validator_tool.LinkValidatorTool.ais_link_valid", validate):
+        results = asyncio.run(SearchTool.amulti_search(["x news", "x statistics", "how to x"]))
+
+    # All three searches were in flight together
+    assert len(calls) == 3 and in_flight["peak"] == 3
+    links = [r["link"] for r in results]
+    # Pages found by two queries rank first; the first-seen URL form is kept; dead links are dropped
+    assert links == ["https://www.site.com/a/?utm_source=x", "https://news.org/b#top", "https://guide.org/e", "https://data.org/c"]
+    # Each unique page is validated once
+    assert validate.await_count == 5
+
+
+def test_trend_agent_fans_out_query_variants():
+    calls = []
+    context = AgentContext()
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=lambda model, prompt: prompt)
+    with patch.dict("os.environ", SEARCH_ENV), \
+         patch("tools.http_client.HttpClient.aget", side_effect=_fake_search(calls)), \
+         patch("tools.link_validator_tool.LinkValidatorTool.ais_link_valid", AsyncMock(return_value=True)):
+        output = TrendAgent(context).run("Edge AI")
+
+    assert len(calls) == 5
+    assert "Edge AI latest news" in calls and "how to Edge AI" in calls and "Edge AI statistics" in calls
+    assert any(q.startswith("Edge AI trends 20") for q in calls)
+    # One prompt with the merged results
+    assert len(backend.calls) == 1 and output.count("'link': 'https://news.org/b") == 1
+    assert any("Searched 5 query variants: 5 unique results" in line for line in context.history)
+
+
+if __name__ == "__main__":
+    test_canonical_url()
+    test_multi_search_runs_queries_at_once_and_merges_by_canonical_url()
+    test_trend_agent_fans_out_query_variants()
+    print("Search fan-out tests passed.")
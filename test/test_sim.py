@@ -25,14 +25,12 @@ def test_simulation_flow():
     # SEOAgent.run will call _simulate_llm_response in agents.py
     seo_output = seo_agent.run(topic)
     print("\n--- SEO Output ---")
-    print(seo_output)
+    print(seo_output.seo and {k: getattr(seo_output.seo, k) for k in seo_output.seo.__slots__})
+    print(seo_output.body)
     print("--- End SEO Output ---\n")
     
-    # Check if Category and Tags are in the output (they SHOULD be after my agents.py edit)
-    # Wait, I failed the agents.py edit. Let me check if I actually succeeded or failed.
-    # I failed it 3 times. Let me try to edit it one more time before running the test.
-    
-    if "Category:" in seo_output and "Tags:" in seo_output:
+    # SEOAgent now returns a parsed Article; metadata lives on article.seo
+    if seo_output.seo and seo_output.seo.categories and seo_output.seo.tags:
         print("SUCCESS: Category and Tags found in simulation output.")
     else:
         print("FAILURE: Category or Tags missing from simulation output.")
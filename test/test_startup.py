@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Ensure bench is in python path
+sys.path.append(os.path.join(os.getcwd(), "bench"))
+
+from startup import startup_imports, time_to_first_response
+
+
+def test_heavy_modules_are_lazy():
+    eager = startup_imports()
+    assert eager == [], f"Imported at startup: {eager}"
+
+
+def test_health_check_responds_after_cold_start():
+    elapsed = time_to_first_response()
+    print(f"Time to first / response: {elapsed * 1000:.0f} ms")
+    # Generous bound for shared CI machines; bench/startup.py --max-seconds sets the real budget
+    assert elapsed < 10
+
+
+if __name__ == "__main__":
+    test_heavy_modules_are_lazy()
+    test_health_check_responds_after_cold_start()
+    print("Startup tests passed.")
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.agents import LLMAgent, WorkflowAgent
+from adk.llm_backends import FakeLLMBackend
+from adk.tracing import span, load_spans, critical_path, format_waterfall
+
+
+def test_spans_nest_workflow_agent_llm():
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_file = os.path.join(tmp, "traces.jsonl")
+        context = AgentContext()
+        context.job_id = "job-trace"
+        context.llm_backend = FakeLLMBackend(ttft=0.001, output_tokens=1, responder=lambda model, prompt: "result text")
+        workflow = WorkflowAgent("ManagerAgent", context, [
+            LLMAgent("TrendAgent", context, persona="trends"),
+            LLMAgent("WriterAgent", context, persona="writer"),
+        ])
+        with patch.dict("os.environ", {"TRACE_FILE": trace_file, "GOOGLE_MODEL_NAME": "gemini-test"}):
+            workflow.run("Edge AI")
+
+        spans = load_spans(trace_file)
+        by_name = {s["name"]: s for s in spans}
+        assert all(s["trace_id"] == "job-trace" for s in spans)
+
+        root = by_name["workflow:ManagerAgent"]
+        writer = by_name["agent:WriterAgent"]
+        assert root["parent_id"] is None
+        assert writer["parent_id"] == root["span_id"]
+
+        llm_spans = [s for s in spans if s["name"] == "llm.generate"]
+        assert len(llm_spans) == 2
+        assert {s["parent_id"] for s in llm_spans} == {writer["span_id"], by_name["agent:TrendAgent"]["span_id"]}
+        assert llm_spans[0]["attributes"]["model"] == "gemini-test"
+        assert llm_spans[0]["attributes"]["prompt_chars"] > 0
+
+        path = [s["name"] for s in critical_path(spans)]
+        assert path == ["workflow:ManagerAgent", "agent:WriterAgent", "llm.generate"]
+
+        text = format_waterfall(spans)
+        print(text)
+        assert "Critical path: workflow:ManagerAgent" in text
+
+
+def test_error_spans_are_marked():
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_file = os.path.join(tmp, "traces.jsonl")
+        with patch.dict("os.environ", {"TRACE_FILE": trace_file}):
+            try:
+                with span("root", trace_id="t1"):
+                    with span("http GET", url="https://slow.example"):
+                        raise TimeoutError("read timeout")
+            except TimeoutError:
+                pass
+        spans = load_spans(trace_file, "t1")
+        failed = [s for s in spans if s["status"] == "error"]
+        assert len(failed) == 2
+        assert "read timeout" in failed[0]["attributes"]["error"]
+
+
+if __name__ == "__main__":
+    test_spans_nest_workflow_agent_llm()
+    test_error_spans_are_marked()
+    print("Tracing tests passed!")
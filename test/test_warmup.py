@@ -0,0 +1,70 @@
+import os
+import sys
+import sqlite3
+import subprocess
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Ensure src and test helpers are in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+sys.path.append(os.path.join(os.getcwd(), "test"))
+
+from fake_wordpress import FakeWordPressServer
+from adk.llm_backends import GeminiBackend
+from adk.warmup import warm_up
+from tools.http_client import HttpClient
+
+
+def test_warm_up_reports_each_step():
+    HttpClient.reset()
+    with tempfile.TemporaryDirectory() as tmp, FakeWordPressServer() as wp:
+        db_path = os.path.join(tmp, "dev.db")
+        sqlite3.connect(db_path).close()
+        client = MagicMock()
+        env = {"GOOGLE_API_KEY": "warm-key", "WP_URL": wp.url, "DATABASE_URL": f"file:{db_path}", "GOOGLE_SEARCH_API_KEY": ""}
+        with patch.dict("os.environ", env), patch("google.genai.Client", return_value=client), \
+             patch.dict(GeminiBackend._clients, clear=True):
+            report = warm_up().to_dict()
+            # The client is cached for the first job
+            assert GeminiBackend._clients[("api_key", "warm-key")] is client
+
+        print(report)
+        steps = report["steps"]
+        assert report["state"] == "done"
+        assert steps["imports"]["status"] == "ok"
+        assert steps["genai_client"]["status"] == "ok"
+        client.models.get.assert_called_once()
+        assert steps[f"tls:{wp.url}"]["status"] == "ok"
+        assert steps["database"] == {"status": "ok", "seconds": steps["database"]["seconds"], "detail": "sqlite"}
+        assert "tls:google_search" not in steps
+        # The WordPress session is now pooled for the publisher
+        assert wp.url in HttpClient.export_stats()
+
+
+def test_warm_up_skips_and_survives_failures():
+    env = {"GOOGLE_API_KEY": "", "USE_VERTEX_AI": "false", "WP_URL": "http://127.0.0.1:9", "DATABASE_URL": ""}
+    with patch.dict("os.environ", env):
+        steps = warm_up().to_dict()["steps"]
+    assert steps["genai_client"]["status"] == "skipped"
+    assert steps["database"]["status"] == "skipped"
+    assert steps["tls:http://127.0.0.1:9"]["status"] == "error"
+
+
+def test_warm_up_is_opt_in_and_vertex_skips_the_ping():
+    env = {k: v for k, v in os.environ.items() if k != "WARMUP_ON_START"}
+    code = "import sys; sys.path.append('src'); from adk.warmup import WARMUP_ON_START; print(WARMUP_ON_START)"
+    assert subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True).stdout.strip() == "False"
+
+    backend = MagicMock()
+    with patch.dict("os.environ", {"GOOGLE_API_KEY": "", "WP_URL": "", "DATABASE_URL": ""}), \
+         patch("adk.llm_backends.GeminiBackend.from_context", return_value=backend):
+        steps = warm_up().to_dict()["steps"]
+    assert steps["genai_client"] == {"status": "ok", "seconds": steps["genai_client"]["seconds"], "detail": "client built"}
+    backend.client.models.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    test_warm_up_reports_each_step()
+    test_warm_up_skips_and_survives_failures()
+    test_warm_up_is_opt_in_and_vertex_skips_the_ping()
+    print("Warm-up tests passed.")
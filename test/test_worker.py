@@ -0,0 +1,285 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import uuid
+
+# Ensure src (and the repo root, for worker.py) are in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+sys.path.append(os.getcwd())
+
+from adk.job_store import SQLiteJobStore, PostgresJobStore, close_job_stores, get_job_store, postgres_params, _pooled_connection_class
+from worker import Worker, WORKER_RECENT_RESULTS
+
+SCHEMA = [
+    'CREATE TABLE "User" ("id" TEXT PRIMARY KEY, "googleApiKey" TEXT, "googleModelName" TEXT, "googleFallbackModels" TEXT, "googleModelRoutes" TEXT)',
+    'CREATE TABLE "Website" ("id" TEXT PRIMARY KEY, "url" TEXT, "username" TEXT, "appPassword" TEXT, "userId" TEXT)',
+    'CREATE TABLE "ContentItem" ("id" TEXT PRIMARY KEY, "title" TEXT, "topic" TEXT, "status" TEXT, "publishedUrl" TEXT, '
+    '"scheduledFor" DATETIME, "priority" INTEGER NOT NULL DEFAULT 0, "websiteId" TEXT, "updatedAt" DATETIME)',
+    'CREATE TABLE "AgentJob" ("id" TEXT PRIMARY KEY, "status" TEXT DEFAULT \'PENDING\', "logs" TEXT, "currentStep" TEXT, '
+    '"contentItemId" TEXT, "heartbeatAt" DATETIME, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, "updatedAt" DATETIME)',
+    'CREATE TABLE "AgentJobLog" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "jobId" TEXT NOT NULL, "seq" INTEGER NOT NULL, '
+    '"content" TEXT NOT NULL, "createdAt" DATETIME DEFAULT CURRENT_TIMESTAMP, UNIQUE ("jobId", "seq"))',
+    'INSERT INTO "User" VALUES (\'u1\', \'user-key\', \'gemini-test\', NULL, \'alt_text=gemini-lite|$primary\')',
+    'INSERT INTO "User" VALUES (\'u2\', \'other-key\', NULL, NULL, NULL)',
+    'INSERT INTO "Website" VALUES (\'w1\', \'https://blog.example\', \'admin\', \'secret\', \'u1\')',
+    'INSERT INTO "Website" VALUES (\'w2\', \'https://other.example\', \'editor\', \'pw\', \'u2\')',
+]
+
+
+def _make_db(tmp, items):
+    path = os.path.join(tmp, "dev.db")
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    # Prisma stores epoch milliseconds; hand-written rows may hold ISO text, so both are covered
+    conn.executemany('INSERT INTO "ContentItem" ("id", "title", "topic", "status", "scheduledFor", "websiteId") VALUES (?, ?, ?, ?, ?, ?)', items)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_claims_only_due_items_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [
+            ("c1", "Due (ms)", "Edge AI", "SCHEDULED", 1700000000000, "w1"),
+            ("c2", "Due (text)", "Vector databases", "SCHEDULED", "2024-01-01T09:00:00.000Z", "w1"),
+            ("c3", "Future", "Quantum", "SCHEDULED", "2999-01-01T00:00:00.000Z", "w1"),
+            ("c4", "Draft", "Drafts", "DRAFT", 1700000000000, "w1"),
+        ])
+        store = get_job_store(f"file:{path}")
+        claims = store.claim_due("worker-a", 10)
+        assert sorted(c["content_id"] for c in claims) == ["c1", "c2"]
+        assert claims[0]["wp_url"] == "https://blog.example" and claims[0]["google_api_key"] == "user-key"
+        assert claims[0]["google_model_routes"] == "alt_text=gemini-lite|$primary"
+        # Nothing left for a second worker
+        assert store.claim_due("worker-b", 10) == []
+        assert _rows(path, 'SELECT "id", "status" FROM "ContentItem" ORDER BY "id"')[:2] == [("c1", "PROCESSING"), ("c2", "PROCESSING")]
+        assert sorted(_rows(path, 'SELECT "contentItemId", "status" FROM "AgentJob"')) == [("c1", "RUNNING"), ("c2", "RUNNING")]
+        assert len(_rows(path, 'SELECT * FROM "WorkerClaim" WHERE "workerId" = \'worker-a\'')) == 2
+        close_job_stores()
+
+
+def test_concurrent_workers_never_double_claim():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [(f"c{i}", f"Item {i}", f"Topic {i}", "SCHEDULED", 1700000000000 + i, "w1") for i in range(40)])
+        claimed = []
+
+        def claim(worker_id):
+            # A connection per worker, as with separate processes
+            store = SQLiteJobStore(path)
+            while True:
+                batch = store.claim_due(worker_id, 3)
+                if not batch:
+                    store.close()
+                    return
+                claimed.extend(c["content_id"] for c in batch)
+
+        threads = [threading.Thread(target=claim, args=(f"worker-{n}",)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(claimed) == sorted(f"c{i}" for i in range(40))
+        assert _rows(path, 'SELECT COUNT(*) FROM "AgentJob"') == [(40,)]
+
+
+def test_claims_take_users_in_turn_by_priority():
+    with tempfile.TemporaryDirectory() as tmp:
+        # u1 scheduled a long backlog first; u2 has one item due later
+        items = [(f"a{i}", f"A{i}", f"A {i}", "SCHEDULED", 1700000000000 + i, "w1") for i in range(10)]
+        items.append(("b0", "B0", "B 0", "SCHEDULED", 1700000009999, "w2"))
+        path = _make_db(tmp, items)
+        conn = sqlite3.connect(path)
+        conn.execute('UPDATE "ContentItem" SET "priority" = 5 WHERE "id" = \'a7\'')
+        conn.commit()
+        conn.close()
+        claims = get_job_store(f"file:{path}").claim_due("worker-a", 3)
+        assert [c["content_id"] for c in claims] == ["a7", "b0", "a0"]
+        assert claims[0]["priority"] == 5 and claims[1]["user_id"] == "u2"
+        close_job_stores()
+
+
+def test_worker_runs_claims_on_bounded_pool_and_records_outcome():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [
+            ("c1", "Good", "Edge AI", "SCHEDULED", 1700000000000, "w1"),
+            ("c2", "Bad", "Explodes", "SCHEDULED", 1700000000001, "w1"),
+            ("c3", "Later", "Third", "SCHEDULED", 1700000000002, "w1"),
+        ])
+        running = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def pipeline(context, topic):
+            with lock:
+                running.append(topic)
+                peak[0] = max(peak[0], len(running))
+            try:
+                assert context.wp_config["url"] == "https://blog.example"
+                context.log(f"[PublisherAgent] Publishing {topic}")
+                if topic == "Explodes":
+                    raise RuntimeError("boom")
+                return "**Published (https://blog.example):** [View Post](https://blog.example/edge-ai/)"
+            finally:
+                with lock:
+                    running.remove(topic)
+
+        worker = Worker(f"file:{path}", concurrency=2, batch_size=2, poll_seconds=0, worker_id="w-test", pipeline=pipeline)
+        # At most batch_size items are claimed per poll
+        assert worker.poll_once() == 2
+        worker.stop()
+        assert peak[0] <= 2
+        assert sorted(worker.results) == [("c1", "PUBLISHED"), ("c2", "FAILED")]
+        # Only recent outcomes are kept, so run_forever does not grow without bound
+        assert worker.results.maxlen == WORKER_RECENT_RESULTS
+        statuses = dict(_rows(path, 'SELECT "id", "status" FROM "ContentItem"'))
+        assert statuses == {"c1": "PUBLISHED", "c2": "FAILED", "c3": "SCHEDULED"}
+        jobs = dict(_rows(path, 'SELECT "contentItemId", "status" FROM "AgentJob"'))
+        assert jobs == {"c1": "COMPLETED", "c2": "FAILED"}
+        assert "ERROR: boom" in _rows(path, 'SELECT "logs" FROM "AgentJob" WHERE "contentItemId" = \'c2\'')[0][0]
+        assert _rows(path, 'SELECT COUNT(*) FROM "WorkerClaim"') == [(0,)]
+        close_job_stores()
+
+
+def test_expired_claims_are_reclaimed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [
+            ("c1", "Crashed", "Edge AI", "SCHEDULED", 1700000000000, "w1"),
+            ("c2", "Alive", "Vector databases", "SCHEDULED", 1700000000001, "w1"),
+        ])
+        store = get_job_store(f"file:{path}")
+        first = {c["content_id"]: c["job_id"] for c in store.claim_due("worker-a", 10, lease_seconds=300)}
+        store.append_logs(first["c1"], ["[ResearchAgent] Researching"], "Researching")
+        # worker-a died: c1's heartbeat stopped ten minutes ago, while c2's is still current
+        conn = sqlite3.connect(path)
+        conn.execute('UPDATE "AgentJob" SET "heartbeatAt" = datetime(\'now\', \'-600 seconds\') WHERE "id" = ?', (first["c1"],))
+        conn.commit()
+        conn.close()
+        store.heartbeat([first["c2"]])
+
+        again = store.claim_due("worker-b", 10, lease_seconds=300)
+        assert [c["content_id"] for c in again] == ["c1"]
+        assert again[0]["job_id"] != first["c1"]
+        status, logs = _rows(path, f'SELECT "status", "logs" FROM "AgentJob" WHERE "id" = \'{first["c1"]}\'')[0]
+        assert status == "FAILED"
+        assert logs.startswith("[ResearchAgent] Researching\n[Worker] Claim expired")
+        assert _rows(path, 'SELECT "contentItemId", "workerId" FROM "WorkerClaim" ORDER BY 1') == [("c1", "worker-b"), ("c2", "worker-a")]
+        assert _rows(path, 'SELECT "status" FROM "ContentItem" WHERE "id" = \'c1\'') == [("PROCESSING",)]
+        close_job_stores()
+
+
+def test_worker_heartbeat_keeps_its_claims():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _make_db(tmp, [("c1", "Slow", "Edge AI", "SCHEDULED", 1700000000000, "w1")])
+        started = threading.Event()
+        release = threading.Event()
+
+        def pipeline(context, topic):
+            started.set()
+            release.wait(5)
+            return "**Published (https://blog.example):** [View Post](https://blog.example/edge-ai/)"
+
+        worker = Worker(f"file:{path}", concurrency=1, batch_size=1, worker_id="w-slow", pipeline=pipeline, lease_seconds=3)
+        assert worker.poll_once() == 1
+        assert started.wait(5)
+        conn = sqlite3.connect(path)
+        conn.execute('UPDATE "AgentJob" SET "heartbeatAt" = datetime(\'now\', \'-600 seconds\')')
+        conn.commit()
+        conn.close()
+        worker.heartbeat()
+        # The beat renewed the lease, so another worker leaves the running job alone
+        assert SQLiteJobStore(path).claim_due("w-other", 10, lease_seconds=3) == []
+        release.set()
+        worker.stop()
+        assert list(worker.results) == [("c1", "PUBLISHED")]
+        assert _rows(path, 'SELECT "status" FROM "AgentJob"') == [("COMPLETED",)]
+        close_job_stores()
+
+
+_PG_SCHEMA = [
+    'CREATE TABLE "User" ("id" TEXT PRIMARY KEY, "googleApiKey" TEXT, "googleModelName" TEXT, "googleFallbackModels" TEXT, "googleModelRoutes" TEXT)',
+    'CREATE TABLE "Website" ("id" TEXT PRIMARY KEY, "url" TEXT, "username" TEXT, "appPassword" TEXT, "userId" TEXT)',
+    'CREATE TABLE "ContentItem" ("id" TEXT PRIMARY KEY, "title" TEXT, "topic" TEXT, "status" TEXT, "publishedUrl" TEXT, '
+    '"scheduledFor" TIMESTAMP(3), "priority" INTEGER NOT NULL DEFAULT 0, "websiteId" TEXT, "updatedAt" TIMESTAMP(3))',
+    'CREATE TABLE "AgentJob" ("id" TEXT PRIMARY KEY, "status" TEXT DEFAULT \'PENDING\', "logs" TEXT, "currentStep" TEXT, '
+    '"contentItemId" TEXT, "heartbeatAt" TIMESTAMP(3), "createdAt" TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP, "updatedAt" TIMESTAMP(3))',
+    'CREATE TABLE "AgentJobLog" ("id" SERIAL PRIMARY KEY, "jobId" TEXT NOT NULL, "seq" INTEGER NOT NULL, '
+    '"content" TEXT NOT NULL, "createdAt" TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP, UNIQUE ("jobId", "seq"))',
+    'INSERT INTO "User" VALUES (\'u1\', \'user-key\', NULL, NULL, NULL), (\'u2\', \'other-key\', NULL, NULL, NULL)',
+    'INSERT INTO "Website" VALUES (\'w1\', \'https://blog.example\', \'admin\', \'secret\', \'u1\'), '
+    '(\'w2\', \'https://other.example\', \'editor\', \'pw\', \'u2\')',
+]
+
+
+def test_postgres_workers_never_double_claim():
+    # Needs a disposable database; the tables go in a throwaway schema that is dropped afterwards
+    db_url = os.environ.get("TEST_POSTGRES_URL")
+    if not db_url:
+        print("  -> Skipping Postgres claim test: TEST_POSTGRES_URL is not set")
+        return
+    import psycopg2
+
+    params = postgres_params(db_url)
+    schema = "claim_test_" + uuid.uuid4().hex[:8]
+    admin = psycopg2.connect(**params)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'CREATE SCHEMA "{schema}"')
+        cur.execute(f'SET search_path TO "{schema}"')
+        for statement in _PG_SCHEMA:
+            cur.execute(statement)
+        cur.executemany('INSERT INTO "ContentItem" ("id", "title", "topic", "status", "scheduledFor", "websiteId") '
+                        'VALUES (%s, %s, %s, \'SCHEDULED\', NOW() - interval \'1 hour\', %s)',
+                        [(f"c{i}", f"Item {i}", f"Topic {i}", "w1" if i % 3 else "w2") for i in range(200)])
+
+    def connect():
+        return psycopg2.connect(connection_factory=_pooled_connection_class(), options=f"-c search_path={schema}", **params)
+
+    claimed = []
+    try:
+        # Two stores with one connection each: two workers racing on the same rows
+        stores = [PostgresJobStore(db_url, minconn=1, maxconn=1, connect=connect) for _ in range(2)]
+
+        def claim(store, worker_id):
+            while True:
+                batch = store.claim_due(worker_id, 3)
+                if not batch:
+                    return
+                claimed.extend(c["content_id"] for c in batch)
+
+        threads = [threading.Thread(target=claim, args=(store, f"worker-{n}")) for n, store in enumerate(stores)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for store in stores:
+            store.close()
+        assert sorted(claimed) == sorted(f"c{i}" for i in range(200))
+        with admin.cursor() as cur:
+            cur.execute('SELECT COUNT(*), COUNT(DISTINCT "contentItemId") FROM "AgentJob"')
+            assert cur.fetchone() == (200, 200)
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f'DROP SCHEMA "{schema}" CASCADE')
+        admin.close()
+
+
+if __name__ == "__main__":
+    test_claims_only_due_items_once()
+    test_concurrent_workers_never_double_claim()
+    test_claims_take_users_in_turn_by_priority()
+    test_worker_runs_claims_on_bounded_pool_and_records_outcome()
+    test_expired_claims_are_reclaimed()
+    test_worker_heartbeat_keeps_its_claims()
+    test_postgres_workers_never_double_claim()
+    print("Worker tests passed.")
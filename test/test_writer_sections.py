@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+from unittest.mock import patch
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.getcwd(), "src"))
+
+from adk.core import AgentContext
+from adk.artifacts import ResearchBrief
+from adk.llm_backends import FakeLLMBackend
+from agents.writer_agent import WriterAgent, section_concurrency
+
+OUTLINE = {
+    "title": "Edge AI in 2026",
+    "intro_points": ["why inference moves to devices"],
+    "sections": [{"heading": f"Part {i}", "points": [f"point {i}"]} for i in range(1, 7)],
+}
+BRIEF = ResearchBrief("Edge AI", "Facts about edge AI.", [("Edge report", "https://example.org/edge")])
+
+
+def _responder(model, prompt):
+    if "Plan an article" in prompt:
+        return json.dumps(OUTLINE)
+    if "written section by section" in prompt:
+        return json.dumps({"edits": [{"find": "Edge devices are slow.", "replace": "Edge devices are fast."},
+                                     {"find": "## Part 1", "replace": "## Renamed"},
+                                     {"find": "See the", "replace": "Ambiguous"}]})
+    if "Write the introduction" in prompt:
+        return "# Stray Title\n\nEdge AI is everywhere. See the [Edge report](https://example.org/edge)."
+    if '"## ' not in prompt:
+        return "# Whole article"
+    part = prompt.split('"## ')[1].split('"')[0]
+    extra = " Edge devices are slow." if part == "Part 2" else ""
+    # Part 3 forgets its heading; the others repeat the source link
+    heading = "" if part == "Part 3" else f"## {part}\n\n"
+    return f"{heading}Text for {part}. See the [Edge report](https://example.org/edge).{extra}"
+
+
+def test_sections_are_written_concurrently_under_the_cap():
+    context = AgentContext()
+    context.topic = "Edge AI"
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.1, output_tokens=1, responder=_responder)
+    with patch.dict("os.environ", {"WRITER_SECTION_CONCURRENCY": "3"}):
+        article = WriterAgent(context).run(BRIEF)
+
+    # Outline, 7 pieces (intro + 6 sections) three at a time, consistency pass
+    assert len(backend.calls) == 9
+    assert backend.peak_in_flight == 3
+
+    body = article.body
+    assert body.startswith("# Edge AI in 2026\n\nEdge AI is everywhere.")
+    assert body.count("\n# ") == 0 and "Stray Title" not in body
+    assert [line for line in body.splitlines() if line.startswith("## ")] == [f"## Part {i}" for i in range(1, 7)]
+    # The source is linked once; later mentions keep the anchor text only
+    assert body.count("(https://example.org/edge)") == 1
+    assert article.links == [("Edge report", "https://example.org/edge")]
+    # Only the unambiguous, non-heading edit applied
+    assert "Edge devices are fast." in body and "Ambiguous" not in body
+    assert any("applied 1 of 3 edit(s)" in line for line in context.history)
+
+
+def test_single_mode_and_unusable_outline_fall_back_to_one_call():
+    for env, responder in (({"WRITER_MODE": "single"}, _responder), ({}, lambda model, prompt: "# Plain article")):
+        context = AgentContext()
+        context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=responder)
+        with patch.dict("os.environ", env):
+            article = WriterAgent(context).run(BRIEF)
+        assert len(backend.calls) == (1 if env else 2)
+        assert article.body == ("# Whole article" if env else "# Plain article")
+
+
+def test_section_concurrency_setting_and_numeric_titles():
+    for value, expected in (("0", 1), ("-2", 1), ("5", 5)):
+        with patch.dict("os.environ", {"WRITER_SECTION_CONCURRENCY": value}):
+            assert section_concurrency() == expected
+    with patch.dict("os.environ", {"WRITER_SECTION_CONCURRENCY": "lots"}):
+        try:
+            section_concurrency()
+            assert False, "Expected a non-integer limit to be rejected"
+        except ValueError as e:
+            assert "WRITER_SECTION_CONCURRENCY" in str(e)
+
+    # A zero limit still writes every section, one call at a time
+    context = AgentContext()
+    context.llm_backend = backend = FakeLLMBackend(ttft=0.01, output_tokens=1, responder=_responder)
+    with patch.dict("os.environ", {"WRITER_SECTION_CONCURRENCY": "0"}):
+        WriterAgent(context).run(BRIEF)
+    assert len(backend.calls) == 9 and backend.peak_in_flight == 1
+
+    outline = WriterAgent._parse_outline(json.dumps(dict(OUTLINE, title=2026)))
+    assert outline["title"] == "2026"
+
+
+if __name__ == "__main__":
+    test_sections_are_written_concurrently_under_the_cap()
+    test_single_mode_and_unusable_outline_fall_back_to_one_call()
+    test_section_concurrency_setting_and_numeric_titles()
+    print("Sectioned writer tests passed.")
@@ -0,0 +1,33 @@
+"""
+Print a per-job span waterfall and critical path from a TRACE_FILE export.
+
+Usage:
+    python trace_waterfall.py [--file traces.jsonl] [--job JOB_ID]
+"""
+import os
+import sys
+import argparse
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from adk.tracing import load_spans, format_waterfall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the span waterfall for a traced job.")
+    parser.add_argument("--file", default=os.environ.get("TRACE_FILE") or "traces.jsonl", help="JSONL trace export")
+    parser.add_argument("--job", default=None, help="Trace/job id (defaults to the latest trace)")
+    parser.add_argument("--width", type=int, default=50, help="Width of the timing bars")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"Trace file not found: {args.file} (set TRACE_FILE when running the backend)")
+        sys.exit(1)
+
+    spans = load_spans(args.file, args.job)
+    print(format_waterfall(spans, width=args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 
 import prisma from "@/lib/prisma";
 import { NextResponse } from "next/server";
+import { assembleLogs, parseLogCursor, readLogDelta } from "@/lib/job-logs";
 
 export async function GET(
     req: Request,
@@ -30,7 +31,15 @@ export async function GET(
             return NextResponse.json({ message: "Job not found" }, { status: 404 });
         }
 
-        return NextResponse.json(job);
+        // ?after=<seq> returns only new log segments while the job runs; the final logs once it is done
+        const finished = job.status === "COMPLETED" || job.status === "FAILED";
+        const after = parseLogCursor(req);
+        if (after !== null && !finished) {
+            const { logs, ...rest } = job;
+            return NextResponse.json({ ...rest, ...(await readLogDelta(id, after)) });
+        }
+
+        return NextResponse.json({ ...job, logs: await assembleLogs(id, finished ? job.logs : null) });
     } catch (error: any) {
         return NextResponse.json({ message: "Error fetching demo job", error: error.message }, { status: 500 });
     }
@@ -2,6 +2,7 @@ import prisma from "@/lib/prisma";
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/lib/auth";
 import { NextResponse } from "next/server";
+import { assembleLogs, parseLogCursor, readLogDelta } from "@/lib/job-logs";
 
 export async function GET(
     req: Request,
@@ -39,6 +40,16 @@ export async function GET(
             return NextResponse.json({ message: "Forbidden" }, { status: 403 });
         }
 
+        // ?after=<seq> returns only new log segments while the job runs
+        const finished = job.status === "COMPLETED" || job.status === "FAILED";
+        const after = parseLogCursor(req);
+        if (after !== null && !finished) {
+            const { logs, ...rest } = job;
+            return NextResponse.json({ ...rest, ...(await readLogDelta(id, after)) });
+        }
+
+        job.logs = await assembleLogs(id, finished ? job.logs : null);
+
         // Truncate logs if too large (e.g., last 50,000 characters)
         if (job.logs && job.logs.length > 50000) {
             job.logs = "...(truncated)...\n" + job.logs.slice(-50000);
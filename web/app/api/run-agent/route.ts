@@ -38,6 +38,7 @@ export async function POST(req: Request) {
         const googleApiKey = user.googleApiKey;
         const googleModelName = user.googleModelName;
         const googleFallbackModels = user.googleFallbackModels;
+        const googleModelRoutes = user.googleModelRoutes;
 
         if (!googleApiKey) {
             return NextResponse.json({
@@ -72,6 +73,7 @@ export async function POST(req: Request) {
                         google_api_key: googleApiKey,
                         google_model_name: googleModelName,
                         google_fallback_models: googleFallbackModels,
+                        google_model_routes: googleModelRoutes,
                         wp_config: {
                             url: content.website!.url,
                             username: content.website!.username,
@@ -2,6 +2,7 @@ import prisma from "@/lib/prisma";
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/lib/auth";
 import { NextResponse } from "next/server";
+import { parseModelRoutes } from "@/lib/model-routes";
 
 export async function GET() {
     const session = await getServerSession(authOptions);
@@ -17,6 +18,7 @@ export async function GET() {
                 googleApiKey: true,
                 googleModelName: true,
                 googleFallbackModels: true,
+                googleModelRoutes: true,
             } as any
         });
 
@@ -29,6 +31,7 @@ export async function GET() {
             googleApiKey: userData.googleApiKey,
             googleModelName: userData.googleModelName,
             googleFallbackModels: userData.googleFallbackModels,
+            googleModelRoutes: userData.googleModelRoutes,
         });
     } catch (error) {
         console.error(error);
@@ -44,7 +47,14 @@ export async function POST(req: Request) {
     }
 
     try {
-        const { googleApiKey, googleModelName, googleFallbackModels } = await req.json();
+        const { googleApiKey, googleModelName, googleFallbackModels, googleModelRoutes } = await req.json();
+
+        // Runs ignore malformed routes with a warning, so reject them here where the user can fix them
+        try {
+            parseModelRoutes(googleModelRoutes);
+        } catch (err) {
+            return NextResponse.json({ message: (err as Error).message }, { status: 400 });
+        }
 
         await prisma.user.update({
             where: { email: session.user.email },
@@ -52,6 +62,7 @@ export async function POST(req: Request) {
                 googleApiKey,
                 googleModelName,
                 googleFallbackModels,
+                googleModelRoutes,
             } as any
         });
 
@@ -12,6 +12,7 @@ export default function DemoPage() {
     const [publishedUrl, setPublishedUrl] = useState<string | null>(null);
     const [error, setError] = useState<string | null>(null);
     const logsEndRef = useRef<HTMLDivElement>(null);
+    const logCursorRef = useRef<number>(0);
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
@@ -22,6 +23,7 @@ export default function DemoPage() {
         setLogs("Initializing demo run...\n");
         setPublishedUrl(null);
         setJobId(null);
+        logCursorRef.current = 0;
 
         try {
             const res = await fetch("/api/demo/run", {
@@ -50,7 +52,8 @@ export default function DemoPage() {
 
         const poll = async () => {
             try {
-                const res = await fetch(`/api/demo/jobs/${jobId}`);
+                // Only fetch log segments we have not seen yet
+                const res = await fetch(`/api/demo/jobs/${jobId}?after=${logCursorRef.current}`);
                 if (!res.ok) return; // Retry next time
                 const data = await res.json();
 
@@ -58,12 +61,23 @@ export default function DemoPage() {
                     setStatus(data.status);
                 }
 
-                if (data.logs) {
+                // Running jobs return a delta; finished jobs return the final logs once
+                let newText: string | null = null;
+                if (data.logDelta) {
+                    newText = data.logDelta;
+                    const isFirstDelta = logCursorRef.current === 0;
+                    setLogs((prev) => (isFirstDelta ? data.logDelta : prev + "\n" + data.logDelta));
+                    logCursorRef.current = data.logCursor;
+                } else if (data.logs) {
+                    newText = data.logs;
                     setLogs(data.logs);
+                }
+
+                if (newText) {
                     // Proactive link extraction from logs
-                    const urlMatch = data.logs.match(/\[View Post\]\((https?:\/\/[^\s)]+)\)/) ||
-                        data.logs.match(/SUCCESS: Post published at\s*(https?:\/\/[^\s]+)/) ||
-                        data.logs.match(/SIMULATED: Post would be published at\s*(https?:\/\/[^\s]+)/);
+                    const urlMatch = newText.match(/\[View Post\]\((https?:\/\/[^\s)]+)\)/) ||
+                        newText.match(/SUCCESS: Post published at\s*(https?:\/\/[^\s]+)/) ||
+                        newText.match(/SIMULATED: Post would be published at\s*(https?:\/\/[^\s]+)/);
                     if (urlMatch && !publishedUrl) {
                         setPublishedUrl(urlMatch[1]);
                     }
@@ -8,6 +8,7 @@ export default function SettingsPage() {
     const [googleApiKey, setGoogleApiKey] = useState("");
     const [googleModelName, setGoogleModelName] = useState("");
     const [googleFallbackModels, setGoogleFallbackModels] = useState("");
+    const [googleModelRoutes, setGoogleModelRoutes] = useState("");
     const [isLoading, setIsLoading] = useState(true);
     const [isSaving, setIsSaving] = useState(false);
     const [message, setMessage] = useState({ text: "", type: "" });
@@ -19,6 +20,7 @@ export default function SettingsPage() {
                 if (data.googleApiKey) setGoogleApiKey(data.googleApiKey);
                 if (data.googleModelName) setGoogleModelName(data.googleModelName);
                 if (data.googleFallbackModels) setGoogleFallbackModels(data.googleFallbackModels);
+                if (data.googleModelRoutes) setGoogleModelRoutes(data.googleModelRoutes);
                 setIsLoading(false);
             })
             .catch((err) => {
@@ -36,13 +38,14 @@ export default function SettingsPage() {
             const res = await fetch("/api/user/settings", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ googleApiKey, googleModelName, googleFallbackModels }),
+                body: JSON.stringify({ googleApiKey, googleModelName, googleFallbackModels, googleModelRoutes }),
             });
 
             if (res.ok) {
                 setMessage({ text: "Settings saved successfully!", type: "success" });
             } else {
-                setMessage({ text: "Failed to save settings.", type: "error" });
+                const data = await res.json().catch(() => ({}));
+                setMessage({ text: data.message || "Failed to save settings.", type: "error" });
             }
         } catch (err) {
             setMessage({ text: "An error occurred.", type: "error" });
@@ -143,6 +146,23 @@ export default function SettingsPage() {
                                             placeholder="e.g. gemini-1.5-flash, gemini-1.5-pro"
                                         />
                                     </div>
+
+                                    <div>
+                                        <label htmlFor="modelRoutes" className="block text-sm font-medium text-gray-700">
+                                            Model Routes
+                                        </label>
+                                        <p className="mt-1 text-xs text-gray-500 mb-2">
+                                            Optional. Models per task (query_extraction, alt_text, synthesis, writing, seo_rewrite) or agent, tried in order; one route per line. $primary, $fallbacks and $fast stand for the models above and the fast model.
+                                        </p>
+                                        <textarea
+                                            id="modelRoutes"
+                                            rows={3}
+                                            value={googleModelRoutes}
+                                            onChange={(e) => setGoogleModelRoutes(e.target.value)}
+                                            className="block w-full rounded-lg border border-gray-300 px-4 py-2 font-mono text-sm text-gray-900 focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500"
+                                            placeholder={"alt_text=gemini-2.5-flash-lite|$primary\nwriting=gemini-3-pro-preview|$fallbacks"}
+                                        />
+                                    </div>
                                 </div>
                             </div>
 
@@ -1,5 +1,8 @@
 import prisma from "./prisma";
 
+// Single-instance trigger: nothing stops two cron runs from picking up the same item.
+// For more than one instance, run the Python worker (worker.py), which claims due items
+// with FOR UPDATE SKIP LOCKED and runs them on a bounded pool.
 export async function runCron() {
     console.log("[CRON] Checking for scheduled content...");
     
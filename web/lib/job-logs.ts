@@ -0,0 +1,36 @@
+import prisma from "./prisma";
+
+const MAX_SEGMENTS_PER_READ = 500;
+
+/** Parse the `after` cursor (last seen segment seq) from a request URL; null when absent. */
+export function parseLogCursor(req: Request): number | null {
+    const value = new URL(req.url).searchParams.get("after");
+    if (value === null) return null;
+    const after = parseInt(value, 10);
+    return Number.isFinite(after) && after > 0 ? after : 0;
+}
+
+/** Log segments newer than `after`, joined as text, plus the cursor to send next time. */
+export async function readLogDelta(jobId: string, after: number) {
+    const segments = await prisma.agentJobLog.findMany({
+        where: { jobId, seq: { gt: after } },
+        orderBy: { seq: "asc" },
+        take: MAX_SEGMENTS_PER_READ,
+        select: { seq: true, content: true },
+    });
+    return {
+        logDelta: segments.map((s) => s.content).join("\n"),
+        logCursor: segments.length ? segments[segments.length - 1].seq : after,
+    };
+}
+
+/** Full log text: the final `logs` column for finished jobs (pass null while running), otherwise the segments so far. */
+export async function assembleLogs(jobId: string, finalLogs: string | null): Promise<string> {
+    if (finalLogs !== null) return finalLogs;
+    const segments = await prisma.agentJobLog.findMany({
+        where: { jobId },
+        orderBy: { seq: "asc" },
+        select: { content: true },
+    });
+    return segments.map((s) => s.content).join("\n");
+}
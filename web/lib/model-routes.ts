@@ -0,0 +1,50 @@
+// Same grammar as src/adk/routing.py parse_routes: a JSON object or "route=model|model" entries
+// separated by newlines or semicolons, where a model may be $primary, $fallbacks or $fast.
+const TOKENS = ["$primary", "$fallbacks", "$fast"];
+
+function splitModels(value: string): string[] {
+    return value.replace(/\|/g, ",").split(",").map((m) => m.trim()).filter(Boolean);
+}
+
+/** Parsed routes {route: [model, ...]}; throws an Error describing the first malformed entry. */
+export function parseModelRoutes(value: unknown): Record<string, string[]> {
+    if (!value) return {};
+    let entries: Record<string, unknown> = {};
+    if (typeof value === "string") {
+        const text = value.trim();
+        if (text.startsWith("{")) {
+            try {
+                entries = JSON.parse(text);
+            } catch {
+                throw new Error("Model routes look like JSON but do not parse");
+            }
+        } else {
+            for (const entry of text.replace(/\n/g, ";").split(";").map((p) => p.trim()).filter(Boolean)) {
+                const sep = entry.indexOf("=");
+                if (sep < 0 || !entry.slice(0, sep).trim()) {
+                    throw new Error(`Model route '${entry}' must look like 'call_or_agent=model|model'`);
+                }
+                entries[entry.slice(0, sep).trim()] = entry.slice(sep + 1);
+            }
+        }
+    } else {
+        entries = value as Record<string, unknown>;
+    }
+    if (typeof entries !== "object" || entries === null || Array.isArray(entries)) {
+        throw new Error("Model routes must map a call type, an agent name or '*' to a model list");
+    }
+
+    const routes: Record<string, string[]> = {};
+    for (const [key, models] of Object.entries(entries)) {
+        const list = typeof models === "string" ? splitModels(models) : Array.isArray(models) ? models : [];
+        if (!list.length || !list.every((m) => typeof m === "string" && m)) {
+            throw new Error(`Model route '${key}' needs at least one model name`);
+        }
+        const unknown = list.filter((m: string) => m.startsWith("$") && !TOKENS.includes(m));
+        if (unknown.length) {
+            throw new Error(`Unknown model token(s) in route '${key}': ${unknown.join(", ")}; expected ${TOKENS.join(", ")}`);
+        }
+        routes[key] = list;
+    }
+    return routes;
+}
@@ -0,0 +1,16 @@
+-- CreateTable
+CREATE TABLE "AgentJobLog" (
+    "id" SERIAL NOT NULL,
+    "jobId" TEXT NOT NULL,
+    "seq" INTEGER NOT NULL,
+    "content" TEXT NOT NULL,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "AgentJobLog_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "AgentJobLog_jobId_seq_key" ON "AgentJobLog"("jobId", "seq");
+
+-- AddForeignKey
+ALTER TABLE "AgentJobLog" ADD CONSTRAINT "AgentJobLog_jobId_fkey" FOREIGN KEY ("jobId") REFERENCES "AgentJob"("id") ON DELETE CASCADE ON UPDATE CASCADE;
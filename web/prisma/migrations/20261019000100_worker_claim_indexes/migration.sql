@@ -0,0 +1,5 @@
+-- CreateIndex
+CREATE INDEX "ContentItem_status_scheduledFor_idx" ON "ContentItem"("status", "scheduledFor");
+
+-- CreateIndex
+CREATE INDEX "AgentJob_contentItemId_idx" ON "AgentJob"("contentItemId");
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "ContentItem" ADD COLUMN "priority" INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,9 @@
+-- CreateTable
+CREATE TABLE "StageCheckpoint" (
+    "jobId" TEXT NOT NULL,
+    "stage" TEXT NOT NULL,
+    "payload" TEXT NOT NULL,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "StageCheckpoint_pkey" PRIMARY KEY ("jobId","stage")
+);
@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "AgentJob" ADD COLUMN     "heartbeatAt" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "AgentJob_status_heartbeatAt_idx" ON "AgentJob"("status", "heartbeatAt");
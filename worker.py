@@ -0,0 +1,226 @@
+"""
+Polling worker for scheduled content.
+
+Claims due ContentItems in batches (FOR UPDATE SKIP LOCKED on Postgres, a WorkerClaim lock table on
+SQLite), taking users in turn, and runs them through a FairScheduler: at most `concurrency` pipelines,
+with per-user and per-site caps and weighted fair ordering across users. Any number of workers can
+poll the same database: a row is claimed by exactly one of them, and a worker only claims enough to
+fill its slots plus a small backlog (batch size) for the scheduler to choose from.
+
+Each claim is a lease: while a claimed job runs or waits in the queue, a heartbeat thread refreshes it
+every third of WORKER_LEASE_SECONDS. If a worker dies (crash, OOM, lost host), its jobs stop beating,
+and once the lease runs out the next poll by any worker marks them FAILED (with the logs they wrote)
+and claims their content again. Keep the lease well above a heartbeat hiccup: a worker that is only
+slow to beat can lose its claim, and the item then runs twice.
+
+Usage:
+    python worker.py                 # poll DATABASE_URL until interrupted
+    python worker.py --once          # claim one batch, run it, exit
+"""
+import os
+import sys
+import socket
+import typing
+import argparse
+import datetime
+import threading
+import collections
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from adk.core import AgentContext
+from adk.checkpoint import get_checkpoint_store
+from adk.job_store import get_job_store, WORKER_LEASE_SECONDS
+from adk.routing import job_routes
+from adk.job_outcome import record_success, record_failure
+from adk.metrics import JOBS_IN_FLIGHT
+from adk.scheduler import FairScheduler, tenant_key
+
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "2"))
+WORKER_BATCH_SIZE = int(os.environ.get("WORKER_BATCH_SIZE", "0")) or WORKER_CONCURRENCY
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "15"))
+# (content_id, status) of the most recent jobs; older ones are dropped so a long-running worker stays bounded
+WORKER_RECENT_RESULTS = int(os.environ.get("WORKER_RECENT_RESULTS", "100"))
+
+
+def run_manager(context: AgentContext, topic: str):
+    from agents.manager_agent import ManagerAgent
+    return ManagerAgent(context).run(topic)
+
+
+def deadline_of(scheduled_for) -> typing.Optional[float]:
+    """scheduledFor as epoch seconds: Postgres datetimes, Prisma's SQLite epoch milliseconds, or ISO text."""
+    if scheduled_for is None:
+        return None
+    if isinstance(scheduled_for, datetime.datetime):
+        if scheduled_for.tzinfo is None:
+            scheduled_for = scheduled_for.replace(tzinfo=datetime.timezone.utc)
+        return scheduled_for.timestamp()
+    if isinstance(scheduled_for, (int, float)):
+        return scheduled_for / 1000.0
+    try:
+        return datetime.datetime.fromisoformat(str(scheduled_for).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class Worker:
+    """Claims due content and runs it through a fair-share scheduler with `concurrency` slots."""
+
+    def __init__(self, db_url: str, concurrency: int = None, batch_size: int = None,
+                 poll_seconds: float = None, worker_id: str = None, pipeline=None, scheduler: FairScheduler = None,
+                 lease_seconds: float = None):
+        self.db_url = db_url
+        self.concurrency = concurrency or WORKER_CONCURRENCY
+        self.batch_size = batch_size or WORKER_BATCH_SIZE
+        self.poll_seconds = WORKER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.lease_seconds = WORKER_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.pipeline = pipeline or run_manager
+        self.store = get_job_store(db_url)
+        self.results = collections.deque(maxlen=WORKER_RECENT_RESULTS)
+        self.scheduler = scheduler or FairScheduler(max_concurrent=self.concurrency, name="worker")
+        self._stopping = threading.Event()
+        # Job ids this worker holds a lease on (claimed, queued or running)
+        self._leased = set()
+        self._leased_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._heartbeat_thread = None
+
+    @property
+    def free_slots(self) -> int:
+        """Slots plus backlog not yet taken by running or queued claims."""
+        return self.concurrency + self.batch_size - self.scheduler.running - self.scheduler.queued
+
+    def poll_once(self) -> int:
+        """Claim up to batch_size items (as room allows) and queue them; returns how many were claimed."""
+        free = min(self.batch_size, self.free_slots)
+        if free <= 0:
+            return 0
+        claims = self.store.claim_due(self.worker_id, free, self.lease_seconds)
+        if claims:
+            with self._leased_lock:
+                self._leased.update(claim["job_id"] for claim in claims)
+            self._start_heartbeat()
+        for claim in claims:
+            self.scheduler.submit(
+                lambda claim=claim: self._run_claim(claim),
+                tenant=tenant_key(claim.get("user_id"), claim.get("google_api_key")),
+                site=claim.get("wp_url"),
+                priority=claim.get("priority") or 0,
+                deadline=deadline_of(claim.get("scheduled_for")),
+            )
+        if claims:
+            print(f"[Worker {self.worker_id}] Claimed {len(claims)} item(s): " + ", ".join(c["topic"] for c in claims))
+        return len(claims)
+
+    def heartbeat(self):
+        """Extend the lease on every claim this worker still holds."""
+        with self._leased_lock:
+            job_ids = list(self._leased)
+        if not job_ids:
+            return
+        try:
+            self.store.heartbeat(job_ids)
+        except Exception as e:
+            print(f"[Worker {self.worker_id}] Heartbeat failed: {e}")
+
+    def _start_heartbeat(self):
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        # A third of the lease, so a missed beat or two does not let another worker reclaim
+        while not self._closed.wait(self.lease_seconds / 3):
+            self.heartbeat()
+
+    def _context_for(self, claim: dict) -> AgentContext:
+        context = AgentContext()
+        context.topic = claim["topic"]
+        context.db_url = self.db_url
+        context.job_id = claim["job_id"]
+        context.google_api_key = claim.get("google_api_key") or os.environ.get("GOOGLE_API_KEY")
+        context.google_model_name = claim.get("google_model_name") or os.environ.get("GOOGLE_MODEL_NAME")
+        context.google_fallback_models = claim.get("google_fallback_models") or os.environ.get("GOOGLE_FALLBACK_MODELS")
+        # Same handling as /run: a bad saved route is logged to the job and the defaults apply
+        context.google_model_routes = job_routes(claim.get("google_model_routes"), context.log)
+        if claim.get("wp_url"):
+            context.wp_config = {"url": claim["wp_url"], "username": claim["wp_username"], "password": claim["wp_password"]}
+        context.checkpoint_store = get_checkpoint_store(db_url=self.db_url)
+        return context
+
+    def _run_claim(self, claim: dict):
+        context = self._context_for(claim)
+        JOBS_IN_FLIGHT.inc()
+        try:
+            if not context.wp_config:
+                raise Exception("Content has no website configured")
+            result = self.pipeline(context, claim["topic"])
+            status = record_success(self.db_url, claim["job_id"], context, result)
+            self.results.append((claim["content_id"], status))
+            print(f"[Worker {self.worker_id}] {claim['topic']}: {status}")
+        except Exception as e:
+            print(f"[Worker {self.worker_id}] {claim['topic']} failed: {e}")
+            try:
+                record_failure(self.db_url, claim["job_id"], context, e, content_status="FAILED")
+            except Exception as db_err:
+                print(f"[FINAL DB ERROR] {db_err}")
+            self.results.append((claim["content_id"], "FAILED"))
+        finally:
+            JOBS_IN_FLIGHT.dec()
+            with self._leased_lock:
+                self._leased.discard(claim["job_id"])
+            try:
+                self.store.release_claim(claim["content_id"])
+            except Exception as db_err:
+                print(f"[Worker {self.worker_id}] Could not release claim: {db_err}")
+
+    def run_forever(self):
+        print(f"[Worker {self.worker_id}] Polling every {self.poll_seconds}s with {self.concurrency} slot(s)")
+        while not self._stopping.is_set():
+            try:
+                claimed = self.poll_once()
+            except Exception as e:
+                print(f"[Worker {self.worker_id}] Claim failed: {e}")
+                claimed = 0
+            # Poll again right away while there is work and room for it
+            if not claimed or self.free_slots <= 0:
+                self._stopping.wait(self.poll_seconds)
+
+    def stop(self, wait: bool = True):
+        self._stopping.set()
+        # Keep beating until the running jobs are done, or they could be reclaimed mid-run
+        self.scheduler.shutdown(wait=wait)
+        self._closed.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scheduled content from the job database")
+    parser.add_argument("--db", default=os.environ.get("DATABASE_URL"), help="Database URL (default: DATABASE_URL)")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Pipelines run at once")
+    parser.add_argument("--batch-size", type=int, default=WORKER_BATCH_SIZE, help="Most items claimed per poll (and queued beyond the running ones)")
+    parser.add_argument("--poll", type=float, default=WORKER_POLL_SECONDS, help="Seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="Claim one batch, wait for it, and exit")
+    args = parser.parse_args()
+    if not args.db:
+        parser.error("DATABASE_URL is not set; pass --db")
+
+    worker = Worker(args.db, concurrency=args.concurrency, batch_size=args.batch_size, poll_seconds=args.poll)
+    if args.once:
+        worker.poll_once()
+        worker.stop()
+        return
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        print(f"[Worker {worker.worker_id}] Stopping; waiting for running jobs...")
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()